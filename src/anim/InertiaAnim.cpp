@@ -0,0 +1,225 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "InertiaAnim.h"
+
+#include "../base/MathHelper.h"
+
+#include "../player/Player.h"
+
+#include <cmath>
+
+using namespace boost;
+using namespace boost::python;
+using namespace std;
+
+namespace avg {
+
+// Friction and velocity smoothing are specified per frame at this frame duration.
+static const float REF_FRAME_DURATION = 1000.f/60;
+// Weight of the old velocity estimate after one reference frame.
+static const float VELOCITY_DECAY = 0.9f;
+// Angular friction is friction/ANG_FRICTION_DIVISOR.
+static const float ANG_FRICTION_DIVISOR = 200;
+
+InertiaAnim::InertiaAnim(float friction, const object& moveCallback, 
+        const object& stopCallback)
+    : Anim(object(), stopCallback),
+      m_Friction(friction),
+      m_MoveCallback(moveCallback),
+      m_Velocity(0,0),
+      m_AngVelocity(0),
+      m_Pivot(0,0),
+      m_LastDragTime(Player::get()->getFrameTime()),
+      m_LastDragDuration(REF_FRAME_DURATION),
+      m_StartTime(0),
+      m_TransDuration(0),
+      m_AngDuration(0),
+      m_LastTransOffset(0,0),
+      m_LastAngOffset(0)
+{
+}
+
+InertiaAnim::~InertiaAnim()
+{
+}
+
+void InertiaAnim::onDrag(const glm::vec2& trans, float rot, const glm::vec2& pivot)
+{
+    long long curTime = Player::get()->getFrameTime();
+    float duration = float(curTime-m_LastDragTime);
+    if (duration > 0) {
+        m_LastDragDuration = duration;
+    } else {
+        // Several drags in one frame.
+        duration = m_LastDragDuration;
+    }
+    m_LastDragTime = curTime;
+
+    if (rot > M_PI) {
+        rot -= float(2*M_PI);
+    }
+    // Exponential moving average of the velocity with a time constant that doesn't
+    // depend on the time between samples.
+    float decay = pow(VELOCITY_DECAY, duration/REF_FRAME_DURATION);
+    m_Velocity = decay*m_Velocity + (1-decay)*trans/duration;
+    m_AngVelocity = decay*m_AngVelocity + (1-decay)*rot/duration;
+    if (pivot != glm::vec2(0,0)) {
+        m_Pivot = pivot;
+    }
+}
+
+void InertiaAnim::start(bool)
+{
+    m_pThis = dynamic_pointer_cast<InertiaAnim>(shared_from_this());
+    Anim::start();
+    m_StartTime = Player::get()->getFrameTime();
+    m_LastTransOffset = glm::vec2(0,0);
+    m_LastAngOffset = 0;
+
+    // Account for the time the contact didn't move before it was released.
+    float decay = pow(VELOCITY_DECAY, (m_StartTime-m_LastDragTime)/REF_FRAME_DURATION);
+    m_Velocity *= decay;
+    m_AngVelocity *= decay;
+    
+    float speed = glm::length(m_Velocity);
+    float transDecel = m_Friction/REF_FRAME_DURATION;
+    float angDecel = transDecel/ANG_FRICTION_DIVISOR;
+    if (m_Friction > 0) {
+        m_TransDuration = speed/transDecel;
+        m_AngDuration = fabs(m_AngVelocity)/angDecel;
+    } else {
+        // No friction: Move until aborted.
+        m_TransDuration = -1;
+        m_AngDuration = -1;
+    }
+    if (m_Friction > 0 && m_TransDuration <= REF_FRAME_DURATION &&
+            m_AngDuration <= REF_FRAME_DURATION)
+    {
+        // Too slow to move for even one frame.
+        stop();
+    }
+}
+
+void InertiaAnim::abort()
+{
+    if (isRunning()) {
+        stop();
+    } else {
+        releaseCallbacks();
+    }
+}
+    
+bool InertiaAnim::step()
+{
+    assert(isRunning());
+    float time = float(Player::get()->getFrameTime()-m_StartTime);
+    glm::vec2 transOffset = calcTransOffset(time);
+    float angOffset = calcAngOffset(time);
+    glm::vec2 trans = transOffset-m_LastTransOffset;
+    float rot = angOffset-m_LastAngOffset;
+    m_LastTransOffset = transOffset;
+    m_LastAngOffset = angOffset;
+    m_Pivot += trans;
+
+    InertiaAnimPtr tempThis = m_pThis;
+    if (m_MoveCallback != object()) {
+        m_MoveCallback(trans, rot, m_Pivot);
+    }
+    if (isRunning() && m_TransDuration != -1 && time >= m_TransDuration && 
+            time >= m_AngDuration)
+    {
+        stop();
+        return true;
+    } else {
+        return false;
+    }
+}
+
+void InertiaAnim::onPlaybackEnd()
+{
+    m_MoveCallback = object();
+    Anim::onPlaybackEnd();
+}
+
+float InertiaAnim::getFriction() const
+{
+    return m_Friction;
+}
+
+glm::vec2 InertiaAnim::getVelocity() const
+{
+    return m_Velocity;
+}
+
+float InertiaAnim::getAngVelocity() const
+{
+    return m_AngVelocity;
+}
+
+glm::vec2 InertiaAnim::calcTransOffset(float time) const
+{
+    float speed = glm::length(m_Velocity);
+    if (speed == 0) {
+        return glm::vec2(0,0);
+    }
+    float decel = m_Friction/REF_FRAME_DURATION;
+    if (m_TransDuration != -1) {
+        time = min(time, m_TransDuration);
+    } else {
+        decel = 0;
+    }
+    return m_Velocity/speed * (speed*time - decel*time*time/2);
+}
+
+float InertiaAnim::calcAngOffset(float time) const
+{
+    if (m_AngVelocity == 0) {
+        return 0;
+    }
+    float decel = m_Friction/REF_FRAME_DURATION/ANG_FRICTION_DIVISOR;
+    if (m_AngDuration != -1) {
+        time = min(time, m_AngDuration);
+    } else {
+        decel = 0;
+    }
+    float sign = m_AngVelocity > 0 ? 1.f : -1.f;
+    return sign * (fabs(m_AngVelocity)*time - decel*time*time/2);
+}
+
+void InertiaAnim::stop()
+{
+    InertiaAnimPtr tempThis = m_pThis;
+    m_pThis = InertiaAnimPtr();
+    setStopped();
+    releaseCallbacks();
+}
+
+void InertiaAnim::releaseCallbacks()
+{
+    // The callbacks are usually methods of the object that owns the anim. Python's
+    // garbage collector can't break this cycle because it runs through C++.
+    m_MoveCallback = object();
+    setStopCallback(object());
+}
+
+}
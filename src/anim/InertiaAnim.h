@@ -0,0 +1,87 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _InertiaAnim_H_
+#define _InertiaAnim_H_
+
+#include "../api.h"
+
+#include "Anim.h"
+
+#include "../base/GLMHelper.h"
+
+namespace avg {
+
+class InertiaAnim;
+typedef boost::shared_ptr<class InertiaAnim> InertiaAnimPtr;
+
+// Lets a dragged object coast after the contact is released. While the object is
+// dragged, onDrag() estimates its velocity. start() begins the coasting phase, which
+// decelerates the object at a constant rate until it stops. Positions are calculated
+// analytically from the time since start(), so the motion doesn't depend on the
+// framerate and skipped frames don't change the result. Every frame, moveCallback is 
+// called with the translation and rotation since the last frame and the current pivot.
+class AVG_API InertiaAnim: public Anim {
+public:
+    InertiaAnim(float friction, 
+            const boost::python::object& moveCallback=boost::python::object(), 
+            const boost::python::object& stopCallback=boost::python::object());
+    virtual ~InertiaAnim();
+   
+    void onDrag(const glm::vec2& trans, float rot, const glm::vec2& pivot);
+    virtual void start(bool bKeepAttr=false);
+    virtual void abort();
+    
+    virtual bool step();
+    virtual void onPlaybackEnd();
+
+    float getFriction() const;
+    glm::vec2 getVelocity() const;
+    float getAngVelocity() const;
+
+private:
+    glm::vec2 calcTransOffset(float time) const;
+    float calcAngOffset(float time) const;
+    void stop();
+    void releaseCallbacks();
+
+    float m_Friction;
+    boost::python::object m_MoveCallback;
+
+    glm::vec2 m_Velocity;
+    float m_AngVelocity;
+    glm::vec2 m_Pivot;
+    long long m_LastDragTime;
+    float m_LastDragDuration;
+
+    long long m_StartTime;
+    float m_TransDuration;
+    float m_AngDuration;
+    glm::vec2 m_LastTransOffset;
+    float m_LastAngOffset;
+
+    InertiaAnimPtr m_pThis; // Make sure we're not deleted while running.
+};
+
+}
+
+#endif 
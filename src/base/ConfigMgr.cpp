@@ -97,9 +97,14 @@ ConfigMgr::ConfigMgr()
     addOption("gesture", "filterbeta", "0.03");
     addOption("gesture", "friction", "-1");
 
+    addSubsys("bitmap");
+    addOption("bitmap", "diskcachedir", "");
+
     addSubsys("touch");
     addOption("touch", "area", "0, 0");
     addOption("touch", "offset", "0, 0");
+    addOption("touch", "filtermincutoff", "-1");
+    addOption("touch", "filterbeta", "0.03");
 
     m_sFName = "avgrc";
     loadFile(getGlobalConfigDir()+m_sFName);
@@ -183,6 +188,25 @@ int ConfigMgr::getIntOption(const string& sSubsys,
     return Result;
 }
 
+float ConfigMgr::getFloatOption(const string& sSubsys, 
+        const string& sName, float Default) const
+{
+    errno = 0;
+    const string * psOption = getOption(sSubsys, sName);
+    if (psOption == 0) {
+        return Default;
+    }
+    char * pEnd;
+    float Result = float(strtod(psOption->c_str(), &pEnd));
+    int rc = errno;
+    if (rc == ERANGE || pEnd == psOption->c_str()) {
+        AVG_LOG_ERROR(m_sFName << ": Unrecognized value for option "<<sName<<": " 
+                << *psOption << ". Must be a number. Aborting.");
+        exit(-1);
+    }
+    return Result;
+}
+
 void ConfigMgr::getGammaOption(const string& sSubsys, 
             const string& sName, float* Val) const
 {
@@ -57,6 +57,8 @@ public:
             const std::string& sName, bool bDefault) const;
     int getIntOption(const std::string& sSubsys, 
             const std::string& sName, int Default) const;
+    float getFloatOption(const std::string& sSubsys, 
+            const std::string& sName, float Default) const;
     void getGammaOption(const std::string& sSubsys, 
             const std::string& sName, float* Val) const;
     glm::vec2 getSizeOption(const std::string& sSubsys, 
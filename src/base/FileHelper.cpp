@@ -123,6 +123,15 @@ bool fileExists(const string& sFilename)
     return stat(sFilename.c_str(), &myStat) != -1;
 }
 
+time_t getFileModTime(const string& sFilename)
+{
+    struct stat myStat;
+    if (stat(sFilename.c_str(), &myStat) == -1) {
+        return -1;
+    }
+    return myStat.st_mtime;
+}
+
 void readWholeFile(const string& sFilename, string& sContent)
 {
     ifstream file(sFilename.c_str());
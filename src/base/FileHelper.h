@@ -24,6 +24,7 @@
 
 #include "../api.h"
 #include <string>
+#include <ctime>
 
 namespace avg {
     
@@ -36,6 +37,9 @@ bool AVG_API isAbsPath(const std::string& path);
 
 bool AVG_API fileExists(const std::string& sFilename);
 
+// Returns -1 if the file can't be accessed.
+time_t AVG_API getFileModTime(const std::string& sFilename);
+
 void AVG_API readWholeFile(const std::string& sFilename, std::string& sContents);
 
 void AVG_API writeWholeFile(const std::string& sFilename, const std::string& sContent);
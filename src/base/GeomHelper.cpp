@@ -21,6 +21,8 @@
 
 #include "GeomHelper.h"
 
+#include "Exception.h"
+
 #include <math.h>
 #include <iostream>
 
@@ -174,5 +176,140 @@ glm::vec2 getLineLineIntersection(const glm::vec2& p1, const glm::vec2& v1,
 
 }
 
+static void calcCentroids(const vector<glm::vec2>& pts, const vector<int>& clusters,
+        vector<glm::vec2>& centroids, vector<int>& clusterSizes)
+{
+    centroids.assign(centroids.size(), glm::vec2(0,0));
+    clusterSizes.assign(centroids.size(), 0);
+    for (unsigned i = 0; i < pts.size(); ++i) {
+        int cluster = clusters[i];
+        if (cluster != -1) {
+            centroids[cluster] += pts[i];
+            clusterSizes[cluster]++;
+        }
+    }
+    for (unsigned i = 0; i < centroids.size(); ++i) {
+        if (clusterSizes[i] > 0) {
+            centroids[i] /= float(clusterSizes[i]);
+        }
+    }
+}
+
+static float calcMinDist2(const glm::vec2& pt, const vector<glm::vec2>& centroids, 
+        const vector<int>& clusterSizes, int& nearestCluster)
+{
+    float minDist2 = -1;
+    nearestCluster = -1;
+    for (unsigned i = 0; i < centroids.size(); ++i) {
+        if (clusterSizes[i] > 0) {
+            glm::vec2 diff = pt-centroids[i];
+            float dist2 = glm::dot(diff, diff);
+            if (nearestCluster == -1 || dist2 < minDist2) {
+                minDist2 = dist2;
+                nearestCluster = i;
+            }
+        }
+    }
+    return minDist2;
+}
+
+vector<int> calcKMeans(const vector<glm::vec2>& pts, int numClusters,
+        const vector<int>& initialClusters, int maxIterations)
+{
+    if (numClusters < 1 || int(pts.size()) < numClusters) {
+        throw Exception(AVG_ERR_INVALID_ARGS, 
+                "calcKMeans: Need at least numClusters points.");
+    }
+    vector<int> clusters(pts.size(), -1);
+    for (unsigned i = 0; i < pts.size() && i < initialClusters.size(); ++i) {
+        if (initialClusters[i] >= 0 && initialClusters[i] < numClusters) {
+            clusters[i] = initialClusters[i];
+        }
+    }
+    vector<glm::vec2> centroids(numClusters);
+    vector<int> clusterSizes(numClusters);
+    calcCentroids(pts, clusters, centroids, clusterSizes);
+
+    // Seed empty clusters with the point farthest from all existing clusters.
+    for (int c = 0; c < numClusters; ++c) {
+        if (clusterSizes[c] == 0) {
+            int seedIndex = 0;
+            float maxDist2 = -1;
+            for (unsigned i = 0; i < pts.size(); ++i) {
+                int nearestCluster;
+                float dist2 = calcMinDist2(pts[i], centroids, clusterSizes, 
+                        nearestCluster);
+                if (nearestCluster == -1) {
+                    // No clusters yet.
+                    break;
+                }
+                if (dist2 > maxDist2) {
+                    maxDist2 = dist2;
+                    seedIndex = i;
+                }
+            }
+            centroids[c] = pts[seedIndex];
+            clusterSizes[c] = 1;
+        }
+    }
+
+    for (int iteration = 0; iteration < maxIterations; ++iteration) {
+        bool bChanged = false;
+        for (unsigned i = 0; i < pts.size(); ++i) {
+            int nearestCluster;
+            calcMinDist2(pts[i], centroids, clusterSizes, nearestCluster);
+            if (nearestCluster != clusters[i]) {
+                clusters[i] = nearestCluster;
+                bChanged = true;
+            }
+        }
+        calcCentroids(pts, clusters, centroids, clusterSizes);
+        // Clusters can run empty. Move the worst-fitting point of a larger cluster 
+        // there.
+        for (int c = 0; c < numClusters; ++c) {
+            if (clusterSizes[c] == 0) {
+                int worstIndex = -1;
+                float maxDist2 = -1;
+                for (unsigned i = 0; i < pts.size(); ++i) {
+                    if (clusterSizes[clusters[i]] > 1) {
+                        glm::vec2 diff = pts[i]-centroids[clusters[i]];
+                        float dist2 = glm::dot(diff, diff);
+                        if (dist2 > maxDist2) {
+                            maxDist2 = dist2;
+                            worstIndex = i;
+                        }
+                    }
+                }
+                AVG_ASSERT(worstIndex != -1);
+                clusters[worstIndex] = c;
+                calcCentroids(pts, clusters, centroids, clusterSizes);
+                bChanged = true;
+            }
+        }
+        if (!bChanged) {
+            break;
+        }
+    }
+    return clusters;
+}
+
+vector<glm::vec2> calcClusterCentroids(const vector<glm::vec2>& pts,
+        const vector<int>& clusters, int numClusters)
+{
+    if (clusters.size() != pts.size()) {
+        throw Exception(AVG_ERR_INVALID_ARGS, 
+                "calcClusterCentroids: Need one cluster index per point.");
+    }
+    for (unsigned i = 0; i < clusters.size(); ++i) {
+        if (clusters[i] < 0 || clusters[i] >= numClusters) {
+            throw Exception(AVG_ERR_OUT_OF_RANGE, 
+                    "calcClusterCentroids: Cluster index out of range.");
+        }
+    }
+    vector<glm::vec2> centroids(numClusters);
+    vector<int> clusterSizes(numClusters);
+    calcCentroids(pts, clusters, centroids, clusterSizes);
+    return centroids;
+}
 
 }
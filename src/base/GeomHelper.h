@@ -46,6 +46,17 @@ bool AVG_API pointInPolygon(const glm::vec2& pt, const std::vector<glm::vec2>& p
 glm::vec2 AVG_API getLineLineIntersection(const glm::vec2& p1, const glm::vec2& v1, 
         const glm::vec2& p2, const glm::vec2& v2);
 
+// Partitions pts into numClusters clusters and returns the cluster index of each point.
+// initialClusters can contain a previous result, with -1 for points that weren't
+// clustered before. Empty clusters are seeded k-means++-style with the point that is
+// farthest from all existing cluster centers.
+std::vector<int> AVG_API calcKMeans(const std::vector<glm::vec2>& pts, int numClusters,
+        const std::vector<int>& initialClusters=std::vector<int>(),
+        int maxIterations=50);
+
+std::vector<glm::vec2> AVG_API calcClusterCentroids(const std::vector<glm::vec2>& pts,
+        const std::vector<int>& clusters, int numClusters);
+
 }
 #endif
  
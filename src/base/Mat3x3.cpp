@@ -0,0 +1,209 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#include "Mat3x3.h"
+
+#include "Exception.h"
+#include "GLMHelper.h"
+
+#include <math.h>
+
+using namespace std;
+
+namespace avg {
+
+Mat3x3::Mat3x3()
+{
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            m_Elems[i][j] = (i == j) ? 1.f : 0.f;
+        }
+    }
+}
+
+Mat3x3::Mat3x3(const glm::vec3& row0, const glm::vec3& row1, const glm::vec3& row2)
+{
+    setRow(0, row0);
+    setRow(1, row1);
+    setRow(2, row2);
+}
+
+Mat3x3 Mat3x3::translate(const glm::vec2& t)
+{
+    return Mat3x3(glm::vec3(1, 0, t.x), glm::vec3(0, 1, t.y));
+}
+
+Mat3x3 Mat3x3::rotate(float angle)
+{
+    float c = cos(angle);
+    float s = sin(angle);
+    return Mat3x3(glm::vec3(c, -s, 0), glm::vec3(s, c, 0));
+}
+
+Mat3x3 Mat3x3::pivotRotate(const glm::vec2& pivot, float angle)
+{
+    return translate(pivot)*rotate(angle)*translate(-pivot);
+}
+
+Mat3x3 Mat3x3::scale(const glm::vec2& s)
+{
+    return Mat3x3(glm::vec3(s.x, 0, 0), glm::vec3(0, s.y, 0));
+}
+
+glm::vec3 Mat3x3::getRow(int i) const
+{
+    if (i < 0 || i > 2) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, 
+                "Index out of range for Mat3x3. Must be 0, 1 or 2.");
+    }
+    return glm::vec3(m_Elems[i][0], m_Elems[i][1], m_Elems[i][2]);
+}
+
+void Mat3x3::setRow(int i, const glm::vec3& row)
+{
+    if (i < 0 || i > 2) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, 
+                "Index out of range for Mat3x3. Must be 0, 1 or 2.");
+    }
+    m_Elems[i][0] = row.x;
+    m_Elems[i][1] = row.y;
+    m_Elems[i][2] = row.z;
+}
+
+Mat3x3 Mat3x3::operator *(const Mat3x3& other) const
+{
+    Mat3x3 result;
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            result.m_Elems[i][j] = m_Elems[i][0]*other.m_Elems[0][j] +
+                    m_Elems[i][1]*other.m_Elems[1][j] + 
+                    m_Elems[i][2]*other.m_Elems[2][j];
+        }
+    }
+    return result;
+}
+
+Mat3x3 Mat3x3::operator *(float s) const
+{
+    Mat3x3 result;
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            result.m_Elems[i][j] = m_Elems[i][j]*s;
+        }
+    }
+    return result;
+}
+
+bool Mat3x3::operator ==(const Mat3x3& other) const
+{
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            if (m_Elems[i][j] != other.m_Elems[i][j]) {
+                return false;
+            }
+        }
+    }
+    return true;
+}
+
+glm::vec3 Mat3x3::applyVec(const glm::vec3& v) const
+{
+    return glm::vec3(
+            m_Elems[0][0]*v.x + m_Elems[0][1]*v.y + m_Elems[0][2]*v.z,
+            m_Elems[1][0]*v.x + m_Elems[1][1]*v.y + m_Elems[1][2]*v.z,
+            m_Elems[2][0]*v.x + m_Elems[2][1]*v.y + m_Elems[2][2]*v.z);
+}
+
+glm::vec2 Mat3x3::applyPoint(const glm::vec2& pt) const
+{
+    glm::vec3 v = applyVec(glm::vec3(pt.x, pt.y, 1));
+    return glm::vec2(v.x, v.y)/v.z;
+}
+
+vector<glm::vec2> Mat3x3::applyPoints(const vector<glm::vec2>& pts) const
+{
+    vector<glm::vec2> result;
+    result.reserve(pts.size());
+    for (unsigned i = 0; i < pts.size(); ++i) {
+        result.push_back(applyPoint(pts[i]));
+    }
+    return result;
+}
+
+float Mat3x3::det() const
+{
+    const float (&m)[3][3] = m_Elems;
+    return m[0][0]*(m[2][2]*m[1][1]-m[2][1]*m[1][2])
+         - m[1][0]*(m[2][2]*m[0][1]-m[2][1]*m[0][2])
+         + m[2][0]*(m[1][2]*m[0][1]-m[1][1]*m[0][2]);
+}
+
+Mat3x3 Mat3x3::inverse() const
+{
+    float d = det();
+    if (d == 0) {
+        throw Exception(AVG_ERR_INVALID_ARGS, "Mat3x3.inverse(): Matrix is singular.");
+    }
+    const float (&m)[3][3] = m_Elems;
+    Mat3x3 adj(
+            glm::vec3(m[2][2]*m[1][1]-m[2][1]*m[1][2],
+                    -(m[2][2]*m[0][1]-m[2][1]*m[0][2]),
+                    m[1][2]*m[0][1]-m[1][1]*m[0][2]),
+            glm::vec3(-(m[2][2]*m[1][0]-m[2][0]*m[1][2]),
+                    m[2][2]*m[0][0]-m[2][0]*m[0][2],
+                    -(m[1][2]*m[0][0]-m[1][0]*m[0][2])),
+            glm::vec3(m[2][1]*m[1][0]-m[2][0]*m[1][1],
+                    -(m[2][1]*m[0][0]-m[2][0]*m[0][1]),
+                    m[1][1]*m[0][0]-m[1][0]*m[0][1]));
+    return adj*(1/d);
+}
+
+glm::vec2 Mat3x3::getTranslation() const
+{
+    return glm::vec2(m_Elems[0][2], m_Elems[1][2]);
+}
+
+float Mat3x3::getRotation() const
+{
+    return getAngle(glm::vec2(m_Elems[0][0], m_Elems[1][0]));
+}
+
+glm::vec2 Mat3x3::getScale() const
+{
+    return glm::vec2(glm::length(glm::vec2(m_Elems[0][0], m_Elems[1][0])),
+            glm::length(glm::vec2(m_Elems[0][1], m_Elems[1][1])));
+}
+
+std::ostream& operator<<(std::ostream& os, const Mat3x3& mat)
+{
+    os << "(";
+    for (int i = 0; i < 3; ++i) {
+        glm::vec3 row = mat.getRow(i);
+        os << "(" << row.x << ", " << row.y << ", " << row.z << ")";
+        if (i < 2) {
+            os << ", ";
+        }
+    }
+    os << ")";
+    return os;
+}
+
+}
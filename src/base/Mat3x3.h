@@ -0,0 +1,73 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#ifndef _Mat3x3_H_
+#define _Mat3x3_H_
+
+#include "../api.h"
+
+#include "../glm/glm.hpp"
+
+#include <vector>
+#include <iostream>
+
+namespace avg {
+
+// 3x3 matrix for 2D affine transformations in homogeneous coordinates. Points are
+// column vectors, so a*b applies b first.
+class AVG_API Mat3x3 {
+public:
+    Mat3x3();
+    Mat3x3(const glm::vec3& row0, const glm::vec3& row1, 
+            const glm::vec3& row2=glm::vec3(0,0,1));
+
+    static Mat3x3 translate(const glm::vec2& t);
+    static Mat3x3 rotate(float angle);
+    static Mat3x3 pivotRotate(const glm::vec2& pivot, float angle);
+    static Mat3x3 scale(const glm::vec2& s);
+
+    glm::vec3 getRow(int i) const;
+    void setRow(int i, const glm::vec3& row);
+
+    Mat3x3 operator *(const Mat3x3& other) const;
+    Mat3x3 operator *(float s) const;
+    bool operator ==(const Mat3x3& other) const;
+
+    glm::vec3 applyVec(const glm::vec3& v) const;
+    glm::vec2 applyPoint(const glm::vec2& pt) const;
+    std::vector<glm::vec2> applyPoints(const std::vector<glm::vec2>& pts) const;
+
+    float det() const;
+    Mat3x3 inverse() const;
+
+    glm::vec2 getTranslation() const;
+    float getRotation() const;
+    glm::vec2 getScale() const;
+
+private:
+    float m_Elems[3][3];
+};
+
+std::ostream& operator<<(std::ostream& os, const Mat3x3& mat);
+
+}
+
+#endif
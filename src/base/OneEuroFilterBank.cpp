@@ -0,0 +1,160 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "OneEuroFilterBank.h"
+
+#include "Exception.h"
+#include "MathHelper.h"
+
+#include <sstream>
+
+using namespace std;
+
+namespace avg {
+
+// Sampling frequency used until a channel has two samples.
+static const float INITIAL_FREQ = 60;
+
+OneEuroFilterBank::OneEuroFilterBank(float minCutoff, float beta, float dCutoff)
+    : m_MinCutoff(minCutoff),
+      m_Beta(beta),
+      m_DCutoff(dCutoff)
+{
+    if (minCutoff <= 0) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE,
+                "OneEuroFilterBank: mincutoff must be > 0.");
+    }
+    if (dCutoff <= 0) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, "OneEuroFilterBank: dcutoff must be > 0.");
+    }
+}
+
+OneEuroFilterBank::~OneEuroFilterBank()
+{
+}
+
+int OneEuroFilterBank::addChannel()
+{
+    int channel;
+    if (m_FreeChannels.empty()) {
+        channel = int(m_bUsed.size());
+        m_bUsed.push_back(true);
+        m_bHasValue.push_back(false);
+        m_RawValues.push_back(glm::vec2(0,0));
+        m_Values.push_back(glm::vec2(0,0));
+        m_Derivs.push_back(glm::vec2(0,0));
+        m_Freqs.push_back(INITIAL_FREQ);
+        m_LastTimes.push_back(-1);
+    } else {
+        channel = m_FreeChannels.back();
+        m_FreeChannels.pop_back();
+        m_bUsed[channel] = true;
+        m_bHasValue[channel] = false;
+        m_Freqs[channel] = INITIAL_FREQ;
+        m_LastTimes[channel] = -1;
+    }
+    return channel;
+}
+
+void OneEuroFilterBank::removeChannel(int channel)
+{
+    checkChannel(channel);
+    m_bUsed[channel] = false;
+    m_FreeChannels.push_back(channel);
+}
+
+int OneEuroFilterBank::getNumChannels() const
+{
+    return int(m_bUsed.size() - m_FreeChannels.size());
+}
+
+vector<glm::vec2> OneEuroFilterBank::apply(const vector<int>& channels,
+        const vector<glm::vec2>& values, long long time)
+{
+    if (channels.size() != values.size()) {
+        throw Exception(AVG_ERR_INVALID_ARGS, 
+                "OneEuroFilterBank.apply: Number of channels and values must match.");
+    }
+    vector<glm::vec2> results(values.size());
+    for (unsigned i = 0; i < channels.size(); ++i) {
+        int c = channels[i];
+        checkChannel(c);
+        const glm::vec2& x = values[i];
+        if (m_LastTimes[c] == time) {
+            results[i] = x;
+            continue;
+        }
+        if (m_LastTimes[c] > 0 && time > 0) {
+            m_Freqs[c] = 1000.f/(time-m_LastTimes[c]);
+        }
+        m_LastTimes[c] = time;
+        if (m_bHasValue[c]) {
+            // Estimate the current speed and use it to adapt the cutoff frequency.
+            glm::vec2 dx = (x-m_RawValues[c])*m_Freqs[c];
+            glm::vec2 dAlpha = calcAlpha(glm::vec2(m_DCutoff, m_DCutoff), m_Freqs[c]);
+            m_Derivs[c] = dAlpha*dx + (glm::vec2(1,1)-dAlpha)*m_Derivs[c];
+            glm::vec2 cutoff = glm::vec2(m_MinCutoff, m_MinCutoff) + 
+                    m_Beta*glm::abs(m_Derivs[c]);
+            glm::vec2 alpha = calcAlpha(cutoff, m_Freqs[c]);
+            m_Values[c] = alpha*x + (glm::vec2(1,1)-alpha)*m_Values[c];
+        } else {
+            m_Derivs[c] = glm::vec2(0,0);
+            m_Values[c] = x;
+            m_bHasValue[c] = true;
+        }
+        m_RawValues[c] = x;
+        results[i] = m_Values[c];
+    }
+    return results;
+}
+
+float OneEuroFilterBank::getMinCutoff() const
+{
+    return m_MinCutoff;
+}
+
+float OneEuroFilterBank::getBeta() const
+{
+    return m_Beta;
+}
+
+float OneEuroFilterBank::getDCutoff() const
+{
+    return m_DCutoff;
+}
+
+void OneEuroFilterBank::checkChannel(int channel) const
+{
+    if (channel < 0 || channel >= int(m_bUsed.size()) || !m_bUsed[channel]) {
+        stringstream ss;
+        ss << "OneEuroFilterBank: Invalid channel " << channel << ".";
+        throw Exception(AVG_ERR_OUT_OF_RANGE, ss.str());
+    }
+}
+
+glm::vec2 OneEuroFilterBank::calcAlpha(const glm::vec2& cutoff, float freq) const
+{
+    // alpha = 1/(1+tau/te) with tau = 1/(2*pi*cutoff) and te = 1/freq.
+    return glm::vec2(1,1) / (glm::vec2(1,1) + freq/(float(2*M_PI)*cutoff));
+}
+
+}
@@ -0,0 +1,84 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _OneEuroFilterBank_H_
+#define _OneEuroFilterBank_H_
+
+#include "../api.h"
+
+#include "GLMHelper.h"
+
+#include <boost/shared_ptr.hpp>
+
+#include <vector>
+
+namespace avg {
+
+// A set of 2D 1€ filters that share their parameters. The state of all channels is
+// kept in flat arrays so a complete frame of samples is filtered in one call.
+// Filter based on:
+// Casiez, G., Roussel, N. and Vogel, D. (2012). 1€ Filter: A Simple Speed-based Low-pass
+// Filter for Noisy Input in Interactive Systems. Proceedings of the ACM Conference on
+// Human Factors in Computing Systems (CHI '12). Austin, Texas (May 5-12, 2012). New York:
+// ACM Press, pp. 2527-2530.
+class AVG_API OneEuroFilterBank
+{
+    public:
+        OneEuroFilterBank(float minCutoff=1.0, float beta=0.0, float dCutoff=1.0);
+        virtual ~OneEuroFilterBank();
+
+        // Returns the index of a new channel. Indexes of removed channels are reused.
+        int addChannel();
+        void removeChannel(int channel);
+        int getNumChannels() const;
+
+        // Filters values[i] using channel channels[i]. time is in milliseconds.
+        std::vector<glm::vec2> apply(const std::vector<int>& channels,
+                const std::vector<glm::vec2>& values, long long time);
+
+        float getMinCutoff() const;
+        float getBeta() const;
+        float getDCutoff() const;
+
+    private:
+        void checkChannel(int channel) const;
+        glm::vec2 calcAlpha(const glm::vec2& cutoff, float freq) const;
+
+        float m_MinCutoff;
+        float m_Beta;
+        float m_DCutoff;
+
+        std::vector<bool> m_bUsed;
+        std::vector<bool> m_bHasValue;
+        std::vector<glm::vec2> m_RawValues;
+        std::vector<glm::vec2> m_Values;
+        std::vector<glm::vec2> m_Derivs;
+        std::vector<float> m_Freqs;
+        std::vector<long long> m_LastTimes;
+        std::vector<int> m_FreeChannels;
+};
+
+typedef boost::shared_ptr<OneEuroFilterBank> OneEuroFilterBankPtr;
+
+}
+
+#endif
@@ -32,6 +32,9 @@ namespace avg {
 ProfilingZone::ProfilingZone(const ProfilingZoneID& zoneID)
     : m_TimeSum(0),
       m_AvgTime(0),
+      m_CountSum(0),
+      m_AvgCount(0),
+      m_bHasCount(false),
       m_NumFrames(0),
       m_Indent(0),
       m_ZoneID(zoneID)
@@ -49,6 +52,8 @@ void ProfilingZone::restart()
     m_NumFrames = 0;
     m_AvgTime = 0;
     m_TimeSum = 0;
+    m_AvgCount = 0;
+    m_CountSum = 0;
 }
 
 void ProfilingZone::reset()
@@ -56,6 +61,8 @@ void ProfilingZone::reset()
     m_NumFrames++;
     m_AvgTime = (m_AvgTime*(m_NumFrames-1)+m_TimeSum)/m_NumFrames;
     m_TimeSum = 0;
+    m_AvgCount = (m_AvgCount*(m_NumFrames-1)+m_CountSum)/m_NumFrames;
+    m_CountSum = 0;
 }
 
 long long ProfilingZone::getUSecs() const
@@ -68,6 +75,16 @@ long long ProfilingZone::getAvgUSecs() const
     return m_AvgTime;
 }
 
+bool ProfilingZone::hasCount() const
+{
+    return m_bHasCount;
+}
+
+long long ProfilingZone::getAvgCount() const
+{
+    return m_AvgCount;
+}
+
 void ProfilingZone::setIndentLevel(int indent)
 {
     m_Indent = indent;
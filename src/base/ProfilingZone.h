@@ -45,9 +45,16 @@ public:
     {
         m_TimeSum += TimeSource::get()->getCurrentMicrosecs()-m_StartTime;
     };
+    void addCount(long long count)
+    {
+        m_CountSum += count;
+        m_bHasCount = true;
+    };
     void reset();
     long long getUSecs() const;
     long long getAvgUSecs() const;
+    bool hasCount() const;
+    long long getAvgCount() const;
     void setIndentLevel(int indent);
     int getIndentLevel() const;
     std::string getIndentString() const;
@@ -57,6 +64,9 @@ private:
     long long m_TimeSum;
     long long m_AvgTime;
     long long m_StartTime;
+    long long m_CountSum;
+    long long m_AvgCount;
+    bool m_bHasCount;
     int m_NumFrames;
     int m_Indent;
     const ProfilingZoneID& m_ZoneID;
@@ -47,6 +47,14 @@ public:
         }
     };
 
+    // Adds to a per-frame counter shown next to the zone's time.
+    void addCount(long long count)
+    {
+        if (m_pZoneID) {
+            m_pZoneID->getProfiler()->addCount(*m_pZoneID, count);
+        }
+    };
+
     static void enableTimers(bool bEnable);
 
 private:
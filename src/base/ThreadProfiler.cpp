@@ -108,21 +108,34 @@ void ThreadProfiler::stopZone(const ProfilingZoneID& zoneID)
     m_ActiveZones.pop_back();
 }
 
+void ThreadProfiler::addCount(const ProfilingZoneID& zoneID, long long count)
+{
+    // Only valid for active zones.
+    ZoneMap::iterator it = m_ZoneMap.find(&zoneID);
+    AVG_ASSERT(it != m_ZoneMap.end());
+    it->second->addCount(count);
+}
+
 void ThreadProfiler::dumpStatistics()
 {
     if (!m_Zones.empty()) {
         AVG_TRACE(m_LogCategory, Logger::severity::INFO, "Thread " << m_sName);
         AVG_TRACE(m_LogCategory, Logger::severity::INFO,
-                "Zone name                          Avg. time");
+                "Zone name                          Avg. time  Avg. count");
         AVG_TRACE(m_LogCategory, Logger::severity::INFO,
-                "---------                          ---------");
+                "---------                          ---------  ----------");
 
         ZoneVector::iterator it;
         for (it = m_Zones.begin(); it != m_Zones.end(); ++it) {
+            std::stringstream ss;
+            if ((*it)->hasCount()) {
+                ss << std::setw(12) << std::right << (*it)->getAvgCount();
+            }
             AVG_TRACE(m_LogCategory, Logger::severity::INFO,
                     std::setw(35) << std::left 
                     << ((*it)->getIndentString()+(*it)->getName())
-                    << std::setw(9) << std::right << (*it)->getAvgUSecs());
+                    << std::setw(9) << std::right << (*it)->getAvgUSecs()
+                    << ss.str());
         }
         AVG_TRACE(m_LogCategory, Logger::severity::INFO, "");
     }
@@ -57,6 +57,7 @@ public:
     void restart();
     void startZone(const ProfilingZoneID& zoneID);
     void stopZone(const ProfilingZoneID& zoneID);
+    void addCount(const ProfilingZoneID& zoneID, long long count);
     void dumpStatistics();
     void reset();
     int getNumZones();
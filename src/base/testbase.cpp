@@ -38,6 +38,8 @@
 #include "WideLine.h"
 #include "Rect.h"
 #include "Triangle.h"
+#include "Mat3x3.h"
+#include "OneEuroFilterBank.h"
 #include "TestSuite.h"
 #include "TimeSource.h"
 #include "XMLHelper.h"
@@ -442,6 +444,21 @@ public:
         TEST(almostEqual(getRotatedPivot(glm::vec2(10,0), M_PI*2, glm::vec2(15,5)), 
                 glm::vec2(10,0)));
         TEST(almostEqual(getRotatedPivot(glm::vec2(23,0), M_PI*0.5), glm::vec2(0,23)));
+        {
+            glm::vec2 ptArray[] = {glm::vec2(0,0), glm::vec2(100,50), glm::vec2(1,0),
+                    glm::vec2(101,50)};
+            vector<glm::vec2> pts = vectorFromCArray(4, ptArray);
+            vector<int> clusters = calcKMeans(pts, 2);
+            int baselineClusters[] = {0,1,0,1};
+            TEST(clusters == vectorFromCArray(4, baselineClusters));
+            vector<glm::vec2> centroids = calcClusterCentroids(pts, clusters, 2);
+            TEST(almostEqual(centroids[0], glm::vec2(0.5,0)));
+            TEST(almostEqual(centroids[1], glm::vec2(100.5,50)));
+            pts.push_back(glm::vec2(99,51));
+            clusters.push_back(-1);
+            int baselineClusters2[] = {0,1,0,1,1};
+            TEST(calcKMeans(pts, 2, clusters) == vectorFromCArray(5, baselineClusters2));
+        }
 
         {
             // TODO: More tests
@@ -494,6 +511,135 @@ public:
 };
 
 
+class OneEuroFilterTest: public Test
+{
+public:
+    OneEuroFilterTest()
+        : Test("OneEuroFilterTest", 2)
+    {
+    }
+
+    void runTests()
+    {
+        OneEuroFilterBank bank(1.0, 0.0, 1.0);
+        int c0 = bank.addChannel();
+        int c1 = bank.addChannel();
+        TEST(c0 == 0 && c1 == 1);
+        TEST(bank.getNumChannels() == 2);
+        vector<int> channels;
+        channels.push_back(c0);
+        channels.push_back(c1);
+        vector<glm::vec2> values;
+        values.push_back(glm::vec2(10,10));
+        values.push_back(glm::vec2(100,0));
+        // The first sample passes through unchanged.
+        vector<glm::vec2> results = bank.apply(channels, values, 1000);
+        TEST(almostEqual(results[0], glm::vec2(10,10)));
+        TEST(almostEqual(results[1], glm::vec2(100,0)));
+        // A second sample in the same frame isn't filtered either.
+        values[0] = glm::vec2(20,20);
+        results = bank.apply(channels, values, 1000);
+        TEST(almostEqual(results[0], glm::vec2(20,20)));
+
+        // Without beta, the filter is a low pass with alpha = 1/(1+freq/(2*pi)).
+        values[0] = glm::vec2(20,10);
+        values[1] = glm::vec2(100,0);
+        results = bank.apply(channels, values, 1100);
+        float alpha = 1.f/(1.f+10.f/float(2*M_PI));
+        TEST(almostEqual(results[0], glm::vec2(10+10*alpha, 10)));
+        TEST(almostEqual(results[1], glm::vec2(100,0)));
+
+        bank.removeChannel(c0);
+        TEST(bank.getNumChannels() == 1);
+        bool bExceptionThrown = false;
+        try {
+            bank.apply(channels, values, 1200);
+        } catch (const Exception&) {
+            bExceptionThrown = true;
+        }
+        TEST(bExceptionThrown);
+        TEST(bank.addChannel() == c0);
+        vector<int> channels1(1, c0);
+        vector<glm::vec2> values1(1, glm::vec2(5,5));
+        results = bank.apply(channels1, values1, 1200);
+        TEST(almostEqual(results[0], glm::vec2(5,5)));
+        bExceptionThrown = false;
+        try {
+            bank.apply(channels, values1, 1300);
+        } catch (const Exception&) {
+            bExceptionThrown = true;
+        }
+        TEST(bExceptionThrown);
+    }
+};
+
+
+class Mat3x3Test: public Test
+{
+public:
+    Mat3x3Test()
+        : Test("Mat3x3Test", 2)
+    {
+    }
+
+    void runTests()
+    {
+        Mat3x3 t = Mat3x3::translate(glm::vec2(1,0));
+        glm::vec3 v(1,0,1);
+        TEST(t.applyVec(v) == glm::vec3(2,0,1));
+        Mat3x3 r = Mat3x3::rotate(float(M_PI/2));
+        TEST(almostEqual(r.applyPoint(glm::vec2(1,0)), glm::vec2(0,1)));
+        TEST(t*t == Mat3x3::translate(glm::vec2(2,0)));
+        TEST(isAlmostEqual(t*r, Mat3x3(glm::vec3(0,-1,1), glm::vec3(1,0,0))));
+        TEST(isAlmostEqual(r*t, Mat3x3(glm::vec3(0,-1,0), glm::vec3(1,0,1))));
+        TEST(Mat3x3().inverse() == Mat3x3());
+
+        Mat3x3 m(glm::vec3(-1,3,-3), glm::vec3(0,-6,5), glm::vec3(-5,-3,1));
+        Mat3x3 im(glm::vec3(3.f/2,1,-1.f/2), glm::vec3(-25.f/6,-8.f/3,5.f/6), 
+                glm::vec3(-5,-3,1));
+        TEST(isAlmostEqual(m.inverse(), im));
+        TEST(isAlmostEqual(m*m.inverse(), Mat3x3()));
+
+        Mat3x3 pr = Mat3x3::pivotRotate(glm::vec2(1,1), float(M_PI));
+        TEST(almostEqual(pr.applyPoint(glm::vec2(0,0)), glm::vec2(2,2)));
+        Mat3x3 trs = Mat3x3::translate(glm::vec2(10,20)) * 
+                Mat3x3::rotate(0.5f) * Mat3x3::scale(glm::vec2(3,4));
+        TEST(almostEqual(trs.getTranslation(), glm::vec2(10,20)));
+        TEST(almostEqual(trs.getRotation(), 0.5f));
+        TEST(almostEqual(trs.getScale(), glm::vec2(3,4)));
+
+        vector<glm::vec2> pts;
+        pts.push_back(glm::vec2(0,0));
+        pts.push_back(glm::vec2(1,2));
+        vector<glm::vec2> transformedPts = t.applyPoints(pts);
+        TEST(transformedPts.size() == 2);
+        TEST(transformedPts[0] == glm::vec2(1,0));
+        TEST(transformedPts[1] == glm::vec2(2,2));
+
+        bool bExceptionThrown = false;
+        try {
+            Mat3x3::scale(glm::vec2(0,1)).inverse();
+        } catch (const Exception&) {
+            bExceptionThrown = true;
+        }
+        TEST(bExceptionThrown);
+    }
+
+private:
+    bool isAlmostEqual(const Mat3x3& m1, const Mat3x3& m2)
+    {
+        for (int i = 0; i < 3; ++i) {
+            glm::vec3 diff = m1.getRow(i)-m2.getRow(i);
+            if (fabs(diff.x) > 0.0001 || fabs(diff.y) > 0.0001 || fabs(diff.z) > 0.0001)
+            {
+                return false;
+            }
+        }
+        return true;
+    }
+};
+
+
 class FileTest: public Test
 {
 public:
@@ -994,6 +1140,8 @@ public:
         addTest(TestPtr(new ObjectCounterTest));
         addTest(TestPtr(new GeomTest));
         addTest(TestPtr(new TriangleTest));
+        addTest(TestPtr(new Mat3x3Test));
+        addTest(TestPtr(new OneEuroFilterTest));
         addTest(TestPtr(new FileTest));
         addTest(TestPtr(new OSTest));
         addTest(TestPtr(new StringTest));
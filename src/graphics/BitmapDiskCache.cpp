@@ -0,0 +1,286 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#include "BitmapDiskCache.h"
+#include "BitmapLoader.h"
+
+#include "../base/Exception.h"
+#include "../base/Logger.h"
+#include "../base/FileHelper.h"
+#include "../base/Directory.h"
+#include "../base/ThreadHelper.h"
+
+#include <boost/interprocess/file_mapping.hpp>
+#include <boost/interprocess/mapped_region.hpp>
+#include <boost/thread/thread.hpp>
+
+#include <fstream>
+#include <sstream>
+#include <iomanip>
+#include <cstring>
+#include <cstdio>
+
+using namespace std;
+namespace bip = boost::interprocess;
+
+namespace avg {
+
+// Layout of a cache file: A header padded to HEADER_SIZE bytes, followed by the lines
+// of the bitmap.
+static const char CACHE_FILE_MAGIC[8] = {'A', 'V', 'G', 'B', 'M', 'P', '0', '1'};
+static const int HEADER_SIZE = 64;
+
+struct CacheFileHeader
+{
+    char m_Magic[8];
+    int m_Width;
+    int m_Height;
+    int m_PF;
+    int m_Stride;
+};
+
+// Keeps the file mapping alive as long as the bitmap that points into it exists.
+class MappedRegionReleaser
+{
+public:
+    MappedRegionReleaser(boost::shared_ptr<bip::mapped_region> pRegion)
+        : m_pRegion(pRegion)
+    {
+    }
+
+    void operator()(Bitmap* pBmp)
+    {
+        delete pBmp;
+        m_pRegion = boost::shared_ptr<bip::mapped_region>();
+    }
+
+private:
+    boost::shared_ptr<bip::mapped_region> m_pRegion;
+};
+
+static bool calcFileHash(const string& sFilename, unsigned long long& hash,
+        long long& fileSize)
+{
+    ifstream file(sFilename.c_str(), ios::in | ios::binary);
+    if (!file) {
+        return false;
+    }
+    // 64-bit FNV-1a.
+    hash = 14695981039346656037ULL;
+    fileSize = 0;
+    vector<char> buffer(65536);
+    while (file) {
+        file.read(&buffer[0], streamsize(buffer.size()));
+        streamsize numRead = file.gcount();
+        for (streamsize i = 0; i < numRead; ++i) {
+            hash = (hash ^ (unsigned char)(buffer[i])) * 1099511628211ULL;
+        }
+        fileSize += numRead;
+    }
+    return !file.bad();
+}
+
+BitmapDiskCache* BitmapDiskCache::s_pBitmapDiskCache = 0;
+
+BitmapDiskCache* BitmapDiskCache::get()
+{
+    if (!s_pBitmapDiskCache) {
+        s_pBitmapDiskCache = new BitmapDiskCache();
+    }
+    return s_pBitmapDiskCache;
+}
+
+BitmapDiskCache::BitmapDiskCache()
+    : m_NumHits(0),
+      m_NumMisses(0)
+{
+}
+
+BitmapDiskCache::~BitmapDiskCache()
+{
+}
+
+void BitmapDiskCache::setDir(const string& sDir)
+{
+    if (sDir != "") {
+        Directory dir(sDir);
+        if (dir.open(true) != 0) {
+            throw Exception(AVG_ERR_FILEIO,
+                    "Can't open or create bitmap disk cache directory "+sDir+".");
+        }
+    }
+    lock_guard lock(m_Mutex);
+    m_sDir = sDir;
+}
+
+string BitmapDiskCache::getDir() const
+{
+    lock_guard lock(m_Mutex);
+    return m_sDir;
+}
+
+bool BitmapDiskCache::isEnabled() const
+{
+    lock_guard lock(m_Mutex);
+    return m_sDir != "";
+}
+
+string BitmapDiskCache::getKey(const string& sFilename, PixelFormat pf,
+        const IntPoint& maxSize, bool bBlueFirst) const
+{
+    unsigned long long hash;
+    long long fileSize;
+    if (!calcFileHash(sFilename, hash, fileSize)) {
+        return "";
+    }
+    stringstream ss;
+    ss << hex << setfill('0') << setw(16) << hash << dec << "_" << fileSize << "_"
+            << int(pf) << "_" << int(bBlueFirst) << "_" << maxSize.x << "x" << maxSize.y;
+    return ss.str();
+}
+
+BitmapPtr BitmapDiskCache::load(const string& sKey)
+{
+    string sCacheFilename = getCacheFilename(sKey);
+    if (!fileExists(sCacheFilename)) {
+        lock_guard lock(m_Mutex);
+        m_NumMisses++;
+        return BitmapPtr();
+    }
+    BitmapPtr pBmp;
+    try {
+        bip::file_mapping mapping(sCacheFilename.c_str(), bip::read_only);
+        // Copy-on-write, so users of the bitmap can modify it without touching the file.
+        boost::shared_ptr<bip::mapped_region> pRegion(
+                new bip::mapped_region(mapping, bip::copy_on_write));
+        unsigned char* pData = (unsigned char*)(pRegion->get_address());
+        CacheFileHeader header;
+        if (pRegion->get_size() < size_t(HEADER_SIZE)) {
+            throw Exception(AVG_ERR_FILEIO, "File too small.");
+        }
+        memcpy(&header, pData, sizeof(header));
+        if (memcmp(header.m_Magic, CACHE_FILE_MAGIC, sizeof(CACHE_FILE_MAGIC)) != 0 ||
+                header.m_PF < 0 || header.m_PF >= int(NO_PIXELFORMAT) ||
+                pRegion->get_size() !=
+                        size_t(HEADER_SIZE)+size_t(header.m_Stride)*header.m_Height)
+        {
+            throw Exception(AVG_ERR_FILEIO, "Invalid cache file.");
+        }
+        Bitmap* pRawBmp = new Bitmap(IntPoint(header.m_Width, header.m_Height),
+                PixelFormat(header.m_PF), pData+HEADER_SIZE, header.m_Stride, false);
+        pBmp = BitmapPtr(pRawBmp, MappedRegionReleaser(pRegion));
+    } catch (const bip::interprocess_exception& ex) {
+        AVG_LOG_WARNING("Can't map bitmap cache file " << sCacheFilename << ": "
+                << ex.what());
+    } catch (const Exception& ex) {
+        AVG_LOG_WARNING("Ignoring bitmap cache file " << sCacheFilename << ": "
+                << ex.getStr());
+    }
+    lock_guard lock(m_Mutex);
+    if (pBmp) {
+        m_NumHits++;
+    } else {
+        m_NumMisses++;
+    }
+    return pBmp;
+}
+
+void BitmapDiskCache::store(const string& sKey, BitmapPtr pBmp)
+{
+    string sCacheFilename = getCacheFilename(sKey);
+    // Write to a temporary file first so other processes never see partial files.
+    stringstream ss;
+    ss << sCacheFilename << "." << boost::this_thread::get_id() << ".tmp";
+    string sTempFilename = ss.str();
+    {
+        ofstream file(sTempFilename.c_str(), ios::out | ios::binary | ios::trunc);
+        if (!file) {
+            AVG_LOG_WARNING("Can't write bitmap cache file " << sTempFilename << ".");
+            return;
+        }
+        char header[HEADER_SIZE];
+        memset(header, 0, HEADER_SIZE);
+        CacheFileHeader* pHeader = (CacheFileHeader*)header;
+        memcpy(pHeader->m_Magic, CACHE_FILE_MAGIC, sizeof(CACHE_FILE_MAGIC));
+        pHeader->m_Width = pBmp->getSize().x;
+        pHeader->m_Height = pBmp->getSize().y;
+        pHeader->m_PF = int(pBmp->getPixelFormat());
+        pHeader->m_Stride = pBmp->getLineLen();
+        file.write(header, HEADER_SIZE);
+        const unsigned char* pLine = pBmp->getPixels();
+        for (int y = 0; y < pBmp->getSize().y; ++y) {
+            file.write((const char*)pLine, pBmp->getLineLen());
+            pLine += pBmp->getStride();
+        }
+        if (!file) {
+            file.close();
+            remove(sTempFilename.c_str());
+            AVG_LOG_WARNING("Can't write bitmap cache file " << sTempFilename << ".");
+            return;
+        }
+    }
+    if (rename(sTempFilename.c_str(), sCacheFilename.c_str()) != 0) {
+        // Another process or thread was faster.
+        remove(sTempFilename.c_str());
+    }
+}
+
+bool BitmapDiskCache::prewarm(const UTF8String& sFilename, PixelFormat pf,
+        const IntPoint& maxSize)
+{
+    if (!isEnabled()) {
+        throw Exception(AVG_ERR_UNSUPPORTED,
+                "BitmapDiskCache.prewarm(): No cache directory set.");
+    }
+    string sKey = getKey(sFilename, pf, maxSize, BitmapLoader::get()->isBlueFirst());
+    if (sKey != "" && fileExists(getCacheFilename(sKey))) {
+        return false;
+    }
+    // The loader stores the decoded bitmap.
+    BitmapLoader::get()->load(sFilename, pf, maxSize);
+    return true;
+}
+
+long long BitmapDiskCache::getNumHits() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumHits;
+}
+
+long long BitmapDiskCache::getNumMisses() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumMisses;
+}
+
+void BitmapDiskCache::resetStats()
+{
+    lock_guard lock(m_Mutex);
+    m_NumHits = 0;
+    m_NumMisses = 0;
+}
+
+string BitmapDiskCache::getCacheFilename(const string& sKey) const
+{
+    return getDir()+"/"+sKey+".avgbmp";
+}
+
+}
@@ -0,0 +1,84 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#ifndef _BitmapDiskCache_H_
+#define _BitmapDiskCache_H_
+
+#include "../api.h"
+
+#include "Bitmap.h"
+#include "PixelFormat.h"
+
+#include "../base/GLMHelper.h"
+#include "../base/UTF8String.h"
+
+#include <boost/thread/mutex.hpp>
+
+#include <string>
+
+namespace avg {
+
+// Optional persistent cache for decoded image files. Decoded pixels are stored in a
+// raw format in a cache directory, keyed by a hash of the source file contents and
+// the decode parameters. Cache hits are memory-mapped, so they need neither decoding
+// nor a copy of the pixels. The cache is disabled as long as no directory is set.
+class AVG_API BitmapDiskCache
+{
+    public:
+        static BitmapDiskCache* get();
+
+        void setDir(const std::string& sDir);
+        std::string getDir() const;
+        bool isEnabled() const;
+
+        // Returns the key under which the decoded bitmap is stored, or an empty
+        // string if the source file can't be read.
+        std::string getKey(const std::string& sFilename, PixelFormat pf,
+                const IntPoint& maxSize, bool bBlueFirst) const;
+        // Returns an empty pointer on cache misses.
+        BitmapPtr load(const std::string& sKey);
+        void store(const std::string& sKey, BitmapPtr pBmp);
+        // Decodes the file and stores the result if it's not in the cache yet. Returns
+        // true if the file needed to be decoded.
+        bool prewarm(const UTF8String& sFilename, PixelFormat pf=NO_PIXELFORMAT,
+                const IntPoint& maxSize=IntPoint(0,0));
+
+        long long getNumHits() const;
+        long long getNumMisses() const;
+        void resetStats();
+
+    private:
+        BitmapDiskCache();
+        virtual ~BitmapDiskCache();
+
+        std::string getCacheFilename(const std::string& sKey) const;
+
+        std::string m_sDir;
+        long long m_NumHits;
+        long long m_NumMisses;
+        mutable boost::mutex m_Mutex;
+
+        static BitmapDiskCache* s_pBitmapDiskCache;
+};
+
+}
+
+#endif
@@ -20,6 +20,7 @@
 //
 
 #include "BitmapLoader.h"
+#include "BitmapDiskCache.h"
 
 #include "PixelFormat.h"
 #include "Filterfliprgb.h"
@@ -29,6 +30,7 @@
 
 #include <gdk-pixbuf/gdk-pixbuf.h>
 #include <iostream>
+#include <algorithm>
 
 using namespace std;
 using namespace boost;
@@ -89,15 +91,59 @@ PixelFormat BitmapLoader::getDefaultPixelFormat(bool bAlpha)
 static ProfilingZoneID GDKPixbufProfilingZone("gdk_pixbuf load", true);
 static ProfilingZoneID ConvertProfilingZone("Format conversion", true);
 static ProfilingZoneID RGBFlipProfilingZone("RGB<->BGR flip", true);
+static ProfilingZoneID DiskCacheProfilingZone("Bitmap disk cache", true);
 
-BitmapPtr BitmapLoader::load(const UTF8String& sFName, PixelFormat pf) const
+BitmapPtr BitmapLoader::load(const UTF8String& sFName, PixelFormat pf,
+        const IntPoint& maxSize) const
 {
     AVG_ASSERT(s_pBitmapLoader != 0);
+    BitmapDiskCache* pDiskCache = BitmapDiskCache::get();
+    if (!pDiskCache->isEnabled()) {
+        return decode(sFName, pf, maxSize);
+    }
+    string sKey;
+    {
+        ScopeTimer timer(DiskCacheProfilingZone);
+        sKey = pDiskCache->getKey(sFName, pf, maxSize, m_bBlueFirst);
+        if (sKey != "") {
+            BitmapPtr pBmp = pDiskCache->load(sKey);
+            if (pBmp) {
+                return pBmp;
+            }
+        }
+    }
+    BitmapPtr pBmp = decode(sFName, pf, maxSize);
+    if (sKey != "") {
+        ScopeTimer timer(DiskCacheProfilingZone);
+        pDiskCache->store(sKey, pBmp);
+    }
+    return pBmp;
+}
+
+BitmapPtr BitmapLoader::decode(const UTF8String& sFName, PixelFormat pf,
+        const IntPoint& maxSize) const
+{
     GError* pError = 0;
     GdkPixbuf* pPixBuf;
     {
         ScopeTimer timer(GDKPixbufProfilingZone);
-        pPixBuf = gdk_pixbuf_new_from_file(sFName.c_str(), &pError);
+        IntPoint fileSize;
+        if (maxSize != IntPoint(0,0) && 
+                gdk_pixbuf_get_file_info(sFName.c_str(), &fileSize.x, &fileSize.y))
+        {
+            // Let the decoder scale while loading. The jpeg loader decodes at 1/2, 1/4
+            // or 1/8 size directly, so large photos never exist in memory at full
+            // resolution.
+            IntPoint decodeSize = calcDecodeSize(fileSize, maxSize);
+            if (decodeSize != fileSize) {
+                pPixBuf = gdk_pixbuf_new_from_file_at_scale(sFName.c_str(), 
+                        decodeSize.x, decodeSize.y, false, &pError);
+            } else {
+                pPixBuf = gdk_pixbuf_new_from_file(sFName.c_str(), &pError);
+            }
+        } else {
+            pPixBuf = gdk_pixbuf_new_from_file(sFName.c_str(), &pError);
+        }
     }
     if (!pPixBuf) {
         string sErr = pError->message;
@@ -147,9 +193,25 @@ BitmapPtr BitmapLoader::load(const UTF8String& sFName, PixelFormat pf) const
     return pBmp;
 }
 
-BitmapPtr loadBitmap(const UTF8String& sFName, PixelFormat pf)
+BitmapPtr loadBitmap(const UTF8String& sFName, PixelFormat pf, const IntPoint& maxSize)
+{
+    return BitmapLoader::get()->load(sFName, pf, maxSize);
+}
+
+IntPoint calcDecodeSize(const IntPoint& size, const IntPoint& maxSize)
 {
-    return BitmapLoader::get()->load(sFName, pf);
+    float scale = 1;
+    if (maxSize.x > 0 && size.x > maxSize.x) {
+        scale = float(maxSize.x)/size.x;
+    }
+    if (maxSize.y > 0 && size.y*scale > maxSize.y) {
+        scale = float(maxSize.y)/size.y;
+    }
+    if (scale == 1) {
+        return size;
+    }
+    return IntPoint(std::max(1, int(size.x*scale+0.5f)), 
+            std::max(1, int(size.y*scale+0.5f)));
 }
 
 }
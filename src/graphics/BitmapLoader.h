@@ -38,17 +38,26 @@ public:
     static BitmapLoader* get();
     bool isBlueFirst() const;
     PixelFormat getDefaultPixelFormat(bool bAlpha);
-    BitmapPtr load(const UTF8String& sFName, PixelFormat pf=NO_PIXELFORMAT) const;
+    BitmapPtr load(const UTF8String& sFName, PixelFormat pf=NO_PIXELFORMAT,
+            const IntPoint& maxSize=IntPoint(0,0)) const;
 
 private:
     BitmapLoader(bool bBlueFirst);
     virtual ~BitmapLoader();
+    BitmapPtr decode(const UTF8String& sFName, PixelFormat pf,
+            const IntPoint& maxSize) const;
 
     bool m_bBlueFirst;
     static BitmapLoader * s_pBitmapLoader;
 };
 
-BitmapPtr AVG_API loadBitmap(const UTF8String& sFName, PixelFormat pf=NO_PIXELFORMAT);
+BitmapPtr AVG_API loadBitmap(const UTF8String& sFName, PixelFormat pf=NO_PIXELFORMAT,
+        const IntPoint& maxSize=IntPoint(0,0));
+
+// Returns the largest size that has the aspect ratio of size and fits into maxSize.
+// Components of maxSize that are 0 don't constrain the result. Bitmaps are never
+// enlarged.
+IntPoint AVG_API calcDecodeSize(const IntPoint& size, const IntPoint& maxSize);
 
 }
 
@@ -31,6 +31,7 @@
 #include "VertexArray.h"
 #include "MCFBO.h"
 #include "ShaderRegistry.h"
+#include "TextureAtlas.h"
 
 #ifdef __APPLE__
     #include "CGLContext.h"
@@ -63,13 +64,16 @@ bool GLContextManager::exists()
 }
 
 GLContextManager::GLContextManager()
+    : m_NextSharedTexPurgeSize(64)
 {
 //    AVG_ASSERT(!s_pGLContextManager);
     s_pGLContextManager = this;
+    m_pTextureAtlas = new TextureAtlas();
 }
 
 GLContextManager::~GLContextManager()
 {
+    delete m_pTextureAtlas;
     m_pPendingTexCreates.clear();
     m_pPendingTexUploads.clear();
     m_PendingTexDeletes.clear();
@@ -79,6 +83,9 @@ GLContextManager::~GLContextManager()
     m_pPendingVACreates.clear();
     m_PendingBufferDeletes.clear();
 
+    m_SharedTextures.clear();
+    m_SharedTexKeys.clear();
+
     s_pGLContextManager = 0;
 }
 
@@ -174,6 +181,57 @@ void GLContextManager::deleteTexture(unsigned texID)
     m_PendingTexDeletes.push_back(texID);
 }
 
+MCTexturePtr GLContextManager::findSharedTexture(BitmapPtr pBmp, bool bMipmap,
+        unsigned wrapSMode, unsigned wrapTMode)
+{
+    SharedTexMap::iterator it = m_SharedTextures.find(
+            SharedTexKey(pBmp.get(), bMipmap, wrapSMode, wrapTMode));
+    if (it == m_SharedTextures.end()) {
+        return MCTexturePtr();
+    }
+    MCTexturePtr pTex = it->second.m_pTex.lock();
+    // A different bitmap might have been allocated at the same address.
+    if (!pTex || it->second.m_pBmp.lock() != pBmp) {
+        return MCTexturePtr();
+    }
+    return pTex;
+}
+
+void GLContextManager::shareTexture(BitmapPtr pBmp, MCTexturePtr pTex, bool bMipmap,
+        unsigned wrapSMode, unsigned wrapTMode)
+{
+    if (m_SharedTextures.size() >= m_NextSharedTexPurgeSize) {
+        purgeSharedTextures();
+        m_NextSharedTexPurgeSize = max(size_t(64), m_SharedTextures.size()*2);
+    }
+    // A texture can only be registered for one bitmap at a time. Entries in
+    // m_SharedTexKeys may be stale, so they're checked before use.
+    SharedTexKeyMap::iterator keyIt = m_SharedTexKeys.find(pTex.get());
+    if (keyIt != m_SharedTexKeys.end()) {
+        SharedTexMap::iterator it = m_SharedTextures.find(keyIt->second);
+        if (it != m_SharedTextures.end() && it->second.m_pTex.lock() == pTex) {
+            m_SharedTextures.erase(it);
+        }
+        m_SharedTexKeys.erase(keyIt);
+    }
+    SharedTexKey key(pBmp.get(), bMipmap, wrapSMode, wrapTMode);
+    SharedTexEntry& entry = m_SharedTextures[key];
+    entry.m_pBmp = pBmp;
+    entry.m_pTex = pTex;
+    m_SharedTexKeys.insert(make_pair(pTex.get(), key));
+}
+
+int GLContextManager::getNumSharedTextures()
+{
+    purgeSharedTextures();
+    return int(m_SharedTextures.size());
+}
+
+TextureAtlas* GLContextManager::getTextureAtlas()
+{
+    return m_pTextureAtlas;
+}
+
 VertexArrayPtr GLContextManager::createVertexArray(int reserveVerts,
         int reserveIndexes)
 {
@@ -252,6 +310,45 @@ void GLContextManager::reset()
     m_PendingBufferDeletes.clear();
 }
 
+void GLContextManager::purgeSharedTextures()
+{
+    SharedTexMap::iterator it = m_SharedTextures.begin();
+    while (it != m_SharedTextures.end()) {
+        SharedTexMap::iterator curIt = it;
+        ++it;
+        if (curIt->second.m_pTex.expired() || curIt->second.m_pBmp.expired()) {
+            m_SharedTextures.erase(curIt);
+        }
+    }
+    m_SharedTexKeys.clear();
+    for (it = m_SharedTextures.begin(); it != m_SharedTextures.end(); ++it) {
+        m_SharedTexKeys.insert(make_pair(it->second.m_pTex.lock().get(), it->first));
+    }
+}
+
+GLContextManager::SharedTexKey::SharedTexKey(const Bitmap* pBmp, bool bMipmap,
+        unsigned wrapSMode, unsigned wrapTMode)
+    : m_pBmp(pBmp),
+      m_bMipmap(bMipmap),
+      m_WrapSMode(wrapSMode),
+      m_WrapTMode(wrapTMode)
+{
+}
+
+bool GLContextManager::SharedTexKey::operator <(const SharedTexKey& other) const
+{
+    if (m_pBmp != other.m_pBmp) {
+        return m_pBmp < other.m_pBmp;
+    }
+    if (m_bMipmap != other.m_bMipmap) {
+        return m_bMipmap < other.m_bMipmap;
+    }
+    if (m_WrapSMode != other.m_WrapSMode) {
+        return m_WrapSMode < other.m_WrapSMode;
+    }
+    return m_WrapTMode < other.m_WrapTMode;
+}
+
 bool GLContextManager::isGLESSupported()
 {
 #if defined linux
@@ -27,6 +27,8 @@
 #include "GLContext.h"
 #include "MCShaderParam.h"
 
+#include <boost/weak_ptr.hpp>
+
 #include <map>
 
 namespace avg {
@@ -41,6 +43,7 @@ class VertexArray;
 typedef boost::shared_ptr<VertexArray> VertexArrayPtr;
 class MCFBO;
 typedef boost::shared_ptr<MCFBO> MCFBOPtr;
+class TextureAtlas;
 
 class AVG_API GLContextManager
 {
@@ -80,6 +83,15 @@ public:
             bool bForcePOT=false, int potBorderColor=0);
     void deleteTexture(unsigned texID);
 
+    // Textures registered here are shared by all users of the same bitmap. The registry
+    // holds weak references, so a texture is deleted when the last user releases it.
+    MCTexturePtr findSharedTexture(BitmapPtr pBmp, bool bMipmap=false, 
+            unsigned wrapSMode=GL_CLAMP_TO_EDGE, unsigned wrapTMode=GL_CLAMP_TO_EDGE);
+    void shareTexture(BitmapPtr pBmp, MCTexturePtr pTex, bool bMipmap=false, 
+            unsigned wrapSMode=GL_CLAMP_TO_EDGE, unsigned wrapTMode=GL_CLAMP_TO_EDGE);
+    int getNumSharedTextures();
+    TextureAtlas* getTextureAtlas();
+
     VertexArrayPtr createVertexArray(int reserveVerts = 0, int reserveIndexes = 0);
     typedef std::map<const GLContext*, unsigned> BufferIDMap;
     void deleteBuffers(BufferIDMap& bufferIDs);
@@ -98,6 +110,29 @@ private:
     TexUploadMap m_pPendingTexUploads;
     std::vector<unsigned> m_PendingTexDeletes;
 
+    struct SharedTexKey {
+        SharedTexKey(const Bitmap* pBmp, bool bMipmap, unsigned wrapSMode,
+                unsigned wrapTMode);
+        bool operator <(const SharedTexKey& other) const;
+
+        const Bitmap* m_pBmp;
+        bool m_bMipmap;
+        unsigned m_WrapSMode;
+        unsigned m_WrapTMode;
+    };
+    struct SharedTexEntry {
+        boost::weak_ptr<Bitmap> m_pBmp;
+        boost::weak_ptr<MCTexture> m_pTex;
+    };
+    typedef std::map<SharedTexKey, SharedTexEntry> SharedTexMap;
+    typedef std::map<const MCTexture*, SharedTexKey> SharedTexKeyMap;
+    void purgeSharedTextures();
+
+    SharedTexMap m_SharedTextures;
+    SharedTexKeyMap m_SharedTexKeys;
+    size_t m_NextSharedTexPurgeSize;
+    TextureAtlas* m_pTextureAtlas;
+
     std::vector<MCFBOPtr> m_pPendingFBOCreates;
     std::vector<MCShaderParamPtr> m_pPendingShaderParamCreates;
 
@@ -0,0 +1,443 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#include "TextureAtlas.h"
+
+#include "GLContextManager.h"
+#include "MCTexture.h"
+
+#include "../base/Exception.h"
+#include "../base/ObjectCounter.h"
+
+#include <algorithm>
+#include <cstring>
+
+using namespace std;
+
+namespace avg {
+
+// Every region is surrounded by a border of this width that repeats its edge pixels,
+// so linear filtering doesn't pick up neighbouring images.
+static const int BORDER = 1;
+
+TextureAtlasRegion::TextureAtlasRegion(TextureAtlasPagePtr pPage, BitmapPtr pBmp)
+    : m_pPage(pPage),
+      m_pTex(pPage->getTex()),
+      m_pBmp(pBmp)
+{
+    ObjectCounter::get()->incRef(&typeid(*this));
+}
+
+TextureAtlasRegion::~TextureAtlasRegion()
+{
+    TextureAtlasPagePtr pPage = m_pPage.lock();
+    if (pPage) {
+        pPage->getAtlas()->releaseRegion(this, pPage);
+    }
+    ObjectCounter::get()->decRef(&typeid(*this));
+}
+
+MCTexturePtr TextureAtlasRegion::getTex() const
+{
+    return m_pTex;
+}
+
+BitmapPtr TextureAtlasRegion::getBitmap() const
+{
+    return m_pBmp;
+}
+
+const IntPoint& TextureAtlasRegion::getPos() const
+{
+    return m_Pos;
+}
+
+IntPoint TextureAtlasRegion::getSize() const
+{
+    return m_pBmp->getSize();
+}
+
+FRect TextureAtlasRegion::getTexCoordRect() const
+{
+    glm::vec2 texSize = glm::vec2(m_pTex->getGLSize());
+    glm::vec2 pos = glm::vec2(m_Pos);
+    glm::vec2 size = glm::vec2(getSize());
+    return FRect(pos.x/texSize.x, pos.y/texSize.y,
+            (pos.x+size.x)/texSize.x, (pos.y+size.y)/texSize.y);
+}
+
+
+TextureAtlasPage::TextureAtlasPage(TextureAtlas* pAtlas, const IntPoint& size,
+        PixelFormat pf)
+    : m_pAtlas(pAtlas),
+      m_FreedArea(0)
+{
+    m_pBmp = BitmapPtr(new Bitmap(size, pf, "TextureAtlasPage"));
+    memset(m_pBmp->getPixels(), 0, m_pBmp->getStride()*size.y);
+    m_pTex = GLContextManager::get()->createTexture(size, pf);
+    ObjectCounter::get()->incRef(&typeid(*this));
+}
+
+TextureAtlasPage::~TextureAtlasPage()
+{
+    ObjectCounter::get()->decRef(&typeid(*this));
+}
+
+TextureAtlas* TextureAtlasPage::getAtlas() const
+{
+    return m_pAtlas;
+}
+
+MCTexturePtr TextureAtlasPage::getTex() const
+{
+    return m_pTex;
+}
+
+PixelFormat TextureAtlasPage::getPF() const
+{
+    return m_pBmp->getPixelFormat();
+}
+
+size_t TextureAtlasPage::getNumBytes() const
+{
+    return size_t(m_pBmp->getMemNeeded());
+}
+
+int TextureAtlasPage::getNumRegions() const
+{
+    return int(m_pRegions.size());
+}
+
+bool TextureAtlasPage::hasFreedSpace() const
+{
+    return m_FreedArea > 0;
+}
+
+bool TextureAtlasPage::insert(TextureAtlasRegion* pRegion)
+{
+    IntPoint pos;
+    if (!findSpace(pRegion->getSize(), m_Shelves, pos)) {
+        return false;
+    }
+    pRegion->m_Pos = pos;
+    m_pRegions.push_back(pRegion);
+    copyToPage(pRegion);
+    scheduleUpload();
+    return true;
+}
+
+void TextureAtlasPage::remove(TextureAtlasRegion* pRegion)
+{
+    vector<TextureAtlasRegion*>::iterator it =
+            find(m_pRegions.begin(), m_pRegions.end(), pRegion);
+    AVG_ASSERT(it != m_pRegions.end());
+    m_pRegions.erase(it);
+    IntPoint size = pRegion->getSize();
+    m_FreedArea += (size.x+2*BORDER)*(size.y+2*BORDER);
+}
+
+static bool isTaller(const TextureAtlasRegion* pRegion1,
+        const TextureAtlasRegion* pRegion2)
+{
+    return pRegion1->getSize().y > pRegion2->getSize().y;
+}
+
+bool TextureAtlasPage::repack()
+{
+    // Positions are computed first, so the page stays untouched if the regions
+    // don't fit.
+    vector<TextureAtlasRegion*> pRegions = m_pRegions;
+    stable_sort(pRegions.begin(), pRegions.end(), isTaller);
+    vector<Shelf> shelves;
+    vector<IntPoint> positions(pRegions.size());
+    for (unsigned i = 0; i < pRegions.size(); ++i) {
+        if (!findSpace(pRegions[i]->getSize(), shelves, positions[i])) {
+            return false;
+        }
+    }
+    m_Shelves = shelves;
+    m_pRegions = pRegions;
+    m_FreedArea = 0;
+    memset(m_pBmp->getPixels(), 0, m_pBmp->getStride()*m_pBmp->getSize().y);
+    for (unsigned i = 0; i < m_pRegions.size(); ++i) {
+        m_pRegions[i]->m_Pos = positions[i];
+        copyToPage(m_pRegions[i]);
+    }
+    scheduleUpload();
+    return true;
+}
+
+bool TextureAtlasPage::findSpace(const IntPoint& size, vector<Shelf>& shelves,
+        IntPoint& pos) const
+{
+    IntPoint pageSize = m_pBmp->getSize();
+    IntPoint paddedSize = size + IntPoint(2*BORDER, 2*BORDER);
+    // Best fit: Use the lowest existing shelf that is high enough.
+    int bestShelf = -1;
+    for (unsigned i = 0; i < shelves.size(); ++i) {
+        const Shelf& shelf = shelves[i];
+        if (shelf.m_Height >= paddedSize.y &&
+                shelf.m_UsedWidth+paddedSize.x <= pageSize.x &&
+                (bestShelf == -1 || shelf.m_Height < shelves[bestShelf].m_Height))
+        {
+            bestShelf = i;
+        }
+    }
+    if (bestShelf == -1) {
+        int y = 0;
+        if (!shelves.empty()) {
+            y = shelves.back().m_Y + shelves.back().m_Height;
+        }
+        if (y+paddedSize.y > pageSize.y || paddedSize.x > pageSize.x) {
+            return false;
+        }
+        shelves.push_back(Shelf(y, paddedSize.y));
+        bestShelf = int(shelves.size())-1;
+    }
+    Shelf& shelf = shelves[bestShelf];
+    pos = IntPoint(shelf.m_UsedWidth+BORDER, shelf.m_Y+BORDER);
+    shelf.m_UsedWidth += paddedSize.x;
+    return true;
+}
+
+void TextureAtlasPage::copyToPage(TextureAtlasRegion* pRegion)
+{
+    const Bitmap& srcBmp = *(pRegion->getBitmap());
+    IntPoint size = srcBmp.getSize();
+    IntPoint pos = pRegion->getPos();
+    int bpp = srcBmp.getBytesPerPixel();
+    int stride = m_pBmp->getStride();
+    for (int y = -BORDER; y < size.y+BORDER; ++y) {
+        int srcY = max(0, min(size.y-1, y));
+        const unsigned char* pSrc = srcBmp.getPixels()+srcY*srcBmp.getStride();
+        unsigned char* pDest = m_pBmp->getPixels()+(pos.y+y)*stride+pos.x*bpp;
+        memcpy(pDest, pSrc, size.x*bpp);
+        for (int i = 1; i <= BORDER; ++i) {
+            memcpy(pDest-i*bpp, pSrc, bpp);
+            memcpy(pDest+(size.x+i-1)*bpp, pSrc+(size.x-1)*bpp, bpp);
+        }
+    }
+}
+
+void TextureAtlasPage::scheduleUpload()
+{
+    GLContextManager::get()->scheduleTexUpload(m_pTex, m_pBmp);
+}
+
+TextureAtlasPage::Shelf::Shelf(int y, int height)
+    : m_Y(y),
+      m_Height(height),
+      m_UsedWidth(0)
+{
+}
+
+
+TextureAtlas* TextureAtlas::get()
+{
+    return GLContextManager::get()->getTextureAtlas();
+}
+
+TextureAtlas::TextureAtlas()
+    : m_MaxImageSize(0),
+      m_PageSize(1024),
+      m_MaxBytes(32*1024*1024),
+      m_NumRepacks(0)
+{
+}
+
+TextureAtlas::~TextureAtlas()
+{
+    clear();
+}
+
+TextureAtlasRegionPtr TextureAtlas::allocRegion(BitmapPtr pBmp, bool bMipmap,
+        unsigned wrapSMode, unsigned wrapTMode)
+{
+    if (!isEligible(pBmp, bMipmap, wrapSMode, wrapTMode)) {
+        return TextureAtlasRegionPtr();
+    }
+    TextureAtlasRegionPtr pRegion = findRegion(pBmp);
+    if (!pRegion) {
+        pRegion = insert(pBmp);
+        if (pRegion) {
+            m_Regions[pBmp.get()] = pRegion;
+        }
+    }
+    return pRegion;
+}
+
+void TextureAtlas::setMaxImageSize(int maxSize)
+{
+    if (maxSize < 0) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE,
+                "TextureAtlas.setMaxImageSize: size must not be negative.");
+    }
+    m_MaxImageSize = maxSize;
+}
+
+int TextureAtlas::getMaxImageSize() const
+{
+    return m_MaxImageSize;
+}
+
+void TextureAtlas::setPageSize(int size)
+{
+    if (size < 64) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE,
+                "TextureAtlas.setPageSize: size must be at least 64.");
+    }
+    // Only new pages are affected.
+    m_PageSize = size;
+}
+
+int TextureAtlas::getPageSize() const
+{
+    return m_PageSize;
+}
+
+void TextureAtlas::setMaxBytes(size_t maxBytes)
+{
+    m_MaxBytes = maxBytes;
+}
+
+size_t TextureAtlas::getMaxBytes() const
+{
+    return m_MaxBytes;
+}
+
+size_t TextureAtlas::getNumBytes() const
+{
+    size_t numBytes = 0;
+    for (unsigned i = 0; i < m_pPages.size(); ++i) {
+        numBytes += m_pPages[i]->getNumBytes();
+    }
+    return numBytes;
+}
+
+int TextureAtlas::getNumPages() const
+{
+    return int(m_pPages.size());
+}
+
+int TextureAtlas::getNumRegions() const
+{
+    int numRegions = 0;
+    for (unsigned i = 0; i < m_pPages.size(); ++i) {
+        numRegions += m_pPages[i]->getNumRegions();
+    }
+    return numRegions;
+}
+
+long long TextureAtlas::getNumRepacks() const
+{
+    return m_NumRepacks;
+}
+
+bool TextureAtlas::isEligible(BitmapPtr pBmp, bool bMipmap, unsigned wrapSMode,
+        unsigned wrapTMode) const
+{
+    IntPoint size = pBmp->getSize();
+    return size.x <= m_MaxImageSize && size.y <= m_MaxImageSize &&
+            size.x+2*BORDER <= m_PageSize && size.y+2*BORDER <= m_PageSize &&
+            !bMipmap && wrapSMode == GL_CLAMP_TO_EDGE && wrapTMode == GL_CLAMP_TO_EDGE &&
+            !pixelFormatIsPlanar(pBmp->getPixelFormat());
+}
+
+TextureAtlasRegionPtr TextureAtlas::findRegion(BitmapPtr pBmp)
+{
+    RegionMap::iterator it = m_Regions.find(pBmp.get());
+    if (it == m_Regions.end()) {
+        return TextureAtlasRegionPtr();
+    }
+    TextureAtlasRegionPtr pRegion = it->second.lock();
+    // A different bitmap might have been allocated at the same address.
+    if (!pRegion || pRegion->getBitmap() != pBmp) {
+        return TextureAtlasRegionPtr();
+    }
+    return pRegion;
+}
+
+TextureAtlasRegionPtr TextureAtlas::insert(BitmapPtr pBmp)
+{
+    PixelFormat pf = pBmp->getPixelFormat();
+    vector<TextureAtlasPagePtr> pMatchingPages;
+    for (unsigned i = 0; i < m_pPages.size(); ++i) {
+        if (m_pPages[i]->getPF() == pf) {
+            pMatchingPages.push_back(m_pPages[i]);
+        }
+    }
+    for (unsigned i = 0; i < pMatchingPages.size(); ++i) {
+        TextureAtlasRegionPtr pRegion(new TextureAtlasRegion(pMatchingPages[i], pBmp));
+        if (pMatchingPages[i]->insert(pRegion.get())) {
+            return pRegion;
+        }
+        // Not inserted, so the destructor must not release it.
+        pRegion->m_pPage.reset();
+    }
+
+    size_t pageBytes = size_t(m_PageSize)*m_PageSize*getBytesPerPixel(pf);
+    if (getNumBytes()+pageBytes > m_MaxBytes) {
+        // Out of budget: Reclaim the space of released images before giving up.
+        for (unsigned i = 0; i < pMatchingPages.size(); ++i) {
+            TextureAtlasPagePtr pPage = pMatchingPages[i];
+            if (pPage->hasFreedSpace() && pPage->repack()) {
+                m_NumRepacks++;
+                TextureAtlasRegionPtr pRegion(new TextureAtlasRegion(pPage, pBmp));
+                if (pPage->insert(pRegion.get())) {
+                    return pRegion;
+                }
+                pRegion->m_pPage.reset();
+            }
+        }
+        return TextureAtlasRegionPtr();
+    }
+
+    TextureAtlasPagePtr pPage(new TextureAtlasPage(this,
+            IntPoint(m_PageSize, m_PageSize), pf));
+    m_pPages.push_back(pPage);
+    TextureAtlasRegionPtr pRegion(new TextureAtlasRegion(pPage, pBmp));
+    bool bInserted = pPage->insert(pRegion.get());
+    AVG_ASSERT(bInserted);
+    return pRegion;
+}
+
+void TextureAtlas::releaseRegion(TextureAtlasRegion* pRegion, TextureAtlasPagePtr pPage)
+{
+    RegionMap::iterator it = m_Regions.find(pRegion->getBitmap().get());
+    if (it != m_Regions.end() && it->second.expired()) {
+        m_Regions.erase(it);
+    }
+    pPage->remove(pRegion);
+    if (pPage->getNumRegions() == 0) {
+        vector<TextureAtlasPagePtr>::iterator pageIt =
+                find(m_pPages.begin(), m_pPages.end(), pPage);
+        AVG_ASSERT(pageIt != m_pPages.end());
+        m_pPages.erase(pageIt);
+    }
+}
+
+void TextureAtlas::clear()
+{
+    m_pPages.clear();
+    m_Regions.clear();
+}
+
+}
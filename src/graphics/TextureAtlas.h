@@ -0,0 +1,166 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#ifndef _TextureAtlas_H_
+#define _TextureAtlas_H_
+
+#include "../api.h"
+#include "Bitmap.h"
+#include "PixelFormat.h"
+
+#include "../base/GLMHelper.h"
+#include "../base/Rect.h"
+
+#include <boost/shared_ptr.hpp>
+#include <boost/weak_ptr.hpp>
+
+#include <vector>
+#include <map>
+
+namespace avg {
+
+class MCTexture;
+typedef boost::shared_ptr<MCTexture> MCTexturePtr;
+class TextureAtlas;
+class TextureAtlasPage;
+typedef boost::shared_ptr<TextureAtlasPage> TextureAtlasPagePtr;
+
+// A rectangle in an atlas page that holds one bitmap. The space is freed when the
+// last reference to the region is released. Regions can move inside their page
+// when the page is repacked, so users should compare getPos() to detect this.
+class AVG_API TextureAtlasRegion
+{
+    public:
+        virtual ~TextureAtlasRegion();
+
+        MCTexturePtr getTex() const;
+        BitmapPtr getBitmap() const;
+        const IntPoint& getPos() const;
+        IntPoint getSize() const;
+        // Position and size of the bitmap in normalized texture coordinates.
+        FRect getTexCoordRect() const;
+
+    private:
+        friend class TextureAtlas;
+        friend class TextureAtlasPage;
+        TextureAtlasRegion(TextureAtlasPagePtr pPage, BitmapPtr pBmp);
+
+        boost::weak_ptr<TextureAtlasPage> m_pPage;
+        MCTexturePtr m_pTex;
+        BitmapPtr m_pBmp;
+        IntPoint m_Pos;
+};
+
+typedef boost::shared_ptr<TextureAtlasRegion> TextureAtlasRegionPtr;
+
+// One texture of the atlas, filled using shelf packing. A CPU-side copy of the page
+// is kept so bitmaps can be added and the page can be repacked without reading
+// back the texture.
+class AVG_API TextureAtlasPage
+{
+    public:
+        TextureAtlasPage(TextureAtlas* pAtlas, const IntPoint& size, PixelFormat pf);
+        virtual ~TextureAtlasPage();
+
+        TextureAtlas* getAtlas() const;
+        MCTexturePtr getTex() const;
+        PixelFormat getPF() const;
+        size_t getNumBytes() const;
+        int getNumRegions() const;
+        bool hasFreedSpace() const;
+
+        bool insert(TextureAtlasRegion* pRegion);
+        void remove(TextureAtlasRegion* pRegion);
+        bool repack();
+
+    private:
+        struct Shelf {
+            Shelf(int y, int height);
+
+            int m_Y;
+            int m_Height;
+            int m_UsedWidth;
+        };
+
+        bool findSpace(const IntPoint& size, std::vector<Shelf>& shelves,
+                IntPoint& pos) const;
+        void copyToPage(TextureAtlasRegion* pRegion);
+        void scheduleUpload();
+
+        TextureAtlas* m_pAtlas;
+        BitmapPtr m_pBmp;
+        MCTexturePtr m_pTex;
+        std::vector<Shelf> m_Shelves;
+        std::vector<TextureAtlasRegion*> m_pRegions;
+        int m_FreedArea;
+};
+
+// Packs small bitmaps into shared textures so nodes that display them can be
+// batched and don't each pay for texture padding. Bitmaps larger than the maximum
+// image size, mipmapped or wrapped textures and planar pixel formats get textures
+// of their own. Pages with freed space are repacked before the memory budget
+// is exceeded, and empty pages are deleted.
+class AVG_API TextureAtlas
+{
+    public:
+        static TextureAtlas* get();
+
+        TextureAtlas();
+        virtual ~TextureAtlas();
+
+        // Returns an empty pointer if the bitmap should get its own texture.
+        TextureAtlasRegionPtr allocRegion(BitmapPtr pBmp, bool bMipmap,
+                unsigned wrapSMode, unsigned wrapTMode);
+
+        void setMaxImageSize(int maxSize);
+        int getMaxImageSize() const;
+        void setPageSize(int size);
+        int getPageSize() const;
+        void setMaxBytes(size_t maxBytes);
+        size_t getMaxBytes() const;
+
+        size_t getNumBytes() const;
+        int getNumPages() const;
+        int getNumRegions() const;
+        long long getNumRepacks() const;
+
+    private:
+        friend class TextureAtlasRegion;
+        bool isEligible(BitmapPtr pBmp, bool bMipmap, unsigned wrapSMode,
+                unsigned wrapTMode) const;
+        TextureAtlasRegionPtr findRegion(BitmapPtr pBmp);
+        TextureAtlasRegionPtr insert(BitmapPtr pBmp);
+        void releaseRegion(TextureAtlasRegion* pRegion, TextureAtlasPagePtr pPage);
+        void clear();
+
+        int m_MaxImageSize;
+        int m_PageSize;
+        size_t m_MaxBytes;
+        long long m_NumRepacks;
+
+        std::vector<TextureAtlasPagePtr> m_pPages;
+        typedef std::map<const Bitmap*, boost::weak_ptr<TextureAtlasRegion> > RegionMap;
+        RegionMap m_Regions;
+};
+
+}
+
+#endif
@@ -155,6 +155,14 @@ void VertexData::reset()
     m_bDataChanged = false;
 }
 
+void VertexData::reuse(int numVerts, int numIndexes)
+{
+    AVG_ASSERT(m_NumVerts+numVerts <= m_ReserveVerts);
+    AVG_ASSERT(m_NumIndexes+numIndexes <= m_ReserveIndexes);
+    m_NumVerts += numVerts;
+    m_NumIndexes += numIndexes;
+}
+
 int VertexData::getNumVerts() const
 {
     return m_NumVerts;
@@ -63,6 +63,9 @@ public:
     bool hasDataChanged() const;
     void resetDataChanged();
     void reset();
+    // Keeps numVerts vertexes and numIndexes indexes from the last pass at the current
+    // position. reset() doesn't clear the buffers, so they are still there.
+    void reuse(int numVerts, int numIndexes);
 
     int getNumVerts() const;
     int getNumIndexes() const;
@@ -107,6 +107,8 @@ void AreaNode::connectDisplay()
         notifySubscribers("SIZE_CHANGED", m_RelViewport.size());
     }
     m_bTransformChanged = true;
+    setRenderDirty();
+    hitBoundsChanged();
     Node::connectDisplay();
 }
 
@@ -182,6 +184,8 @@ void AreaNode::setAngle(float angle)
 {
     m_Angle = fmod(angle, 2*PI);
     m_bTransformChanged = true;
+    setRenderDirty();
+    hitBoundsChanged();
 }
 
 glm::vec2 AreaNode::getPivot() const
@@ -199,6 +203,8 @@ void AreaNode::setPivot(const glm::vec2& pt)
     m_Pivot.y = pt.y;
     m_bHasCustomPivot = true;
     m_bTransformChanged = true;
+    setRenderDirty();
+    hitBoundsChanged();
 }
 
 const std::string& AreaNode::getElementOutlineColor() const
@@ -214,6 +220,7 @@ void AreaNode::setElementOutlineColor(const std::string& sColor)
     } else {
         m_ElementOutlineColor = colorStringToColor(m_sElementOutlineColor);
     }
+    setRenderDirty();
 }
 
 glm::vec2 AreaNode::toLocal(const glm::vec2& globalPos) const
@@ -237,16 +244,64 @@ void AreaNode::getElementsByPos(const glm::vec2& pos, vector<NodePtr>& pElements
     }
 }
 
+bool AreaNode::getHitBounds(FRect& bounds) const
+{
+    bounds = localToParentBounds(FRect(glm::vec2(0,0), getSize()));
+    return true;
+}
+
+FRect AreaNode::localToParentBounds(const FRect& localRect) const
+{
+    if (m_Angle == 0) {
+        return FRect(localRect.tl+m_RelViewport.tl, localRect.br+m_RelViewport.tl);
+    }
+    glm::vec2 corners[4] = {toGlobal(localRect.tl), 
+            toGlobal(glm::vec2(localRect.br.x, localRect.tl.y)),
+            toGlobal(localRect.br), toGlobal(glm::vec2(localRect.tl.x, localRect.br.y))};
+    FRect bounds(corners[0], corners[0]);
+    for (int i = 1; i < 4; ++i) {
+        bounds.tl = glm::min(bounds.tl, corners[i]);
+        bounds.br = glm::max(bounds.br, corners[i]);
+    }
+    return bounds;
+}
+
+FRect AreaNode::parentToLocalBounds(const FRect& parentRect) const
+{
+    if (m_Angle == 0) {
+        return FRect(parentRect.tl-m_RelViewport.tl, parentRect.br-m_RelViewport.tl);
+    }
+    glm::vec2 corners[4] = {toLocal(parentRect.tl), 
+            toLocal(glm::vec2(parentRect.br.x, parentRect.tl.y)),
+            toLocal(parentRect.br), toLocal(glm::vec2(parentRect.tl.x, parentRect.br.y))};
+    FRect bounds(corners[0], corners[0]);
+    for (int i = 1; i < 4; ++i) {
+        bounds.tl = glm::min(bounds.tl, corners[i]);
+        bounds.br = glm::max(bounds.br, corners[i]);
+    }
+    return bounds;
+}
+
 void AreaNode::maybeRender(const glm::mat4& parentTransform)
 {
     AVG_ASSERT(getState() == NS_CANRENDER);
     if (isVisible()) {
-        calcTransform();
-        m_Transform = parentTransform*m_LocalTransform;
+        updateTransform(parentTransform);
         render();
     }
 }
 
+void AreaNode::updateTransform(const glm::mat4& parentTransform)
+{
+    calcTransform();
+    m_Transform = parentTransform*m_LocalTransform;
+}
+
+const glm::mat4& AreaNode::getLocalTransform() const
+{
+    return m_LocalTransform;
+}
+
 void AreaNode::renderOutlines(const VertexArrayPtr& pVA, Pixel32 parentColor)
 {
     Pixel32 effColor = getEffectiveOutlineColor(parentColor);
@@ -295,6 +350,8 @@ void AreaNode::setViewport(float x, float y, float width, float height)
         notifySubscribers("SIZE_CHANGED", m_RelViewport.size());
     }
     m_bTransformChanged = true;
+    setRenderDirty();
+    hitBoundsChanged();
 }
 
 const FRect& AreaNode::getRelViewport() const
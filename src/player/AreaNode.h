@@ -91,6 +91,7 @@ class AVG_API AreaNode: public Node
         
         virtual void getElementsByPos(const glm::vec2& pos, 
                 std::vector<NodePtr>& pElements);
+        virtual bool getHitBounds(FRect& bounds) const;
 
         virtual void maybeRender(const glm::mat4& parentTransform);
         virtual void renderOutlines(const VertexArrayPtr& pVA, Pixel32 parentColor);
@@ -109,6 +110,12 @@ class AVG_API AreaNode: public Node
         AreaNode();
         glm::vec2 getUserSize() const;
         Pixel32 getEffectiveOutlineColor(Pixel32 parentColor) const;
+        void updateTransform(const glm::mat4& parentTransform);
+        const glm::mat4& getLocalTransform() const;
+        // Axis-aligned bounding boxes of rects converted between local and parent 
+        // coordinates.
+        FRect localToParentBounds(const FRect& localRect) const;
+        FRect parentToLocalBounds(const FRect& parentRect) const;
 
     private:
         void calcTransform();
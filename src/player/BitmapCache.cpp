@@ -0,0 +1,315 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "BitmapCache.h"
+
+#include "../base/Exception.h"
+#include "../base/FileHelper.h"
+#include "../base/ThreadHelper.h"
+
+#include "../graphics/BitmapLoader.h"
+#include "../graphics/Filterfliprgb.h"
+
+#include <limits>
+#include <cstring>
+
+using namespace std;
+
+namespace avg {
+
+BitmapCache* BitmapCache::s_pBitmapCache = 0;
+
+static size_t calcBmpHash(const Bitmap& bmp)
+{
+    // FNV-1a over 32-bit words, line by line to skip stride padding.
+    unsigned hash = 2166136261U;
+    hash = (hash ^ unsigned(bmp.getPixelFormat())) * 16777619U;
+    hash = (hash ^ unsigned(bmp.getSize().x)) * 16777619U;
+    hash = (hash ^ unsigned(bmp.getSize().y)) * 16777619U;
+    int lineLen = bmp.getLineLen();
+    int numWords = lineLen/4;
+    const unsigned char * pLine = bmp.getPixels();
+    for (int y = 0; y < bmp.getSize().y; ++y) {
+        for (int i = 0; i < numWords; ++i) {
+            unsigned word;
+            memcpy(&word, pLine+i*4, 4);
+            hash = (hash ^ word) * 16777619U;
+        }
+        for (int i = numWords*4; i < lineLen; ++i) {
+            hash = (hash ^ pLine[i]) * 16777619U;
+        }
+        pLine += bmp.getStride();
+    }
+    return hash;
+}
+
+BitmapCache* BitmapCache::get()
+{
+    if (!s_pBitmapCache) {
+        s_pBitmapCache = new BitmapCache();
+    }
+    return s_pBitmapCache;
+}
+
+BitmapCache::BitmapCache()
+    : m_MaxBytes(128*1024*1024),
+      m_NumBytes(0),
+      m_NumHits(0),
+      m_NumMisses(0),
+      m_NextInternPurgeSize(64),
+      m_NumInternHits(0)
+{
+}
+
+BitmapCache::~BitmapCache()
+{
+}
+
+BitmapPtr BitmapCache::load(const UTF8String& sFilename, PixelFormat pf,
+        Image::TextureCompression comp, const IntPoint& maxSize)
+{
+    string sPath = sFilename;
+    if (!isAbsPath(sPath)) {
+        sPath = getCWD() + sPath;
+    }
+    time_t modTime = getFileModTime(sPath);
+    if (modTime == -1) {
+        // Let the loader generate the appropriate error.
+        return loadUncached(sFilename, pf, comp, maxSize);
+    }
+    Key key(sPath, modTime, pf, comp, maxSize);
+    {
+        lock_guard lock(m_Mutex);
+        EntryMap::iterator it = m_EntryMap.find(key);
+        if (it != m_EntryMap.end()) {
+            m_Entries.splice(m_Entries.begin(), m_Entries, it->second);
+            m_NumHits++;
+            return it->second->m_pBmp;
+        }
+        m_NumMisses++;
+    }
+    BitmapPtr pBmp = loadUncached(sFilename, pf, comp, maxSize);
+    insert(key, pBmp);
+    return pBmp;
+}
+
+BitmapPtr BitmapCache::intern(BitmapPtr pBmp)
+{
+    size_t hash = calcBmpHash(*pBmp);
+    lock_guard lock(m_Mutex);
+    pair<InternMap::iterator, InternMap::iterator> range = 
+            m_InternedBmps.equal_range(hash);
+    for (InternMap::iterator it = range.first; it != range.second; ++it) {
+        BitmapPtr pOtherBmp = it->second.lock();
+        if (pOtherBmp && *pOtherBmp == *pBmp) {
+            m_NumInternHits++;
+            return pOtherBmp;
+        }
+    }
+    if (m_InternedBmps.size() >= m_NextInternPurgeSize) {
+        purgeInterned();
+        m_NextInternPurgeSize = max(size_t(64), m_InternedBmps.size()*2);
+    }
+    m_InternedBmps.insert(make_pair(hash, boost::weak_ptr<Bitmap>(pBmp)));
+    return pBmp;
+}
+
+void BitmapCache::setMaxBytes(size_t maxBytes)
+{
+    lock_guard lock(m_Mutex);
+    m_MaxBytes = maxBytes;
+    trim(m_MaxBytes);
+}
+
+size_t BitmapCache::getMaxBytes() const
+{
+    lock_guard lock(m_Mutex);
+    return m_MaxBytes;
+}
+
+size_t BitmapCache::getNumBytes() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumBytes;
+}
+
+int BitmapCache::getNumEntries() const
+{
+    lock_guard lock(m_Mutex);
+    return int(m_Entries.size());
+}
+
+long long BitmapCache::getNumHits() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumHits;
+}
+
+long long BitmapCache::getNumMisses() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumMisses;
+}
+
+long long BitmapCache::getNumInternHits() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumInternHits;
+}
+
+void BitmapCache::resetStats()
+{
+    lock_guard lock(m_Mutex);
+    m_NumHits = 0;
+    m_NumMisses = 0;
+    m_NumInternHits = 0;
+}
+
+void BitmapCache::clear()
+{
+    lock_guard lock(m_Mutex);
+    m_Entries.clear();
+    m_EntryMap.clear();
+    m_NumBytes = 0;
+}
+
+BitmapCache::Key::Key(const string& sFilename, time_t modTime, PixelFormat pf,
+        Image::TextureCompression comp, const IntPoint& maxSize)
+    : m_sFilename(sFilename),
+      m_ModTime(modTime),
+      m_PF(pf),
+      m_Compression(comp),
+      m_MaxSize(maxSize)
+{
+}
+
+bool BitmapCache::Key::operator <(const Key& other) const
+{
+    if (m_sFilename != other.m_sFilename) {
+        return m_sFilename < other.m_sFilename;
+    }
+    if (m_ModTime != other.m_ModTime) {
+        return m_ModTime < other.m_ModTime;
+    }
+    if (m_PF != other.m_PF) {
+        return m_PF < other.m_PF;
+    }
+    if (m_Compression != other.m_Compression) {
+        return m_Compression < other.m_Compression;
+    }
+    if (m_MaxSize.x != other.m_MaxSize.x) {
+        return m_MaxSize.x < other.m_MaxSize.x;
+    }
+    return m_MaxSize.y < other.m_MaxSize.y;
+}
+
+BitmapCache::Entry::Entry(const Key& key, BitmapPtr pBmp)
+    : m_Key(key),
+      m_pBmp(pBmp)
+{
+}
+
+BitmapPtr BitmapCache::loadUncached(const string& sFilename, PixelFormat pf,
+        Image::TextureCompression comp, const IntPoint& maxSize) const
+{
+    BitmapPtr pBmp = loadBitmap(sFilename, pf, maxSize);
+    switch (comp) {
+        case Image::TEXTURECOMPRESSION_NONE:
+            return pBmp;
+        case Image::TEXTURECOMPRESSION_B5G6R5:
+            {
+                if (pBmp->hasAlpha()) {
+                    throw Exception(AVG_ERR_UNSUPPORTED, "B5G6R5-compressed textures "
+                            "with an alpha channel are not supported.");
+                }
+                BitmapPtr pDestBmp(new Bitmap(pBmp->getSize(), B5G6R5, sFilename));
+                if (!BitmapLoader::get()->isBlueFirst()) {
+                    FilterFlipRGB().applyInPlace(pBmp);
+                }
+                pDestBmp->copyPixels(*pBmp);
+                return pDestBmp;
+            }
+        default:
+            AVG_ASSERT(false);
+            return BitmapPtr();
+    }
+}
+
+void BitmapCache::insert(const Key& key, BitmapPtr pBmp)
+{
+    lock_guard lock(m_Mutex);
+    // Another thread might have loaded the same file in the meantime.
+    if (m_EntryMap.find(key) != m_EntryMap.end()) {
+        return;
+    }
+    // Versions of the file with an older modification time will never be hit again.
+    Key firstKey(key.m_sFilename, numeric_limits<time_t>::min(), NO_PIXELFORMAT,
+            Image::TEXTURECOMPRESSION_NONE, IntPoint(0,0));
+    EntryMap::iterator it = m_EntryMap.lower_bound(firstKey);
+    while (it != m_EntryMap.end() && it->first.m_sFilename == key.m_sFilename) {
+        EntryMap::iterator curIt = it;
+        ++it;
+        if (curIt->first.m_ModTime != key.m_ModTime) {
+            erase(curIt->second);
+        }
+    }
+
+    size_t numBytes = pBmp->getMemNeeded();
+    if (numBytes > m_MaxBytes) {
+        return;
+    }
+    m_Entries.push_front(Entry(key, pBmp));
+    m_EntryMap[key] = m_Entries.begin();
+    m_NumBytes += numBytes;
+    trim(m_MaxBytes);
+}
+
+void BitmapCache::trim(size_t maxBytes)
+{
+    while (m_NumBytes > maxBytes) {
+        AVG_ASSERT(!m_Entries.empty());
+        EntryList::iterator it = m_Entries.end();
+        --it;
+        erase(it);
+    }
+}
+
+void BitmapCache::erase(EntryList::iterator it)
+{
+    m_NumBytes -= it->m_pBmp->getMemNeeded();
+    m_EntryMap.erase(it->m_Key);
+    m_Entries.erase(it);
+}
+
+void BitmapCache::purgeInterned()
+{
+    InternMap::iterator it = m_InternedBmps.begin();
+    while (it != m_InternedBmps.end()) {
+        InternMap::iterator curIt = it;
+        ++it;
+        if (curIt->second.expired()) {
+            m_InternedBmps.erase(curIt);
+        }
+    }
+}
+
+}
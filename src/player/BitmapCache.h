@@ -0,0 +1,125 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _BitmapCache_H_
+#define _BitmapCache_H_
+
+#include "../api.h"
+
+#include "Image.h"
+
+#include "../graphics/Bitmap.h"
+#include "../graphics/PixelFormat.h"
+
+#include <boost/thread/mutex.hpp>
+#include <boost/weak_ptr.hpp>
+
+#include <string>
+#include <list>
+#include <map>
+#include <ctime>
+
+namespace avg {
+
+// Process-wide cache for bitmaps loaded from files. Entries are keyed by path,
+// modification time, pixel format, texture compression and maximum decode size, so a
+// file that changes on disk is reloaded. Cached bitmaps are shared between all users
+// and must not be modified. When the byte budget is exceeded, the least recently used
+// entries are dropped. Bitmaps that are still in use stay alive through their
+// reference counts.
+class AVG_API BitmapCache
+{
+    public:
+        static BitmapCache* get();
+
+        BitmapPtr load(const UTF8String& sFilename, PixelFormat pf=NO_PIXELFORMAT,
+                Image::TextureCompression comp=Image::TEXTURECOMPRESSION_NONE,
+                const IntPoint& maxSize=IntPoint(0,0));
+
+        // Returns a bitmap with the same contents as pBmp that is shared with other
+        // callers, so identical bitmaps are held in memory and uploaded to the GPU only
+        // once. pBmp must not be modified afterwards.
+        BitmapPtr intern(BitmapPtr pBmp);
+
+        void setMaxBytes(size_t maxBytes);
+        size_t getMaxBytes() const;
+        size_t getNumBytes() const;
+        int getNumEntries() const;
+        long long getNumHits() const;
+        long long getNumMisses() const;
+        long long getNumInternHits() const;
+        void resetStats();
+        void clear();
+
+    private:
+        BitmapCache();
+        virtual ~BitmapCache();
+
+        struct Key {
+            Key(const std::string& sFilename, time_t modTime, PixelFormat pf,
+                    Image::TextureCompression comp, const IntPoint& maxSize);
+            bool operator <(const Key& other) const;
+
+            std::string m_sFilename;
+            time_t m_ModTime;
+            PixelFormat m_PF;
+            Image::TextureCompression m_Compression;
+            IntPoint m_MaxSize;
+        };
+
+        struct Entry {
+            Entry(const Key& key, BitmapPtr pBmp);
+
+            Key m_Key;
+            BitmapPtr m_pBmp;
+        };
+
+        typedef std::list<Entry> EntryList;
+        typedef std::map<Key, EntryList::iterator> EntryMap;
+
+        BitmapPtr loadUncached(const std::string& sFilename, PixelFormat pf,
+                Image::TextureCompression comp, const IntPoint& maxSize) const;
+        void insert(const Key& key, BitmapPtr pBmp);
+        void trim(size_t maxBytes);
+        void erase(EntryList::iterator it);
+        void purgeInterned();
+
+        EntryList m_Entries;
+        EntryMap m_EntryMap;
+        size_t m_MaxBytes;
+        size_t m_NumBytes;
+        long long m_NumHits;
+        long long m_NumMisses;
+
+        typedef std::multimap<size_t, boost::weak_ptr<Bitmap> > InternMap;
+        InternMap m_InternedBmps;
+        size_t m_NextInternPurgeSize;
+        long long m_NumInternHits;
+
+        mutable boost::mutex m_Mutex;
+
+        static BitmapCache* s_pBitmapCache;
+};
+
+}
+
+#endif
@@ -29,6 +29,7 @@
 #include  <stdlib.h>
 
 #include "../base/OSHelper.h"
+#include "../base/TimeSource.h"
 
 using namespace std;
 
@@ -36,14 +37,24 @@ namespace avg {
 
 BitmapManager * BitmapManager::s_pBitmapManager=0;
 
+// In auto mode, one thread is started for every REQUESTS_PER_THREAD pending requests.
+static const int REQUESTS_PER_THREAD = 4;
+// Threads are only stopped after they haven't been needed for this long (in ms).
+static const float THREAD_SHRINK_DELAY = 2000;
+
 BitmapManager::BitmapManager()
+    : m_bAutoNumThreads(false),
+      m_NumStoppingThreads(0),
+      m_LastFullUseTime(0)
 {
     if (s_pBitmapManager) {
         throw Exception(AVG_ERR_UNKNOWN, "BitmapMananger has already been instantiated.");
     }
     
     m_pCmdQueue = BitmapManagerThread::CQueuePtr(new BitmapManagerThread::CQueue);
+    m_pRequestQueue = BitmapRequestQueuePtr(new BitmapRequestQueue);
     m_pMsgQueue = BitmapManagerMsgQueuePtr(new BitmapManagerMsgQueue(8));
+    m_pStats = BitmapManagerStatsPtr(new BitmapManagerStats());
 
     startThreads(1);
 
@@ -55,6 +66,7 @@ BitmapManager::~BitmapManager()
     while (!m_pCmdQueue->empty()) {
         m_pCmdQueue->pop();
     }
+    m_pRequestQueue->clear();
     while (!m_pMsgQueue->empty()) {
         m_pMsgQueue->pop();
     }
@@ -70,39 +82,112 @@ BitmapManager* BitmapManager::get()
     return s_pBitmapManager;
 }
 
-void BitmapManager::loadBitmapPy(const UTF8String& sUtf8FileName,
-        const boost::python::object& pyFunc, PixelFormat pf)
+BitmapManagerMsgPtr BitmapManager::loadBitmapPy(const UTF8String& sUtf8FileName,
+        const boost::python::object& pyFunc, PixelFormat pf, float priority,
+        const IntPoint& maxSize)
 {
     std::string sFileName = convertUTF8ToFilename(sUtf8FileName);
     BitmapManagerMsgPtr pMsg = BitmapManagerMsgPtr(
-            new BitmapManagerMsg(sUtf8FileName, pyFunc, pf));
-    internalLoadBitmap(pMsg);
+            new BitmapManagerMsg(sUtf8FileName, pyFunc, pf, maxSize));
+    internalLoadBitmap(pMsg, priority);
+    return pMsg;
 }
 
-void BitmapManager::loadBitmap(const UTF8String& sUtf8FileName,
-        IBitmapLoadedListener* pLoadedListener, PixelFormat pf)
+BitmapManagerMsgPtr BitmapManager::loadBitmap(const UTF8String& sUtf8FileName,
+        IBitmapLoadedListener* pLoadedListener, PixelFormat pf, float priority,
+        const IntPoint& maxSize)
 {
     std::string sFileName = convertUTF8ToFilename(sUtf8FileName);
     BitmapManagerMsgPtr pMsg = BitmapManagerMsgPtr(
-            new BitmapManagerMsg(sUtf8FileName, pLoadedListener, pf));
-    internalLoadBitmap(pMsg);
+            new BitmapManagerMsg(sUtf8FileName, pLoadedListener, pf, maxSize));
+    internalLoadBitmap(pMsg, priority);
+    return pMsg;
+}
+
+void BitmapManager::cancelRequest(BitmapManagerMsgPtr pMsg)
+{
+    // Requests that are already being decoded are dropped when they're done.
+    pMsg->cancel();
+    m_pRequestQueue->remove(pMsg);
+}
+
+void BitmapManager::setRequestPriority(BitmapManagerMsgPtr pMsg, float priority)
+{
+    m_pRequestQueue->setPriority(pMsg, priority);
+}
+
+float BitmapManager::getRequestPriority(BitmapManagerMsgPtr pMsg) const
+{
+    return m_pRequestQueue->getPriority(pMsg);
+}
+
+int BitmapManager::getNumPendingRequests() const
+{
+    return m_pRequestQueue->size();
 }
 
 void BitmapManager::setNumThreads(int numThreads)
 {
+    m_bAutoNumThreads = false;
     stopThreads();
     startThreads(numThreads);
 }
 
+int BitmapManager::getNumThreads() const
+{
+    return int(m_pBitmapManagerThreads.size()) - m_NumStoppingThreads;
+}
+
+void BitmapManager::setAutoNumThreads(bool bAuto)
+{
+    m_bAutoNumThreads = bAuto;
+    if (m_bAutoNumThreads) {
+        adjustNumThreads();
+    }
+}
+
+bool BitmapManager::getAutoNumThreads() const
+{
+    return m_bAutoNumThreads;
+}
+
+float BitmapManager::getLoadLatency(float percentile) const
+{
+    return m_pStats->getLatencyPercentile(percentile);
+}
+
+float BitmapManager::getBytesPerSecond() const
+{
+    return m_pStats->getBytesPerSecond(TimeSource::get()->getCurrentMicrosecs()/1000);
+}
+
+long long BitmapManager::getNumLoaded() const
+{
+    return m_pStats->getNumLoaded();
+}
+
+void BitmapManager::resetStats()
+{
+    m_pStats->reset();
+}
+
 void BitmapManager::onFrameEnd()
 {
     while (!m_pMsgQueue->empty()) {
         BitmapManagerMsgPtr pMsg = m_pMsgQueue->pop();
-        pMsg->executeCallback();
+        if (!pMsg->isCancelled()) {
+            pMsg->executeCallback();
+        }
+    }
+    if (m_bAutoNumThreads) {
+        adjustNumThreads();
+    }
+    if (m_NumStoppingThreads > 0) {
+        joinStoppedThreads();
     }
 }
 
-void BitmapManager::internalLoadBitmap(BitmapManagerMsgPtr pMsg)
+void BitmapManager::internalLoadBitmap(BitmapManagerMsgPtr pMsg, float priority)
 {
 #ifdef WIN32
     int rc = _access(pMsg->getFilename().c_str(), 04);
@@ -117,7 +202,8 @@ void BitmapManager::internalLoadBitmap(BitmapManagerMsgPtr pMsg)
                 strerror(errno)));
         m_pMsgQueue->push(pMsg);
     } else {
-        m_pCmdQueue->pushCmd(boost::bind(&BitmapManagerThread::loadBitmap, _1, pMsg));
+        m_pRequestQueue->push(pMsg, priority);
+        m_pCmdQueue->pushCmd(boost::bind(&BitmapManagerThread::loadNextBitmap, _1));
     }
 }
 
@@ -125,23 +211,61 @@ void BitmapManager::startThreads(int numThreads)
 {
     for (int i=0; i<numThreads; ++i) {
         boost::thread* pThread = new boost::thread(
-                BitmapManagerThread(*m_pCmdQueue, *m_pMsgQueue));
+                BitmapManagerThread(*m_pCmdQueue, *m_pRequestQueue, *m_pMsgQueue,
+                        *m_pStats));
         m_pBitmapManagerThreads.push_back(pThread);
     }
 }
 
 void BitmapManager::stopThreads()
 {
-    int numThreads = m_pBitmapManagerThreads.size();
+    // Threads that are already stopping have a stop command in the queue.
+    int numThreads = getNumThreads();
     for (int i=0; i<numThreads; ++i) {
         m_pCmdQueue->pushCmd(boost::bind(&BitmapManagerThread::stop, _1));
     }
-    for (int i=0; i<numThreads; ++i) {
+    for (unsigned i=0; i<m_pBitmapManagerThreads.size(); ++i) {
         boost::thread* pThread = m_pBitmapManagerThreads[i];
         pThread->join();
         delete pThread;
     }
     m_pBitmapManagerThreads.clear();
+    m_NumStoppingThreads = 0;
+}
+
+void BitmapManager::adjustNumThreads()
+{
+    int maxThreads = max(1, int(boost::thread::hardware_concurrency())-1);
+    int numPending = m_pRequestQueue->size();
+    int numThreads = getNumThreads();
+    int numNeeded = (numPending+REQUESTS_PER_THREAD-1)/REQUESTS_PER_THREAD;
+    numNeeded = max(1, min(maxThreads, numNeeded));
+    float curTime = TimeSource::get()->getCurrentMicrosecs()/1000;
+    if (numNeeded >= numThreads) {
+        m_LastFullUseTime = curTime;
+        if (numNeeded > numThreads) {
+            startThreads(numNeeded-numThreads);
+        }
+    } else if (curTime-m_LastFullUseTime > THREAD_SHRINK_DELAY) {
+        // Whichever thread gets the stop command terminates. It's joined later.
+        m_pCmdQueue->pushCmd(boost::bind(&BitmapManagerThread::stop, _1));
+        m_NumStoppingThreads++;
+        m_LastFullUseTime = curTime;
+    }
+}
+
+void BitmapManager::joinStoppedThreads()
+{
+    vector<boost::thread*>::iterator it = m_pBitmapManagerThreads.begin();
+    while (it != m_pBitmapManagerThreads.end()) {
+        if ((*it)->timed_join(boost::posix_time::milliseconds(0))) {
+            delete *it;
+            it = m_pBitmapManagerThreads.erase(it);
+            m_NumStoppingThreads--;
+        } else {
+            ++it;
+        }
+    }
 }
 
 }
@@ -24,6 +24,7 @@
 
 #include "BitmapManagerThread.h"
 #include "BitmapManagerMsg.h"
+#include "BitmapRequestQueue.h"
 
 #include "../api.h"
 #include "../base/Queue.h"
@@ -41,24 +42,46 @@ class AVG_API BitmapManager : public IFrameEndListener
         BitmapManager();
         ~BitmapManager();
         static BitmapManager* get();
-        void loadBitmapPy(const UTF8String& sUtf8FileName,
-                const boost::python::object& pyFunc, PixelFormat pf=NO_PIXELFORMAT);
-        void loadBitmap(const UTF8String& sUtf8FileName,
-                IBitmapLoadedListener* pLoadedListener, PixelFormat pf=NO_PIXELFORMAT);
+        BitmapManagerMsgPtr loadBitmapPy(const UTF8String& sUtf8FileName,
+                const boost::python::object& pyFunc, PixelFormat pf=NO_PIXELFORMAT,
+                float priority=0, const IntPoint& maxSize=IntPoint(0,0));
+        BitmapManagerMsgPtr loadBitmap(const UTF8String& sUtf8FileName,
+                IBitmapLoadedListener* pLoadedListener, PixelFormat pf=NO_PIXELFORMAT,
+                float priority=0, const IntPoint& maxSize=IntPoint(0,0));
+        void cancelRequest(BitmapManagerMsgPtr pMsg);
+        void setRequestPriority(BitmapManagerMsgPtr pMsg, float priority);
+        float getRequestPriority(BitmapManagerMsgPtr pMsg) const;
+        int getNumPendingRequests() const;
         void setNumThreads(int numThreads);
+        int getNumThreads() const;
+        void setAutoNumThreads(bool bAuto);
+        bool getAutoNumThreads() const;
+
+        float getLoadLatency(float percentile) const;
+        float getBytesPerSecond() const;
+        long long getNumLoaded() const;
+        void resetStats();
 
         virtual void onFrameEnd();
         
     private:
-        void internalLoadBitmap(BitmapManagerMsgPtr pMsg);
+        void internalLoadBitmap(BitmapManagerMsgPtr pMsg, float priority);
         void startThreads(int numThreads);
         void stopThreads();
+        void adjustNumThreads();
+        void joinStoppedThreads();
 
         static BitmapManager * s_pBitmapManager;
 
         std::vector<boost::thread*> m_pBitmapManagerThreads;
         BitmapManagerThread::CQueuePtr m_pCmdQueue;
+        BitmapRequestQueuePtr m_pRequestQueue;
         BitmapManagerMsgQueuePtr m_pMsgQueue;
+        BitmapManagerStatsPtr m_pStats;
+
+        bool m_bAutoNumThreads;
+        int m_NumStoppingThreads;
+        float m_LastFullUseTime;
 };
 
 }
@@ -25,24 +25,25 @@
 #include "../base/ObjectCounter.h"
 #include "../base/Exception.h"
 #include "../base/TimeSource.h"
+#include "../base/ThreadHelper.h"
 
 
 namespace avg {
 
 BitmapManagerMsg::BitmapManagerMsg(const UTF8String& sFilename,
-        const boost::python::object& onLoadedCb, PixelFormat pf) 
+        const boost::python::object& onLoadedCb, PixelFormat pf, const IntPoint& maxSize)
 {
     ObjectCounter::get()->incRef(&typeid(*this));
-    init(sFilename, pf);
+    init(sFilename, pf, maxSize);
     m_OnLoadedCb = onLoadedCb;
     m_pLoadedListener = 0;
 }
 
 BitmapManagerMsg::BitmapManagerMsg(const UTF8String& sFilename,
-        IBitmapLoadedListener* pLoadedListener, PixelFormat pf)
+        IBitmapLoadedListener* pLoadedListener, PixelFormat pf, const IntPoint& maxSize)
 {
     ObjectCounter::get()->incRef(&typeid(*this));
-    init(sFilename, pf);
+    init(sFilename, pf, maxSize);
     m_OnLoadedCb = boost::python::object();
     m_pLoadedListener = pLoadedListener;
 }
@@ -55,13 +56,18 @@ BitmapManagerMsg::~BitmapManagerMsg()
     ObjectCounter::get()->decRef(&typeid(*this));
 }
 
-void BitmapManagerMsg::init(const UTF8String& sFilename, PixelFormat pf)
+void BitmapManagerMsg::init(const UTF8String& sFilename, PixelFormat pf,
+        const IntPoint& maxSize)
 {
     m_sFilename = sFilename;
     m_StartTime = TimeSource::get()->getCurrentMicrosecs()/1000.0f;
     m_PF = pf;
+    m_MaxSize = maxSize;
     m_MsgType = REQUEST;
     m_pEx = 0;
+    m_Priority = 0;
+    m_SeqNum = 0;
+    m_bCancelled = false;
 }
 
 void BitmapManagerMsg::executeCallback()
@@ -104,6 +110,11 @@ PixelFormat BitmapManagerMsg::getPixelFormat()
     return m_PF;
 }
 
+const IntPoint& BitmapManagerMsg::getMaxSize() const
+{
+    return m_MaxSize;
+}
+
 void BitmapManagerMsg::setBitmap(BitmapPtr pBmp)
 {
     AVG_ASSERT(m_MsgType == REQUEST);
@@ -118,4 +129,32 @@ void BitmapManagerMsg::setError(const Exception& ex)
     m_pEx = new Exception(ex);
 }
 
+void BitmapManagerMsg::setQueuePos(float priority, long long seqNum)
+{
+    m_Priority = priority;
+    m_SeqNum = seqNum;
+}
+
+float BitmapManagerMsg::getPriority() const
+{
+    return m_Priority;
+}
+
+long long BitmapManagerMsg::getSeqNum() const
+{
+    return m_SeqNum;
+}
+
+void BitmapManagerMsg::cancel()
+{
+    lock_guard lock(m_CancelMutex);
+    m_bCancelled = true;
+}
+
+bool BitmapManagerMsg::isCancelled() const
+{
+    lock_guard lock(m_CancelMutex);
+    return m_bCancelled;
+}
+
 }
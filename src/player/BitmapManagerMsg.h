@@ -30,6 +30,7 @@
 
 #include <boost/shared_ptr.hpp>
 #include <boost/python.hpp>
+#include <boost/thread/mutex.hpp>
 
 
 namespace avg {
@@ -42,19 +43,30 @@ public:
     enum MsgType {REQUEST, BITMAP, ERROR};
 
     BitmapManagerMsg(const UTF8String& sFilename,
-            const boost::python::object& onLoadedCb, PixelFormat pf);
+            const boost::python::object& onLoadedCb, PixelFormat pf,
+            const IntPoint& maxSize=IntPoint(0,0));
     BitmapManagerMsg(const UTF8String& sFilename,
-            IBitmapLoadedListener* pLoadedListener, PixelFormat pf);
+            IBitmapLoadedListener* pLoadedListener, PixelFormat pf,
+            const IntPoint& maxSize=IntPoint(0,0));
     virtual ~BitmapManagerMsg();
-    void init(const UTF8String& sFilename, PixelFormat pf);
+    void init(const UTF8String& sFilename, PixelFormat pf, const IntPoint& maxSize);
 
     void executeCallback();
     const UTF8String getFilename();
     float getStartTime();
     PixelFormat getPixelFormat();
+    const IntPoint& getMaxSize() const;
     void setBitmap(BitmapPtr pBmp);
     void setError(const Exception& ex);
 
+    // Only called by BitmapRequestQueue.
+    void setQueuePos(float priority, long long seqNum);
+    float getPriority() const;
+    long long getSeqNum() const;
+
+    void cancel();
+    bool isCancelled() const;
+
     MsgType getType() { return m_MsgType; };
 
 private:
@@ -64,8 +76,14 @@ private:
     boost::python::object m_OnLoadedCb;
     IBitmapLoadedListener* m_pLoadedListener;
     PixelFormat m_PF;
+    IntPoint m_MaxSize;
     MsgType m_MsgType;
     Exception* m_pEx;
+
+    float m_Priority;
+    long long m_SeqNum;
+    bool m_bCancelled;
+    mutable boost::mutex m_CancelMutex;
 };
 
 typedef boost::shared_ptr<BitmapManagerMsg> BitmapManagerMsgPtr;
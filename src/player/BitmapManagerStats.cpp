@@ -0,0 +1,109 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "BitmapManagerStats.h"
+
+#include "../base/Exception.h"
+#include "../base/ThreadHelper.h"
+
+#include <algorithm>
+
+using namespace std;
+
+namespace avg {
+
+BitmapManagerStats::BitmapManagerStats(int maxSamples)
+    : m_MaxSamples(maxSamples)
+{
+    reset();
+}
+
+BitmapManagerStats::~BitmapManagerStats()
+{
+}
+
+void BitmapManagerStats::addLoad(float latency, int numBytes, float curTime)
+{
+    lock_guard lock(m_Mutex);
+    if (int(m_Latencies.size()) < m_MaxSamples) {
+        m_Latencies.push_back(latency);
+    } else {
+        m_Latencies[m_NextSample] = latency;
+        m_NextSample = (m_NextSample+1) % m_MaxSamples;
+    }
+    m_RecentLoads.push_back(TimedLoad(curTime, numBytes));
+    m_NumRecentBytes += numBytes;
+    trimRecentLoads(curTime);
+    m_NumLoaded++;
+}
+
+float BitmapManagerStats::getLatencyPercentile(float percentile) const
+{
+    if (percentile < 0 || percentile > 100) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, 
+                "Latency percentile must be between 0 and 100.");
+    }
+    vector<float> latencies;
+    {
+        lock_guard lock(m_Mutex);
+        latencies = m_Latencies;
+    }
+    if (latencies.empty()) {
+        return 0;
+    }
+    unsigned i = unsigned(percentile/100*(latencies.size()-1)+0.5f);
+    nth_element(latencies.begin(), latencies.begin()+i, latencies.end());
+    return latencies[i];
+}
+
+float BitmapManagerStats::getBytesPerSecond(float curTime)
+{
+    lock_guard lock(m_Mutex);
+    trimRecentLoads(curTime);
+    return float(m_NumRecentBytes);
+}
+
+long long BitmapManagerStats::getNumLoaded() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumLoaded;
+}
+
+void BitmapManagerStats::reset()
+{
+    lock_guard lock(m_Mutex);
+    m_Latencies.clear();
+    m_NextSample = 0;
+    m_RecentLoads.clear();
+    m_NumRecentBytes = 0;
+    m_NumLoaded = 0;
+}
+
+void BitmapManagerStats::trimRecentLoads(float curTime)
+{
+    while (!m_RecentLoads.empty() && m_RecentLoads.front().first < curTime-1000) {
+        m_NumRecentBytes -= m_RecentLoads.front().second;
+        m_RecentLoads.pop_front();
+    }
+}
+
+}
@@ -0,0 +1,68 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _BitmapManagerStats_H_
+#define _BitmapManagerStats_H_
+
+#include "../api.h"
+
+#include <boost/thread/mutex.hpp>
+#include <boost/shared_ptr.hpp>
+
+#include <vector>
+#include <deque>
+
+namespace avg {
+
+// Load statistics shared by all BitmapManagerThreads. Latency percentiles are 
+// calculated over the most recent loads, throughput over the last second. All
+// times are in milliseconds.
+class AVG_API BitmapManagerStats
+{
+    public:
+        BitmapManagerStats(int maxSamples=1024);
+        virtual ~BitmapManagerStats();
+
+        void addLoad(float latency, int numBytes, float curTime);
+        float getLatencyPercentile(float percentile) const;
+        float getBytesPerSecond(float curTime);
+        long long getNumLoaded() const;
+        void reset();
+
+    private:
+        void trimRecentLoads(float curTime);
+
+        int m_MaxSamples;
+        std::vector<float> m_Latencies;
+        int m_NextSample;
+        typedef std::pair<float, int> TimedLoad;
+        std::deque<TimedLoad> m_RecentLoads;
+        long long m_NumRecentBytes;
+        long long m_NumLoaded;
+        mutable boost::mutex m_Mutex;
+};
+
+typedef boost::shared_ptr<BitmapManagerStats> BitmapManagerStatsPtr;
+
+}
+
+#endif
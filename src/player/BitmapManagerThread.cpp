@@ -32,9 +32,13 @@
 
 namespace avg {
 
-BitmapManagerThread::BitmapManagerThread(CQueue& cmdQ, BitmapManagerMsgQueue& MsgQueue)
+BitmapManagerThread::BitmapManagerThread(CQueue& cmdQ, 
+        BitmapRequestQueue& requestQueue, BitmapManagerMsgQueue& MsgQueue,
+        BitmapManagerStats& stats)
     : WorkerThread<BitmapManagerThread>("BitmapManager", cmdQ),
+      m_RequestQueue(requestQueue),
       m_MsgQueue(MsgQueue),
+      m_Stats(stats),
       m_TotalLatency(0),
       m_NumBmpsLoaded(0)
 {
@@ -55,23 +59,42 @@ void BitmapManagerThread::deinit()
     }
 }
 
+void BitmapManagerThread::loadNextBitmap()
+{
+    // There is one command per request, but cancelled requests have already been
+    // removed from the queue.
+    BitmapManagerMsgPtr pRequest = m_RequestQueue.pop();
+    if (pRequest) {
+        loadBitmap(pRequest);
+    }
+}
+
 static ProfilingZoneID LoaderProfilingZone("loadBitmap", true);
 
 void BitmapManagerThread::loadBitmap(BitmapManagerMsgPtr pRequest)
 {
+    if (pRequest->isCancelled()) {
+        // The request still holds a python callback, so it's released in the main
+        // thread.
+        m_MsgQueue.push(pRequest);
+        return;
+    }
     BitmapPtr pBmp;
     ScopeTimer timer(LoaderProfilingZone);
     float startTime = pRequest->getStartTime();
     try {
-        pBmp = avg::loadBitmap(pRequest->getFilename(), pRequest->getPixelFormat());
+        pBmp = avg::loadBitmap(pRequest->getFilename(), pRequest->getPixelFormat(),
+                pRequest->getMaxSize());
         pRequest->setBitmap(pBmp);
     } catch (const Exception& ex) {
         pRequest->setError(ex);
     }
     m_MsgQueue.push(pRequest);
     m_NumBmpsLoaded++;
-    float curLatency = TimeSource::get()->getCurrentMicrosecs()/1000 - startTime;
+    float curTime = TimeSource::get()->getCurrentMicrosecs()/1000;
+    float curLatency = curTime - startTime;
     m_TotalLatency += curLatency;
+    m_Stats.addLoad(curLatency, pBmp ? pBmp->getMemNeeded() : 0, curTime);
     ThreadProfiler::get()->reset();
 }
 
@@ -25,6 +25,8 @@
 #include "../api.h"
 
 #include "BitmapManagerMsg.h"
+#include "BitmapRequestQueue.h"
+#include "BitmapManagerStats.h"
 
 #include "../base/WorkerThread.h"
 #include "../graphics/Bitmap.h"
@@ -37,14 +39,19 @@ namespace avg {
 class AVG_API BitmapManagerThread : public WorkerThread<BitmapManagerThread>
 {
     public:
-        BitmapManagerThread(CQueue& cmdQ, BitmapManagerMsgQueue& MsgQueue);
+        BitmapManagerThread(CQueue& cmdQ, BitmapRequestQueue& requestQueue,
+                BitmapManagerMsgQueue& MsgQueue, BitmapManagerStats& stats);
                 
-        void loadBitmap(BitmapManagerMsgPtr pRequest);
+        void loadNextBitmap();
         
     private:
         virtual bool work();
         virtual void deinit();
+        void loadBitmap(BitmapManagerMsgPtr pRequest);
+
+        BitmapRequestQueue& m_RequestQueue;
         BitmapManagerMsgQueue& m_MsgQueue;
+        BitmapManagerStats& m_Stats;
 
         float m_TotalLatency;
         int m_NumBmpsLoaded;
@@ -0,0 +1,110 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "BitmapRequestQueue.h"
+
+#include "../base/Exception.h"
+#include "../base/ThreadHelper.h"
+
+using namespace std;
+
+namespace avg {
+
+BitmapRequestQueue::BitmapRequestQueue()
+    : m_NextSeqNum(0)
+{
+}
+
+BitmapRequestQueue::~BitmapRequestQueue()
+{
+}
+
+void BitmapRequestQueue::push(BitmapManagerMsgPtr pMsg, float priority)
+{
+    lock_guard lock(m_Mutex);
+    pMsg->setQueuePos(priority, m_NextSeqNum);
+    m_NextSeqNum++;
+    m_Requests.insert(pMsg);
+}
+
+BitmapManagerMsgPtr BitmapRequestQueue::pop()
+{
+    lock_guard lock(m_Mutex);
+    if (m_Requests.empty()) {
+        return BitmapManagerMsgPtr();
+    }
+    BitmapManagerMsgPtr pMsg = *m_Requests.begin();
+    m_Requests.erase(m_Requests.begin());
+    return pMsg;
+}
+
+bool BitmapRequestQueue::remove(BitmapManagerMsgPtr pMsg)
+{
+    lock_guard lock(m_Mutex);
+    return m_Requests.erase(pMsg) > 0;
+}
+
+void BitmapRequestQueue::setPriority(BitmapManagerMsgPtr pMsg, float priority)
+{
+    lock_guard lock(m_Mutex);
+    // The sort key can't change while the request is in the set.
+    bool bQueued = (m_Requests.erase(pMsg) > 0);
+    pMsg->setQueuePos(priority, pMsg->getSeqNum());
+    if (bQueued) {
+        m_Requests.insert(pMsg);
+    }
+}
+
+float BitmapRequestQueue::getPriority(BitmapManagerMsgPtr pMsg) const
+{
+    lock_guard lock(m_Mutex);
+    return pMsg->getPriority();
+}
+
+void BitmapRequestQueue::clear()
+{
+    lock_guard lock(m_Mutex);
+    m_Requests.clear();
+}
+
+bool BitmapRequestQueue::empty() const
+{
+    lock_guard lock(m_Mutex);
+    return m_Requests.empty();
+}
+
+int BitmapRequestQueue::size() const
+{
+    lock_guard lock(m_Mutex);
+    return int(m_Requests.size());
+}
+
+bool BitmapRequestQueue::RequestCompare::operator()(const BitmapManagerMsgPtr& pMsg1, 
+        const BitmapManagerMsgPtr& pMsg2) const
+{
+    if (pMsg1->getPriority() != pMsg2->getPriority()) {
+        return pMsg1->getPriority() > pMsg2->getPriority();
+    }
+    return pMsg1->getSeqNum() < pMsg2->getSeqNum();
+}
+
+}
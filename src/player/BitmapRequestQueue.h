@@ -0,0 +1,70 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _BitmapRequestQueue_H_
+#define _BitmapRequestQueue_H_
+
+#include "../api.h"
+
+#include "BitmapManagerMsg.h"
+
+#include <boost/thread/mutex.hpp>
+#include <boost/shared_ptr.hpp>
+
+#include <set>
+
+namespace avg {
+
+// Thread-safe queue of pending bitmap load requests. Requests with a higher priority
+// are returned first, requests with the same priority in the order they were pushed.
+class AVG_API BitmapRequestQueue
+{
+    public:
+        BitmapRequestQueue();
+        virtual ~BitmapRequestQueue();
+
+        void push(BitmapManagerMsgPtr pMsg, float priority);
+        BitmapManagerMsgPtr pop();
+        bool remove(BitmapManagerMsgPtr pMsg);
+        void setPriority(BitmapManagerMsgPtr pMsg, float priority);
+        float getPriority(BitmapManagerMsgPtr pMsg) const;
+        void clear();
+        bool empty() const;
+        int size() const;
+
+    private:
+        struct RequestCompare {
+            bool operator()(const BitmapManagerMsgPtr& pMsg1, 
+                    const BitmapManagerMsgPtr& pMsg2) const;
+        };
+        typedef std::set<BitmapManagerMsgPtr, RequestCompare> RequestSet;
+
+        RequestSet m_Requests;
+        long long m_NextSeqNum;
+        mutable boost::mutex m_Mutex;
+};
+
+typedef boost::shared_ptr<BitmapRequestQueue> BitmapRequestQueuePtr;
+
+}
+
+#endif
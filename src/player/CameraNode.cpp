@@ -337,6 +337,10 @@ void CameraNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
         float parentEffectiveOpacity)
 {
     Node::preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+    if (m_bIsPlaying) {
+        // New camera images arrive asynchronously.
+        setRenderDirty();
+    }
     if (m_bAutoUpdateCameraImage) {
         ScopeTimer Timer(CameraFetchImage);
         updateToLatestCameraImage();
@@ -366,6 +370,13 @@ void CameraNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
     calcVertexArray(pVA);
 }
 
+void CameraNode::preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity)
+{
+    // Keeps fetching images so the camera buffers don't fill up.
+    preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+}
+
 static ProfilingZoneID CameraProfilingZone("Camera::render");
 
 void CameraNode::render()
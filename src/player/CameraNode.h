@@ -99,6 +99,8 @@ class AVG_API CameraNode : public RasterNode
 
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
+        virtual void preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity);
         virtual void render();
 
         int getFrameNum() const;
@@ -26,6 +26,7 @@
 #include "Shape.h"
 #include "OffscreenCanvas.h"
 #include "Window.h"
+#include "RasterNode.h"
 
 #include "../base/Exception.h"
 #include "../base/Logger.h"
@@ -34,6 +35,7 @@
 #include "../graphics/StandardShader.h"
 #include "../graphics/GLContextManager.h"
 #include "../graphics/MCFBO.h"
+#include "../graphics/VertexArray.h"
 
 #include <iostream>
 
@@ -48,7 +50,12 @@ Canvas::Canvas(Player * pPlayer)
       m_PlaybackEndSignal(&IPlaybackEndListener::onPlaybackEnd),
       m_FrameEndSignal(&IFrameEndListener::onFrameEnd),
       m_PreRenderSignal(&IPreRenderListener::onPreRender),
-      m_ClipLevel(0)
+      m_ClipLevel(0),
+      m_NumBatches(0),
+      m_NumBatchedNodes(0),
+      m_NumCacheUpdates(0),
+      m_NumCulledNodes(0),
+      m_NumReusedDivs(0)
 {
 }
 
@@ -71,6 +78,7 @@ void Canvas::initPlayback(int multiSampleSamples)
     m_pRootNode->connectDisplay();
     m_MultiSampleSamples = multiSampleSamples;
     m_pVertexArray = GLContextManager::get()->createVertexArray(2000, 3000);
+    m_pBatchVertexArray = GLContextManager::get()->createVertexArray(2000, 3000);
 }
 
 void Canvas::stopPlayback(bool bIsAbort)
@@ -84,6 +92,7 @@ void Canvas::stopPlayback(bool bIsAbort)
         m_IDMap.clear();
         m_bIsPlaying = false;
         m_pVertexArray = VertexArrayPtr();
+        m_pBatchVertexArray = VertexArrayPtr();
     }
 }
 
@@ -164,6 +173,7 @@ void Canvas::doFrame(bool bPythonAvailable)
         Player::get()->endTraversingTree();
     }
     resetFXSchedule();
+    m_pScheduledCacheNodes.clear();
     emitFrameEndSignal();
 }
 
@@ -232,13 +242,26 @@ vector<NodePtr> Canvas::getElementsByPos(const glm::vec2& pos) const
 }
 
 static ProfilingZoneID PreRenderProfilingZone("PreRender");
+static ProfilingZoneID CulledNodesProfilingZone("PreRender: culled nodes");
 static ProfilingZoneID VATransferProfilingZone("VA Transfer");
 
 void Canvas::preRender()
 {
     ScopeTimer Timer(PreRenderProfilingZone);
     m_pVertexArray->reset();
+    m_NumBatches = 0;
+    m_NumBatchedNodes = 0;
+    m_NumCacheUpdates = 0;
+    m_NumCulledNodes = 0;
+    m_NumReusedDivs = 0;
+    m_CullRects.clear();
+    m_CullRects.push_back(FRect(glm::vec2(0,0), glm::vec2(getSize())));
     m_pRootNode->preRender(m_pVertexArray, true, 1.0f);
+    m_CullRects.pop_back();
+    {
+        ScopeTimer timer(CulledNodesProfilingZone);
+        timer.addCount(m_NumCulledNodes);
+    }
 }
 
 static ProfilingZoneID RootRenderProfilingZone("RootNode: render");
@@ -248,6 +271,11 @@ void Canvas::renderWindow(WindowPtr pWindow, MCFBOPtr pFBO, const IntRect& viewp
     pWindow->getGLContext()->activate();
     GLContextManager::get()->uploadDataForContext();
     renderFX();
+    {
+        ScopeTimer Timer(VATransferProfilingZone);
+        m_pVertexArray->update();
+    }
+    renderCaches();
     glm::mat4 projMat;
     if (pFBO) {
         pFBO->activate();
@@ -261,10 +289,6 @@ void Canvas::renderWindow(WindowPtr pWindow, MCFBOPtr pFBO, const IntRect& viewp
         IntPoint windowSize = pWindow->getSize();
         glViewport(0, 0, windowSize.x, windowSize.y);
     }
-    {
-        ScopeTimer Timer(VATransferProfilingZone);
-        m_pVertexArray->update();
-    }
     clearGLBuffers(GL_COLOR_BUFFER_BIT | GL_STENCIL_BUFFER_BIT | GL_DEPTH_BUFFER_BIT,
             !pFBO);
     GLContext::checkError("Canvas::renderWindow: glViewport()");
@@ -276,6 +300,48 @@ void Canvas::renderWindow(WindowPtr pWindow, MCFBOPtr pFBO, const IntRect& viewp
     renderOutlines(projMat);
 }
 
+static ProfilingZoneID RenderBatchProfilingZone("Render batch");
+
+void Canvas::renderBatch(const vector<RasterNode*>& nodes, 
+        const glm::mat4& parentTransform)
+{
+    // Stay well below 65536 vertexes so 16-bit indexes (GLES) work.
+    static const int MAX_BATCH_VERTEXES = 32768;
+
+    ScopeTimer timer(RenderBatchProfilingZone);
+    m_pBatchVertexArray->reset();
+    for (unsigned i = 0; i < nodes.size(); ++i) {
+        nodes[i]->appendBatchVertexes(m_pBatchVertexArray, parentTransform);
+        m_NumBatchedNodes++;
+        if (m_pBatchVertexArray->getNumVerts() > MAX_BATCH_VERTEXES) {
+            drawBatch(nodes[0], parentTransform);
+            m_pBatchVertexArray->reset();
+        }
+    }
+    if (m_pBatchVertexArray->getNumVerts() > 0) {
+        drawBatch(nodes[0], parentTransform);
+    }
+    // Restore the buffers the rest of the tree renders from.
+    m_pVertexArray->activate();
+}
+
+int Canvas::getNumBatches() const
+{
+    return m_NumBatches;
+}
+
+int Canvas::getNumBatchedNodes() const
+{
+    return m_NumBatchedNodes;
+}
+
+void Canvas::drawBatch(RasterNode* pFirstNode, const glm::mat4& parentTransform)
+{
+    pFirstNode->activateBatch(parentTransform);
+    m_pBatchVertexArray->draw();
+    m_NumBatches++;
+}
+
 void Canvas::scheduleFXRender(const RasterNodePtr& pNode)
 {
     m_pScheduledFXNodes.push_back(pNode);
@@ -306,6 +372,67 @@ void Canvas::renderFX()
     }
 }
 
+void Canvas::scheduleCacheRender(const DivNodePtr& pNode)
+{
+    m_pScheduledCacheNodes.push_back(pNode);
+    m_NumCacheUpdates++;
+}
+
+int Canvas::getNumCacheUpdates() const
+{
+    return m_NumCacheUpdates;
+}
+
+void Canvas::pushCullRect(const FRect& rect)
+{
+    m_CullRects.push_back(rect);
+}
+
+void Canvas::popCullRect()
+{
+    m_CullRects.pop_back();
+}
+
+const FRect& Canvas::getCullRect() const
+{
+    AVG_ASSERT(!m_CullRects.empty());
+    return m_CullRects.back();
+}
+
+void Canvas::addCulledNodes(int numNodes)
+{
+    m_NumCulledNodes += numNodes;
+}
+
+int Canvas::getNumCulledNodes() const
+{
+    return m_NumCulledNodes;
+}
+
+void Canvas::addReusedDiv()
+{
+    m_NumReusedDivs++;
+}
+
+int Canvas::getNumReusedDivs() const
+{
+    return m_NumReusedDivs;
+}
+
+static ProfilingZoneID RenderCachesProfilingZone("Render cached divs");
+
+void Canvas::renderCaches()
+{
+    if (!m_pScheduledCacheNodes.empty()) {
+        ScopeTimer timer(RenderCachesProfilingZone);
+        m_pVertexArray->activate();
+        vector<DivNodePtr>::iterator it;
+        for (it=m_pScheduledCacheNodes.begin(); it!=m_pScheduledCacheNodes.end(); ++it) {
+            (*it)->renderCache();
+        }
+    }
+}
+
 void Canvas::resetFXSchedule()
 {
     vector<RasterNodePtr>::iterator it;
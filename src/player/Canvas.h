@@ -31,6 +31,7 @@
 #include "../base/IPreRenderListener.h"
 #include "../base/Signal.h"
 #include "../base/GLMHelper.h"
+#include "../base/Rect.h"
 
 #include "../graphics/OGLHelper.h"
 #include "../graphics/Bitmap.h"
@@ -45,6 +46,7 @@ namespace avg {
 class Player;
 class Node;
 class RasterNode;
+class DivNode;
 class CanvasNode;
 class AudioEngine;
 class TestHelper;
@@ -58,6 +60,7 @@ class Window;
 
 typedef boost::shared_ptr<Node> NodePtr;
 typedef boost::shared_ptr<RasterNode> RasterNodePtr;
+typedef boost::shared_ptr<DivNode> DivNodePtr;
 typedef boost::shared_ptr<CanvasNode> CanvasNodePtr;
 typedef boost::shared_ptr<FBO> FBOPtr;
 typedef boost::shared_ptr<MCFBO> MCFBOPtr;
@@ -100,6 +103,22 @@ class AVG_API Canvas: public ExportedObject
         virtual void renderWindow(WindowPtr pWindow, MCFBOPtr pFBO, 
                 const IntRect& viewport);
         void scheduleFXRender(const RasterNodePtr& pNode);
+        void renderBatch(const std::vector<RasterNode*>& nodes, 
+                const glm::mat4& parentTransform);
+        int getNumBatches() const;
+        int getNumBatchedNodes() const;
+        void scheduleCacheRender(const DivNodePtr& pNode);
+        int getNumCacheUpdates() const;
+
+        // The cull rect is the visible area in the coordinates of the div whose
+        // children are being prerendered.
+        void pushCullRect(const FRect& rect);
+        void popCullRect();
+        const FRect& getCullRect() const;
+        void addCulledNodes(int numNodes);
+        int getNumCulledNodes() const;
+        void addReusedDiv();
+        int getNumReusedDivs() const;
 
     protected:
         Player * getPlayer() const;
@@ -111,13 +130,22 @@ class AVG_API Canvas: public ExportedObject
         virtual void renderTree()=0;
         void renderFX();
         void resetFXSchedule();
+        void renderCaches();
         void renderOutlines(const glm::mat4& transform);
+        void drawBatch(RasterNode* pFirstNode, const glm::mat4& parentTransform);
 
         void clip(const glm::mat4& transform, SubVertexArray& va, GLenum stencilOp);
         Player * m_pPlayer;
         CanvasNodePtr m_pRootNode;
         bool m_bIsPlaying;
         VertexArrayPtr m_pVertexArray;
+        VertexArrayPtr m_pBatchVertexArray;
+        int m_NumBatches;
+        int m_NumBatchedNodes;
+        int m_NumCacheUpdates;
+        std::vector<FRect> m_CullRects;
+        int m_NumCulledNodes;
+        int m_NumReusedDivs;
        
         typedef std::map<std::string, NodePtr> NodeIDMap;
         NodeIDMap m_IDMap;
@@ -130,6 +158,7 @@ class AVG_API Canvas: public ExportedObject
         int m_ClipLevel;
 
         std::vector<RasterNodePtr> m_pScheduledFXNodes;
+        std::vector<DivNodePtr> m_pScheduledCacheNodes;
 };
 
 }
@@ -37,6 +37,7 @@ using namespace std;
 namespace avg {
 
 int Contact::s_LastListenerID = 0;
+int Contact::s_MaxHistoryLen = 0;
 
 void Contact::registerType()
 {
@@ -47,6 +48,8 @@ void Contact::registerType()
 
 Contact::Contact(CursorEventPtr pEvent)
     : Publisher("Contact"),
+      m_pFirstEvent(pEvent),
+      m_NumEvents(1),
       m_bSendingEvents(false),
       m_bCurListenerIsDead(false),
       m_CursorID(pEvent->getCursorID()),
@@ -87,7 +90,7 @@ void Contact::disconnectListener(int id)
 
 long long Contact::getAge() const
 {
-    return m_Events.back()->getWhen() - m_Events[0]->getWhen();
+    return m_Events.back()->getWhen() - m_pFirstEvent->getWhen();
 }
 
 float Contact::getDistanceFromStart() const
@@ -107,7 +110,7 @@ float Contact::getMotionAngle() const
 
 glm::vec2 Contact::getMotionVec() const
 {
-    return m_Events.back()->getPos() - m_Events[0]->getPos();
+    return m_Events.back()->getPos() - m_pFirstEvent->getPos();
 }
 
 float Contact::getDistanceTravelled() const
@@ -117,7 +120,36 @@ float Contact::getDistanceTravelled() const
 
 vector<CursorEventPtr> Contact::getEvents() const
 {
-    return m_Events;
+    return vector<CursorEventPtr>(m_Events.begin(), m_Events.end());
+}
+
+CursorEventPtr Contact::getFirstEvent() const
+{
+    return m_pFirstEvent;
+}
+
+CursorEventPtr Contact::getLastEvent() const
+{
+    return m_Events.back();
+}
+
+long long Contact::getNumEvents() const
+{
+    return m_NumEvents;
+}
+
+void Contact::setMaxHistoryLen(int maxLen)
+{
+    if (maxLen < 0) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE,
+                "Contact.setMaxHistoryLen: maxLen must not be negative.");
+    }
+    s_MaxHistoryLen = maxLen;
+}
+
+int Contact::getMaxHistoryLen()
+{
+    return s_MaxHistoryLen;
 }
 
 void Contact::addEvent(CursorEventPtr pEvent)
@@ -129,6 +161,11 @@ void Contact::addEvent(CursorEventPtr pEvent)
     m_Events.back()->removeBlob();
     m_Events.back()->setNode(NodePtr());
     m_Events.push_back(pEvent);
+    m_NumEvents++;
+    // The first event stays available through m_pFirstEvent.
+    while (s_MaxHistoryLen > 0 && int(m_Events.size()) > s_MaxHistoryLen) {
+        m_Events.pop_front();
+    }
 }
 
 void Contact::sendEventToListeners(CursorEventPtr pCursorEvent)
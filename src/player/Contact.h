@@ -33,6 +33,7 @@
 #include "WrapPython.h"
 
 #include <vector>
+#include <deque>
 #include <map>
 #include <set>
 #include <boost/enable_shared_from_this.hpp>
@@ -59,6 +60,14 @@ public:
     glm::vec2 getMotionVec() const;
     float getDistanceTravelled() const;
     std::vector<CursorEventPtr> getEvents() const;
+    CursorEventPtr getFirstEvent() const;
+    CursorEventPtr getLastEvent() const;
+    long long getNumEvents() const;
+
+    // Maximum number of events kept in the event history of each contact. 0 keeps
+    // all events.
+    static void setMaxHistoryLen(int maxLen);
+    static int getMaxHistoryLen();
 
     void addEvent(CursorEventPtr pEvent);
     void sendEventToListeners(CursorEventPtr pCursorEvent);
@@ -70,7 +79,10 @@ private:
     void updateDistanceTravelled(CursorEventPtr pEvent1, CursorEventPtr pEvent2);
     void dumpListeners(std::string sFuncName);
 
-    std::vector<CursorEventPtr> m_Events;
+    std::deque<CursorEventPtr> m_Events;
+    CursorEventPtr m_pFirstEvent;
+    long long m_NumEvents;
+    static int s_MaxHistoryLen;
 
     bool m_bSendingEvents;
 
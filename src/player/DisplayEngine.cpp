@@ -286,7 +286,7 @@ SDLWindowPtr DisplayEngine::getSDLWindow() const
 
 static ProfilingZoneID WaitProfilingZone("Render - wait");
 
-void DisplayEngine::frameWait()
+void DisplayEngine::frameWait(bool bFrameSkipped)
 {
     ScopeTimer Timer(WaitProfilingZone);
 
@@ -295,7 +295,8 @@ void DisplayEngine::frameWait()
     m_FrameWaitStartTime = TimeSource::get()->getCurrentMicrosecs();
     m_TargetTime = m_LastFrameTime+(long long)(1000000/m_Framerate);
     m_bFrameLate = false;
-    if (m_VBRate == 0) {
+    // Without a buffer swap, vertical blank sync doesn't pace skipped frames.
+    if (m_VBRate == 0 || bFrameSkipped) {
         if (m_FrameWaitStartTime <= m_TargetTime) {
             long long WaitTime = (m_TargetTime-m_FrameWaitStartTime)/1000;
             if (WaitTime > 5000) {
@@ -71,7 +71,7 @@ class AVG_API DisplayEngine: public InputDevice
         const WindowPtr getWindow(unsigned i) const;
         SDLWindowPtr getSDLWindow() const;
 
-        void frameWait();
+        void frameWait(bool bFrameSkipped=false);
         void swapBuffers();
         void checkJitter();
         long long getDisplayTime();
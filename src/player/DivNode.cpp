@@ -23,6 +23,7 @@
 #include "Player.h"
 #include "TypeDefinition.h"
 #include "Canvas.h"
+#include "RasterNode.h"
 
 #include "../base/Exception.h"
 #include "../base/Logger.h"
@@ -30,6 +31,18 @@
 #include "../base/FileHelper.h"
 #include "../base/MathHelper.h"
 #include "../base/ObjectCounter.h"
+#include "../base/ScopeTimer.h"
+
+#include "../graphics/GLContext.h"
+#include "../graphics/GLContextManager.h"
+#include "../graphics/MCFBO.h"
+#include "../graphics/MCTexture.h"
+#include "../graphics/BitmapLoader.h"
+#include "../graphics/StandardShader.h"
+#include "../graphics/OGLHelper.h"
+#include "../graphics/TextureAtlas.h"
+
+#include "../glm/gtc/matrix_transform.hpp"
 
 #include <iostream>
 #include <sstream>
@@ -52,11 +65,19 @@ void DivNode::registerType()
             ExportedObject::buildObject<DivNode>)
         .addChildren(sChildren)
         .addArg(Arg<bool>("crop", false, false, offsetof(DivNode, m_bCrop)))
-        .addArg(Arg<UTF8String>("mediadir", "", false, offsetof(DivNode, m_sMediaDir)));
+        .addArg(Arg<UTF8String>("mediadir", "", false, offsetof(DivNode, m_sMediaDir)))
+        .addArg(Arg<bool>("spatialindex", false, false, 
+                offsetof(DivNode, m_bSpatialIndex)))
+        .addArg(Arg<bool>("cached", false, false, offsetof(DivNode, m_bCached)));
     TypeRegistry::get()->registerType(def);
 }
 
 DivNode::DivNode(const ArgList& args)
+    : m_bHitTestGridDirty(true),
+      m_CacheNumBytes(0),
+      m_bCacheDirty(true),
+      m_bVertexesValid(false),
+      m_pLastVA(0)
 {
     args.setMembers(this);
     ObjectCounter::get()->incRef(&typeid(*this));
@@ -91,6 +112,7 @@ void DivNode::disconnect(bool bKill)
     for (unsigned i = 0; i < getNumChildren(); ++i) {
         getChild(i)->disconnect(bKill);
     }
+    releaseCache();
     AreaNode::disconnect(bKill);
 }
 
@@ -175,6 +197,14 @@ void DivNode::insertChild(NodePtr pChild, unsigned i)
     if (getState() == NS_CANRENDER) {
         pChild->connectDisplay();
     }
+    invalidate();
+    if (m_pHitTestGrid) {
+        if (i == m_Children.size()-1 && !m_bHitTestGridDirty) {
+            m_pHitTestGrid->appendChild(pChild.get());
+        } else {
+            m_bHitTestGridDirty = true;
+        }
+    }
 }
 
 void DivNode::reorderChild(NodePtr pChild, unsigned j)
@@ -187,6 +217,8 @@ void DivNode::reorderChild(NodePtr pChild, unsigned j)
     m_Children.erase(m_Children.begin()+i);
     std::vector<NodePtr>::iterator pos = m_Children.begin()+j;
     m_Children.insert(pos, pChild);
+    m_bHitTestGridDirty = true;
+    invalidate();
 }
 
 void DivNode::reorderChild(unsigned i, unsigned j)
@@ -199,6 +231,8 @@ void DivNode::reorderChild(unsigned i, unsigned j)
     m_Children.erase(m_Children.begin()+i);
     std::vector<NodePtr>::iterator pos = m_Children.begin()+j;
     m_Children.insert(pos, pChild);
+    m_bHitTestGridDirty = true;
+    invalidate();
 }
 
 unsigned DivNode::indexOf(NodePtr pChild)
@@ -239,6 +273,8 @@ void DivNode::removeChild(NodePtr pChild, bool bKill)
                 getID()+"::removeChild: index "+toString(i)+" out of bounds."));
     }
     m_Children.erase(m_Children.begin()+i);
+    m_bHitTestGridDirty = true;
+    invalidate();
 }
 
 void DivNode::removeChild(unsigned i, bool bKill)
@@ -255,6 +291,7 @@ bool DivNode::getCrop() const
 void DivNode::setCrop(bool bCrop)
 {
     m_bCrop = bCrop;
+    setRenderDirty();
 }
 
 const UTF8String& DivNode::getMediaDir() const
@@ -269,19 +306,66 @@ void DivNode::setMediaDir(const UTF8String& sMediaDir)
     checkReload();
 }
 
+bool DivNode::getSpatialIndex() const
+{
+    return m_bSpatialIndex;
+}
+
+void DivNode::setSpatialIndex(bool bSpatialIndex)
+{
+    m_bSpatialIndex = bSpatialIndex;
+    if (!m_bSpatialIndex) {
+        m_pHitTestGrid = HitTestGridPtr();
+    }
+}
+
+bool DivNode::getCached() const
+{
+    return m_bCached;
+}
+
+void DivNode::setCached(bool bCached)
+{
+    m_bCached = bCached;
+    if (!m_bCached) {
+        releaseCache();
+    }
+    invalidate();
+}
+
+void DivNode::invalidate()
+{
+    m_bCacheDirty = true;
+    setRenderDirty();
+}
+
 void DivNode::getElementsByPos(const glm::vec2& pos, vector<NodePtr>& pElements)
 {
     if (reactsToMouseEvents() &&
             ((getSize() == glm::vec2(0,0) ||
              (pos.x >= 0 && pos.y >= 0 && pos.x < getSize().x && pos.y < getSize().y))))
     {
-        for (int i = getNumChildren()-1; i >= 0; i--) {
-            NodePtr pCurChild = getChild(i);
-            glm::vec2 relPos = pCurChild->toLocal(pos);
-            pCurChild->getElementsByPos(relPos, pElements);
-            if (!pElements.empty()) {
-                pElements.push_back(getSharedThis());
-                return;
+        if (m_bSpatialIndex) {
+            if (!m_pHitTestGrid) {
+                m_pHitTestGrid = HitTestGridPtr(new HitTestGrid());
+                m_bHitTestGridDirty = true;
+            }
+            if (m_bHitTestGridDirty) {
+                m_pHitTestGrid->rebuild(m_Children);
+                m_bHitTestGridDirty = false;
+            }
+            vector<int> candidates;
+            m_pHitTestGrid->getCandidates(pos, candidates);
+            for (unsigned i = 0; i < candidates.size(); ++i) {
+                if (getElementsByPosInChild(candidates[i], pos, pElements)) {
+                    return;
+                }
+            }
+        } else {
+            for (int i = getNumChildren()-1; i >= 0; i--) {
+                if (getElementsByPosInChild(i, pos, pElements)) {
+                    return;
+                }
             }
         }
         // pos isn't in any of the children.
@@ -292,10 +376,68 @@ void DivNode::getElementsByPos(const glm::vec2& pos, vector<NodePtr>& pElements)
     }
 }
 
+bool DivNode::getHitBounds(FRect& bounds) const
+{
+    if (getSize() == glm::vec2(0,0)) {
+        // Children can be anywhere.
+        return false;
+    }
+    return AreaNode::getHitBounds(bounds);
+}
+
+void DivNode::childHitBoundsChanged(Node* pChild)
+{
+    if (m_pHitTestGrid && !m_bHitTestGridDirty) {
+        m_pHitTestGrid->updateChild(pChild);
+    }
+}
+
 void DivNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
         float parentEffectiveOpacity)
 {
+    CanvasPtr pCanvas = getCanvas();
+    bool bReuseVertexes = canReuseVertexes(pVA, bIsParentActive, parentEffectiveOpacity);
     Node::preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+    if (bReuseVertexes) {
+        pVA->reuse(m_LastNumVerts, m_LastNumIndexes);
+        pCanvas->addCulledNodes(m_LastNumCulledNodes);
+        pCanvas->addReusedDiv();
+        return;
+    }
+    m_bVertexesValid = false;
+    if (updateCache()) {
+        pVA->startSubVA(m_CacheVA);
+        glm::vec2 size = getSize();
+        glm::vec2 texSize = glm::vec2(m_pCacheFBO->getTex()->getGLSize());
+        glm::vec2 texCoord(size.x/texSize.x, size.y/texSize.y);
+        Pixel32 color(255, 255, 255, 255);
+        m_CacheVA.appendPos(glm::vec2(0,0), glm::vec2(0,0), color);
+        m_CacheVA.appendPos(glm::vec2(0,size.y), glm::vec2(0,texCoord.y), color);
+        m_CacheVA.appendPos(glm::vec2(size.x,0), glm::vec2(texCoord.x,0), color);
+        m_CacheVA.appendPos(size, texCoord, color);
+        m_CacheVA.appendQuadIndexes(0, 1, 2, 3);
+        if (m_bCacheDirty) {
+            // Opacity is applied to the cached image as a whole.
+            pCanvas->pushCullRect(FRect(glm::vec2(0,0), getSize()));
+            preRenderChildren(pVA, bIsParentActive, 1.0f);
+            pCanvas->popCullRect();
+            // Children are scheduled first, so nested caches are up to date when 
+            // this one is rendered.
+            pCanvas->scheduleCacheRender(
+                    dynamic_pointer_cast<DivNode>(getSharedThis()));
+        }
+        return;
+    }
+    m_pLastVA = pVA.get();
+    m_LastStartVertex = pVA->getNumVerts();
+    m_LastStartIndex = pVA->getNumIndexes();
+    m_bLastParentActive = bIsParentActive;
+    m_LastParentOpacity = parentEffectiveOpacity;
+    m_LastCullRect = pCanvas->getCullRect();
+    m_LastNumAtlasRepacks = TextureAtlas::get()->getNumRepacks();
+    int numCulledNodes = pCanvas->getNumCulledNodes();
+
+    FRect cullRect = parentToLocalBounds(pCanvas->getCullRect());
     if (getCrop() && getSize() != glm::vec2(0,0)) {
         pVA->startSubVA(m_ClipVA);
         glm::vec2 viewport = getSize();
@@ -304,26 +446,242 @@ void DivNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
         m_ClipVA.appendPos(glm::vec2(viewport.x,0), glm::vec2(0,0), Pixel32(0,0,0,0));
         m_ClipVA.appendPos(viewport, glm::vec2(0,0), Pixel32(0,0,0,0));
         m_ClipVA.appendQuadIndexes(0, 1, 2, 3);
+        cullRect.intersect(FRect(glm::vec2(0,0), viewport));
+    }
+    pCanvas->pushCullRect(cullRect);
+    preRenderChildren(pVA, bIsParentActive, getEffectiveOpacity());
+    pCanvas->popCullRect();
+
+    m_LastNumVerts = pVA->getNumVerts()-m_LastStartVertex;
+    m_LastNumIndexes = pVA->getNumIndexes()-m_LastStartIndex;
+    m_LastNumCulledNodes = pCanvas->getNumCulledNodes()-numCulledNodes;
+    m_bVertexesValid = true;
+}
+
+bool DivNode::canReuseVertexes(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity) const
+{
+    // If nothing in the subtree changed, its vertexes from the last frame are still
+    // in the vertex array. They can be used if everything before them takes up the
+    // same space as before. Relies on the dirty flags, so it's tied to frame skipping.
+    // Repacking the texture atlas moves texture coordinates without marking nodes
+    // dirty.
+    return m_bVertexesValid && !isRenderDirty() && !m_bCached &&
+            Player::get()->isFrameSkippingEnabled() &&
+            pVA.get() == m_pLastVA && 
+            pVA->getNumVerts() == m_LastStartVertex &&
+            pVA->getNumIndexes() == m_LastStartIndex &&
+            bIsParentActive == m_bLastParentActive &&
+            parentEffectiveOpacity == m_LastParentOpacity &&
+            getCanvas()->getCullRect() == m_LastCullRect &&
+            TextureAtlas::get()->getNumRepacks() == m_LastNumAtlasRepacks;
+}
+
+void DivNode::preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity)
+{
+    Node::preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+    m_bVertexesValid = false;
+    // Clean subtrees are skipped. Dirty children need to be visited so their
+    // dirty flags are reset and videos keep playing.
+    for (unsigned i = 0; i < getNumChildren(); i++) {
+        const NodePtr& pChild = getChild(i);
+        if (pChild->isRenderDirty()) {
+            if (m_pCacheFBO) {
+                m_bCacheDirty = true;
+            }
+            pChild->setCulled(true);
+            pChild->preRenderCulled(pVA, bIsParentActive, getEffectiveOpacity());
+        }
+    }
+}
+
+bool DivNode::getRenderBounds(FRect& bounds) const
+{
+    // Children can only be drawn outside the div if they aren't clipped.
+    if ((getCrop() || m_pCacheFBO) && getSize() != glm::vec2(0,0)) {
+        return AreaNode::getHitBounds(bounds);
     }
+    return false;
+}
+
+void DivNode::preRenderChildren(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity)
+{
+    // Children that are completely outside the current cull rect don't generate
+    // vertices and aren't rendered.
+    CanvasPtr pCanvas = getCanvas();
+    const FRect& cullRect = pCanvas->getCullRect();
+    bool bCullAll = cullRect.width() <= 0 || cullRect.height() <= 0;
+    int numCulled = 0;
     for (unsigned i = 0; i < getNumChildren(); i++) {
-        getChild(i)->preRender(pVA, bIsParentActive, getEffectiveOpacity());
+        const NodePtr& pChild = getChild(i);
+        FRect bounds;
+        bool bCulled = bCullAll || 
+                (pChild->getRenderBounds(bounds) && !bounds.intersects(cullRect));
+        pChild->setCulled(bCulled);
+        if (bCulled) {
+            pChild->preRenderCulled(pVA, bIsParentActive, parentEffectiveOpacity);
+            numCulled++;
+        } else {
+            pChild->preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+        }
     }
+    pCanvas->addCulledNodes(numCulled);
 }
 
 void DivNode::render()
 {
     const glm::mat4& transform = getTransform();
+    if (m_pCacheFBO) {
+        renderCachedImage(transform);
+        return;
+    }
     if (getCrop() && getSize() != glm::vec2(0,0)) {
         getCanvas()->pushClipRect(transform, m_ClipVA);
     }
-    for (unsigned i = 0; i < getNumChildren(); i++) {
-        getChild(i)->maybeRender(transform);
-    }
+    renderChildren(transform);
     if (getCrop() && getSize() != glm::vec2(0,0)) {
         getCanvas()->popClipRect(transform, m_ClipVA);
     }
 }
 
+static ProfilingZoneID RenderCacheProfilingZone("DivNode::renderCache");
+
+void DivNode::renderCache()
+{
+    ScopeTimer timer(RenderCacheProfilingZone);
+    AVG_ASSERT(m_pCacheFBO);
+    m_pCacheFBO->activate();
+    IntPoint size = m_pCacheFBO->getSize();
+    glViewport(0, 0, size.x, size.y);
+    clearGLBuffers(GL_COLOR_BUFFER_BIT | GL_STENCIL_BUFFER_BIT | GL_DEPTH_BUFFER_BIT,
+            false);
+    glm::mat4 projMat = glm::ortho(0.f, float(size.x), 0.f, float(size.y));
+    renderChildren(projMat);
+    m_bCacheDirty = false;
+}
+
+void DivNode::renderChildren(const glm::mat4& transform)
+{
+    if (Player::get()->isRenderBatchingEnabled()) {
+        renderChildrenBatched(transform);
+    } else {
+        for (unsigned i = 0; i < getNumChildren(); i++) {
+            const NodePtr& pChild = getChild(i);
+            if (!pChild->isCulled()) {
+                pChild->maybeRender(transform);
+            }
+        }
+    }
+}
+
+void DivNode::renderChildrenBatched(const glm::mat4& transform)
+{
+    // Runs of consecutive children that render with identical state are collected 
+    // and drawn in one call. Everything else is rendered normally, so render order 
+    // is preserved.
+    vector<RasterNode*> batch;
+    for (unsigned i = 0; i < getNumChildren(); i++) {
+        const NodePtr& pChild = getChild(i);
+        if (pChild->isCulled()) {
+            continue;
+        }
+        RasterNode* pRasterNode = dynamic_cast<RasterNode*>(pChild.get());
+        if (pRasterNode && pRasterNode->isBatchable()) {
+            if (!batch.empty() && !batch[0]->canBatchWith(pRasterNode)) {
+                flushBatch(batch, transform);
+            }
+            batch.push_back(pRasterNode);
+        } else {
+            flushBatch(batch, transform);
+            pChild->maybeRender(transform);
+        }
+    }
+    flushBatch(batch, transform);
+}
+
+void DivNode::flushBatch(vector<RasterNode*>& batch, const glm::mat4& transform)
+{
+    if (batch.size() == 1) {
+        batch[0]->maybeRender(transform);
+    } else if (batch.size() > 1) {
+        getCanvas()->renderBatch(batch, transform);
+    }
+    batch.clear();
+}
+
+bool DivNode::updateCache()
+{
+    // Returns true if the children should be rendered from the cache texture.
+    Player* pPlayer = Player::get();
+    IntPoint size(glm::ceil(getSize()));
+    if (!m_bCached || size.x == 0 || size.y == 0) {
+        releaseCache();
+        return false;
+    }
+    if (m_pCacheFBO && (m_pCacheFBO->getSize() != size ||
+            pPlayer->getDivCacheNumBytes() > pPlayer->getDivCacheMaxBytes()))
+    {
+        releaseCache();
+    }
+    if (!m_pCacheFBO) {
+        PixelFormat pf;
+        if (BitmapLoader::get()->isBlueFirst()) {
+            pf = B8G8R8A8;
+        } else {
+            pf = R8G8B8A8;
+        }
+        size_t numBytes = size_t(size.x)*size.y*getBytesPerPixel(pf);
+        if (!pPlayer->reserveDivCacheBytes(numBytes)) {
+            // Over budget: Render the children directly.
+            return false;
+        }
+        bool bUseDepthBuffer = GLContext::getCurrent()->useDepthBuffer();
+        m_pCacheFBO = GLContextManager::get()->createFBO(size, pf, 1, 1, 
+                bUseDepthBuffer, true);
+        m_CacheNumBytes = numBytes;
+        m_bCacheDirty = true;
+    }
+    for (unsigned i = 0; i < getNumChildren() && !m_bCacheDirty; i++) {
+        // Changes anywhere in the subtree mark the child on the path dirty.
+        if (getChild(i)->isRenderDirty()) {
+            m_bCacheDirty = true;
+        }
+    }
+    return true;
+}
+
+void DivNode::releaseCache()
+{
+    if (m_pCacheFBO) {
+        m_pCacheFBO = MCFBOPtr();
+        Player::get()->releaseDivCacheBytes(m_CacheNumBytes);
+        m_CacheNumBytes = 0;
+        m_bCacheDirty = true;
+    }
+}
+
+void DivNode::renderCachedImage(const glm::mat4& transform)
+{
+    // The cache contains premultiplied alpha, just like effect textures.
+    GLContext* pContext = GLContext::getCurrent();
+    StandardShaderPtr pShader = pContext->getStandardShader();
+    float opacity = getEffectiveOpacity();
+    pContext->setBlendColor(glm::vec4(1.0f, 1.0f, 1.0f, opacity));
+    pContext->setBlendMode(GLContext::BLEND_BLEND, true);
+    m_pCacheFBO->getTex()->activate(GL_TEXTURE0);
+    pShader->setColorModel(0);
+    pShader->disableColorspaceMatrix();
+    pShader->setGamma(glm::vec4(1.0f, 1.0f, 1.0f, 1.0f));
+    pShader->setPremultipliedAlpha(true);
+    pShader->setMask(false);
+    pShader->setAlpha(opacity);
+    pShader->setTransform(transform);
+    pShader->activate();
+    m_CacheVA.draw();
+}
+
 void DivNode::renderOutlines(const VertexArrayPtr& pVA, Pixel32 parentColor)
 {
     Pixel32 effColor = getEffectiveOutlineColor(parentColor);
@@ -389,4 +747,17 @@ bool DivNode::isChildTypeAllowed(const string& sType)
     return getDefinition()->isChildAllowed(sType);
 }
 
+bool DivNode::getElementsByPosInChild(unsigned i, const glm::vec2& pos, 
+        vector<NodePtr>& pElements)
+{
+    NodePtr pCurChild = getChild(i);
+    glm::vec2 relPos = pCurChild->toLocal(pos);
+    pCurChild->getElementsByPos(relPos, pElements);
+    if (!pElements.empty()) {
+        pElements.push_back(getSharedThis());
+        return true;
+    }
+    return false;
+}
+
 }
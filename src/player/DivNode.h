@@ -24,15 +24,21 @@
 
 #include "../api.h"
 #include "AreaNode.h"
+#include "HitTestGrid.h"
 
 #include "../graphics/SubVertexArray.h"
 
 #include "../base/UTF8String.h"
 
 #include <string>
+#include <vector>
 
 namespace avg {
 
+class RasterNode;
+class MCFBO;
+typedef boost::shared_ptr<MCFBO> MCFBOPtr;
+
 class AVG_API DivNode : public AreaNode
 {
     public:
@@ -66,9 +72,24 @@ class AVG_API DivNode : public AreaNode
         const UTF8String& getMediaDir() const;
         void setMediaDir(const UTF8String& mediaDir);
 
+        bool getSpatialIndex() const;
+        void setSpatialIndex(bool bSpatialIndex);
+
+        bool getCached() const;
+        void setCached(bool bCached);
+        void invalidate();
+        // Renders the children into the cache texture. Called by the canvas before
+        // the frame is rendered.
+        void renderCache();
+
         void getElementsByPos(const glm::vec2& pos, std::vector<NodePtr>& pElements);
+        virtual bool getHitBounds(FRect& bounds) const;
+        void childHitBoundsChanged(Node* pChild);
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
+        virtual void preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity);
+        virtual bool getRenderBounds(FRect& bounds) const;
         virtual void render();
         virtual void renderOutlines(const VertexArrayPtr& pVA, Pixel32 color);
 
@@ -80,12 +101,47 @@ class AVG_API DivNode : public AreaNode
    
     private:
         bool isChildTypeAllowed(const std::string& sType);
+        bool getElementsByPosInChild(unsigned i, const glm::vec2& pos, 
+                std::vector<NodePtr>& pElements);
+        void preRenderChildren(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity);
+        bool canReuseVertexes(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity) const;
+        void renderChildren(const glm::mat4& transform);
+        void renderChildrenBatched(const glm::mat4& transform);
+        void flushBatch(std::vector<RasterNode*>& batch, const glm::mat4& transform);
+        bool updateCache();
+        void releaseCache();
+        void renderCachedImage(const glm::mat4& transform);
 
         UTF8String m_sMediaDir;
         bool m_bCrop;
+        bool m_bSpatialIndex;
+        HitTestGridPtr m_pHitTestGrid;
+        bool m_bHitTestGridDirty;
 
         SubVertexArray m_ClipVA;
 
+        bool m_bCached;
+        MCFBOPtr m_pCacheFBO;
+        size_t m_CacheNumBytes;
+        bool m_bCacheDirty;
+        SubVertexArray m_CacheVA;
+
+        // Position of the subtree's vertexes in the last preRender and the state they 
+        // depend on.
+        bool m_bVertexesValid;
+        VertexArray* m_pLastVA;
+        int m_LastStartVertex;
+        int m_LastStartIndex;
+        int m_LastNumVerts;
+        int m_LastNumIndexes;
+        bool m_bLastParentActive;
+        float m_LastParentOpacity;
+        FRect m_LastCullRect;
+        int m_LastNumCulledNodes;
+        long long m_LastNumAtlasRepacks;
+
         std::vector<NodePtr> m_Children;
 };
 
@@ -35,10 +35,12 @@ using namespace boost;
 
 namespace avg {
 
-EventDispatcher::EventDispatcher(Player* pPlayer, bool bMouseEnabled)
+EventDispatcher::EventDispatcher(Player* pPlayer, bool bMouseEnabled, 
+        bool bCoalesceMotion)
     : m_pPlayer(pPlayer),
       m_NumMouseButtonsDown(0),
-      m_bMouseEnabled(bMouseEnabled)
+      m_bMouseEnabled(bMouseEnabled),
+      m_bCoalesceMotion(bCoalesceMotion)
 {
 }
 
@@ -62,14 +64,25 @@ void EventDispatcher::dispatch()
         }
     }
 
-    vector<EventPtr>::iterator it;
-    for (it = events.begin(); it != events.end(); ++it) {
-        EventPtr pEvent = *it;
+    vector<bool> superseded;
+    if (m_bCoalesceMotion) {
+        superseded = findSupersededMotion(events);
+    }
+    for (unsigned i = 0; i < events.size(); ++i) {
+        EventPtr pEvent = events[i];
+        if (m_bCoalesceMotion && superseded[i]) {
+            // Only the last motion event of a cursor in this frame is delivered.
+            // The others are recorded in the contact history.
+            if (!(!m_bMouseEnabled && pEvent->getSource() == Event::MOUSE)) {
+                testAddContact(pEvent);
+            }
+            continue;
+        }
         bool bHookEatsEvent = processEventHook(pEvent);
         if (!(!m_bMouseEnabled && pEvent->getSource() == Event::MOUSE) &&
                 !bHookEatsEvent) {
             testAddContact(pEvent);
-            handleEvent(*it);
+            handleEvent(pEvent);
             testRemoveContact(pEvent);
         }
     }
@@ -90,6 +103,11 @@ void EventDispatcher::enableMouse(bool bEnabled)
     m_bMouseEnabled = bEnabled;
 }
 
+void EventDispatcher::enableMotionCoalescing(bool bEnabled)
+{
+    m_bCoalesceMotion = bEnabled;
+}
+
 ContactPtr EventDispatcher::getContact(int id)
 {
     std::map<int, ContactPtr>::iterator it = m_ContactMap.find(id);
@@ -160,6 +178,36 @@ void EventDispatcher::testAddContact(EventPtr pEvent)
     }
 }
 
+vector<bool> EventDispatcher::findSupersededMotion(const vector<EventPtr>& events)
+{
+    // Walks the events backwards. A motion event is superseded if the same cursor 
+    // moves again later in the frame without going up or down in between.
+    vector<bool> superseded(events.size(), false);
+    set<int> movedCursors;
+    for (int i = int(events.size())-1; i >= 0; --i) {
+        CursorEventPtr pCursorEvent = dynamic_pointer_cast<CursorEvent>(events[i]);
+        if (pCursorEvent) {
+            int cursorID = pCursorEvent->getCursorID();
+            switch (pCursorEvent->getType()) {
+                case Event::CURSOR_MOTION:
+                    if (movedCursors.find(cursorID) != movedCursors.end()) {
+                        superseded[i] = true;
+                    } else {
+                        movedCursors.insert(cursorID);
+                    }
+                    break;
+                case Event::CURSOR_DOWN:
+                case Event::CURSOR_UP:
+                    movedCursors.erase(cursorID);
+                    break;
+                default:
+                    break;
+            }
+        }
+    }
+    return superseded;
+}
+
 void EventDispatcher::testRemoveContact(EventPtr pEvent)
 {
     if (pEvent->getType() == Event::CURSOR_UP) {
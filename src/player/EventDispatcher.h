@@ -27,6 +27,7 @@
 
 #include <vector>
 #include <map>
+#include <set>
 
 namespace avg {
 
@@ -38,7 +39,7 @@ class Player;
 
 class AVG_API EventDispatcher {
     public:
-        EventDispatcher(Player* pPlayer, bool bMouseEnabled);
+        EventDispatcher(Player* pPlayer, bool bMouseEnabled, bool bCoalesceMotion);
         virtual ~EventDispatcher();
         void dispatch();
         
@@ -46,6 +47,7 @@ class AVG_API EventDispatcher {
 
         void sendEvent(EventPtr pEvent);
         void enableMouse(bool bEnabled);
+        void enableMotionCoalescing(bool bEnabled);
         ContactPtr getContact(int id);
 
     private:
@@ -53,12 +55,14 @@ class AVG_API EventDispatcher {
         bool processEventHook(EventPtr pEvent);
         void testAddContact(EventPtr pEvent);
         void testRemoveContact(EventPtr pEvent);
+        std::vector<bool> findSupersededMotion(const std::vector<EventPtr>& events);
 
         std::vector<InputDevicePtr> m_InputDevices;
         Player* m_pPlayer;
         std::map<int, ContactPtr> m_ContactMap;
         int m_NumMouseButtonsDown;
         bool m_bMouseEnabled;
+        bool m_bCoalesceMotion;
 };
 typedef boost::shared_ptr<EventDispatcher> EventDispatcherPtr;
 
@@ -87,6 +87,11 @@ FRect FXNode::getRelDestRect() const
     return m_pFilter->getRelDestRect();
 }
 
+bool FXNode::hasFilter() const
+{
+    return bool(m_pFilter);
+}
+
 bool FXNode::isDirty() const
 {
     return m_bDirty;
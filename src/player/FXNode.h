@@ -44,6 +44,7 @@ public:
     GLTexturePtr getTex();
     BitmapPtr getImage();
     FRect getRelDestRect() const;
+    bool hasFilter() const;
 
     bool isDirty() const;
     void resetDirty();
@@ -53,6 +53,7 @@ void FilledVectorNode::registerType()
 
 FilledVectorNode::FilledVectorNode(const ArgList& args)
     : VectorNode(args),
+      m_ParentEffectiveOpacity(1.f),
       m_pFillShape(new Shape(MaterialInfo(GL_REPEAT, GL_REPEAT, false)))
 {
     m_FillTexHRef = args.getArgVal<UTF8String>("filltexhref"); 
@@ -149,6 +150,7 @@ void FilledVectorNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive
         float parentEffectiveOpacity)
 {
     Node::preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+    m_ParentEffectiveOpacity = parentEffectiveOpacity;
     float curOpacity = parentEffectiveOpacity*m_FillOpacity;
 
     VertexDataPtr pShapeVD = m_pFillShape->getVertexData();
@@ -169,7 +171,7 @@ static ProfilingZoneID RenderProfilingZone("FilledVectorNode::render");
 void FilledVectorNode::render()
 {
     ScopeTimer Timer(RenderProfilingZone);
-    float curOpacity = getParent()->getEffectiveOpacity()*m_FillOpacity;
+    float curOpacity = m_ParentEffectiveOpacity*m_FillOpacity;
     if (curOpacity > 0.01) {
         m_pFillShape->draw(getTransform(), curOpacity);
     }
@@ -209,7 +211,7 @@ glm::vec2 FilledVectorNode::calcFillTexCoord(const glm::vec2& pt, const glm::vec
 bool FilledVectorNode::isVisible() const
 {
     return getEffectiveActive() && (getEffectiveOpacity() > 0.01 || 
-            getParent()->getEffectiveOpacity()*m_FillOpacity > 0.01);
+            m_ParentEffectiveOpacity*m_FillOpacity > 0.01);
 }
 
 }
@@ -70,6 +70,8 @@ class AVG_API FilledVectorNode : public VectorNode
 
     private:
         float m_OldOpacity;
+        // Cached divs pass 1.0 here instead of their own opacity.
+        float m_ParentEffectiveOpacity;
 
         UTF8String m_FillTexHRef;
         glm::vec2 m_FillTexCoord1;
@@ -0,0 +1,174 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#include "HitTestGrid.h"
+
+#include "../base/Exception.h"
+
+#include <algorithm>
+#include <functional>
+#include <cmath>
+
+using namespace std;
+
+namespace avg {
+
+// Children that cover more cells than this aren't stored in the grid.
+static const int MAX_CELLS_PER_CHILD = 16;
+static const float MIN_CELL_SIZE = 8;
+
+HitTestGrid::HitTestGrid()
+    : m_CellSize(64)
+{
+}
+
+HitTestGrid::~HitTestGrid()
+{
+}
+
+void HitTestGrid::rebuild(const vector<NodePtr>& children)
+{
+    m_Entries.clear();
+    m_IndexMap.clear();
+    m_Cells.clear();
+    m_UnboundedChildren.clear();
+
+    // Choose the cell size so an average child covers about one cell.
+    float sizeSum = 0;
+    int numBounded = 0;
+    for (unsigned i = 0; i < children.size(); ++i) {
+        FRect bounds;
+        if (children[i]->getHitBounds(bounds)) {
+            sizeSum += max(bounds.width(), bounds.height());
+            numBounded++;
+        }
+    }
+    if (numBounded > 0) {
+        m_CellSize = max(MIN_CELL_SIZE, sizeSum/numBounded);
+    }
+
+    for (unsigned i = 0; i < children.size(); ++i) {
+        appendChild(children[i].get());
+    }
+}
+
+void HitTestGrid::appendChild(Node* pChild)
+{
+    int i = int(m_Entries.size());
+    m_Entries.push_back(Entry(pChild));
+    m_IndexMap[pChild] = i;
+    addEntry(i);
+}
+
+void HitTestGrid::updateChild(Node* pChild)
+{
+    boost::unordered_map<Node*, int>::iterator it = m_IndexMap.find(pChild);
+    if (it == m_IndexMap.end()) {
+        // The child is still being inserted.
+        return;
+    }
+    int i = it->second;
+    removeEntry(i);
+    addEntry(i);
+}
+
+void HitTestGrid::getCandidates(const glm::vec2& pos, vector<int>& candidates) const
+{
+    candidates = m_UnboundedChildren;
+    CellMap::const_iterator it =
+            m_Cells.find(getCellKey(getCellCoord(pos.x), getCellCoord(pos.y)));
+    if (it != m_Cells.end()) {
+        candidates.insert(candidates.end(), it->second.begin(), it->second.end());
+    }
+    sort(candidates.begin(), candidates.end(), greater<int>());
+}
+
+float HitTestGrid::getCellSize() const
+{
+    return m_CellSize;
+}
+
+HitTestGrid::Entry::Entry(Node* pNode)
+    : m_pNode(pNode),
+      m_bInGrid(false)
+{
+}
+
+void HitTestGrid::addEntry(int i)
+{
+    Entry& entry = m_Entries[i];
+    FRect bounds;
+    if (entry.m_pNode->getHitBounds(bounds)) {
+        IntRect cells(getCellCoord(bounds.tl.x), getCellCoord(bounds.tl.y),
+                getCellCoord(bounds.br.x)+1, getCellCoord(bounds.br.y)+1);
+        if (cells.width() <= MAX_CELLS_PER_CHILD && 
+                cells.height() <= MAX_CELLS_PER_CHILD &&
+                cells.width()*cells.height() <= MAX_CELLS_PER_CHILD)
+        {
+            entry.m_bInGrid = true;
+            entry.m_Cells = cells;
+            for (int y = cells.tl.y; y < cells.br.y; ++y) {
+                for (int x = cells.tl.x; x < cells.br.x; ++x) {
+                    m_Cells[getCellKey(x, y)].push_back(i);
+                }
+            }
+            return;
+        }
+    }
+    entry.m_bInGrid = false;
+    m_UnboundedChildren.push_back(i);
+}
+
+void HitTestGrid::removeEntry(int i)
+{
+    Entry& entry = m_Entries[i];
+    if (entry.m_bInGrid) {
+        const IntRect& cells = entry.m_Cells;
+        for (int y = cells.tl.y; y < cells.br.y; ++y) {
+            for (int x = cells.tl.x; x < cells.br.x; ++x) {
+                CellMap::iterator it = m_Cells.find(getCellKey(x, y));
+                AVG_ASSERT(it != m_Cells.end());
+                vector<int>& cell = it->second;
+                cell.erase(find(cell.begin(), cell.end(), i));
+                if (cell.empty()) {
+                    m_Cells.erase(it);
+                }
+            }
+        }
+    } else {
+        m_UnboundedChildren.erase(
+                find(m_UnboundedChildren.begin(), m_UnboundedChildren.end(), i));
+    }
+}
+
+long long HitTestGrid::getCellKey(int x, int y) const
+{
+    return (((long long)x) << 32) | (unsigned)y;
+}
+
+int HitTestGrid::getCellCoord(float pos) const
+{
+    float cellCoord = floor(pos/m_CellSize);
+    // Keep far-away nodes from overflowing the cell coordinates.
+    return int(max(-1e9f, min(1e9f, cellCoord)));
+}
+
+}
@@ -0,0 +1,87 @@
+//
+//  libavg - Media Playback Engine.
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#ifndef _HitTestGrid_H_
+#define _HitTestGrid_H_
+
+#include "../api.h"
+
+#include "Node.h"
+
+#include "../base/GLMHelper.h"
+#include "../base/Rect.h"
+
+#include <boost/shared_ptr.hpp>
+#include <boost/unordered_map.hpp>
+
+#include <vector>
+
+namespace avg {
+
+// Uniform grid over the bounding boxes of the children of a DivNode. Used to find the
+// children that might contain a point without looking at all of them. Children without
+// known bounds and children that cover a lot of cells are kept in a separate list and
+// are always returned as candidates.
+class AVG_API HitTestGrid
+{
+    public:
+        HitTestGrid();
+        virtual ~HitTestGrid();
+
+        void rebuild(const std::vector<NodePtr>& children);
+        // Adds a child after all existing ones.
+        void appendChild(Node* pChild);
+        // Call when the bounds of a child have changed.
+        void updateChild(Node* pChild);
+
+        // Returns the indexes of the children that might contain pos, topmost first.
+        void getCandidates(const glm::vec2& pos, std::vector<int>& candidates) const;
+
+        float getCellSize() const;
+
+    private:
+        struct Entry {
+            Entry(Node* pNode);
+
+            Node* m_pNode;
+            bool m_bInGrid;
+            IntRect m_Cells;
+        };
+
+        typedef boost::unordered_map<long long, std::vector<int> > CellMap;
+
+        void addEntry(int i);
+        void removeEntry(int i);
+        long long getCellKey(int x, int y) const;
+        int getCellCoord(float pos) const;
+
+        std::vector<Entry> m_Entries;
+        boost::unordered_map<Node*, int> m_IndexMap;
+        CellMap m_Cells;
+        std::vector<int> m_UnboundedChildren;
+        float m_CellSize;
+};
+
+typedef boost::shared_ptr<HitTestGrid> HitTestGridPtr;
+
+}
+
+#endif
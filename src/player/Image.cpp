@@ -28,9 +28,11 @@
 #include "../graphics/Filterfliprgb.h"
 #include "../graphics/BitmapLoader.h"
 #include "../graphics/GLContextManager.h"
+#include "../graphics/TextureAtlas.h"
 
 #include "OGLSurface.h"
 #include "OffscreenCanvas.h"
+#include "BitmapCache.h"
 
 #include <iostream>
 #include <sstream>
@@ -44,7 +46,8 @@ Image::Image(OGLSurface * pSurface, const MaterialInfo& material)
       m_pSurface(pSurface),
       m_State(CPU),
       m_Source(NONE),
-      m_Material(material)
+      m_Material(material),
+      m_bUseTextureAtlas(false)
 {
     ObjectCounter::get()->incRef(&typeid(*this));
     assertValid();
@@ -109,34 +112,17 @@ void Image::setEmpty()
     assertValid();
 }
 
-void Image::setFilename(const std::string& sFilename, TextureCompression comp)
+void Image::setFilename(const std::string& sFilename, TextureCompression comp,
+        const IntPoint& maxSize)
 {
     assertValid();
     AVG_TRACE(Logger::category::MEMORY, Logger::severity::INFO, "Loading " << sFilename);
-    BitmapPtr pBmp = loadBitmap(sFilename);
-    if (comp == TEXTURECOMPRESSION_B5G6R5 && pBmp->hasAlpha()) {
-        throw Exception(AVG_ERR_UNSUPPORTED, 
-                "B5G6R5-compressed textures with an alpha channel are not supported.");
-    }
+    BitmapPtr pBmp = BitmapCache::get()->load(sFilename, NO_PIXELFORMAT, comp, maxSize);
     changeSource(FILE);
     m_pBmp = pBmp;
 
     m_sFilename = sFilename;
 
-    switch (comp) {
-        case TEXTURECOMPRESSION_B5G6R5:
-            m_pBmp = BitmapPtr(new Bitmap(pBmp->getSize(), B5G6R5, sFilename));
-            if (!BitmapLoader::get()->isBlueFirst()) {
-                FilterFlipRGB().applyInPlace(pBmp);
-            }
-            m_pBmp->copyPixels(*pBmp);
-            break;
-        case TEXTURECOMPRESSION_NONE:
-            break;
-        default:
-            assert(false);
-    }
-
     if (m_State == GPU) {
         m_pSurface->destroy();
         setupSurface();
@@ -144,7 +130,7 @@ void Image::setFilename(const std::string& sFilename, TextureCompression comp)
     assertValid();
 }
 
-void Image::setBitmap(BitmapPtr pBmp, TextureCompression comp)
+void Image::setBitmap(BitmapPtr pBmp, TextureCompression comp, bool bShared)
 {
     assertValid();
     if (!pBmp) {
@@ -169,19 +155,36 @@ void Image::setBitmap(BitmapPtr pBmp, TextureCompression comp)
         default:
             assert(false);
     }
-    m_pBmp = BitmapPtr(new Bitmap(pBmp->getSize(), pf, ""));
-    m_pBmp->copyPixels(*pBmp);
-    if (m_State == GPU) {
-        MCTexturePtr pTex = m_pSurface->getTex();
-        if (bSourceChanged || m_pSurface->getSize() != m_pBmp->getSize() ||
-                m_pSurface->getPixelFormat() != pf)
-        {
-            pTex = GLContextManager::get()->createTexture(m_pBmp->getSize(), pf, 
-                    m_Material.getUseMipmaps(), m_Material.getWrapSMode(), 
-                    m_Material.getWrapTMode());
+    BitmapPtr pNewBmp = BitmapPtr(new Bitmap(pBmp->getSize(), pf, ""));
+    pNewBmp->copyPixels(*pBmp);
+    if (bShared) {
+        m_pBmp = BitmapCache::get()->intern(pNewBmp);
+    } else {
+        m_pBmp = pNewBmp;
+    }
+    if (m_State == GPU && !setupAtlasSurface()) {
+        GLContextManager* pCM = GLContextManager::get();
+        MCTexturePtr pTex = pCM->findSharedTexture(m_pBmp, m_Material.getUseMipmaps(),
+                m_Material.getWrapSMode(), m_Material.getWrapTMode());
+        if (!pTex) {
+            pTex = m_pSurface->getTex();
+            // The old texture can be reused if this is its only user.
+            if (bSourceChanged || !pTex || m_pSurface->isInAtlas() || 
+                    pTex.use_count() > 2 || 
+                    m_pSurface->getSize() != m_pBmp->getSize() ||
+                    m_pSurface->getPixelFormat() != pf)
+            {
+                pTex = pCM->createTexture(m_pBmp->getSize(), pf, 
+                        m_Material.getUseMipmaps(), m_Material.getWrapSMode(), 
+                        m_Material.getWrapTMode());
+            }
+            pCM->shareTexture(m_pBmp, pTex, m_Material.getUseMipmaps(),
+                    m_Material.getWrapSMode(), m_Material.getWrapTMode());
+            pCM->scheduleTexUpload(pTex, m_pBmp);
+        }
+        if (pTex != m_pSurface->getTex() || m_pSurface->isInAtlas()) {
             m_pSurface->create(pf, pTex);
         }
-        GLContextManager::get()->scheduleTexUpload(pTex, m_pBmp);
     }
     assertValid();
 }
@@ -201,6 +204,24 @@ void Image::setCanvas(OffscreenCanvasPtr pCanvas)
     assertValid();
 }
 
+bool Image::setUseTextureAtlas(bool bUseAtlas)
+{
+    assertValid();
+    if (bUseAtlas == m_bUseTextureAtlas) {
+        return false;
+    }
+    m_bUseTextureAtlas = bUseAtlas;
+    if (m_State == GPU && (m_Source == FILE || m_Source == BITMAP) &&
+            m_pSurface->isInAtlas() != bUseAtlas)
+    {
+        m_pSurface->destroy();
+        setupSurface();
+        assertValid();
+        return true;
+    }
+    return false;
+}
+
 OffscreenCanvasPtr Image::getCanvas() const
 {
     return m_pCanvas;
@@ -307,13 +328,37 @@ string Image::compression2String(TextureCompression compression)
 
 void Image::setupSurface()
 {
+    if (setupAtlasSurface()) {
+        return;
+    }
     PixelFormat pf = m_pBmp->getPixelFormat();
 //    cerr << "setupSurface: " << pf << endl;
-    MCTexturePtr pTex = GLContextManager::get()->createTexture(m_pBmp->getSize(), pf, 
-            m_Material.getUseMipmaps(), 
+    GLContextManager* pCM = GLContextManager::get();
+    MCTexturePtr pTex = pCM->findSharedTexture(m_pBmp, m_Material.getUseMipmaps(),
             m_Material.getWrapSMode(), m_Material.getWrapTMode());
+    if (!pTex) {
+        pTex = pCM->createTexture(m_pBmp->getSize(), pf, m_Material.getUseMipmaps(), 
+                m_Material.getWrapSMode(), m_Material.getWrapTMode());
+        pCM->shareTexture(m_pBmp, pTex, m_Material.getUseMipmaps(),
+                m_Material.getWrapSMode(), m_Material.getWrapTMode());
+        pCM->scheduleTexUpload(pTex, m_pBmp);
+    }
     m_pSurface->create(pf, pTex);
-    GLContextManager::get()->scheduleTexUpload(pTex, m_pBmp);
+}
+
+bool Image::setupAtlasSurface()
+{
+    if (!m_bUseTextureAtlas) {
+        return false;
+    }
+    TextureAtlasRegionPtr pRegion = GLContextManager::get()->getTextureAtlas()
+            ->allocRegion(m_pBmp, m_Material.getUseMipmaps(),
+                    m_Material.getWrapSMode(), m_Material.getWrapTMode());
+    if (!pRegion) {
+        return false;
+    }
+    m_pSurface->createFromAtlas(m_pBmp->getPixelFormat(), pRegion);
+    return true;
 }
 
 bool Image::changeSource(Source newSource)
@@ -57,10 +57,15 @@ class AVG_API Image
         void discard();
         void setEmpty();
         void setFilename(const std::string& sFilename,
-                TextureCompression comp = TEXTURECOMPRESSION_NONE);
+                TextureCompression comp = TEXTURECOMPRESSION_NONE,
+                const IntPoint& maxSize = IntPoint(0,0));
+        // If bShared is true, nodes that set bitmaps with identical contents share
+        // one bitmap and texture.
         void setBitmap(BitmapPtr pBmp, 
-                TextureCompression comp = TEXTURECOMPRESSION_NONE);
+                TextureCompression comp = TEXTURECOMPRESSION_NONE, bool bShared = false);
         void setCanvas(OffscreenCanvasPtr pCanvas);
+        // Returns true if the surface has been recreated.
+        bool setUseTextureAtlas(bool bUseAtlas);
         OffscreenCanvasPtr getCanvas() const;
         const std::string& getFilename() const;
 
@@ -76,6 +81,7 @@ class AVG_API Image
 
     private:
         void setupSurface();
+        bool setupAtlasSurface();
         bool changeSource(Source newSource);
         void assertValid() const;
 
@@ -87,6 +93,7 @@ class AVG_API Image
         State m_State;
         Source m_Source;
         MaterialInfo m_Material;
+        bool m_bUseTextureAtlas;
 };
 
 typedef boost::shared_ptr<Image> ImagePtr;
@@ -48,7 +48,9 @@ void ImageNode::registerType()
     TypeDefinition def = TypeDefinition("image", "rasternode", 
             ExportedObject::buildObject<ImageNode>)
         .addArg(Arg<UTF8String>("href", "", false, offsetof(ImageNode, m_href)))
-        .addArg(Arg<string>("compression", "none"));
+        .addArg(Arg<string>("compression", "none"))
+        .addArg(Arg<glm::vec2>("maxdecodesize", glm::vec2(0,0), false,
+                offsetof(ImageNode, m_MaxDecodeSize)));
     TypeRegistry::get()->registerType(def);
 }
 
@@ -76,6 +78,7 @@ void ImageNode::connectDisplay()
     if (m_pImage->getSource() == Image::SCENE) {
         checkCanvasValid(m_pImage->getCanvas());
     }
+    m_pImage->setUseTextureAtlas(canUseTextureAtlas());
     m_pImage->moveToGPU();
     RasterNode::connectDisplay();
     if (m_pImage->getSource() == Image::SCENE) {
@@ -120,12 +123,14 @@ void ImageNode::setHRef(const UTF8String& href)
     try {
         if (href == "") {
             m_pImage->setEmpty();
+            setRenderDirty();
         } else {
             checkReload();
         }
     } catch (const Exception&) {
         m_href = "";
         m_pImage->setEmpty();
+        setRenderDirty();
         throw;
     }
 }
@@ -135,12 +140,17 @@ const string ImageNode::getCompression() const
     return Image::compression2String(m_Compression);
 }
 
-void ImageNode::setBitmap(BitmapPtr pBmp)
+const glm::vec2& ImageNode::getMaxDecodeSize() const
+{
+    return m_MaxDecodeSize;
+}
+
+void ImageNode::setBitmap(BitmapPtr pBmp, bool bShared)
 {
     if (m_pImage->getSource() == Image::SCENE && getState() == Node::NS_CANRENDER) {
         m_pImage->getCanvas()->removeDependentCanvas(getCanvas());
     }
-    m_pImage->setBitmap(pBmp, m_Compression);
+    m_pImage->setBitmap(pBmp, m_Compression, bShared);
     if (getState() == Node::NS_CANRENDER) {
         newSurface();
     }
@@ -159,6 +169,8 @@ void ImageNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
         if (m_pImage->getCanvas()) {
             // Force FX render every frame for canvas nodes.
             getSurface()->getTex(0)->setDirty();
+            // The canvas contents can change without the node noticing.
+            setRenderDirty();
         }
         scheduleFXRender();
     }
@@ -175,6 +187,19 @@ void ImageNode::render()
     }
 }
 
+bool ImageNode::isBatchable() const
+{
+    return m_pImage->getSource() != Image::NONE && canRenderBatched();
+}
+
+void ImageNode::updateTextureAtlasUse()
+{
+    bool bNewSurface = m_pImage->setUseTextureAtlas(canUseTextureAtlas());
+    if (bNewSurface && getState() == NS_CANRENDER) {
+        newSurface();
+    }
+}
+
 IntPoint ImageNode::getMediaSize()
 {
     return m_pImage->getSize();
@@ -195,7 +220,8 @@ void ImageNode::checkReload()
         }
         newSurface();
     } else {
-        bool bNewImage = Node::checkReload(m_href, m_pImage, m_Compression);
+        bool bNewImage = Node::checkReload(m_href, m_pImage, m_Compression,
+                IntPoint(m_MaxDecodeSize));
         if (bNewImage) {
             newSurface();
         }
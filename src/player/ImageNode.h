@@ -48,23 +48,29 @@ class AVG_API ImageNode : public RasterNode
         const UTF8String& getHRef() const;
         void setHRef(const UTF8String& href);
         const std::string getCompression() const;
-        void setBitmap(BitmapPtr pBmp);
+        const glm::vec2& getMaxDecodeSize() const;
+        void setBitmap(BitmapPtr pBmp, bool bShared=false);
         
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
         virtual void render();
+        virtual bool isBatchable() const;
         
         void getElementsByPos(const glm::vec2& pos, std::vector<NodePtr>& pElements);
 
         virtual BitmapPtr getBitmap();
         virtual IntPoint getMediaSize();
 
+    protected:
+        virtual void updateTextureAtlasUse();
+
     private:
         bool isCanvasURL(const std::string& sURL);
         void checkCanvasValid(const CanvasPtr& pCanvas);
 
         UTF8String m_href;
         Image::TextureCompression m_Compression;
+        glm::vec2 m_MaxDecodeSize;
         ImagePtr m_pImage;
 };
 
@@ -48,7 +48,8 @@ using namespace std;
 namespace avg {
 
 MainCanvas::MainCanvas(Player * pPlayer)
-    : Canvas(pPlayer)
+    : Canvas(pPlayer),
+      m_bFrameSkipped(false)
 {
 }
 
@@ -84,9 +85,32 @@ static ProfilingZoneID RootRenderProfilingZone("Render MainCanvas");
 static ProfilingZoneID SecondWindowRenderProfilingZone(
         "Render second window");
 
+bool MainCanvas::isFrameSkipped() const
+{
+    return m_bFrameSkipped;
+}
+
 void MainCanvas::renderTree()
 {
+    m_bFrameSkipped = getPlayer()->isFrameSkippingEnabled() && 
+            !getRootNode()->isRenderDirty();
+    if (m_bFrameSkipped) {
+        // Nothing changed since the last frame, so the front buffer is still valid.
+        return;
+    }
     preRender();
+    renderWindows();
+}
+
+void MainCanvas::restoreBackBuffer()
+{
+    if (m_bFrameSkipped) {
+        renderWindows();
+    }
+}
+
+void MainCanvas::renderWindows()
+{
     DisplayEngine* pDisplayEngine = getPlayer()->getDisplayEngine();
     unsigned numWindows = pDisplayEngine->getNumWindows();
     for (unsigned i=0; i<numWindows; ++i) {
@@ -44,11 +44,19 @@ class AVG_API MainCanvas: public Canvas
        
         virtual BitmapPtr screenshot() const;
 
+        // True if the last frame wasn't rendered because nothing had changed.
+        bool isFrameSkipped() const;
+        // The back buffer is undefined after a skipped frame. This renders the
+        // unchanged scene into it again so it can be read back.
+        void restoreBackBuffer();
+
     private:
         void renderTree();
+        void renderWindows();
         void pollEvents();
 
         DisplayEnginePtr m_pDisplayEngine;
+        bool m_bFrameSkipped;
 };
 
 }
@@ -46,6 +46,13 @@ MultitouchInputDevice::MultitouchInputDevice(const DivNodePtr& pEventReceiverNod
         }
         m_TouchOffset = ConfigMgr::get()->getSizeOption("touch", "offset");
     }
+    float filterMinCutoff = ConfigMgr::get()->getFloatOption("touch", "filtermincutoff",
+            -1);
+    if (filterMinCutoff != -1) {
+        float filterBeta = ConfigMgr::get()->getFloatOption("touch", "filterbeta", 0);
+        m_pFilterBank = OneEuroFilterBankPtr(
+                new OneEuroFilterBank(filterMinCutoff, filterBeta));
+    }
 }
 
 MultitouchInputDevice::~MultitouchInputDevice()
@@ -62,23 +69,24 @@ vector<EventPtr> MultitouchInputDevice::pollEvents()
     lock_guard lock(*m_pMutex);
 
     vector<EventPtr> events;
+    vector<CursorEventPtr> cursorEvents;
     vector<TouchStatusPtr>::iterator it;
 //    cerr << "--------poll---------" << endl;
     for (it = m_Touches.begin(); it != m_Touches.end(); ) {
 //        cerr << (*it)->getID() << " ";
-        CursorEventPtr pEvent = (*it)->pollEvent();
-        if (pEvent) {
-            events.push_back(pEvent);
-            if (pEvent->getType() == Event::CURSOR_UP) {
-                it = m_Touches.erase(it);
-            } else {
-                ++it;
-            }
+        vector<CursorEventPtr> touchEvents = (*it)->pollEvents();
+        events.insert(events.end(), touchEvents.begin(), touchEvents.end());
+        cursorEvents.insert(cursorEvents.end(), touchEvents.begin(), touchEvents.end());
+        if (!touchEvents.empty() && touchEvents.back()->getType() == Event::CURSOR_UP) {
+            it = m_Touches.erase(it);
         } else {
             ++it;
         }
     }
 //    cerr << endl;
+    if (m_pFilterBank) {
+        filterEvents(cursorEvents);
+    }
     return events;
 }
 
@@ -126,6 +134,44 @@ IntPoint MultitouchInputDevice::getScreenPos(const glm::vec2& pos) const
                         int(pos.y * m_TouchArea.y + m_TouchOffset.y) + 0.5);
 }
 
+void MultitouchInputDevice::filterEvents(const vector<CursorEventPtr>& allEvents)
+{
+    // The filter gets one sample per cursor and frame. With motion coalescing,
+    // several events of a cursor arrive in one frame. Only the newest one is filtered,
+    // since that's the one recognizers use. The others keep their raw positions.
+    vector<CursorEventPtr> events;
+    set<int> cursorIDs;
+    for (int i = int(allEvents.size())-1; i >= 0; --i) {
+        if (cursorIDs.insert(allEvents[i]->getCursorID()).second) {
+            events.push_back(allEvents[i]);
+        }
+    }
+    vector<int> channels;
+    vector<glm::vec2> posns;
+    channels.reserve(events.size());
+    posns.reserve(events.size());
+    for (unsigned i = 0; i < events.size(); ++i) {
+        int cursorID = events[i]->getCursorID();
+        map<int, int>::iterator it = m_FilterChannels.find(cursorID);
+        if (it == m_FilterChannels.end()) {
+            it = m_FilterChannels.insert(
+                    make_pair(cursorID, m_pFilterBank->addChannel())).first;
+        }
+        channels.push_back(it->second);
+        posns.push_back(events[i]->getPos());
+    }
+    vector<glm::vec2> filteredPosns = m_pFilterBank->apply(channels, posns,
+            Player::get()->getFrameTime());
+    for (unsigned i = 0; i < events.size(); ++i) {
+        // Round, since cursor events store integer positions.
+        events[i]->setPos(glm::floor(filteredPosns[i]+glm::vec2(0.5, 0.5)));
+        if (events[i]->getType() == Event::CURSOR_UP) {
+            m_pFilterBank->removeChannel(channels[i]);
+            m_FilterChannels.erase(events[i]->getCursorID());
+        }
+    }
+}
+
 boost::mutex& MultitouchInputDevice::getMutex()
 {
     return *m_pMutex;
@@ -27,6 +27,7 @@
 
 #include "../base/GLMHelper.h"
 #include "../base/ConfigMgr.h"
+#include "../base/OneEuroFilterBank.h"
 
 #include <boost/thread.hpp>
 #include <map>
@@ -70,11 +71,17 @@ protected:
     static int getNextContactID();
 
 private:
+    void filterEvents(const std::vector<CursorEventPtr>& allEvents);
+
     TouchIDMap m_TouchIDMap;
     std::vector<TouchStatusPtr> m_Touches;
     MutexPtr m_pMutex;
     glm::vec2 m_TouchArea;
     glm::vec2 m_TouchOffset;
+
+    // Optional jitter filter applied to all touches. Maps cursor ids to filter channels.
+    OneEuroFilterBankPtr m_pFilterBank;
+    std::map<int, int> m_FilterChannels;
 };
 
 typedef boost::shared_ptr<MultitouchInputDevice> MultitouchInputDevicePtr;
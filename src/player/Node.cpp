@@ -80,7 +80,9 @@ Node::Node(const std::string& sPublisherName)
     : Publisher(sPublisherName),
       m_pParent(0),
       m_pCanvas(),
-      m_State(NS_UNCONNECTED)
+      m_State(NS_UNCONNECTED),
+      m_bRenderDirty(true),
+      m_bCulled(false)
 {
     ObjectCounter::get()->incRef(&typeid(*this));
 }
@@ -151,6 +153,7 @@ void Node::connectDisplay()
 {
     AVG_ASSERT(getState() == NS_CONNECTED);
     setState(NS_CANRENDER);
+    setRenderDirty();
 }
 
 void Node::connect(CanvasPtr pCanvas)
@@ -204,6 +207,7 @@ void Node::setOpacity(float opacity)
     } else if (m_Opacity > 1.0) {
         m_Opacity = 1.0;
     }
+    setRenderDirty();
 }
 
 bool Node::getActive() const 
@@ -215,6 +219,7 @@ void Node::setActive(bool bActive)
 {
     if (bActive != m_bActive) {
         m_bActive = bActive;
+        setRenderDirty();
     }
 }
 
@@ -366,11 +371,53 @@ void Node::getElementsByPos(const glm::vec2& pos, vector<NodePtr>& pElements)
 {
 }
 
+bool Node::getHitBounds(FRect& bounds) const
+{
+    return false;
+}
+
 void Node::preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
         float parentEffectiveOpacity)
 {
     m_EffectiveOpacity = m_Opacity*parentEffectiveOpacity;
     m_bEffectiveActive = bIsParentActive && m_bActive;
+    m_bRenderDirty = false;
+}
+
+void Node::preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity)
+{
+    Node::preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+}
+
+bool Node::getRenderBounds(FRect& bounds) const
+{
+    return false;
+}
+
+void Node::setCulled(bool bCulled)
+{
+    m_bCulled = bCulled;
+}
+
+bool Node::isCulled() const
+{
+    return m_bCulled;
+}
+
+void Node::setRenderDirty()
+{
+    // Ancestors of a dirty node are always dirty, so we can stop early.
+    Node* pNode = this;
+    while (pNode && !pNode->m_bRenderDirty) {
+        pNode->m_bRenderDirty = true;
+        pNode = pNode->m_pParent;
+    }
+}
+
+bool Node::isRenderDirty() const
+{
+    return m_bRenderDirty;
 }
 
 Node::NodeState Node::getState() const
@@ -385,7 +432,9 @@ CanvasPtr Node::getCanvas() const
 
 bool Node::handleEvent(EventPtr pEvent)
 {
-    if (pEvent->getSource() != Event::NONE && pEvent->getSource() != Event::CUSTOM) {
+    if (pEvent->getSource() != Event::NONE && pEvent->getSource() != Event::CUSTOM &&
+            hasSubscribers())
+    {
         string messageID = getEventMessageID(pEvent);
         notifySubscribers(messageID, pEvent);
     }
@@ -466,7 +515,7 @@ void Node::initFilename(string& sFilename)
 }
 
 bool Node::checkReload(const std::string& sHRef, const ImagePtr& pImage,
-        Image::TextureCompression comp)
+        Image::TextureCompression comp, const IntPoint& maxSize)
 {
     string sLastFilename = pImage->getFilename();
     string sFilename = sHRef;
@@ -477,7 +526,7 @@ bool Node::checkReload(const std::string& sHRef, const ImagePtr& pImage,
             if (sHRef == "") {
                 pImage->setEmpty();
             } else {
-                pImage->setFilename(sFilename, comp);
+                pImage->setFilename(sFilename, comp, maxSize);
             }
         } catch (Exception& ex) {
             pImage->setEmpty();
@@ -504,6 +553,13 @@ NodePtr Node::getSharedThis()
     return dynamic_pointer_cast<Node>(ExportedObject::getSharedThis());
 }
 
+void Node::hitBoundsChanged()
+{
+    if (m_pParent) {
+        m_pParent->childHitBoundsChanged(this);
+    }
+}
+
 void Node::logFileNotFoundWarning(const string& sWarn) const
 {
     unsigned int sev;
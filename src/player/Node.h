@@ -113,15 +113,29 @@ class AVG_API Node: public Publisher
         NodePtr getElementByPos(const glm::vec2& pos);
         virtual void getElementsByPos(const glm::vec2& pos, 
                 std::vector<NodePtr>& pElements);
+        // Returns false if the area that reacts to events isn't bounded.
+        virtual bool getHitBounds(FRect& bounds) const;
 
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
+        // Called instead of preRender() if the node can't be seen.
+        virtual void preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity);
+        // Bounding box of everything the node renders, in parent coordinates. Returns
+        // false if it isn't known, in which case the node is never culled.
+        virtual bool getRenderBounds(FRect& bounds) const;
+        void setCulled(bool bCulled);
+        bool isCulled() const;
         virtual void maybeRender(const glm::mat4& parentTransform) {};
         virtual void render() {};
         virtual void renderOutlines(const VertexArrayPtr& pVA, Pixel32 color) {};
 
         float getEffectiveOpacity() const;
         virtual std::string dump(int indent = 0);
+
+        // Marks the node and its ancestors as needing a new preRender/render pass.
+        void setRenderDirty();
+        bool isRenderDirty() const;
         
         NodeState getState() const;
         CanvasPtr getCanvas() const;
@@ -138,10 +152,12 @@ class AVG_API Node: public Publisher
         void setState(NodeState state);
         void initFilename(std::string& sFilename);
         bool checkReload(const std::string& sHRef, const ImagePtr& pImage,
-                Image::TextureCompression comp = Image::TEXTURECOMPRESSION_NONE);
+                Image::TextureCompression comp = Image::TEXTURECOMPRESSION_NONE,
+                const IntPoint& maxSize = IntPoint(0,0));
         virtual bool isVisible() const;
         bool getEffectiveActive() const;
         NodePtr getSharedThis();
+        void hitBoundsChanged();
 
         void logFileNotFoundWarning(const std::string& sWarn) const;
 
@@ -188,6 +204,8 @@ class AVG_API Node: public Publisher
         bool m_bSensitive;
         float m_EffectiveOpacity;
         bool m_bEffectiveActive;
+        bool m_bRenderDirty;
+        bool m_bCulled;
 };
 
 }
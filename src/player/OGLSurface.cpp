@@ -29,6 +29,7 @@
 
 #include "../graphics/GLContext.h"
 #include "../graphics/MCTexture.h"
+#include "../graphics/TextureAtlas.h"
 
 #include <iostream>
 #include <sstream>
@@ -70,6 +71,7 @@ void OGLSurface::create(PixelFormat pf, MCTexturePtr pTex0, MCTexturePtr pTex1,
     m_pTextures[1] = pTex1;
     m_pTextures[2] = pTex2;
     m_pTextures[3] = pTex3;
+    m_pAtlasRegion = TextureAtlasRegionPtr();
     m_bIsDirty = true;
     m_bPremultipliedAlpha = bPremultipliedAlpha;
 
@@ -86,6 +88,14 @@ void OGLSurface::create(PixelFormat pf, MCTexturePtr pTex0, MCTexturePtr pTex1,
     }
 }
 
+void OGLSurface::createFromAtlas(PixelFormat pf, TextureAtlasRegionPtr pRegion)
+{
+    create(pf, pRegion->getTex());
+    m_pAtlasRegion = pRegion;
+    m_AtlasPos = pRegion->getPos();
+    m_Size = pRegion->getSize();
+}
+
 void OGLSurface::setMask(MCTexturePtr pTex)
 {
     m_pMaskTexture = pTex;
@@ -98,6 +108,7 @@ void OGLSurface::destroy()
     m_pTextures[1] = MCTexturePtr();
     m_pTextures[2] = MCTexturePtr();
     m_pTextures[3] = MCTexturePtr();
+    m_pAtlasRegion = TextureAtlasRegionPtr();
 }
 
 void OGLSurface::activate(const IntPoint& logicalSize) const
@@ -193,6 +204,28 @@ IntPoint OGLSurface::getTextureSize()
     return m_pTextures[0]->getGLSize();
 }
 
+FRect OGLSurface::getTexCoordRect()
+{
+    if (m_pAtlasRegion) {
+        m_AtlasPos = m_pAtlasRegion->getPos();
+        return m_pAtlasRegion->getTexCoordRect();
+    } else {
+        glm::vec2 textureSize = glm::vec2(getTextureSize());
+        return FRect(0, 0, m_Size.x/textureSize.x, m_Size.y/textureSize.y);
+    }
+}
+
+bool OGLSurface::isTexCoordRectDirty() const
+{
+    // Atlas regions move when their page is repacked.
+    return m_pAtlasRegion && m_pAtlasRegion->getPos() != m_AtlasPos;
+}
+
+bool OGLSurface::isInAtlas() const
+{
+    return bool(m_pAtlasRegion);
+}
+
 bool OGLSurface::isCreated() const
 {
     return m_pTextures[0];
@@ -258,6 +291,16 @@ glm::mat4 OGLSurface::calcColorspaceMatrix() const
     return mat;
 }
 
+bool OGLSurface::sharesShaderState(const OGLSurface& other) const
+{
+    // True if activate() sets identical state for both surfaces.
+    return m_pTextures[0] == other.m_pTextures[0] && m_pf == other.m_pf &&
+            !pixelFormatIsPlanar(m_pf) && !m_pMaskTexture && !other.m_pMaskTexture &&
+            m_bPremultipliedAlpha == other.m_bPremultipliedAlpha &&
+            !colorIsModified() && !other.colorIsModified() &&
+            m_Gamma == other.m_Gamma && m_AlphaGamma == other.m_AlphaGamma;
+}
+
 bool OGLSurface::colorIsModified() const
 {
     return (fabs(m_Brightness.x-1.0) > 0.00001 || fabs(m_Brightness.y-1.0) > 0.00001 ||
@@ -25,6 +25,7 @@
 #include "../api.h"
 
 #include "../base/GLMHelper.h"
+#include "../base/Rect.h"
 
 #include "../graphics/Bitmap.h"
 #include "../graphics/OGLHelper.h"
@@ -37,6 +38,8 @@ namespace avg {
 
 class MCTexture;
 typedef boost::shared_ptr<MCTexture> MCTexturePtr;
+class TextureAtlasRegion;
+typedef boost::shared_ptr<TextureAtlasRegion> TextureAtlasRegionPtr;
 
 
 class AVG_API OGLSurface {
@@ -47,6 +50,7 @@ public:
     virtual void create(PixelFormat pf, MCTexturePtr pTex0, 
             MCTexturePtr pTex1 = MCTexturePtr(), MCTexturePtr pTex2 = MCTexturePtr(), 
             MCTexturePtr pTex3 = MCTexturePtr(), bool bPremultipliedAlpha = false);
+    void createFromAtlas(PixelFormat pf, TextureAtlasRegionPtr pRegion);
     void setMask(MCTexturePtr pTex);
     virtual void destroy();
     void activate(const IntPoint& logicalSize = IntPoint(1,1)) const;
@@ -57,8 +61,12 @@ public:
     PixelFormat getPixelFormat();
     IntPoint getSize();
     IntPoint getTextureSize();
+    FRect getTexCoordRect();
+    bool isTexCoordRectDirty() const;
+    bool isInAtlas() const;
     bool isCreated() const;
     bool isPremultipliedAlpha() const;
+    bool sharesShaderState(const OGLSurface& other) const;
 
     void setColorParams(const glm::vec3& gamma, const glm::vec3& brightness,
             const glm::vec3& contrast);
@@ -72,6 +80,8 @@ private:
     bool colorIsModified() const;
 
     MCTexturePtr m_pTextures[4];
+    TextureAtlasRegionPtr m_pAtlasRegion;
+    IntPoint m_AtlasPos;
     IntPoint m_Size;
     PixelFormat m_pf;
     MCTexturePtr m_pMaskTexture;
@@ -41,6 +41,7 @@
 #include "PluginManager.h"
 #include "TextEngine.h"
 #include "TestHelper.h"
+#include "TouchStatus.h"
 #include "MainCanvas.h"
 #include "OffscreenCanvas.h"
 #include "TrackerInputDevice.h"
@@ -74,6 +75,7 @@
 #include "../base/DAG.h"
 
 #include "../graphics/BitmapLoader.h"
+#include "../graphics/BitmapDiskCache.h"
 #include "../graphics/ShaderRegistry.h"
 #include "../graphics/Display.h"
 #include "../graphics/GLContextManager.h"
@@ -121,10 +123,16 @@ Player::Player()
       m_FrameTime(0),
       m_Volume(1),
       m_bPythonAvailable(true),
+      m_bRenderBatching(false),
+      m_bFrameSkipping(false),
+      m_NumSkippedFrames(0),
+      m_DivCacheMaxBytes(64*1024*1024),
+      m_DivCacheNumBytes(0),
       m_pLastMouseEvent(new MouseEvent(Event::CURSOR_MOTION, false, false, false, 
             IntPoint(-1, -1), MouseEvent::NO_BUTTON, glm::vec2(-1, -1), 0)),
       m_EventHookPyFunc(Py_None),
-      m_bMouseEnabled(true)
+      m_bMouseEnabled(true),
+      m_bMotionCoalescing(false)
 {
     string sDummy;
 #ifdef _WIN32
@@ -299,6 +307,61 @@ void Player::enableGLErrorChecks(bool bEnable)
 {
     GLContext::enableErrorChecks(bEnable);
 }
+
+void Player::enableRenderBatching(bool bEnable)
+{
+    m_bRenderBatching = bEnable;
+}
+
+bool Player::isRenderBatchingEnabled() const
+{
+    return m_bRenderBatching;
+}
+
+void Player::enableFrameSkipping(bool bEnable)
+{
+    m_bFrameSkipping = bEnable;
+}
+
+bool Player::isFrameSkippingEnabled() const
+{
+    return m_bFrameSkipping;
+}
+
+long long Player::getNumSkippedFrames() const
+{
+    return m_NumSkippedFrames;
+}
+
+void Player::setDivCacheMaxBytes(size_t maxBytes)
+{
+    m_DivCacheMaxBytes = maxBytes;
+}
+
+size_t Player::getDivCacheMaxBytes() const
+{
+    return m_DivCacheMaxBytes;
+}
+
+size_t Player::getDivCacheNumBytes() const
+{
+    return m_DivCacheNumBytes;
+}
+
+bool Player::reserveDivCacheBytes(size_t numBytes)
+{
+    if (m_DivCacheNumBytes+numBytes > m_DivCacheMaxBytes) {
+        return false;
+    }
+    m_DivCacheNumBytes += numBytes;
+    return true;
+}
+
+void Player::releaseDivCacheBytes(size_t numBytes)
+{
+    AVG_ASSERT(numBytes <= m_DivCacheNumBytes);
+    m_DivCacheNumBytes -= numBytes;
+}
         
 glm::vec2 Player::getScreenResolution()
 {
@@ -554,6 +617,7 @@ void Player::initPlayback(const std::string& sShaderPath)
 
     m_FrameTime = 0;
     m_NumFrames = 0;
+    m_NumSkippedFrames = 0;
 }
 
 bool Player::isPlaying()
@@ -709,6 +773,21 @@ void Player::enableMouse(bool enabled)
     }
 }
 
+void Player::enableMotionCoalescing(bool enabled)
+{
+    m_bMotionCoalescing = enabled;
+    TouchStatus::setKeepAllEvents(enabled);
+    
+    if (m_pEventDispatcher) {
+        m_pEventDispatcher->enableMotionCoalescing(enabled);
+    }
+}
+
+bool Player::isMotionCoalescingEnabled() const
+{
+    return m_bMotionCoalescing;
+}
+
 bool Player::isMultitouchAvailable() const
 {
     if (m_bIsPlaying) {
@@ -796,17 +875,16 @@ int Player::setOnFrameHandler(PyObject * pyfunc)
 
 bool Player::clearInterval(int id)
 {
-    vector<Timeout*>::iterator it;
-    for (it = m_PendingTimeouts.begin(); it != m_PendingTimeouts.end(); it++) {
-        if (id == (*it)->getID()) {
-            if (it == m_PendingTimeouts.begin() && m_bInHandleTimers) {
-                m_bCurrentTimeoutDeleted = true;
-            }
-            delete *it;
-            m_PendingTimeouts.erase(it);
-            return true;
+    if (m_bInHandleTimers) {
+        Timeout* pCurTimeout = m_PendingTimeouts.peek();
+        if (pCurTimeout && pCurTimeout->getID() == id) {
+            m_bCurrentTimeoutDeleted = true;
         }
     }
+    if (m_PendingTimeouts.remove(id)) {
+        return true;
+    }
+    vector<Timeout*>::iterator it;
     for (it = m_NewTimeouts.begin(); it != m_NewTimeouts.end(); it++) {
         if (id == (*it)->getID()) {
             delete *it;
@@ -824,6 +902,13 @@ void Player::callFromThread(PyObject * pyfunc)
     m_AsyncCalls.push_back(pTimeout);
 }
 
+ThreadChannelPtr Player::createThreadChannel(PyObject * pyfunc, int maxSize)
+{
+    ThreadChannelPtr pChannel(new ThreadChannel(pyfunc, maxSize));
+    m_ThreadChannels.push_back(pChannel);
+    return pChannel;
+}
+
 MouseEventPtr Player::getMouseState() const
 {
     return m_pLastMouseEvent;
@@ -853,6 +938,7 @@ BitmapPtr Player::screenshot()
         throw Exception(AVG_ERR_UNSUPPORTED,
                 "Must call Player.play() before screenshot().");
     }
+    string sDummy;
     if (GLContext::getCurrent()->isGLES()) {
         // Some GLES implementations invalidate the buffer after eglSwapBuffers.
         // The only way we can get at the contents at this point is to rerender them.
@@ -860,6 +946,9 @@ BitmapPtr Player::screenshot()
         IntRect viewport = pWindow->getViewport();
         m_pMainCanvas->renderWindow(pWindow, MCFBOPtr(), viewport);
         GLContextManager::get()->reset();
+    } else if (getEnv("AVG_BROKEN_READBUFFER", sDummy)) {
+        // The screenshot is read from the back buffer.
+        m_pMainCanvas->restoreBackBuffer();
     }
     return m_pDisplayEngine->screenshot();
 }
@@ -1102,17 +1191,21 @@ void Player::doFrame(bool bFirstFrame)
             m_pMainCanvas->doFrame(m_bPythonAvailable);
         }
         GLContext::mandatoryCheckError("End of frame");
+        bool bFrameSkipped = m_pMainCanvas->isFrameSkipped();
+        if (bFrameSkipped) {
+            m_NumSkippedFrames++;
+        }
         if (m_bPythonAvailable) {
             Py_BEGIN_ALLOW_THREADS;
             try {
-                endFrame();
+                endFrame(bFrameSkipped);
             } catch(...) {
                 Py_BLOCK_THREADS;
                 throw;
             }
             Py_END_ALLOW_THREADS;
         } else {
-            endFrame();
+            endFrame(bFrameSkipped);
         }
     }
     ThreadProfiler::get()->reset();
@@ -1121,10 +1214,12 @@ void Player::doFrame(bool bFirstFrame)
     }
 }
 
-void Player::endFrame()
+void Player::endFrame(bool bFrameSkipped)
 {
-    m_pDisplayEngine->frameWait();
-    m_pDisplayEngine->swapBuffers();
+    m_pDisplayEngine->frameWait(bFrameSkipped);
+    if (!bFrameSkipped) {
+        m_pDisplayEngine->swapBuffers();
+    }
     m_pDisplayEngine->checkJitter();
 }
 
@@ -1231,6 +1326,11 @@ void Player::initConfig()
     m_GLConfig.m_bGLES = true;
 #endif
     BitmapLoader::init(!m_GLConfig.m_bGLES);
+    string sDiskCacheDir;
+    pMgr->getStringOption("bitmap", "diskcachedir", "", sDiskCacheDir);
+    if (sDiskCacheDir != "") {
+        BitmapDiskCache::get()->setDir(sDiskCacheDir);
+    }
 
     float gamma[3];
     pMgr->getGammaOption("scr", "gamma", gamma);
@@ -1290,7 +1390,8 @@ void Player::initAudio()
 
 void Player::initMainCanvas(NodePtr pRootNode)
 {
-    m_pEventDispatcher = EventDispatcherPtr(new EventDispatcher(this, m_bMouseEnabled));
+    m_pEventDispatcher = EventDispatcherPtr(new EventDispatcher(this, m_bMouseEnabled, 
+            m_bMotionCoalescing));
     m_pMainCanvas = MainCanvasPtr(new MainCanvas(this));
     m_pMainCanvas->setRoot(pRootNode);
     if (m_DP.getNumWindows() == 1) {
@@ -1610,27 +1711,22 @@ void Player::handleTimers()
     vector<Timeout *>::iterator it;
     m_bInHandleTimers = true;
 
-    it = m_PendingTimeouts.begin();
-    while (it != m_PendingTimeouts.end() && (*it)->isReady(getFrameTime())
-            && !m_bStopping)
-    {
+    Timeout* pTimeout = m_PendingTimeouts.peek();
+    while (pTimeout && pTimeout->isReady(getFrameTime()) && !m_bStopping) {
         m_bCurrentTimeoutDeleted = false;
-        (*it)->fire(getFrameTime());
-        if (m_bCurrentTimeoutDeleted) {
-            it = m_PendingTimeouts.begin();
-        } else {
-            if ((*it)->isInterval()) {
-                Timeout* pTempTimeout = *it;
-                it = m_PendingTimeouts.erase(it);
-                m_NewTimeouts.insert(m_NewTimeouts.begin(), pTempTimeout);
+        pTimeout->fire(getFrameTime());
+        if (!m_bCurrentTimeoutDeleted) {
+            m_PendingTimeouts.pop();
+            if (pTimeout->isInterval()) {
+                m_NewTimeouts.insert(m_NewTimeouts.begin(), pTimeout);
             } else {
-                delete *it;
-                it = m_PendingTimeouts.erase(it);
+                delete pTimeout;
             }
         }
+        pTimeout = m_PendingTimeouts.peek();
     }
     for (it = m_NewTimeouts.begin(); it != m_NewTimeouts.end(); ++it) {
-        addTimeout(*it);
+        m_PendingTimeouts.push(*it);
     }
     m_NewTimeouts.clear();
     
@@ -1643,14 +1739,33 @@ void Player::handleTimers()
         Py_BEGIN_ALLOW_THREADS;
         {
             lock_guard lock(m_AsyncCallMutex);
-            tempAsyncCalls = m_AsyncCalls;
-            m_AsyncCalls.clear();
+            tempAsyncCalls.swap(m_AsyncCalls);
         }
         Py_END_ALLOW_THREADS;
         for (it = tempAsyncCalls.begin(); it != tempAsyncCalls.end(); ++it) {
             (*it)->fire(getFrameTime());
             delete *it;
         }
+        dispatchThreadChannels();
+    }
+}
+
+void Player::dispatchThreadChannels()
+{
+    // Callbacks may create or close channels, so we iterate over a copy.
+    vector<ThreadChannelPtr> channels = m_ThreadChannels;
+    for (unsigned i = 0; i < channels.size(); ++i) {
+        if (!channels[i]->isClosed()) {
+            channels[i]->dispatch();
+        }
+    }
+    vector<ThreadChannelPtr>::iterator it = m_ThreadChannels.begin();
+    while (it != m_ThreadChannels.end()) {
+        if ((*it)->isClosed()) {
+            it = m_ThreadChannels.erase(it);
+        } else {
+            ++it;
+        }
     }
 }
 
@@ -1731,11 +1846,11 @@ OffscreenCanvasPtr Player::getCanvasFromURL(const std::string& sURL)
 void Player::cleanup(bool bIsAbort)
 {
     // Kill all timeouts.
-    vector<Timeout*>::iterator it;
-    for (it = m_PendingTimeouts.begin(); it != m_PendingTimeouts.end(); it++) {
-        delete *it;
-    }
     m_PendingTimeouts.clear();
+    for (unsigned i = 0; i < m_ThreadChannels.size(); ++i) {
+        m_ThreadChannels[i]->close();
+    }
+    m_ThreadChannels.clear();
     m_EventCaptureInfoMap.clear();
     m_pLastCursorStates.clear();
     m_pTestHelper->reset();
@@ -1784,19 +1899,8 @@ int Player::internalSetTimeout(int time, PyObject * pyfunc, bool bIsInterval)
     if (m_bInHandleTimers) {
         m_NewTimeouts.push_back(pTimeout);
     } else {
-        addTimeout(pTimeout);
-    }
-    return pTimeout->getID();
-}
-
-
-int Player::addTimeout(Timeout* pTimeout)
-{
-    vector<Timeout*>::iterator it = m_PendingTimeouts.begin();
-    while (it != m_PendingTimeouts.end() && (**it)<*pTimeout) {
-        it++;
+        m_PendingTimeouts.push(pTimeout);
     }
-    m_PendingTimeouts.insert(it, pTimeout);
     return pTimeout->getID();
 }
 
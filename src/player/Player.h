@@ -25,6 +25,8 @@
 #include "../api.h"
 #include "Publisher.h"
 #include "Timeout.h"
+#include "TimeoutQueue.h"
+#include "ThreadChannel.h"
 #include "TypeRegistry.h"
 #include "DisplayParams.h"
 #include "CursorState.h"
@@ -98,6 +100,16 @@ class AVG_API Player: public Publisher
         void setMultiSampleSamples(int multiSampleSamples);
         void setAudioOptions(int samplerate, int channels);
         void enableGLErrorChecks(bool bEnable);
+        void enableRenderBatching(bool bEnable);
+        bool isRenderBatchingEnabled() const;
+        void enableFrameSkipping(bool bEnable);
+        bool isFrameSkippingEnabled() const;
+        long long getNumSkippedFrames() const;
+        void setDivCacheMaxBytes(size_t maxBytes);
+        size_t getDivCacheMaxBytes() const;
+        size_t getDivCacheNumBytes() const;
+        bool reserveDivCacheBytes(size_t numBytes);
+        void releaseDivCacheBytes(size_t numBytes);
         glm::vec2 getScreenResolution();
         float getPixelsPerMM();
         glm::vec2 getPhysicalScreenDimensions();
@@ -138,6 +150,7 @@ class AVG_API Player: public Publisher
         int setOnFrameHandler(PyObject * pyfunc);
         bool clearInterval(int id);
         void callFromThread(PyObject * pyfunc);
+        ThreadChannelPtr createThreadChannel(PyObject * pyfunc, int maxSize);
 
         void addInputDevice(InputDevicePtr pSource);
         MouseEventPtr getMouseState() const;
@@ -145,6 +158,8 @@ class AVG_API Player: public Publisher
         TrackerInputDevice * getTracker();
         void enableMultitouch();
         void enableMouse(bool enabled);
+        void enableMotionCoalescing(bool enabled);
+        bool isMotionCoalescingEnabled() const;
         bool isMultitouchAvailable() const;
         void setEventCapture(NodePtr pNode, int cursorID);
         void releaseEventCapture(int cursorID);
@@ -219,13 +234,14 @@ class AVG_API Player: public Publisher
                 const xmlNodePtr xmlNode);
         OffscreenCanvasPtr registerOffscreenCanvas(NodePtr pNode);
         OffscreenCanvasPtr findCanvas(const std::string& sID) const;
-        void endFrame();
+        void endFrame(bool bFrameSkipped);
 
         void sendFakeEvents();
         void sendOver(CursorEventPtr pOtherEvent, Event::Type type, NodePtr pNode);
         void handleCursorEvent(CursorEventPtr pEvent, bool bOnlyCheckCursorOver=false);
 
         void dispatchOffscreenRendering(OffscreenCanvas* pOffscreenCanvas);
+        void dispatchThreadChannels();
 
         void errorIfPlaying(const std::string& sFunc) const;
         void errorIfMultiDisplay(const std::string& sFunc) const;
@@ -245,15 +261,15 @@ class AVG_API Player: public Publisher
 
         // Timeout handling
         int internalSetTimeout(int time, PyObject * pyfunc, bool bIsInterval);
-        int addTimeout(Timeout* pTimeout);
         void handleTimers();
         bool m_bInHandleTimers;
         bool m_bCurrentTimeoutDeleted;
 
-        std::vector<Timeout *> m_PendingTimeouts;
+        TimeoutQueue m_PendingTimeouts;
         std::vector<Timeout *> m_NewTimeouts; // Timeouts to be added this frame.
         std::vector<Timeout *> m_AsyncCalls;
         boost::mutex m_AsyncCallMutex;
+        std::vector<ThreadChannelPtr> m_ThreadChannels;
 
         // Configuration variables.
         DisplayParams m_DP;
@@ -274,6 +290,11 @@ class AVG_API Player: public Publisher
         float m_Volume;
 
         bool m_bPythonAvailable;
+        bool m_bRenderBatching;
+        bool m_bFrameSkipping;
+        long long m_NumSkippedFrames;
+        size_t m_DivCacheMaxBytes;
+        size_t m_DivCacheNumBytes;
 
         std::vector<OffscreenCanvasPtr> m_pCanvases;
 
@@ -299,6 +320,7 @@ class AVG_API Player: public Publisher
 
         PyObject * m_EventHookPyFunc;
         bool m_bMouseEnabled;
+        bool m_bMotionCoalescing;
 };
 
 }
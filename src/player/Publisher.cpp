@@ -34,6 +34,20 @@ namespace avg {
 
 int Publisher::s_LastSubscriberID = 0;
 
+Publisher::Signal::Signal()
+    : m_pSubscribers(new SubscriberInfoVector),
+      m_NumSubscribers(0)
+{
+}
+
+Publisher::SubscriberEntry::SubscriberEntry(MessageID messageID, unsigned index,
+        const PyObject* pCallableKey)
+    : m_MessageID(messageID),
+      m_Index(index),
+      m_pCallableKey(pCallableKey)
+{
+}
+
 Publisher::Publisher()
 {
     m_pPublisherDef = PublisherDefinition::create("");
@@ -44,23 +58,32 @@ Publisher::Publisher(const string& sTypeName)
     m_pPublisherDef = PublisherDefinitionRegistry::get()->getDefinition(sTypeName);
     vector<MessageID> messageIDs = m_pPublisherDef->getMessageIDs();
     for (unsigned i=0; i<messageIDs.size(); ++i) {
-        m_SignalMap[messageIDs[i]] = list<SubscriberInfoPtr>();
+        m_SignalMap[messageIDs[i]] = Signal();
     }
 }
 
 Publisher::~Publisher()
 {
+    // Notifications that are still running must not call into a deleted publisher.
+    removeSubscribers();
 }
 
 int Publisher::subscribe(MessageID messageID, PyObject* pCallable)
 {
     if (PyCallable_Check(pCallable)) {
-        SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
+        Signal& signal = safeFindSignal(messageID);
         int subscriberID = s_LastSubscriberID;
         s_LastSubscriberID++;
 //        cerr << this << " subscribe " << messageID << ", " << subscriberID << endl;
-        subscribers.push_front(SubscriberInfoPtr(
+        makeSubscribersWritable(signal);
+        const PyObject* pCallableKey = getCallableKey(pCallable);
+        m_Subscribers.insert(SubscriberMap::value_type(subscriberID, 
+                SubscriberEntry(messageID, signal.m_pSubscribers->size(), pCallableKey)));
+        m_CallableSubscribers.insert(CallableMap::value_type(pCallableKey, 
+                subscriberID));
+        signal.m_pSubscribers->push_back(SubscriberInfoPtr(
                 new SubscriberInfo(subscriberID, pCallable)));
+        signal.m_NumSubscribers++;
         return subscriberID;
     } else {
         if (pCallable != Py_None) {
@@ -77,50 +100,30 @@ void Publisher::unsubscribe(MessageID messageID, int subscriberID)
 //    cerr << this << " unsubscribe " << messageID << ", " << subscriberID << endl;
 //    cerr << "  ";
 //    dumpSubscribers(messageID);
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    SubscriberInfoList::iterator it;
-    for (it = subscribers.begin(); it != subscribers.end(); it++) {
-        if ((*it)->getID() == subscriberID) {
-            unsubscribeIterator(messageID, it);
-            return;
-        }
+    safeFindSignal(messageID);
+    SubscriberMap::iterator it = m_Subscribers.find(subscriberID);
+    if (it == m_Subscribers.end() || !(it->second.m_MessageID == messageID)) {
+        throwSubscriberNotFound(messageID, subscriberID);
     }
+    unsubscribeEntry(it);
 //    cerr << "  End of unsubscribe: ";
 //    dumpSubscribers(messageID);
-    throwSubscriberNotFound(messageID, subscriberID);
 }
 
 void Publisher::unsubscribe1(int subscriberID)
 {
-    SignalMap::iterator it;
-    for (it = m_SignalMap.begin(); it != m_SignalMap.end(); ++it) {
-        SubscriberInfoList& subscribers = it->second;
-        SubscriberInfoList::iterator it2;
-        for (it2 = subscribers.begin(); it2 != subscribers.end(); it2++) {
-            if ((*it2)->getID() == subscriberID) {
-                MessageID messageID = it->first;
-                unsubscribeIterator(messageID, it2);
-                return;
-            }
-        }
+    SubscriberMap::iterator it = m_Subscribers.find(subscriberID);
+    if (it == m_Subscribers.end()) {
+        throw Exception(AVG_ERR_INVALID_ARGS, 
+                "Subscriber with ID "+toString(subscriberID)+" not found.");
     }
-    throw Exception(AVG_ERR_INVALID_ARGS, 
-            "Subscriber with ID "+toString(subscriberID)+" not found.");
+    unsubscribeEntry(it);
 }
 
 void Publisher::unsubscribeCallable(MessageID messageID, PyObject* pCallable)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    SubscriberInfoList::iterator it;
-    SubscriberInfoList::iterator foundIt;
-    int numSubscribers = 0;
-
-    for (it = subscribers.begin(); it != subscribers.end(); it++) {
-        if ((*it)->isCallable(pCallable)) {
-            numSubscribers++;
-            foundIt = it;
-        }
-    }
+    int numSubscribers;
+    int subscriberID = findCallableSubscriber(messageID, pCallable, &numSubscribers);
     if (numSubscribers == 0) {
         throwSubscriberNotFound(messageID, -1);
     }
@@ -128,37 +131,26 @@ void Publisher::unsubscribeCallable(MessageID messageID, PyObject* pCallable)
         throw Exception(AVG_ERR_INVALID_ARGS, "Signal with ID "+toString(messageID)+
                 " has more than one subscriber with the given callable.");
     }
-    unsubscribeIterator(messageID, foundIt);
+    unsubscribeEntry(m_Subscribers.find(subscriberID));
 }
 
 int Publisher::getNumSubscribers(MessageID messageID)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    return subscribers.size(); 
+    return safeFindSignal(messageID).m_NumSubscribers;
 }
     
 bool Publisher::isSubscribed(MessageID messageID, int subscriberID)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    SubscriberInfoList::iterator it;
-    for (it = subscribers.begin(); it != subscribers.end(); it++) {
-        if ((*it)->getID() == subscriberID) {
-            return true;
-        }
-    }
-    return false;
+    safeFindSignal(messageID);
+    SubscriberMap::iterator it = m_Subscribers.find(subscriberID);
+    return it != m_Subscribers.end() && it->second.m_MessageID == messageID;
 }
 
 bool Publisher::isSubscribedCallable(MessageID messageID, PyObject* pCallable)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    SubscriberInfoList::iterator it;
-    for (it = subscribers.begin(); it != subscribers.end(); it++) {
-        if ((*it)->isCallable(pCallable)) {
-            return true;
-        }
-    }
-    return false;
+    int numSubscribers;
+    findCallableSubscriber(messageID, pCallable, &numSubscribers);
+    return numSubscribers > 0;
 }
 
 void Publisher::publish(MessageID messageID)
@@ -167,21 +159,36 @@ void Publisher::publish(MessageID messageID)
         throw Exception(AVG_ERR_INVALID_ARGS, "Signal with ID "+toString(messageID)+
                 "already registered.");
     }
-    m_SignalMap[messageID] = SubscriberInfoList();
+    m_SignalMap[messageID] = Signal();
 }
 
 void Publisher::removeSubscribers()
 {
     SignalMap::iterator it;
     for (it = m_SignalMap.begin(); it != m_SignalMap.end(); ++it) {
-        it->second = SubscriberInfoList();
+        SubscriberInfoVector& subscribers = *(it->second.m_pSubscribers);
+        for (unsigned i = 0; i < subscribers.size(); ++i) {
+            if (subscribers[i]) {
+                subscribers[i]->setUnsubscribed();
+            }
+        }
+        it->second = Signal();
     }
+    m_Subscribers.clear();
+    m_CallableSubscribers.clear();
+}
+
+bool Publisher::hasSubscribers() const
+{
+    return !m_Subscribers.empty();
 }
 
 void Publisher::notifySubscribers(MessageID messageID)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    if (!subscribers.empty()) {
+    if (m_Subscribers.empty()) {
+        return;
+    }
+    if (safeFindSignal(messageID).m_NumSubscribers > 0) {
         py::list args;
         notifySubscribersPy(messageID, args);
     }
@@ -189,6 +196,9 @@ void Publisher::notifySubscribers(MessageID messageID)
     
 void Publisher::notifySubscribers(const string& sMsgName)
 {
+    if (m_Subscribers.empty()) {
+        return;
+    }
     MessageID messageID = m_pPublisherDef->getMessageID(sMsgName);
     notifySubscribers(messageID);
 }
@@ -199,18 +209,16 @@ void Publisher::notifySubscribersPy(MessageID messageID, const py::list& args)
 //    cerr << "  ";
 //    dumpSubscribers(messageID);
     AVG_ASSERT(!(Player::get()->isTraversingTree()));
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    WeakSubscriberInfoList subRefs;
-    for (SubscriberInfoList::iterator it = subscribers.begin(); it != subscribers.end();
-            ++it)
-    {
-        subRefs.push_back(*it);
+    Signal& signal = safeFindSignal(messageID);
+    if (signal.m_NumSubscribers == 0) {
+        return;
     }
-    WeakSubscriberInfoList::iterator it;
-    for (it = subRefs.begin(); it != subRefs.end(); ++it) {
+    // Holding a reference makes changes during the notification copy the vector.
+    SubscriberInfoVectorPtr pSubscribers = signal.m_pSubscribers;
+    for (int i = int(pSubscribers->size())-1; i >= 0; --i) {
 //        cerr << "  next" << endl;
-        if (!(*it).expired()) {
-            SubscriberInfoPtr pSub = (*it).lock();
+        SubscriberInfoPtr pSub = (*pSubscribers)[i];
+        if (pSub && !pSub->isUnsubscribed()) {
             if (pSub->hasExpired()) {
                 // Python subscriber doesn't exist anymore -> auto-unsubscribe.
                 unsubscribe(messageID, pSub->getID());
@@ -228,19 +236,99 @@ MessageID Publisher::genMessageID()
     return PublisherDefinitionRegistry::get()->genMessageID();
 }
 
-void Publisher::unsubscribeIterator(MessageID messageID, SubscriberInfoList::iterator it)
+void Publisher::unsubscribeEntry(SubscriberMap::iterator it)
 {
-    m_SignalMap[messageID].erase(it);
+    int subscriberID = it->first;
+    const SubscriberEntry& entry = it->second;
+    Signal& signal = m_SignalMap.find(entry.m_MessageID)->second;
+    makeSubscribersWritable(signal);
+    SubscriberInfoPtr& pSub = (*signal.m_pSubscribers)[entry.m_Index];
+    pSub->setUnsubscribed();
+    pSub = SubscriberInfoPtr();
+    signal.m_NumSubscribers--;
+
+    pair<CallableMap::iterator, CallableMap::iterator> range = 
+            m_CallableSubscribers.equal_range(entry.m_pCallableKey);
+    for (CallableMap::iterator callableIt = range.first; callableIt != range.second; 
+            ++callableIt)
+    {
+        if (callableIt->second == subscriberID) {
+            m_CallableSubscribers.erase(callableIt);
+            break;
+        }
+    }
+    m_Subscribers.erase(it);
+
+    int numEmptySlots = int(signal.m_pSubscribers->size()) - signal.m_NumSubscribers;
+    if (numEmptySlots > 8 && numEmptySlots > signal.m_NumSubscribers) {
+        compactSubscribers(signal);
+    }
 }
 
+void Publisher::makeSubscribersWritable(Signal& signal)
+{
+    if (!signal.m_pSubscribers.unique()) {
+        signal.m_pSubscribers = SubscriberInfoVectorPtr(
+                new SubscriberInfoVector(*signal.m_pSubscribers));
+    }
+}
+
+void Publisher::compactSubscribers(Signal& signal)
+{
+    SubscriberInfoVectorPtr pSubscribers(new SubscriberInfoVector);
+    pSubscribers->reserve(signal.m_NumSubscribers);
+    SubscriberInfoVector& oldSubscribers = *signal.m_pSubscribers;
+    for (unsigned i = 0; i < oldSubscribers.size(); ++i) {
+        if (oldSubscribers[i]) {
+            m_Subscribers.find(oldSubscribers[i]->getID())->second.m_Index = 
+                    pSubscribers->size();
+            pSubscribers->push_back(oldSubscribers[i]);
+        }
+    }
+    signal.m_pSubscribers = pSubscribers;
+}
 
-Publisher::SubscriberInfoList& Publisher::safeFindSubscribers(MessageID messageID)
+int Publisher::findCallableSubscriber(MessageID messageID, PyObject* pCallable,
+        int* pNumFound)
 {
-    if (m_SignalMap.find(messageID) == m_SignalMap.end()) {
+    safeFindSignal(messageID);
+    *pNumFound = 0;
+    int subscriberID = -1;
+    const PyObject* pCallableKey = getCallableKey(pCallable);
+    pair<CallableMap::iterator, CallableMap::iterator> range = 
+            m_CallableSubscribers.equal_range(pCallableKey);
+    for (CallableMap::iterator it = range.first; it != range.second; ++it) {
+        const SubscriberEntry& entry = m_Subscribers.find(it->second)->second;
+        if (entry.m_MessageID == messageID) {
+            SignalMap::iterator signalIt = m_SignalMap.find(messageID);
+            const SubscriberInfoPtr& pSub = 
+                    (*signalIt->second.m_pSubscribers)[entry.m_Index];
+            if (pSub->isCallable(pCallable)) {
+                (*pNumFound)++;
+                subscriberID = it->second;
+            }
+        }
+    }
+    return subscriberID;
+}
+
+const PyObject* Publisher::getCallableKey(PyObject* pCallable)
+{
+    // Bound methods are compared by their function (see SubscriberInfo::isCallable()).
+    if (PyMethod_Check(pCallable)) {
+        return PyMethod_Function(pCallable);
+    } else {
+        return pCallable;
+    }
+}
+
+Publisher::Signal& Publisher::safeFindSignal(MessageID messageID)
+{
+    SignalMap::iterator it = m_SignalMap.find(messageID);
+    if (it == m_SignalMap.end()) {
         throw Exception(AVG_ERR_INVALID_ARGS, "No signal with ID "+toString(messageID));
     }
-    SubscriberInfoList& subscribers = m_SignalMap[messageID];
-    return subscribers;
+    return it->second;
 }
 
 void Publisher::throwSubscriberNotFound(MessageID messageID, int subscriberID)
@@ -256,10 +344,11 @@ void Publisher::throwSubscriberNotFound(MessageID messageID, int subscriberID)
 
 void Publisher::dumpSubscribers(MessageID messageID)
 {
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    SubscriberInfoList::iterator it;
-    for (it = subscribers.begin(); it != subscribers.end(); it++) {
-        cerr << (*it)->getID() << " ";
+    SubscriberInfoVector& subscribers = *(safeFindSignal(messageID).m_pSubscribers);
+    for (unsigned i = 0; i < subscribers.size(); ++i) {
+        if (subscribers[i]) {
+            cerr << subscribers[i]->getID() << " ";
+        }
     }
     cerr << endl;
 }
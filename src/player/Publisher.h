@@ -30,18 +30,18 @@
 #include "MessageID.h"
 
 #include <boost/shared_ptr.hpp>
+#include <boost/unordered_map.hpp>
 
 // Python docs say python.h should be included before any standard headers (!)
 #include "WrapPython.h" 
 
-#include <list>
 #include <map>
+#include <vector>
 
 namespace avg {
 
 class SubscriberInfo;
 typedef boost::shared_ptr<SubscriberInfo> SubscriberInfoPtr;
-typedef boost::weak_ptr<SubscriberInfo> SubscriberInfoWeakPtr;
 
 class Publisher;
 typedef boost::shared_ptr<Publisher> PublisherPtr;
@@ -75,19 +75,48 @@ public:
 
 protected:
     void removeSubscribers();
+    bool hasSubscribers() const;
 
 private:
-    typedef std::list<SubscriberInfoWeakPtr> WeakSubscriberInfoList;
-    typedef std::list<SubscriberInfoPtr> SubscriberInfoList;
-    typedef std::map<MessageID, SubscriberInfoList> SignalMap;
+    // Subscribers in order of subscription. Unsubscribed slots are NULL until the
+    // vector is compacted. The vector is shared with running notifications and 
+    // copied before it is changed during a notification.
+    typedef std::vector<SubscriberInfoPtr> SubscriberInfoVector;
+    typedef boost::shared_ptr<SubscriberInfoVector> SubscriberInfoVectorPtr;
+
+    struct Signal {
+        Signal();
+
+        SubscriberInfoVectorPtr m_pSubscribers;
+        int m_NumSubscribers;
+    };
+    typedef std::map<MessageID, Signal> SignalMap;
+
+    struct SubscriberEntry {
+        SubscriberEntry(MessageID messageID, unsigned index,
+                const PyObject* pCallableKey);
+
+        MessageID m_MessageID;
+        unsigned m_Index;
+        const PyObject* m_pCallableKey;
+    };
+    typedef boost::unordered_map<int, SubscriberEntry> SubscriberMap;
+    typedef boost::unordered_multimap<const PyObject*, int> CallableMap;
     
-    void unsubscribeIterator(MessageID messageID, SubscriberInfoList::iterator it);
-    SubscriberInfoList& safeFindSubscribers(MessageID messageID);
+    void unsubscribeEntry(SubscriberMap::iterator it);
+    void makeSubscribersWritable(Signal& signal);
+    void compactSubscribers(Signal& signal);
+    int findCallableSubscriber(MessageID messageID, PyObject* pCallable, 
+            int* pNumFound);
+    static const PyObject* getCallableKey(PyObject* pCallable);
+    Signal& safeFindSignal(MessageID messageID);
     void throwSubscriberNotFound(MessageID messageID, int subscriberID);
     void dumpSubscribers(MessageID messageID);
 
     PublisherDefinitionPtr m_pPublisherDef;
     SignalMap m_SignalMap;
+    SubscriberMap m_Subscribers;
+    CallableMap m_CallableSubscribers;
     static int s_LastSubscriberID;
 
     typedef std::pair<MessageID, int> UnsubscribeDescription;
@@ -96,9 +125,11 @@ private:
 template<class ARG_TYPE>
 void Publisher::notifySubscribers(const std::string& sMsgName, const ARG_TYPE& arg)
 {
+    if (m_Subscribers.empty()) {
+        return;
+    }
     MessageID messageID = m_pPublisherDef->getMessageID(sMsgName);
-    SubscriberInfoList& subscribers = safeFindSubscribers(messageID);
-    if (!subscribers.empty()) {
+    if (safeFindSignal(messageID).m_NumSubscribers > 0) {
         py::list args;
         py::object pyArg(arg);
         args.append(pyArg);
@@ -25,6 +25,7 @@
 #include "OGLSurface.h"
 #include "FXNode.h"
 #include "Canvas.h"
+#include "BitmapCache.h"
 
 #include "../graphics/ImagingProjection.h"
 #include "../graphics/ShaderRegistry.h"
@@ -139,11 +140,12 @@ void RasterNode::checkReload()
     initFilename(sMaskFilename);
     if (sLastMaskFilename != sMaskFilename) {
         m_sMaskFilename = sMaskFilename;
+        setRenderDirty();
         try {
             if (m_sMaskFilename != "") {
                 AVG_TRACE(Logger::category::MEMORY, Logger::severity::INFO,
                         "Loading " << m_sMaskFilename);
-                m_pMaskBmp = loadBitmap(m_sMaskFilename, I8);
+                m_pMaskBmp = BitmapCache::get()->load(m_sMaskFilename, I8);
                 setMaskCoords();
             }
         } catch (Exception & ex) {
@@ -157,6 +159,7 @@ void RasterNode::checkReload()
             m_pMaskBmp = BitmapPtr();
             getSurface()->setMask(MCTexturePtr());
         }
+        updateTextureAtlasUse();
         if (getState() == Node::NS_CANRENDER && m_pMaskBmp) {
             downloadMask();
         }
@@ -197,6 +200,7 @@ void RasterNode::setWarpedVertexCoords(const VertexGrid& grid)
                 "setWarpedVertexCoords() called with incorrect grid size.");
     }
     m_TileVertices = grid;
+    setRenderDirty();
 }
 
 int RasterNode::getMaxTileWidth() const
@@ -230,6 +234,7 @@ void RasterNode::setBlendModeStr(const string& sBlendMode)
     }
     m_sBlendMode = sBlendMode;
     m_BlendMode = blendMode;
+    setRenderDirty();
 }
 
 const UTF8String& RasterNode::getMaskHRef() const
@@ -284,6 +289,7 @@ void RasterNode::setGamma(const glm::vec3& gamma)
     if (getState() == Node::NS_CANRENDER) {
         m_pSurface->setColorParams(m_Gamma, m_Intensity, m_Contrast);
     }
+    setRenderDirty();
 }
 
 glm::vec3 RasterNode::getIntensity() const
@@ -297,6 +303,7 @@ void RasterNode::setIntensity(const glm::vec3& intensity)
     if (getState() == Node::NS_CANRENDER) {
         m_pSurface->setColorParams(m_Gamma, m_Intensity, m_Contrast);
     }
+    setRenderDirty();
 }
 
 glm::vec3 RasterNode::getContrast() const
@@ -310,6 +317,7 @@ void RasterNode::setContrast(const glm::vec3& contrast)
     if (getState() == Node::NS_CANRENDER) {
         m_pSurface->setColorParams(m_Gamma, m_Intensity, m_Contrast);
     }
+    setRenderDirty();
 }
 
 void RasterNode::setEffect(FXNodePtr pFXNode)
@@ -321,6 +329,8 @@ void RasterNode::setEffect(FXNodePtr pFXNode)
         m_pFBO = MCFBOPtr();
     }
     m_pFXNode = pFXNode;
+    updateTextureAtlasUse();
+    setRenderDirty();
     if (getState() == NS_CANRENDER) {
         setupFX();
     }
@@ -378,12 +388,17 @@ void RasterNode::scheduleFXRender()
     if (m_pFXNode) {
         getCanvas()->scheduleFXRender(
                 dynamic_pointer_cast<RasterNode>(shared_from_this()));
+        // Effect parameters aren't tracked, so nodes with effects are always redrawn.
+        setRenderDirty();
     }
 }
 
 void RasterNode::calcVertexArray(const VertexArrayPtr& pVA)
 {
     if (isVisible() && m_pSurface->isCreated()) {
+        if (m_pSurface->isTexCoordRectDirty()) {
+            calcTexCoords();
+        }
         pVA->startSubVA(m_SubVA);
         for (unsigned y = 0; y < m_TileVertices.size()-1; y++) {
             for (unsigned x = 0; x < m_TileVertices[0].size()-1; x++) {
@@ -434,6 +449,7 @@ void RasterNode::setMaskCoords()
 {
     if (m_sMaskFilename != "") {
         calcMaskCoords();
+        setRenderDirty();
     }
 }
 
@@ -452,8 +468,12 @@ void RasterNode::calcMaskCoords()
 
 void RasterNode::downloadMask()
 {
-    MCTexturePtr pTex = GLContextManager::get()->createTextureFromBmp(m_pMaskBmp,
-            m_Material.getUseMipmaps());
+    GLContextManager* pCM = GLContextManager::get();
+    MCTexturePtr pTex = pCM->findSharedTexture(m_pMaskBmp, m_Material.getUseMipmaps());
+    if (!pTex) {
+        pTex = pCM->createTextureFromBmp(m_pMaskBmp, m_Material.getUseMipmaps());
+        pCM->shareTexture(m_pMaskBmp, pTex, m_Material.getUseMipmaps());
+    }
     m_pSurface->setMask(pTex);
 }
         
@@ -541,6 +561,107 @@ void RasterNode::blt(const glm::mat4& transform, const glm::vec2& destSize)
     m_SubVA.draw();
 }
 
+bool RasterNode::getRenderBounds(FRect& bounds) const
+{
+    return calcRenderBounds(glm::vec2(0,0), getSize(), bounds);
+}
+
+bool RasterNode::calcRenderBounds(const glm::vec2& offset, const glm::vec2& destSize,
+        FRect& bounds) const
+{
+    // Vertex and FX coordinates are relative to the destination size, so warped
+    // vertices and effects that draw outside the node are accounted for.
+    if (m_pSurface->getSize() == IntPoint(-1,-1)) {
+        return false;
+    }
+    FRect relRect;
+    if (m_pFXNode) {
+        if (!m_pFXNode->hasFilter()) {
+            // The effect hasn't been set up yet.
+            return false;
+        }
+        relRect = m_pFXNode->getRelDestRect();
+    } else {
+        if (m_TileVertices.empty() || m_TileVertices[0].empty()) {
+            return false;
+        }
+        relRect = FRect(m_TileVertices[0][0], m_TileVertices[0][0]);
+        for (unsigned y = 0; y < m_TileVertices.size(); y++) {
+            for (unsigned x = 0; x < m_TileVertices[y].size(); x++) {
+                relRect.tl = glm::min(relRect.tl, m_TileVertices[y][x]);
+                relRect.br = glm::max(relRect.br, m_TileVertices[y][x]);
+            }
+        }
+    }
+    FRect localRect(offset+relRect.tl*destSize, offset+relRect.br*destSize);
+    bounds = localToParentBounds(localRect);
+    return true;
+}
+
+bool RasterNode::isBatchable() const
+{
+    return false;
+}
+
+bool RasterNode::canBatchWith(const RasterNode* pOther) const
+{
+    return m_BlendMode == pOther->m_BlendMode && 
+            getEffectiveOpacity() == pOther->getEffectiveOpacity() &&
+            m_pSurface->sharesShaderState(*(pOther->m_pSurface));
+}
+
+void RasterNode::appendBatchVertexes(const VertexArrayPtr& pVA, 
+        const glm::mat4& parentTransform)
+{
+    // The vertexes are transformed to the coordinate system of the parent, so all 
+    // nodes in a batch can share one shader transform.
+    updateTransform(parentTransform);
+    glm::vec2 size = getSize();
+    glm::mat4 transform = glm::scale(getLocalTransform(), glm::vec3(size.x, size.y, 1));
+    for (unsigned y = 0; y < m_TileVertices.size()-1; y++) {
+        for (unsigned x = 0; x < m_TileVertices[0].size()-1; x++) {
+            int curVertex = pVA->getNumVerts();
+            for (int i = 0; i < 4; ++i) {
+                unsigned tileX = (i == 1 || i == 2) ? x+1 : x;
+                unsigned tileY = (i >= 2) ? y+1 : y;
+                const glm::vec2& pos = m_TileVertices[tileY][tileX];
+                glm::vec4 transformedPos = transform*glm::vec4(pos.x, pos.y, 0, 1);
+                pVA->appendPos(glm::vec2(transformedPos), m_TexCoords[tileY][tileX], 
+                        m_Color);
+            }
+            pVA->appendQuadIndexes(curVertex+1, curVertex, curVertex+2, curVertex+3);
+        }
+    }
+}
+
+void RasterNode::activateBatch(const glm::mat4& parentTransform)
+{
+    GLContext* pContext = GLContext::getCurrent();
+    StandardShaderPtr pShader = pContext->getStandardShader();
+    float opacity = getEffectiveOpacity();
+    pContext->setBlendColor(glm::vec4(1.0f, 1.0f, 1.0f, opacity));
+    pShader->setAlpha(opacity);
+    m_pSurface->activate(getMediaSize());
+    pContext->setBlendMode(m_BlendMode, m_pSurface->isPremultipliedAlpha());
+    pShader->setTransform(parentTransform);
+    pShader->activate();
+}
+
+bool RasterNode::canRenderBatched() const
+{
+    return isVisible() && !m_pFXNode && m_sMaskFilename == "" && 
+            m_pSurface->isCreated();
+}
+
+bool RasterNode::canUseTextureAtlas() const
+{
+    return !m_pFXNode && m_sMaskFilename == "";
+}
+
+void RasterNode::updateTextureAtlasUse()
+{
+}
+
 IntPoint RasterNode::getNumTiles()
 {
     IntPoint size = m_pSurface->getSize();
@@ -581,10 +702,10 @@ void RasterNode::calcTileVertex(int x, int y, glm::vec2& Vertex)
 
 void RasterNode::calcTexCoords()
 {
-    glm::vec2 textureSize = glm::vec2(m_pSurface->getTextureSize());
+    FRect texCoordRect = m_pSurface->getTexCoordRect();
     glm::vec2 imageSize = glm::vec2(m_pSurface->getSize());
-    glm::vec2 texCoordExtents = glm::vec2(imageSize.x/textureSize.x,
-            imageSize.y/textureSize.y);
+    glm::vec2 texCoordOffset = texCoordRect.tl;
+    glm::vec2 texCoordExtents = texCoordRect.size();
 
     glm::vec2 texSizePerTile;
     if (m_TileSize.x == -1) {
@@ -610,6 +731,7 @@ void RasterNode::calcTexCoords()
             } else {
                 m_TexCoords[y][x].x = texSizePerTile.x*x;
             }
+            m_TexCoords[y][x] += texCoordOffset;
         }
     }
 }
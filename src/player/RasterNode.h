@@ -92,6 +92,16 @@ class AVG_API RasterNode: public AreaNode
         virtual void renderFX();
         void resetFXDirty();
 
+        virtual bool getRenderBounds(FRect& bounds) const;
+
+        // Render batching: Consecutive siblings that can be batched together are
+        // drawn with one draw call.
+        virtual bool isBatchable() const;
+        bool canBatchWith(const RasterNode* pOther) const;
+        void appendBatchVertexes(const VertexArrayPtr& pVA, 
+                const glm::mat4& parentTransform);
+        void activateBatch(const glm::mat4& parentTransform);
+
     protected:
         RasterNode();
         
@@ -108,6 +118,14 @@ class AVG_API RasterNode: public AreaNode
 
         void newSurface();
         void setupFX();
+        bool canRenderBatched() const;
+        // Bounds of the rendered quads, placed at offset in local coordinates.
+        bool calcRenderBounds(const glm::vec2& offset, const glm::vec2& destSize,
+                FRect& bounds) const;
+        // Masks and effects use texture coordinates that span the whole texture, so
+        // they can't be combined with atlas textures.
+        bool canUseTextureAtlas() const;
+        virtual void updateTextureAtlasUse();
 
     private:
         void downloadMask();
@@ -35,6 +35,7 @@ namespace avg {
 
 SubscriberInfo::SubscriberInfo(int id, PyObject* pCallable)
     : m_ID(id),
+      m_bUnsubscribed(false),
       m_pWeakSelf(Py_None),
       m_pPyFunction(Py_None),
       m_pWeakClass(Py_None)
@@ -132,4 +133,14 @@ bool SubscriberInfo::isCallable(const PyObject* pCallable) const
     }
 }
 
+void SubscriberInfo::setUnsubscribed()
+{
+    m_bUnsubscribed = true;
+}
+
+bool SubscriberInfo::isUnsubscribed() const
+{
+    return m_bUnsubscribed;
+}
+
 }
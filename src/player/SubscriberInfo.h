@@ -44,9 +44,12 @@ public:
     void invoke(py::list args) const;
     int getID() const;
     bool isCallable(const PyObject* pCallable) const;
+    void setUnsubscribed();
+    bool isUnsubscribed() const;
 
 private:
     int m_ID;
+    bool m_bUnsubscribed;
     PyObject* m_pWeakSelf;
     PyObject* m_pPyFunction;
     PyObject* m_pWeakClass;
@@ -112,14 +112,10 @@ std::vector<EventPtr> TestHelper::pollEvents()
     map<int, TouchStatusPtr>::iterator it;
     for (it = m_Touches.begin(); it != m_Touches.end(); ) {
         TouchStatusPtr pTouchStatus = it->second;
-        CursorEventPtr pEvent = pTouchStatus->pollEvent();
-        if (pEvent) {
-            events.push_back(pEvent);
-            if (pEvent->getType() == Event::CURSOR_UP) {
-                m_Touches.erase(it++);
-            } else {
-                ++it;
-            }
+        vector<CursorEventPtr> touchEvents = pTouchStatus->pollEvents();
+        events.insert(events.end(), touchEvents.begin(), touchEvents.end());
+        if (!touchEvents.empty() && touchEvents.back()->getType() == Event::CURSOR_UP) {
+            m_Touches.erase(it++);
         } else {
             ++it;
         }
@@ -0,0 +1,144 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#include "ThreadChannel.h"
+
+#include "../base/Exception.h"
+#include "../base/ObjectCounter.h"
+#include "../base/ThreadHelper.h"
+
+using namespace std;
+
+namespace avg {
+
+ThreadChannel::ThreadChannel(PyObject* pCallable, int maxSize)
+    : m_Callable(py::handle<>(py::borrowed(pCallable))),
+      m_MaxSize(maxSize),
+      m_bClosed(false),
+      m_NumDropped(0),
+      m_NumCoalesced(0)
+{
+    if (maxSize < 1) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE,
+                "ThreadChannel: maxsize must be at least 1.");
+    }
+    ObjectCounter::get()->incRef(&typeid(*this));
+    m_Payloads.reserve(maxSize);
+}
+
+ThreadChannel::~ThreadChannel()
+{
+    ObjectCounter::get()->decRef(&typeid(*this));
+}
+
+bool ThreadChannel::post(const py::object& payload, const string& sKey)
+{
+    // The payload replaced by coalescing is released after the lock is gone: its
+    // destructor may run python code that switches threads.
+    py::object oldPayload;
+    {
+        lock_guard lock(m_Mutex);
+        if (m_bClosed) {
+            return false;
+        }
+        if (!sKey.empty()) {
+            map<string, unsigned>::iterator it = m_KeyIndexes.find(sKey);
+            if (it != m_KeyIndexes.end()) {
+                oldPayload = m_Payloads[it->second];
+                m_Payloads[it->second] = payload;
+                m_NumCoalesced++;
+                return true;
+            }
+        }
+        if (int(m_Payloads.size()) >= m_MaxSize) {
+            m_NumDropped++;
+            return false;
+        }
+        if (!sKey.empty()) {
+            m_KeyIndexes[sKey] = m_Payloads.size();
+        }
+        m_Payloads.push_back(payload);
+    }
+    return true;
+}
+
+void ThreadChannel::dispatch()
+{
+    vector<py::object> payloads;
+    {
+        lock_guard lock(m_Mutex);
+        if (m_Payloads.empty()) {
+            return;
+        }
+        payloads.reserve(m_MaxSize);
+        payloads.swap(m_Payloads);
+        m_KeyIndexes.clear();
+    }
+    py::list payloadList;
+    for (unsigned i = 0; i < payloads.size(); ++i) {
+        payloadList.append(payloads[i]);
+    }
+    py::call<void>(m_Callable.ptr(), payloadList);
+}
+
+void ThreadChannel::close()
+{
+    vector<py::object> payloads;
+    {
+        lock_guard lock(m_Mutex);
+        m_bClosed = true;
+        payloads.swap(m_Payloads);
+        m_KeyIndexes.clear();
+    }
+    m_Callable = py::object();
+}
+
+bool ThreadChannel::isClosed() const
+{
+    lock_guard lock(m_Mutex);
+    return m_bClosed;
+}
+
+int ThreadChannel::getMaxSize() const
+{
+    return m_MaxSize;
+}
+
+int ThreadChannel::getNumPending() const
+{
+    lock_guard lock(m_Mutex);
+    return int(m_Payloads.size());
+}
+
+int ThreadChannel::getNumDropped() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumDropped;
+}
+
+int ThreadChannel::getNumCoalesced() const
+{
+    lock_guard lock(m_Mutex);
+    return m_NumCoalesced;
+}
+
+}
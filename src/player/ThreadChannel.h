@@ -0,0 +1,77 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+
+#ifndef _ThreadChannel_H_
+#define _ThreadChannel_H_
+
+#include "../api.h"
+
+#include "BoostPython.h"
+// Python docs say python.h should be included before any standard headers (!)
+#include "WrapPython.h" 
+
+#include <boost/shared_ptr.hpp>
+#include <boost/thread/mutex.hpp>
+
+#include <map>
+#include <string>
+#include <vector>
+
+namespace avg {
+
+// Batched channel from arbitrary threads to the main thread. Payloads are queued
+// by post() and handed to the callback as one list per frame. Payloads posted with
+// the same key replace each other until the next frame. Posting to a full channel
+// drops the payload.
+class AVG_API ThreadChannel
+{
+public:
+    ThreadChannel(PyObject* pCallable, int maxSize);
+    virtual ~ThreadChannel();
+
+    bool post(const py::object& payload, const std::string& sKey);
+    void dispatch();
+    void close();
+    bool isClosed() const;
+
+    int getMaxSize() const;
+    int getNumPending() const;
+    int getNumDropped() const;
+    int getNumCoalesced() const;
+
+private:
+    py::object m_Callable;
+    int m_MaxSize;
+    bool m_bClosed;
+
+    std::vector<py::object> m_Payloads;
+    std::map<std::string, unsigned> m_KeyIndexes;
+    int m_NumDropped;
+    int m_NumCoalesced;
+    mutable boost::mutex m_Mutex;
+};
+
+typedef boost::shared_ptr<ThreadChannel> ThreadChannelPtr;
+
+}
+
+#endif
@@ -85,6 +85,11 @@ int Timeout::getID() const
     return m_ID;
 }
 
+long long Timeout::getNextTimeout() const
+{
+    return m_NextTimeout;
+}
+
 bool Timeout::operator <(const Timeout& other) const
 {
     return m_NextTimeout < other.m_NextTimeout;
@@ -38,6 +38,7 @@ class AVG_API Timeout
         bool isInterval() const;
         void fire(long long curTime);
         int getID() const;
+        long long getNextTimeout() const;
         bool operator <(const Timeout& other) const;
 
     private:
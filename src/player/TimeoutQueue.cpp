@@ -0,0 +1,150 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#include "TimeoutQueue.h"
+
+#include "../base/Exception.h"
+
+#include <algorithm>
+
+using namespace std;
+
+namespace avg {
+
+// The heap is rebuilt without removed entries if there are more of these than this
+// and more than valid ones.
+static const unsigned MIN_COMPACT_SIZE = 64;
+
+TimeoutQueue::TimeoutQueue()
+    : m_NextSeq(0)
+{
+}
+
+TimeoutQueue::~TimeoutQueue()
+{
+    clear();
+}
+
+void TimeoutQueue::push(Timeout* pTimeout)
+{
+    AVG_ASSERT(m_Timeouts.find(pTimeout->getID()) == m_Timeouts.end());
+    m_Timeouts[pTimeout->getID()] = pTimeout;
+    m_Heap.push_back(Entry(pTimeout->getNextTimeout(), m_NextSeq, pTimeout->getID()));
+    m_NextSeq++;
+    push_heap(m_Heap.begin(), m_Heap.end());
+}
+
+Timeout* TimeoutQueue::peek()
+{
+    while (!m_Heap.empty() && isRemoved(m_Heap.front())) {
+        pop_heap(m_Heap.begin(), m_Heap.end());
+        m_Heap.pop_back();
+    }
+    if (m_Heap.empty()) {
+        return 0;
+    } else {
+        return m_Timeouts[m_Heap.front().m_ID];
+    }
+}
+
+Timeout* TimeoutQueue::pop()
+{
+    Timeout* pTimeout = peek();
+    if (pTimeout) {
+        pop_heap(m_Heap.begin(), m_Heap.end());
+        m_Heap.pop_back();
+        m_Timeouts.erase(pTimeout->getID());
+    }
+    return pTimeout;
+}
+
+bool TimeoutQueue::remove(int id)
+{
+    boost::unordered_map<int, Timeout*>::iterator it = m_Timeouts.find(id);
+    if (it == m_Timeouts.end()) {
+        return false;
+    }
+    delete it->second;
+    m_Timeouts.erase(it);
+    unsigned numRemoved = m_Heap.size()-m_Timeouts.size();
+    if (numRemoved > MIN_COMPACT_SIZE && numRemoved > m_Timeouts.size()) {
+        compact();
+    }
+    return true;
+}
+
+void TimeoutQueue::clear()
+{
+    boost::unordered_map<int, Timeout*>::iterator it;
+    for (it = m_Timeouts.begin(); it != m_Timeouts.end(); ++it) {
+        delete it->second;
+    }
+    m_Timeouts.clear();
+    m_Heap.clear();
+}
+
+bool TimeoutQueue::empty() const
+{
+    return m_Timeouts.empty();
+}
+
+unsigned TimeoutQueue::size() const
+{
+    return m_Timeouts.size();
+}
+
+TimeoutQueue::Entry::Entry(long long time, long long seq, int id)
+    : m_Time(time),
+      m_Seq(seq),
+      m_ID(id)
+{
+}
+
+bool TimeoutQueue::Entry::operator <(const Entry& other) const
+{
+    // std::push_heap() and friends keep the largest entry at the top, so an entry is
+    // 'less' if it's due later. 
+    if (m_Time != other.m_Time) {
+        return m_Time > other.m_Time;
+    } else {
+        return m_Seq < other.m_Seq;
+    }
+}
+
+bool TimeoutQueue::isRemoved(const Entry& entry) const
+{
+    return m_Timeouts.find(entry.m_ID) == m_Timeouts.end();
+}
+
+void TimeoutQueue::compact()
+{
+    vector<Entry> heap;
+    heap.reserve(m_Timeouts.size());
+    for (unsigned i = 0; i < m_Heap.size(); ++i) {
+        if (!isRemoved(m_Heap[i])) {
+            heap.push_back(m_Heap[i]);
+        }
+    }
+    make_heap(heap.begin(), heap.end());
+    m_Heap.swap(heap);
+}
+
+}
@@ -0,0 +1,78 @@
+//
+//  libavg - Media Playback Engine. 
+//  Copyright (C) 2003-2014 Ulrich von Zadow
+//
+//  This library is free software; you can redistribute it and/or
+//  modify it under the terms of the GNU Lesser General Public
+//  License as published by the Free Software Foundation; either
+//  version 2 of the License, or (at your option) any later version.
+//
+//  This library is distributed in the hope that it will be useful,
+//  but WITHOUT ANY WARRANTY; without even the implied warranty of
+//  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+//  Lesser General Public License for more details.
+//
+//  You should have received a copy of the GNU Lesser General Public
+//  License along with this library; if not, write to the Free Software
+//  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+//
+//  Current versions can be found at www.libavg.de
+//
+
+#ifndef _TimeoutQueue_H_
+#define _TimeoutQueue_H_
+
+#include "../api.h"
+#include "Timeout.h"
+
+#include <boost/unordered_map.hpp>
+
+#include <vector>
+
+namespace avg {
+
+// Pending timeouts ordered by the time they are due. Timeouts that are due at the same
+// time are ordered last-in, first-out. Adding and removing the first timeout are
+// O(log n). Removing arbitrary timeouts is O(1): They are only marked as removed and
+// skipped when they reach the top of the heap. The queue owns the timeouts it
+// contains.
+class AVG_API TimeoutQueue
+{
+    public:
+        TimeoutQueue();
+        virtual ~TimeoutQueue();
+
+        void push(Timeout* pTimeout);
+        // Returns the timeout that is due first or NULL if the queue is empty.
+        Timeout* peek();
+        // Removes the timeout that is due first and returns it. The caller takes
+        // ownership.
+        Timeout* pop();
+        // Deletes the timeout with the given id. Returns false if it isn't in the queue.
+        bool remove(int id);
+        void clear();
+
+        bool empty() const;
+        unsigned size() const;
+
+    private:
+        struct Entry {
+            Entry(long long time, long long seq, int id);
+            bool operator <(const Entry& other) const;
+
+            long long m_Time;
+            long long m_Seq;
+            int m_ID;
+        };
+
+        bool isRemoved(const Entry& entry) const;
+        void compact();
+
+        std::vector<Entry> m_Heap;
+        boost::unordered_map<int, Timeout*> m_Timeouts;
+        long long m_NextSeq;
+};
+
+}
+
+#endif
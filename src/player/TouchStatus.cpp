@@ -34,6 +34,8 @@ using namespace std;
 
 namespace avg {
 
+bool TouchStatus::s_bKeepAllEvents = false;
+
 TouchStatus::TouchStatus(CursorEventPtr pEvent)
     : m_bFirstFrame(true),
       m_CursorID(pEvent->getCursorID())
@@ -66,7 +68,7 @@ void TouchStatus::pushEvent(CursorEventPtr pEvent, bool bCheckMotion)
             // Ignore motion events without motion.
             return;
         } else {
-            if (m_pNewEvents.empty()) {
+            if (m_pNewEvents.empty() || s_bKeepAllEvents) {
                 // No pending events: schedule for delivery.
                 m_pNewEvents.push_back(pEvent);
             } else {
@@ -90,6 +92,24 @@ CursorEventPtr TouchStatus::pollEvent()
     }
 }
 
+vector<CursorEventPtr> TouchStatus::pollEvents()
+{
+    vector<CursorEventPtr> events;
+    CursorEventPtr pEvent = pollEvent();
+    if (pEvent) {
+        events.push_back(pEvent);
+        // A cursor down is always delivered in a frame of its own.
+        if (s_bKeepAllEvents && pEvent->getType() != Event::CURSOR_DOWN) {
+            events.insert(events.end(), m_pNewEvents.begin(), m_pNewEvents.end());
+            if (!m_pNewEvents.empty()) {
+                m_pLastEvent = m_pNewEvents.back();
+                m_pNewEvents.clear();
+            }
+        }
+    }
+    return events;
+}
+
 CursorEventPtr TouchStatus::getLastEvent()
 {
     if (m_pNewEvents.empty()) {
@@ -105,5 +125,10 @@ int TouchStatus::getID() const
     return m_CursorID;
 }
 
+void TouchStatus::setKeepAllEvents(bool bKeep)
+{
+    s_bKeepAllEvents = bKeep;
+}
+
 }
 
@@ -40,11 +40,18 @@ public:
 
     void pushEvent(CursorEventPtr pEvent, bool bCheckMotion=true);
     CursorEventPtr pollEvent();
+    std::vector<CursorEventPtr> pollEvents();
     CursorEventPtr getLastEvent();
 
     int getID() const;
 
+    // If set, all motion events pushed between two polls are delivered instead of
+    // only the last one.
+    static void setKeepAllEvents(bool bKeep);
+
 private:
+    static bool s_bKeepAllEvents;
+
     CursorEventPtr m_pLastEvent;
     std::vector<CursorEventPtr> m_pNewEvents;
 
@@ -138,6 +138,7 @@ void VectorNode::setBlendModeStr(const string& sBlendMode)
 {
     m_sBlendMode = sBlendMode;
     m_BlendMode = GLContext::stringToBlendMode(sBlendMode);
+    setRenderDirty();
 }
 
 static ProfilingZoneID PrerenderProfilingZone("VectorNode::prerender");
@@ -187,7 +188,7 @@ void VectorNode::setColor(const string& sColor)
     if (m_sColorName != sColor) {
         m_sColorName = sColor;
         m_Color = colorStringToColor(m_sColorName);
-        m_bDrawNeeded = true;
+        setDrawNeeded();
     }
 }
 
@@ -199,7 +200,7 @@ const string& VectorNode::getColor() const
 void VectorNode::setStrokeWidth(float width)
 {
     if (width != m_StrokeWidth) {
-        m_bDrawNeeded = true;
+        setDrawNeeded();
         m_StrokeWidth = width;
     }
 }
@@ -247,6 +248,7 @@ string VectorNode::lineJoin2String(LineJoin lineJoin)
 void VectorNode::setDrawNeeded()
 {
     m_bDrawNeeded = true;
+    setRenderDirty();
 }
         
 bool VectorNode::isDrawNeeded()
@@ -428,10 +428,12 @@ void VideoNode::changeVideoState(VideoState newVideoState)
         }
     }
     m_VideoState = newVideoState;
+    setRenderDirty();
 }
 
 void VideoNode::seek(long long destTime) 
 {
+    setRenderDirty();
     if (getState() == NS_CANRENDER) {    
         if (m_AudioID != -1) {
             AudioEngine::get()->notifySeek(m_AudioID);
@@ -657,6 +659,9 @@ void VideoNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
             if (m_bFirstFrameDecoded) {
                 scheduleFXRender();
             }
+            if (m_VideoState == Playing || !m_bFrameAvailable || m_bSeekPending) {
+                setRenderDirty();
+            }
         }
     } else {
         if (m_VideoState != Unloaded && m_bSeekPending && m_bFirstFrameDecoded) {
@@ -665,6 +670,7 @@ void VideoNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
         if (m_VideoState == Playing) {
             // Throw away frames that are not visible to make sure the video 
             // stays in sync.
+            setRenderDirty();
             m_pDecoder->throwAwayFrame(getNextFrameTime()/1000.0f);
 
             if (m_pDecoder->isEOF()) {
@@ -675,6 +681,13 @@ void VideoNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
     calcVertexArray(pVA);
 }
 
+void VideoNode::preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+        float parentEffectiveOpacity)
+{
+    // Decoding needs to continue so the video stays in sync.
+    preRender(pVA, bIsParentActive, parentEffectiveOpacity);
+}
+
 static ProfilingZoneID RenderProfilingZone("VideoNode::render");
 
 void VideoNode::render()
@@ -95,6 +95,8 @@ class AVG_API VideoNode: public RasterNode, IFrameEndListener
 
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
+        virtual void preRenderCulled(const VertexArrayPtr& pVA, bool bIsParentActive, 
+                float parentEffectiveOpacity);
         virtual void render();
         virtual void onFrameEnd();
         
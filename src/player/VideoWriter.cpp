@@ -21,6 +21,7 @@
 
 #include "VideoWriter.h"
 #include "OffscreenCanvas.h"
+#include "MainCanvas.h"
 #include "Player.h"
 #include "DisplayEngine.h"
 #include "Window.h"
@@ -227,6 +228,7 @@ void VideoWriter::getFrameFromFBO()
         pOldContext->activate();
         m_bFramePending = true;
     } else {
+        dynamic_pointer_cast<MainCanvas>(m_pCanvas)->restoreBackBuffer();
         BitmapPtr pBmp = Player::get()->getDisplayEngine()->screenshot(GL_BACK);
         sendFrameToEncoder(pBmp);
     }
@@ -629,6 +629,7 @@ void WordsNode::updateLayout()
         m_bRenderNeeded = true;
         setViewport(-32767, -32767, -32767, -32767);
     }
+    setRenderDirty();
 }
 
 static ProfilingZoneID RenderTextProfilingZone("WordsNode: render text");
@@ -705,6 +706,16 @@ void WordsNode::preRender(const VertexArrayPtr& pVA, bool bIsParentActive,
     calcVertexArray(pVA);
 }
 
+bool WordsNode::getRenderBounds(FRect& bounds) const
+{
+    if (m_bRenderNeeded || m_sText.length() == 0) {
+        // The text texture will be recreated in preRender.
+        return false;
+    }
+    glm::vec2 offset(m_InkOffset + IntPoint(m_AlignOffset, 0));
+    return calcRenderBounds(offset, glm::vec2(m_InkSize), bounds);
+}
+
 static ProfilingZoneID RenderProfilingZone("WordsNode::render");
 
 void WordsNode::render()
@@ -49,6 +49,7 @@ class AVG_API WordsNode : public RasterNode
         virtual void preRender(const VertexArrayPtr& pVA, bool bIsParentActive, 
                 float parentEffectiveOpacity);
         virtual void render();
+        virtual bool getRenderBounds(FRect& bounds) const;
 
         virtual float getWidth() const;
         virtual void setWidth(float width);
@@ -25,5 +25,6 @@ import utils, methodref
 import gesture
 import filter
 import persist
+import tasks
 import app
 
@@ -19,12 +19,72 @@
 # Current versions can be found at www.libavg.de
 #
 
-from libavg import avg, statemachine, player, filter
+from libavg import avg, statemachine, player
+from libavg.methodref import methodref
 
 import weakref
+import collections
 
 import math
 
+
+class _FrameDispatcher(object):
+    """ Calls the per-frame handlers of all recognizers from a single player.ON_FRAME 
+        subscription, so the cost of a frame doesn't grow with the number of Publisher
+        subscribers. Like Publisher subscriptions, handlers are called newest first and
+        bound methods don't keep their objects alive."""
+
+    def __init__(self):
+        self.__handlers = collections.OrderedDict()
+        self.__lastHandlerID = 0
+        self.__subscriberID = None
+
+    def subscribe(self, handler):
+        if (self.__subscriberID != None and 
+                not(player.isSubscribed(player.ON_FRAME, self.__subscriberID))):
+            # Player.stop() removes all subscribers, including the handlers of 
+            # recognizers that were active at that time.
+            self.__handlers.clear()
+            self.__subscriberID = None
+        self.__lastHandlerID += 1
+        self.__handlers[self.__lastHandlerID] = methodref(handler)
+        if self.__subscriberID == None:
+            self.__subscriberID = player.subscribe(player.ON_FRAME, self.__onFrame)
+        return self.__lastHandlerID
+
+    def unsubscribe(self, handlerID):
+        if handlerID in self.__handlers:
+            del self.__handlers[handlerID]
+            if not(self.__handlers):
+                if player.isSubscribed(player.ON_FRAME, self.__subscriberID):
+                    player.unsubscribe(player.ON_FRAME, self.__subscriberID)
+                self.__subscriberID = None
+
+    def getNumHandlers(self):
+        return len(self.__handlers)
+
+    def __onFrame(self):
+        # Handlers subscribed during this frame are called in the next one.
+        for handlerID in reversed(self.__handlers.keys()):
+            ref = self.__handlers.get(handlerID)
+            if ref:
+                handler = ref()
+                if handler:
+                    handler()
+                else:
+                    self.unsubscribe(handlerID)
+
+_frameDispatcher = _FrameDispatcher()
+
+
+def _createStateMachineTemplate(name, states):
+    template = statemachine.StateMachine(name, "IDLE")
+    for state, transitions in states:
+        template.addState(state, transitions)
+    template.freeze()
+    return template
+
+
 class Recognizer(avg.Publisher):
 
     POSSIBLE = avg.Publisher.genMessageID()
@@ -34,6 +94,15 @@ class Recognizer(avg.Publisher):
     UP = avg.Publisher.genMessageID()
     END = avg.Publisher.genMessageID()
 
+    # All recognizers share these immutable state machine definitions.
+    __continuousStates = _createStateMachineTemplate("Recognizer", 
+            (("IDLE", ("POSSIBLE", "RUNNING")),
+             ("POSSIBLE", ("IDLE", "RUNNING")),
+             ("RUNNING", ("IDLE",))))
+    __discreteStates = _createStateMachineTemplate("Recognizer",
+            (("IDLE", ("POSSIBLE",)),
+             ("POSSIBLE", ("IDLE",))))
+
     def __init__(self, node, isContinuous, maxContacts, initialEvent,
             possibleHandler=None, failHandler=None, detectedHandler=None,
             endHandler=None):
@@ -59,16 +128,14 @@ class Recognizer(avg.Publisher):
         self.publish(Recognizer.DETECTED)
         self.publish(Recognizer.FAILED)
         self.publish(Recognizer.END)
-        self.__stateMachine = statemachine.StateMachine(str(type(self)), "IDLE")
         if self.__isContinuous:
             self.publish(Recognizer.MOTION)
             self.publish(Recognizer.UP)
-            self.__stateMachine.addState("IDLE", ("POSSIBLE", "RUNNING"))
-            self.__stateMachine.addState("POSSIBLE", ("IDLE", "RUNNING"))
-            self.__stateMachine.addState("RUNNING", ("IDLE",))
+            template = Recognizer.__continuousStates
         else:
-            self.__stateMachine.addState("IDLE", ("POSSIBLE",))
-            self.__stateMachine.addState("POSSIBLE", ("IDLE",))
+            template = Recognizer.__discreteStates
+        self.__stateMachine = statemachine.StateMachine(str(type(self)), "IDLE",
+                template)
 
         self.subscribe(Recognizer.POSSIBLE, possibleHandler)
         self.subscribe(Recognizer.FAILED, failHandler)
@@ -100,6 +167,20 @@ class Recognizer(avg.Publisher):
     def isEnabled(self):
         return self.__isEnabled
 
+    def reset(self):
+        self.abort()
+        self.enable(True)
+
+    def rebind(self, node):
+        self.abort()
+        self.__unsubscribeDown()
+        if node:
+            self.__node = weakref.ref(node)
+        else:
+            self.__node = None
+        if self.__isEnabled:
+            self.__setEventHandler()
+
     def getState(self):
         return self.__stateMachine.state
 
@@ -138,8 +219,7 @@ class Recognizer(avg.Publisher):
                         avg.Contact.CURSOR_UP, self.__onUp)
                 self._contacts.add(event.contact)
                 if len(self._contacts) == 1:
-                    self.__frameHandlerID = player.subscribe(player.ON_FRAME, 
-                            self._onFrame)
+                    self.__frameHandlerID = _frameDispatcher.subscribe(self._onFrame)
                 self.__dirty = True
                 return self._handleDown(event)
 
@@ -155,7 +235,7 @@ class Recognizer(avg.Publisher):
             self.__dirty = True
             self._contacts.remove(event.contact)
             if len(self._contacts) == 0:
-                player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
+                _frameDispatcher.unsubscribe(self.__frameHandlerID)
                 self.__frameHandlerID = None
             self._handleUp(event)
 
@@ -164,9 +244,12 @@ class Recognizer(avg.Publisher):
             self.__stateMachine.changeState("IDLE")
         if len(self._contacts) != 0:
             self._disconnectContacts()
-        if self.__node and self.__node():
+        self.__unsubscribeDown()
+
+    def __unsubscribeDown(self):
+        if self.__node and self.__node() and self.__downHandlerID != None:
             self.__node().unsubscribe(avg.Node.CURSOR_DOWN, self.__downHandlerID)
-            self.__downHandlerID = None
+        self.__downHandlerID = None
 
     def _disconnectContacts(self):
         for contact in self._contacts:
@@ -176,7 +259,7 @@ class Recognizer(avg.Publisher):
         self.__upHandlerID = {}
         self._contacts = set()
         if self.__frameHandlerID:
-            player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
+            _frameDispatcher.unsubscribe(self.__frameHandlerID)
             self.__frameHandlerID = None
 
     def _handleDown(self, event):
@@ -253,6 +336,12 @@ class DoubletapRecognizer(Recognizer):
 
     MAX_DOUBLETAP_TIME = None
 
+    __states = _createStateMachineTemplate("DoubletapRecognizer",
+            (("IDLE", ("DOWN1",)),
+             ("DOWN1", ("UP1", "IDLE")),
+             ("UP1", ("DOWN2", "IDLE")),
+             ("DOWN2", ("IDLE",))))
+
     def __init__(self, node, maxTime=None, maxDist=None, initialEvent=None,
             possibleHandler=None, failHandler=None, detectedHandler=None):
         if maxTime == None:
@@ -262,11 +351,8 @@ class DoubletapRecognizer(Recognizer):
             maxDist = TapRecognizer.MAX_TAP_DIST
         self.__maxDist = maxDist
 
-        self.__stateMachine = statemachine.StateMachine("DoubletapRecognizer", "IDLE")
-        self.__stateMachine.addState("IDLE", ("DOWN1",), enterFunc=self.__enterIdle)
-        self.__stateMachine.addState("DOWN1", ("UP1", "IDLE"))
-        self.__stateMachine.addState("UP1", ("DOWN2", "IDLE"))
-        self.__stateMachine.addState("DOWN2", ("IDLE",))
+        self.__stateMachine = statemachine.StateMachine("DoubletapRecognizer", "IDLE",
+                DoubletapRecognizer.__states)
         #self.__stateMachine.traceChanges(True)
         self.__frameHandlerID = None
         super(DoubletapRecognizer, self).__init__(node, False, 1, 
@@ -274,25 +360,25 @@ class DoubletapRecognizer(Recognizer):
 
     def abort(self):
         if self.__stateMachine.state != "IDLE":
-            self.__stateMachine.changeState("IDLE")
+            self.__setIdle()
         super(DoubletapRecognizer, self).abort()
 
     def enable(self, isEnabled):
         if self.__stateMachine.state != "IDLE":
-            self.__stateMachine.changeState("IDLE")
+            self.__setIdle()
         super(DoubletapRecognizer, self).enable(isEnabled)
 
     def _handleDown(self, event):
         self.__startTime = player.getFrameTime()
         if self.__stateMachine.state == "IDLE":
-            self.__frameHandlerID = player.subscribe(player.ON_FRAME, self.__onFrame)
+            self.__frameHandlerID = _frameDispatcher.subscribe(self.__onFrame)
             self.__stateMachine.changeState("DOWN1")
             self.__startPos = event.pos
             self._setPossible(event)
         elif self.__stateMachine.state == "UP1":
             if ((event.pos - self.__startPos).getNorm() > 
                     self.__maxDist*player.getPixelsPerMM()):
-                self.__stateMachine.changeState("IDLE")
+                self.__setIdle()
                 self._setFail(event)
             else:
                 self.__stateMachine.changeState("DOWN2")
@@ -303,7 +389,7 @@ class DoubletapRecognizer(Recognizer):
         if self.__stateMachine.state != "IDLE": 
             if ((event.pos - self.__startPos).getNorm() > 
                     self.__maxDist*player.getPixelsPerMM()):
-                self.__stateMachine.changeState("IDLE")
+                self.__setIdle()
                 self._setFail(event)
 
     def _handleUp(self, event):
@@ -316,7 +402,7 @@ class DoubletapRecognizer(Recognizer):
                 self._setFail(event)
             else:
                 self._setDetected(event)
-            self.__stateMachine.changeState("IDLE")
+            self.__setIdle()
         elif self.__stateMachine.state == "IDLE":
             pass
         else:
@@ -326,10 +412,12 @@ class DoubletapRecognizer(Recognizer):
         downTime = player.getFrameTime() - self.__startTime
         if downTime > self.__maxTime:
             self._setFail(None)
-            self.__stateMachine.changeState("IDLE")
+            self.__setIdle()
 
-    def __enterIdle(self):
-        player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
+    def __setIdle(self):
+        self.__stateMachine.changeState("IDLE")
+        _frameDispatcher.unsubscribe(self.__frameHandlerID)
+        self.__frameHandlerID = None
 
 
 class SwipeRecognizer(Recognizer):
@@ -497,6 +585,14 @@ class DragRecognizer(Recognizer):
         self.__inertiaHandler = None
         super(DragRecognizer, self).abort()
 
+    def rebind(self, eventNode, coordSysNode=None):
+        self.abort()
+        if coordSysNode != None:
+            self.__coordSysNode = weakref.ref(coordSysNode)
+        else:
+            self.__coordSysNode = weakref.ref(eventNode)
+        super(DragRecognizer, self).rebind(eventNode)
+
     def _handleDown(self, event):
         if not self._handleCoordSysNodeUnlinked():
             if self.__inertiaHandler:
@@ -588,103 +684,8 @@ class DragRecognizer(Recognizer):
         else:
             return True
 
-class Mat3x3:
-    # Internal class. Will be removed again.
-
-    def __init__(self, row0=(1,0,0), row1=(0,1,0), row2=(0,0,1)):
-        self.m = [row0, row1, row2]
-
-    @classmethod
-    def translate(cls, t):
-        return Mat3x3([1, 0, t[0]],
-                      [0, 1, t[1]])
-
-    @classmethod
-    def rotate(cls, a):
-        return Mat3x3([math.cos(a), -math.sin(a), 0],
-                      [math.sin(a), math.cos(a), 0])
-
-    @classmethod
-    def pivotRotate(cls, t, a):
-        rot = Mat3x3.rotate(a)
-        trans = Mat3x3.translate(t)
-        return trans.applyMat(rot.applyMat(trans.inverse()))
-
-    @classmethod
-    def scale(cls, s):
-        return Mat3x3([s[0], 0, 0],
-                      [0, s[1], 0])
-
-    @classmethod
-    def fromNode(cls, node):
-        return Mat3x3.translate(node.pos).applyMat(
-                Mat3x3.translate(node.pivot).applyMat(
-                Mat3x3.rotate(node.angle).applyMat(
-                Mat3x3.translate(-node.pivot).applyMat(
-                Mat3x3.scale(node.size)))))
-
-    def setNodeTransform(self, node):
-        v = self.applyVec([1,0,0])
-        rot = avg.Point2D(v[0], v[1]).getAngle()
-        node.angle = rot
-        if self.getScale().x < 9999 and self.getScale().y < 9999:
-            node.size = self.getScale()
-        else:
-            node.size = (0,0)
-        node.pivot = node.size/2 
-        v = self.applyVec([0,0,1])
-        node.pos = (avg.Point2D(v[0], v[1]) + (node.pivot).getRotated(node.angle) - 
-                node.pivot)
-
-    def getScale(self):
-        v = self.applyVec([1,0,0])
-        xscale = avg.Point2D(v[0], v[1]).getNorm()
-        v = self.applyVec([0,1,0])
-        yscale = avg.Point2D(v[0], v[1]).getNorm()
-        return avg.Point2D(xscale, yscale)
-
-    def __str__(self):
-        return self.m.__str__()
-
-    def applyVec(self, v):
-        m = self.m
-        v1 = []
-        for i in range(3):
-            v1.append(m[i][0]*v[0] + m[i][1]*v[1] + m[i][2]*v[2])
-        return v1
-
-    def applyMat(self, m1):
-        m0 = self.m
-        result = Mat3x3() 
-        for i in range(3):
-            v = []
-            for j in range(3):
-                v.append(m0[i][0]*m1.m[0][j] + m0[i][1]*m1.m[1][j] + m0[i][2]*m1.m[2][j])
-            result.m[i] = v
-        return result
-
-    def det(self):
-        m = self.m
-        return float( m[0][0] * (m[2][2]*m[1][1]-m[2][1]*m[1][2])
-                     -m[1][0] * (m[2][2]*m[0][1]-m[2][1]*m[0][2])
-                     +m[2][0] * (m[1][2]*m[0][1]-m[1][1]*m[0][2]))
-
-    def scalarMult(self, s):
-        m = self.m
-        result = Mat3x3()
-        for i in range(3):
-            v = []
-            for j in range(3):
-                v.append(m[i][j]*s)
-            result.m[i] = v
-        return result
-
-    def inverse(self):
-        m = self.m
-        temp = Mat3x3([  m[2][2]*m[1][1]-m[2][1]*m[1][2],  -(m[2][2]*m[0][1]-m[2][1]*m[0][2]),   m[1][2]*m[0][1]-m[1][1]*m[0][2] ],
-                      [-(m[2][2]*m[1][0]-m[2][0]*m[1][2]),   m[2][2]*m[0][0]-m[2][0]*m[0][2] , -(m[1][2]*m[0][0]-m[1][0]*m[0][2])],
-                      [  m[2][1]*m[1][0]-m[2][0]*m[1][1],  -(m[2][1]*m[0][0]-m[2][0]*m[0][1]),   m[1][1]*m[0][0]-m[1][0]*m[0][1] ])
-        return temp.scalarMult(1/self.det())
+# Kept for compatibility. Use avg.Mat3x3 instead.
+Mat3x3 = avg.Mat3x3
 
 
 def getCentroid(indexes, pts):
@@ -698,27 +699,9 @@ def calcKMeans(pts):
     # in: List of points
     # out: Two lists, each containing indexes into the input list
     assert(len(pts) > 1)
-    p1 = pts[0]
-    p2 = pts[1]
-    oldP1 = None
-    oldP2 = None
-    j = 0
-    while not(p1 == oldP1 and p2 == oldP2) and j < 50:
-        l1 = []
-        l2 = []
-        # Group points
-        for i, pt in enumerate(pts):
-            dist1 = (pt-p1).getNorm()
-            dist2 = (pt-p2).getNorm()
-            if dist1 < dist2:
-                l1.append(i)
-            else:
-                l2.append(i)
-        oldP1 = p1
-        oldP2 = p2
-        p1 = getCentroid(l1, pts)
-        p2 = getCentroid(l2, pts)
-        j += 1
+    clusters = avg.calcKMeans(pts, 2)
+    l1 = [i for i, cluster in enumerate(clusters) if cluster == 0]
+    l2 = [i for i, cluster in enumerate(clusters) if cluster == 1]
     return l1, l2
 
 
@@ -730,18 +713,14 @@ class Transform():
         self.pivot = avg.Point2D(pivot)
 
     def moveNode(self, node):
-        transMat =  Mat3x3.translate(self.trans)
-        rotMat = Mat3x3.rotate(self.rot)
-        scaleMat = Mat3x3.scale((self.scale, self.scale))
-        pivotMat = Mat3x3.translate(self.pivot)
-        invPivotMat = pivotMat.inverse()
-        startTransform = Mat3x3.fromNode(node)
-        newTransform = pivotMat.applyMat(
-                rotMat.applyMat(
-                scaleMat.applyMat(
-                invPivotMat.applyMat(
-                transMat.applyMat(
-                startTransform)))))
+        transMat = avg.Mat3x3.translate(self.trans)
+        rotMat = avg.Mat3x3.rotate(self.rot)
+        scaleMat = avg.Mat3x3.scale((self.scale, self.scale))
+        pivotMat = avg.Mat3x3.translate(self.pivot)
+        invPivotMat = avg.Mat3x3.translate(-self.pivot)
+        startTransform = avg.Mat3x3.fromNode(node)
+        newTransform = (pivotMat * rotMat * scaleMat * invPivotMat * transMat * 
+                startTransform)
         newTransform.setNodeTransform(node)
 
     def __repr__(self):
@@ -765,11 +744,12 @@ class TransformRecognizer(Recognizer):
         else:
             self.__friction = friction
 
-        self.__baseTransform = Mat3x3()
         self.__lastPosns = []
         self.__posns = []
         self.__inertiaHandler = None
-        self.__filters = {}
+        self.__filterBank = None
+        self.__filterChannels = {}
+        self.__contactClusters = {}
         self.__frameHandlerID = None
         super(TransformRecognizer, self).__init__(eventNode, True, None, 
                 initialEvent, detectedHandler=detectedHandler, endHandler=endHandler)
@@ -785,21 +765,29 @@ class TransformRecognizer(Recognizer):
         self.__abort()
         super(TransformRecognizer, self).abort()
 
+    def rebind(self, eventNode, coordSysNode=None):
+        self.abort()
+        if coordSysNode != None:
+            self.__coordSysNode = weakref.ref(coordSysNode)
+        else:
+            self.__coordSysNode = weakref.ref(eventNode)
+        super(TransformRecognizer, self).rebind(eventNode)
+
     def _handleDown(self, event):
         numContacts = len(self._contacts)
         self.__newPhase()
         if self.__isFiltered():
-            self.__filters[event.contact] = [
-                    filter.OneEuroFilter(mincutoff=TransformRecognizer.FILTER_MIN_CUTOFF, 
-                            beta=TransformRecognizer.FILTER_BETA),
-                    filter.OneEuroFilter(mincutoff=TransformRecognizer.FILTER_MIN_CUTOFF,
-                            beta=TransformRecognizer.FILTER_BETA)]
+            if not(self.__filterBank):
+                self.__filterBank = avg.OneEuroFilterBank(
+                        mincutoff=TransformRecognizer.FILTER_MIN_CUTOFF,
+                        beta=TransformRecognizer.FILTER_BETA)
+            self.__filterChannels[event.contact] = self.__filterBank.addChannel()
         if numContacts == 1:
             if self.__inertiaHandler:
                 self.__inertiaHandler.abort()
                 self._setEnd(event)
             self._setDetected(event)
-            self.__frameHandlerID = player.subscribe(player.ON_FRAME, self.__onFrame)
+            self.__frameHandlerID = _frameDispatcher.subscribe(self.__onFrame)
             if self.__friction != -1:
                 self.__inertiaHandler = InertiaHandler(self.__friction, 
                         self.__onInertiaMove, self.__onInertiaStop)
@@ -808,9 +796,9 @@ class TransformRecognizer(Recognizer):
         numContacts = len(self._contacts)
         if numContacts == 0:
             contact = event.contact
-            transform = Transform(self.__filteredRelContactPos(contact)
+            transform = Transform(self.__filteredRelContactPosns([contact])[0]
                     - self.__lastPosns[0])
-            player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
+            _frameDispatcher.unsubscribe(self.__frameHandlerID)
             self.__frameHandlerID = None
             if self.__friction != -1:
                 self.__inertiaHandler.onDrag(transform)
@@ -823,7 +811,7 @@ class TransformRecognizer(Recognizer):
         else:
             self.__newPhase()
         if self.__isFiltered():
-            del self.__filters[event.contact]
+            self.__filterBank.removeChannel(self.__filterChannels.pop(event.contact))
 
     def _handleNodeGone(self):
         if ((self.__coordSysNode and not(self.__coordSysNode())) or
@@ -840,8 +828,8 @@ class TransformRecognizer(Recognizer):
 
     def __move(self):
         numContacts = len(self._contacts)
-        contactPosns = [self.__filteredRelContactPos(contact)
-                for contact in self._contacts]
+        contacts = list(self._contacts)
+        contactPosns = self.__filteredRelContactPosns(contacts)
         if numContacts == 1:
             transform = Transform(contactPosns[0] - self.__lastPosns[0])
             if self.__friction != -1:
@@ -852,8 +840,8 @@ class TransformRecognizer(Recognizer):
             if numContacts == 2:
                 self.__posns = contactPosns
             else:
-                self.__posns = [getCentroid(self.__clusters[i], contactPosns) for
-                        i in range(2)]
+                clusters = [self.__contactClusters[contact] for contact in contacts]
+                self.__posns = avg.calcClusterCentroids(contactPosns, clusters, 2)
 
             startDelta = self.__lastPosns[1]-self.__lastPosns[0]
             curDelta = self.__posns[1]-self.__posns[0]
@@ -879,17 +867,23 @@ class TransformRecognizer(Recognizer):
     def __newPhase(self):
         self.__lastPosns = []
         numContacts = len(self._contacts)
-        contactPosns = [self.__relContactPos(contact) 
-                for contact in self._contacts]
+        contacts = list(self._contacts)
+        contactPosns = [self.__relContactPos(contact) for contact in contacts]
         if numContacts == 1:
             self.__lastPosns.append(contactPosns[0])
+            self.__contactClusters = {}
         else:
             if numContacts == 2:
                 self.__lastPosns = contactPosns
+                clusters = [0, 1]
             else:
-                self.__clusters = calcKMeans(contactPosns)
-                self.__lastPosns = [getCentroid(self.__clusters[i], contactPosns) for
-                        i in range(2)]
+                # Start from the previous clusters so contacts that stay don't switch
+                # sides.
+                initialClusters = [self.__contactClusters.get(contact, -1) 
+                        for contact in contacts]
+                clusters = avg.calcKMeans(contactPosns, 2, initialClusters)
+                self.__lastPosns = avg.calcClusterCentroids(contactPosns, clusters, 2)
+            self.__contactClusters = dict(zip(contacts, clusters))
 
     def __onInertiaMove(self, transform):
         self.notifySubscribers(Recognizer.MOTION, [transform]);
@@ -898,24 +892,26 @@ class TransformRecognizer(Recognizer):
         self.__inertiaHandler = None
         self._setEnd(None)
 
-    def __filteredRelContactPos(self, contact):
-        rawPos = self.__relContactPos(contact)
+    def __filteredRelContactPosns(self, contacts):
+        rawPosns = [self.__relContactPos(contact) for contact in contacts]
         if self.__isFiltered():
-            f = self.__filters[contact]
-            return avg.Point2D(f[0].apply(rawPos.x, player.getFrameTime()),
-                    f[1].apply(rawPos.y, player.getFrameTime()))
+            # All contacts are filtered in one call.
+            channels = [self.__filterChannels[contact] for contact in contacts]
+            return self.__filterBank.apply(channels, rawPosns, player.getFrameTime())
         else:
-            return rawPos
+            return rawPosns
 
     def __relContactPos(self, contact):
-        return self.__coordSysNode().getParent().getRelPos(contact.events[-1].pos)
+        return self.__coordSysNode().getParent().getRelPos(contact.lastevent.pos)
 
     def __isFiltered(self):
         return TransformRecognizer.FILTER_MIN_CUTOFF != None
 
     def __abort(self):
+        self.__filterBank = None
+        self.__filterChannels = {}
         if self.__frameHandlerID:
-            player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
+            _frameDispatcher.unsubscribe(self.__frameHandlerID)
             self.__frameHandlerID = None
         if self.__inertiaHandler:
             self.__inertiaHandler.abort()
@@ -924,70 +920,32 @@ class TransformRecognizer(Recognizer):
 
 class InertiaHandler(object):
     def __init__(self, friction, moveHandler, stopHandler):
-        self.__friction = friction
         self.__moveHandler = moveHandler
         self.__stopHandler = stopHandler
-
-        self.__transVel = avg.Point2D(0, 0)
-        self.__curPivot = avg.Point2D(0, 0)
-        self.__angVel = 0
-        self.__sizeVel = avg.Point2D(0, 0)
-        self.__frameHandlerID = player.subscribe(player.ON_FRAME, self.__onDragFrame)
+        self.__anim = avg.InertiaAnim(friction, moveCallback=self.__onInertiaMove,
+                stopCallback=self.__onInertiaStop)
 
     def abort(self):
-        player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
         self.__stopHandler = None
         self.__moveHandler = None
+        self.__anim.abort()
 
     def onDrag(self, transform):
-        frameDuration = player.getFrameDuration()
-        if frameDuration > 0:
-            self.__transVel += 0.1*transform.trans/frameDuration
-        if transform.pivot != avg.Point2D(0,0):
-            self.__curPivot = transform.pivot
-        if transform.rot > math.pi:
-            transform.rot -= 2*math.pi
-        if frameDuration > 0:
-            self.__angVel += 0.1*transform.rot/frameDuration
+        self.__anim.onDrag(transform.trans, transform.rot, transform.pivot)
 
     def onUp(self):
-        player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
-        self.__frameHandlerID = player.subscribe(player.ON_FRAME, self.__onInertiaFrame)
-        self.__onInertiaFrame()
-
-    def __onDragFrame(self):
-        self.__transVel *= 0.9
-        self.__angVel *= 0.9
-
-    def __onInertiaFrame(self):
-        transNorm = self.__transVel.getNorm()
-        if transNorm - self.__friction > 0:
-            direction = self.__transVel.getNormalized()
-            self.__transVel = direction * (transNorm-self.__friction)
-            curTrans = self.__transVel * player.getFrameDuration()
-        else:
-            curTrans = avg.Point2D(0, 0)
-
-        if self.__angVel != 0:
-            angSign = self.__angVel/math.fabs(self.__angVel)
-            self.__angVel = self.__angVel - angSign*self.__friction/200
-            newAngSign = self.__angVel/math.fabs(self.__angVel)
-            if newAngSign != angSign:
-                self.__angVel = 0
-        curAng = self.__angVel * player.getFrameDuration()
-        self.__curPivot += curTrans
-
-        if transNorm - self.__friction > 0 or self.__angVel != 0:
-            if self.__moveHandler:
-                self.__moveHandler(Transform(curTrans,  curAng, 1, self.__curPivot))
-        else:
-            self.__stop()
+        self.__anim.start()
 
-    def __stop(self):
-        player.unsubscribe(player.ON_FRAME, self.__frameHandlerID)
-        self.__stopHandler()
+    def __onInertiaMove(self, trans, rot, pivot):
+        if self.__moveHandler:
+            self.__moveHandler(Transform(trans, rot, 1, pivot))
+
+    def __onInertiaStop(self):
+        stopHandler = self.__stopHandler
         self.__stopHandler = None
         self.__moveHandler = None
+        if stopHandler:
+            stopHandler()
 
     
 def initConfig():
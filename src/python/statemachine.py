@@ -33,18 +33,24 @@ class State(object):
         self.leaveFunc = methodref(leaveFunc)
 
 class StateMachine(object):
-    def __init__(self, name, startState):
-        self.__states = {}
+    def __init__(self, name, startState, template=None):
         self.__name = name
         self.__startState = startState
         self.__curState = startState
         self.__trace = False
-        self.__initDone = False
+        if template:
+            # States can't change after a machine is frozen, so they can be shared.
+            template.freeze()
+            self.__states = template.__states
+            self.__initDone = True
+        else:
+            self.__states = {}
+            self.__initDone = False
 
     def addState(self, state, transitions, enterFunc=None, leaveFunc=None):
         if self.__initDone:
-            raise RuntimeError(
-                    "StateMachine: Can't add new states after calling changeState")
+            raise RuntimeError("StateMachine: Can't add new states after calling "
+                    "changeState or freeze")
         if self.__states.has_key(state):
             raise RuntimeError("StateMachine: Duplicate state " + state + ".")
 
@@ -52,11 +58,14 @@ class StateMachine(object):
             transitions = dict.fromkeys(transitions)
         self.__states[state] = State(transitions, enterFunc, leaveFunc)
 
-    def changeState(self, newState):
+    def freeze(self):
         if not(self.__initDone):
             self.__initDone = True
             self.__doSanityCheck()
 
+    def changeState(self, newState):
+        self.freeze()
+
         if self.__trace:
             print self.__name, ":", self.__curState, "-->", newState
 
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+# libavg - Media Playback Engine.
+# Copyright (C) 2003-2014 Ulrich von Zadow
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Current versions can be found at www.libavg.de
+#
+
+import select
+import traceback
+
+from libavg import avg, player
+
+# Errors raised by select() for closed or otherwise invalid files.
+_FILE_ERRORS = (select.error, EnvironmentError, ValueError)
+
+
+class CancelledError(Exception):
+    pass
+
+
+class Return(Exception):
+    """ Raise Return(value) to end a task with a result. Python 2 generators can't 
+        return values."""
+
+    def __init__(self, value=None):
+        super(Return, self).__init__(value)
+        self.value = value
+
+
+class Future(object):
+
+    def __init__(self):
+        self.__isDone = False
+        self.__isCancelled = False
+        self.__result = None
+        self.__exception = None
+        self.__doneCallbacks = []
+
+    def done(self):
+        return self.__isDone
+
+    def cancelled(self):
+        return self.__isCancelled
+
+    def result(self):
+        if not(self.__isDone):
+            raise RuntimeError("Future.result(): The result isn't available yet.")
+        if self.__exception:
+            raise self.__exception
+        return self.__result
+
+    def exception(self):
+        if not(self.__isDone):
+            raise RuntimeError("Future.exception(): The result isn't available yet.")
+        return self.__exception
+
+    def setResult(self, result):
+        # Results that arrive after a cancel() are ignored.
+        if not(self.__isDone):
+            self.__result = result
+            self.__finish()
+
+    def setException(self, exception):
+        if not(self.__isDone):
+            self.__exception = exception
+            self.__finish()
+
+    def cancel(self):
+        if self.__isDone:
+            return False
+        self.__isCancelled = True
+        self.setException(CancelledError())
+        return True
+
+    def addDoneCallback(self, callback):
+        if self.__isDone:
+            callback(self)
+        else:
+            self.__doneCallbacks.append(callback)
+
+    def _hasDoneCallbacks(self):
+        return len(self.__doneCallbacks) > 0
+
+    def __finish(self):
+        self.__isDone = True
+        callbacks = self.__doneCallbacks
+        self.__doneCallbacks = []
+        for callback in callbacks:
+            callback(self)
+
+
+class Task(Future):
+    """ Runs a generator as a coroutine. The generator yields Futures (including other 
+        Tasks) and is resumed with their result once they are done. """
+
+    def __init__(self, generator):
+        super(Task, self).__init__()
+        self.__generator = generator
+        self.__waitingFor = None
+        self.__step(None, None)
+
+    def cancel(self):
+        if self.done():
+            return False
+        waitingFor = self.__waitingFor
+        self.__waitingFor = None
+        if waitingFor:
+            waitingFor.cancel()
+        self.__generator.close()
+        return super(Task, self).cancel()
+
+    def __step(self, value, exception):
+        # Futures that are already done are handled in this loop instead of 
+        # recursively.
+        while True:
+            try:
+                if exception:
+                    future = self.__generator.throw(exception)
+                else:
+                    future = self.__generator.send(value)
+            except StopIteration:
+                self.setResult(None)
+                return
+            except Return as ret:
+                self.setResult(ret.value)
+                return
+            except Exception as ex:
+                if not(self._hasDoneCallbacks()):
+                    avg.logger.error("Unhandled exception in task:\n" + 
+                            traceback.format_exc())
+                self.setException(ex)
+                return
+
+            if not(isinstance(future, Future)):
+                value = None
+                exception = TypeError("Tasks can only yield Futures, not %r." % (future,))
+            elif future.done():
+                value, exception = _getOutcome(future)
+            else:
+                self.__waitingFor = future
+                future.addDoneCallback(self.__wakeup)
+                return
+
+    def __wakeup(self, future):
+        if future is self.__waitingFor:
+            self.__waitingFor = None
+            value, exception = _getOutcome(future)
+            self.__step(value, exception)
+
+
+def _getOutcome(future):
+    exception = future.exception()
+    if exception:
+        return None, exception
+    else:
+        return future.result(), None
+
+
+class _FrameScheduler(object):
+    """ Resolves the futures that wait for the next frame or for file descriptors from a
+        single player.ON_FRAME subscription. """
+
+    def __init__(self):
+        self.__frameFutures = []
+        self.__readers = {}
+        self.__writers = {}
+        self.__subscriberID = None
+
+    def addFrameFuture(self, future):
+        self.__subscribe()
+        self.__frameFutures.append(future)
+
+    def addReader(self, fd, future):
+        self.__subscribe()
+        self.__readers.setdefault(fd, []).append(future)
+
+    def addWriter(self, fd, future):
+        self.__subscribe()
+        self.__writers.setdefault(fd, []).append(future)
+
+    def __subscribe(self):
+        if (self.__subscriberID != None and 
+                not(player.isSubscribed(player.ON_FRAME, self.__subscriberID))):
+            # Player.stop() removes all subscribers. Tasks that were waiting at that 
+            # time never resume.
+            self.__frameFutures = []
+            self.__readers = {}
+            self.__writers = {}
+            self.__subscriberID = None
+        if self.__subscriberID == None:
+            self.__subscriberID = player.subscribe(player.ON_FRAME, self.__onFrame)
+
+    def __onFrame(self):
+        futures = self.__frameFutures
+        self.__frameFutures = []
+        frameTime = player.getFrameTime()
+        for future in futures:
+            future.setResult(frameTime)
+
+        if self.__readers or self.__writers:
+            self.__pollFiles()
+
+        if not(self.__frameFutures or self.__readers or self.__writers):
+            player.unsubscribe(player.ON_FRAME, self.__subscriberID)
+            self.__subscriberID = None
+
+    def __pollFiles(self):
+        # Forget cancelled waits first: their files may already be closed.
+        for waiters in (self.__readers, self.__writers):
+            for fd, futures in waiters.items():
+                futures = [future for future in futures if not(future.done())]
+                if futures:
+                    waiters[fd] = futures
+                else:
+                    del waiters[fd]
+        try:
+            readable, writable, dummy = select.select(self.__readers.keys(), 
+                    self.__writers.keys(), [], 0)
+        except _FILE_ERRORS:
+            readable = self.__pollFilesSeparately(self.__readers, 0)
+            writable = self.__pollFilesSeparately(self.__writers, 1)
+        for fd in readable:
+            for future in self.__readers.pop(fd):
+                future.setResult(fd)
+        for fd in writable:
+            for future in self.__writers.pop(fd):
+                future.setResult(fd)
+
+    def __pollFilesSeparately(self, waiters, index):
+        # Finds the files that can't be polled (e.g. because they have been closed) and
+        # passes the error to their waiters.
+        ready = []
+        for fd in waiters.keys():
+            fds = ([], [], [])
+            fds[index].append(fd)
+            try:
+                if select.select(fds[0], fds[1], fds[2], 0)[index]:
+                    ready.append(fd)
+            except _FILE_ERRORS as e:
+                for future in waiters.pop(fd):
+                    future.setException(e)
+        return ready
+
+_frameScheduler = _FrameScheduler()
+
+
+def start(generator):
+    return Task(generator)
+
+
+def nextFrame():
+    future = Future()
+    _frameScheduler.addFrameFuture(future)
+    return future
+
+
+def sleep(time):
+    def onDone(future):
+        if future.cancelled():
+            player.clearInterval(timeoutID)
+
+    future = Future()
+    timeoutID = player.setTimeout(time, lambda: future.setResult(None))
+    future.addDoneCallback(onDone)
+    return future
+
+
+def loadBitmap(fileName, **kwargs):
+    def onLoaded(bmp):
+        if isinstance(bmp, Exception):
+            future.setException(bmp)
+        else:
+            future.setResult(bmp)
+
+    def onDone(future):
+        if future.cancelled():
+            request.cancel()
+
+    future = Future()
+    request = avg.BitmapManager.get().loadBitmap(fileName, onLoaded, **kwargs)
+    future.addDoneCallback(onDone)
+    return future
+
+
+def endOfFile(node):
+    def onDone(future):
+        node.unsubscribe(avg.Node.END_OF_FILE, subscriberID)
+
+    future = Future()
+    subscriberID = node.subscribe(avg.Node.END_OF_FILE, lambda: future.setResult(None))
+    future.addDoneCallback(onDone)
+    return future
+
+
+def waitReadable(fd):
+    future = Future()
+    _frameScheduler.addReader(fd, future)
+    return future
+
+
+def waitWritable(fd):
+    future = Future()
+    _frameScheduler.addWriter(fd, future)
+    return future
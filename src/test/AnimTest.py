@@ -281,6 +281,47 @@ class AnimTestCase(AVGTestCase):
                  lambda: self.assert_(self.__endCalled)
                 ))
 
+    def testInertiaAnim(self):
+        def onMove(trans, rot, pivot):
+            self.__trans += trans
+            self.__pivot = pivot
+
+        def onStop():
+            self.__endCalled = True
+
+        def createAnim():
+            self.anim = avg.InertiaAnim(0.01, onMove, onStop)
+
+        def startAnim():
+            self.anim.start()
+            self.__startVel = self.anim.velocity
+
+        def checkTrans():
+            # Constant deceleration: distance = v^2/(2*deceleration).
+            speed = self.__startVel.getNorm()
+            dist = speed*speed / (2*0.01/(1000./60))
+            self.assertAlmostEqual(self.__trans, self.__startVel/speed*dist, 0.1)
+            self.assertAlmostEqual(self.__pivot, (10,10)+self.__trans, 0.1)
+
+        self.initScene()
+        self.__endCalled = False
+        self.__trans = avg.Point2D(0,0)
+        self.start(False,
+                (createAnim,
+                 lambda: self.anim.onDrag((100,0), 0, (10,10)),
+                 lambda: self.assert_(self.anim.velocity.x > 0),
+                 startAnim,
+                 lambda: self.assert_(self.anim.isRunning()),
+                 lambda: self.assert_(self.__trans.x > 0),
+                 lambda: self.delay(1000),
+                 lambda: self.assert_(not(self.anim.isRunning())),
+                 lambda: self.assert_(self.__endCalled),
+                 checkTrans,
+                 # Too slow to move: Stops immediately.
+                 lambda: self.anim.start(),
+                 lambda: self.assert_(not(self.anim.isRunning())),
+                ))
+
     def testParallelAnim(self):
         def animStopped():
             self.__endCalled = True
@@ -504,6 +545,7 @@ def animTestSuite(tests):
         "testIntAnim",
         "testContinuousAnim",
         "testWaitAnim",
+        "testInertiaAnim",
         "testParallelAnim",
         "testParallelAnimRegistry",
         "testStateAnim",
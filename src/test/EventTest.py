@@ -405,6 +405,44 @@ class EventTestCase(AVGTestCase):
                  lambda: assertDownsCalled([True, True]),
                 ))
 
+    def testPublisherManySubscribers(self):
+        def onDown(i):
+            self.calls.append(i)
+
+        def subscribeAll():
+            self.subscriberIDs = [self.img.subscribe(avg.Node.CURSOR_DOWN, 
+                    lambda event, i=i: onDown(i)) for i in xrange(100)]
+            self.calls = []
+
+        def unsubscribeMost():
+            for i in xrange(90):
+                if i%2 == 0:
+                    self.img.unsubscribe(avg.Node.CURSOR_DOWN, self.subscriberIDs[i])
+                else:
+                    self.img.unsubscribe(self.subscriberIDs[i])
+            self.assertEqual(self.img.getNumSubscribers(avg.Node.CURSOR_DOWN), 10)
+            self.assert_(not(self.img.isSubscribed(avg.Node.CURSOR_DOWN, 
+                    self.subscriberIDs[0])))
+            self.assert_(self.img.isSubscribed(avg.Node.CURSOR_DOWN, 
+                    self.subscriberIDs[95]))
+            self.assert_(not(self.img.isSubscribed(avg.Node.CURSOR_UP,
+                    self.subscriberIDs[95])))
+            self.assertRaises(RuntimeError, lambda: 
+                    self.img.unsubscribe(avg.Node.CURSOR_UP, self.subscriberIDs[95]))
+            self.img.subscribe(avg.Node.CURSOR_DOWN, lambda event: onDown(100))
+            self.calls = []
+
+        root = self.loadEmptyScene()
+        self.img = avg.ImageNode(pos=(0,0), href="rgb24-65x65.png", parent=root)
+        self.start(False,
+                (subscribeAll,
+                 lambda: self.fakeClick(10,10),
+                 lambda: self.assertEqual(self.calls, range(99, -1, -1)),
+                 unsubscribeMost,
+                 lambda: self.fakeClick(10,10),
+                 lambda: self.assertEqual(self.calls, [100]+range(99, 89, -1)),
+                ))
+
     def testPublisherAutoDelete(self):
        
         class TestSubscriber():
@@ -929,6 +967,96 @@ class EventTestCase(AVGTestCase):
                 ))
         self.assertEqual(self.numContactCallbacks, 2)
 
+    def testContactHistory(self):
+
+        def onDown(event):
+            self.contact = event.contact
+            checkHistory(1, 10)
+
+        def checkHistory(numEvents, lastX):
+            contact = self.contact
+            self.assertEqual(contact.numevents, numEvents)
+            self.assertEqual(len(contact.events), min(numEvents, 3))
+            self.assertEqual(contact.events[-1].pos, contact.lastevent.pos)
+            self.assertEqual(contact.lastevent.pos, (lastX, 10))
+            self.assertEqual(contact.firstevent.pos, (10, 10))
+            self.assertEqual(contact.distancetravelled, lastX-10)
+            self.assertEqual(contact.age, (numEvents-1)*40)
+            self.assertEqual(contact.motionvec, (lastX-10, 0))
+
+        root = self.loadEmptyScene()
+        root.subscribe(avg.Node.CURSOR_DOWN, onDown)
+        self.assertEqual(avg.Contact.getMaxHistoryLen(), 0)
+        self.assertRaises(RuntimeError, lambda: avg.Contact.setMaxHistoryLen(-1))
+        avg.Contact.setMaxHistoryLen(3)
+        player.setFakeFPS(25)
+        try:
+            self.start(False,
+                    (lambda: self._sendTouchEvent(1, avg.Event.CURSOR_DOWN, 10, 10),
+                     lambda: self._sendTouchEvent(1, avg.Event.CURSOR_MOTION, 20, 10),
+                     lambda: self._sendTouchEvent(1, avg.Event.CURSOR_MOTION, 30, 10),
+                     lambda: self._sendTouchEvent(1, avg.Event.CURSOR_MOTION, 40, 10),
+                     lambda: self._sendTouchEvent(1, avg.Event.CURSOR_MOTION, 50, 10),
+                     lambda: checkHistory(5, 50),
+                     lambda: self._sendTouchEvent(1, avg.Event.CURSOR_UP, 50, 10),
+                    ))
+        finally:
+            avg.Contact.setMaxHistoryLen(0)
+
+    def testMotionCoalescing(self):
+
+        def onDown(event):
+            self.contacts.append(event.contact)
+
+        def onMotion(event):
+            self.motionPositions.append(event.pos)
+
+        def checkHistory(contactIndex, xPositions):
+            contact = self.contacts[contactIndex]
+            self.assertEqual([event.pos.x for event in contact.events], xPositions)
+            self.assertEqual(contact.numevents, len(xPositions))
+
+        def checkMotion(expected):
+            self.assertEqual(self.motionPositions, expected)
+            self.motionPositions = []
+
+        root = self.loadEmptyScene()
+        root.subscribe(avg.Node.CURSOR_DOWN, onDown)
+        root.subscribe(avg.Node.CURSOR_MOTION, onMotion)
+        self.contacts = []
+        self.motionPositions = []
+        self.assert_(not(player.isMotionCoalescingEnabled()))
+        player.enableMotionCoalescing(True)
+        self.assert_(player.isMotionCoalescingEnabled())
+        try:
+            self.start(False,
+                    (lambda: self._sendTouchEvents((
+                            (1, avg.Event.CURSOR_DOWN, 10, 10),
+                            (2, avg.Event.CURSOR_DOWN, 10, 20),
+                            )),
+                     lambda: self._sendTouchEvents((
+                            (1, avg.Event.CURSOR_MOTION, 20, 10),
+                            (1, avg.Event.CURSOR_MOTION, 30, 10),
+                            (2, avg.Event.CURSOR_MOTION, 20, 20),
+                            (1, avg.Event.CURSOR_MOTION, 40, 10),
+                            )),
+                     lambda: checkMotion([(40, 10), (20, 20)]),
+                     lambda: checkHistory(0, [10, 20, 30, 40]),
+                     lambda: checkHistory(1, [10, 20]),
+                     lambda: self._sendTouchEvents((
+                            (1, avg.Event.CURSOR_MOTION, 50, 10),
+                            (1, avg.Event.CURSOR_UP, 50, 10),
+                            (2, avg.Event.CURSOR_MOTION, 30, 20),
+                            (2, avg.Event.CURSOR_MOTION, 40, 20),
+                            (2, avg.Event.CURSOR_UP, 40, 20),
+                            )),
+                     lambda: checkMotion([(50, 10), (40, 20)]),
+                     lambda: checkHistory(0, [10, 20, 30, 40, 50, 50]),
+                     lambda: checkHistory(1, [10, 20, 30, 40, 40]),
+                    ))
+        finally:
+            player.enableMotionCoalescing(False)
+
     def testContactRegistration(self):
 
         def onDown(event):
@@ -1105,6 +1233,7 @@ def eventTestSuite(tests):
             "testConnectHandler",
             "testPublisher",
             "testComplexPublisher",
+            "testPublisherManySubscribers",
             "testPublisherAutoDelete",
             "testPublisherNestedUnsubscribe",
             "testObscuringEvents",
@@ -1117,6 +1246,8 @@ def eventTestSuite(tests):
             "testEventHook",
             "testException",
             "testContacts",
+            "testContactHistory",
+            "testMotionCoalescing",
             "testContactRegistration",
             "testMultiContactRegistration",
             "testPlaybackMessages",
@@ -86,6 +86,26 @@ class FXTestCase(AVGTestCase):
                  lambda: utils.initFXCache(10),
                 ))
 
+    def testCulledNullFX(self):
+        def checkCulled():
+            # Nodes without a surface or filter can't be culled.
+            self.assertEqual(player.getMainCanvas().getNumCulledNodes(), 1)
+
+        root = self.loadEmptyScene()
+        div = avg.DivNode(size=(64,64), crop=True, parent=root)
+        node = avg.ImageNode(parent=div, href="")
+        node.setEffect(avg.NullFXNode())
+        node = avg.VideoNode(parent=div, href="mjpeg-48x48.avi", pos=(100,0),
+                threaded=False)
+        node.setEffect(avg.NullFXNode())
+        node = avg.ImageNode(parent=div, href="rgb24-32x32.png", pos=(100,0))
+        node.setEffect(avg.NullFXNode())
+        self.start(False,
+                (None,
+                 None,
+                 checkCulled,
+                ))
+
     def testVideoNullFX(self):
         root = self.loadEmptyScene()
         player.setFakeFPS(25)
@@ -490,6 +510,7 @@ class FXTestCase(AVGTestCase):
 def fxTestSuite(tests):
     availableTests = [
             "testImageNullFX",
+            "testCulledNullFX",
             "testVideoNullFX",
             "testWordsNullFX",
             "testCanvasNullFX",
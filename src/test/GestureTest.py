@@ -19,7 +19,7 @@
 # Current versions can be found at www.libavg.de
 #
 
-from libavg import avg, gesture, player
+from libavg import avg, gesture, player, filter
 
 import math
 from testcase import *
@@ -781,6 +781,41 @@ class GestureTestCase(AVGTestCase):
                         [gesture.Recognizer.DETECTED, gesture.Recognizer.MOTION]),
                 ))
 
+    def testDragRecognizerInertiaCleanup(self):
+
+        def getNumAnims():
+            objectCount = player.getTestHelper().getObjectCount()
+            return sum([count for (name, count) in objectCount.iteritems()
+                    if "Anim" in name])
+
+        def startCount():
+            self.__numAnims = getNumAnims()
+
+        def checkCount():
+            self.assertEqual(getNumAnims(), self.__numAnims)
+
+        self.__initImageScene()
+        dragRecognizer = gesture.DragRecognizer(self.image, friction=100)
+        player.setFakeFPS(100)
+        dragFrames = []
+        for i in range(5):
+            dragFrames.extend([
+                    lambda: self._sendMouseEvent(avg.Event.CURSOR_DOWN, 30, 30),
+                    lambda: self._sendMouseEvent(avg.Event.CURSOR_MOTION, 40, 30),
+                    lambda: self._sendMouseEvent(avg.Event.CURSOR_UP, 50, 30),
+                    lambda: self.delay(200),
+                    ])
+        self.start(False,
+                (startCount,
+                 dragFrames,
+                 checkCount,
+                 # Handler that is never started.
+                 lambda: self._sendMouseEvent(avg.Event.CURSOR_DOWN, 30, 30),
+                 lambda: dragRecognizer.abort(),
+                 lambda: self._sendMouseEvent(avg.Event.CURSOR_UP, 30, 30),
+                 checkCount,
+                ))
+
 
     def testTransformRecognizer(self):
 
@@ -1024,6 +1059,44 @@ class GestureTestCase(AVGTestCase):
                 ))
         player.setFakeFPS(-1)
 
+    def testRecognizerRebind(self):
+
+        def rebind(node):
+            self.__tapRecognizer.rebind(node)
+
+        self.__initImageScene()
+        image2 = avg.ImageNode(parent=player.getRootNode(), pos=(80,0), 
+                href="rgb24-64x64.png")
+        self.__tapRecognizer = gesture.TapRecognizer(self.image)
+        self.messageTester = MessageTester(self.__tapRecognizer, 
+                [gesture.Recognizer.POSSIBLE, gesture.Recognizer.DETECTED, 
+                gesture.Recognizer.FAILED], self)
+        player.setFakeFPS(10)
+        self.start(False,
+                (lambda: rebind(image2),
+                 # Events on the old node are ignored.
+                 self._genMouseEventFrames(avg.Event.CURSOR_DOWN, 30, 30, []),
+                 self._genMouseEventFrames(avg.Event.CURSOR_UP, 30, 30, []),
+                 self._genMouseEventFrames(avg.Event.CURSOR_DOWN, 110, 30,
+                        [gesture.Recognizer.POSSIBLE]),
+                 self._genMouseEventFrames(avg.Event.CURSOR_UP, 110, 30, 
+                        [gesture.Recognizer.DETECTED]),
+                 # Rebind during a gesture aborts it.
+                 self._genMouseEventFrames(avg.Event.CURSOR_DOWN, 110, 30,
+                        [gesture.Recognizer.POSSIBLE]),
+                 lambda: rebind(self.image),
+                 self._genMouseEventFrames(avg.Event.CURSOR_UP, 110, 30, []),
+                 # reset() enables a disabled recognizer.
+                 lambda: self.__tapRecognizer.enable(False),
+                 self._genMouseEventFrames(avg.Event.CURSOR_DOWN, 30, 30, []),
+                 self._genMouseEventFrames(avg.Event.CURSOR_UP, 30, 30, []),
+                 lambda: self.__tapRecognizer.reset(),
+                 self._genMouseEventFrames(avg.Event.CURSOR_DOWN, 30, 30,
+                        [gesture.Recognizer.POSSIBLE]),
+                 self._genMouseEventFrames(avg.Event.CURSOR_UP, 30, 30, 
+                        [gesture.Recognizer.DETECTED]),
+                ))
+
     def testKMeans(self):
         pts = [avg.Point2D(0,0), avg.Point2D(0,1)]
         means = gesture.calcKMeans(pts)
@@ -1033,33 +1106,73 @@ class GestureTestCase(AVGTestCase):
         means = gesture.calcKMeans(pts)
         self.assertEqual(means, ([0,1], [2]))
 
+        pts = [(0,0), (100,50), (1,0), (101,50), (2,0), (102,50)]
+        clusters = avg.calcKMeans(pts, 2)
+        self.assertEqual(clusters, [0,1,0,1,0,1])
+        self.assertAlmostEqual(avg.calcClusterCentroids(pts, clusters, 2), 
+                [(1,0), (101,50)])
+        # Adding a point keeps the existing clusters.
+        pts.append((101,52))
+        self.assertEqual(avg.calcKMeans(pts, 2, clusters+[-1]), [0,1,0,1,0,1,1])
+        # An empty cluster is seeded again.
+        self.assertEqual(avg.calcKMeans(pts, 2, [1]*len(pts)), [0,1,0,1,0,1,1])
+        self.assertRaises(RuntimeError, lambda: avg.calcKMeans([(0,0)], 2))
+
 
     def testMat3x3(self):
-        t = gesture.Mat3x3.translate([1,0,1])
+        t = avg.Mat3x3.translate([1,0])
         v = [1,0,1]
-        self.assertEqual(t.applyVec(v), [2,0,1])
-        r = gesture.Mat3x3.rotate(math.pi/2)
+        self.assertEqual(t.applyVec(v), (2,0,1))
+        r = avg.Mat3x3.rotate(math.pi/2)
         self.assertAlmostEqual(r.applyVec(v), [0,1,1])
-        self.assertAlmostEqual(t.applyMat(t).m, gesture.Mat3x3.translate([2,0,1]).m)
-        self.assertAlmostEqual(t.applyMat(r).m, gesture.Mat3x3([0,-1,1],[1,0,0]).m)
-        self.assertAlmostEqual(r.applyMat(t).m, gesture.Mat3x3([0,-1,0],[1,0,1]).m)
-        self.assertAlmostEqual(gesture.Mat3x3().m, gesture.Mat3x3().inverse().m)
-        m = gesture.Mat3x3([-1,  3, -3], 
-                      [ 0, -6,  5],
-                      [-5, -3,  1])
-        im = gesture.Mat3x3([3./2,      1., -1./2],
-                       [-25./6, -8./3,  5./6],
-                       [-5.,      -3.,    1.])
-        self.assertAlmostEqual(m.inverse().m, im.m)
+        self.assertAlmostEqual(t.applyMat(t), avg.Mat3x3.translate([2,0]))
+        self.assertAlmostEqual(t*r, avg.Mat3x3([0,-1,1],[1,0,0]))
+        self.assertAlmostEqual(r*t, avg.Mat3x3([0,-1,0],[1,0,1]))
+        self.assertAlmostEqual(avg.Mat3x3(), avg.Mat3x3().inverse())
+        m = avg.Mat3x3([-1,  3, -3], 
+                       [ 0, -6,  5],
+                       [-5, -3,  1])
+        im = avg.Mat3x3([3./2,      1., -1./2],
+                        [-25./6, -8./3,  5./6],
+                        [-5.,      -3.,    1.])
+        self.assertAlmostEqual(m.inverse(), im)
+        self.assertRaises(RuntimeError, avg.Mat3x3.scale((0,1)).inverse)
+        self.assertAlmostEqual(t.applyPoints([(0,0), (1,2)]), [(1,0), (2,2)])
+        self.assertAlmostEqual(avg.Mat3x3.pivotRotate((1,1), math.pi).applyPoint((0,0)),
+                (2,2))
+        self.assert_(gesture.Mat3x3 is avg.Mat3x3)
 
         image = avg.ImageNode(pos=(10,20), size=(30,40), angle=1.57, 
             href="rgb24alpha-64x64.png")
-        mat = gesture.Mat3x3.fromNode(image)
+        mat = avg.Mat3x3.fromNode(image)
         mat.setNodeTransform(image)
         self.assertAlmostEqual(image.pos, (10,20))
         self.assertAlmostEqual(image.size, (30,40))
         self.assertAlmostEqual(image.angle, 1.57)
 
+    def testOneEuroFilterBank(self):
+        bank = avg.OneEuroFilterBank(mincutoff=0.1, beta=0.03)
+        self.assertAlmostEqual(bank.mincutoff, 0.1)
+        channels = [bank.addChannel(), bank.addChannel()]
+        self.assertEqual(channels, [0,1])
+        # The bank must deliver the same results as one OneEuroFilter per coordinate.
+        filters = [filter.OneEuroFilter(mincutoff=0.1, beta=0.03) for i in range(4)]
+        for i in range(10):
+            time = i*10
+            posns = [(i*i*3, math.sin(i)*50), (100-i, 20)]
+            filteredPosns = bank.apply(channels, posns, time)
+            for j, pos in enumerate(posns):
+                expected = (filters[j*2].apply(pos[0], time), 
+                        filters[j*2+1].apply(pos[1], time))
+                self.assertAlmostEqual(filteredPosns[j], expected, 0.01)
+
+        bank.removeChannel(0)
+        self.assertEqual(bank.getNumChannels(), 1)
+        self.assertRaises(RuntimeError, lambda: bank.apply([0], [(0,0)], 100))
+        self.assertRaises(RuntimeError, lambda: bank.apply([1], [], 100))
+        self.assertEqual(bank.addChannel(), 0)
+        self.assertRaises(RuntimeError, lambda: avg.OneEuroFilterBank(mincutoff=0))
+
     def testTwoRecognizers(self):
         self.__initImageScene()
         self.__tapRecognizer = gesture.TapRecognizer(self.image)
@@ -1083,6 +1196,54 @@ class GestureTestCase(AVGTestCase):
                  self._genMouseEventFrames(avg.Event.CURSOR_UP, 30, 30, []),
                 ))
 
+    def testManyRecognizers(self):
+
+        def onMotion(node, transform):
+            transform.moveNode(node)
+
+        def getNumFrameSubscribers():
+            return player.getNumSubscribers(player.ON_FRAME)
+
+        def saveNumFrameSubscribers():
+            self.numFrameSubscribers = getNumFrameSubscribers()
+
+        def sendTouchEvents(type, y):
+            self._sendTouchEvents([(i+1, type, i*15+5, y) for i in xrange(numNodes)])
+
+        def checkActive():
+            # All recognizers share a single player.ON_FRAME subscription.
+            self.assertEqual(getNumFrameSubscribers(), self.numFrameSubscribers+1)
+            self.assertEqual(gesture._frameDispatcher.getNumHandlers(), 2*numNodes)
+
+        def checkMoved():
+            for node in nodes:
+                self.assert_(node.pos.y > 10)
+
+        def checkIdle():
+            self.assertEqual(getNumFrameSubscribers(), self.numFrameSubscribers)
+            self.assertEqual(gesture._frameDispatcher.getNumHandlers(), 0)
+
+        numNodes = 10
+        root = self.loadEmptyScene()
+        nodes = []
+        recognizers = []
+        for i in xrange(numNodes):
+            node = avg.RectNode(pos=(i*15,10), size=(10,10), parent=root)
+            nodes.append(node)
+            recognizers.append(gesture.TransformRecognizer(node, friction=-1,
+                    moveHandler=lambda transform, node=node: onMotion(node, transform)))
+        player.setFakeFPS(10)
+        self.start(False,
+                (saveNumFrameSubscribers,
+                 lambda: sendTouchEvents(avg.Event.CURSOR_DOWN, 15),
+                 checkActive,
+                 lambda: sendTouchEvents(avg.Event.CURSOR_MOTION, 25),
+                 None,
+                 checkMoved,
+                 lambda: sendTouchEvents(avg.Event.CURSOR_UP, 25),
+                 checkIdle,
+                ))
+
     def __initImageScene(self):
         root = self.loadEmptyScene()
         self.image = avg.ImageNode(parent=root, href="rgb24-64x64.png")
@@ -1105,10 +1266,14 @@ def gestureTestSuite(tests):
         "testDragRecognizerCoordSysNode",
         "testDragRecognizerCoordSysNodeParentUnlink",
         "testDragRecognizerMinDist",
+        "testDragRecognizerInertiaCleanup",
         "testTransformRecognizer",
         "testTwoRecognizers",
+        "testManyRecognizers",
+        "testRecognizerRebind",
         "testKMeans",
         "testMat3x3",
+        "testOneEuroFilterBank",
         )
 
     return createAVGTestSuite(availableTests, GestureTestCase, tests)
@@ -21,7 +21,9 @@
 #
 
 
+import os
 import shutil
+import tempfile
 
 from libavg import avg, player
 from testcase import *
@@ -310,6 +312,48 @@ class ImageTestCase(AVGTestCase):
                  testSubBitmap,
                 ))
 
+    def testBitmapSharing(self):
+        def setSameBitmap():
+            for node in nodes:
+                node.setBitmap(bmp, True)
+            checkInternHits(3)
+
+        def changeOneBitmap():
+            nodes[0].setBitmap(otherBmp, True)
+            checkInternHits(3)
+
+        def checkInternHits(numHits):
+            self.assertEqual(cache.getNumInternHits(), numHits)
+
+        def checkBitmap(node, expectedBmp):
+            self.assertEqual(node.getBitmap().getPixels(), expectedBmp.getPixels())
+
+        def checkBitmaps():
+            checkBitmap(nodes[0], otherBmp)
+            for node in nodes[1:]:
+                checkBitmap(node, bmp)
+
+        root = self.loadEmptyScene()
+        cache = avg.BitmapCache.get()
+        cache.resetStats()
+        bmp = avg.Bitmap("media/rgb24-65x65.png")
+        otherBmp = avg.Bitmap("media/rgb24alpha-64x64.png")
+        nodes = [avg.ImageNode(pos=(i*16,0), parent=root) for i in range(4)]
+        self.start(False,
+                (setSameBitmap,
+                 lambda: checkBitmap(nodes[0], bmp),
+                 changeOneBitmap,
+                 checkBitmaps,
+                 lambda: nodes[1].unlink(True),
+                 lambda: nodes[0].setBitmap(bmp, True),
+                 lambda: checkInternHits(4),
+                 lambda: checkBitmap(nodes[0], bmp),
+                 # Bitmaps that aren't marked as shared are never interned.
+                 lambda: nodes[0].setBitmap(bmp),
+                 lambda: checkInternHits(4),
+                 lambda: checkBitmap(nodes[0], bmp),
+                ))
+
     def testBitmapManager(self):
         WAIT_TIMEOUT = 2000
         def expectException(returnValue, nextAction):
@@ -370,6 +414,70 @@ class ImageTestCase(AVGTestCase):
             player.play()
         avg.BitmapManager.get().setNumThreads(1)
         
+    def testBitmapManagerPriority(self):
+        def onLoaded(i, bmp):
+            self.assert_(not isinstance(bmp, Exception))
+            loaded.append(i)
+            if len(loaded) == 7:
+                player.stop()
+
+        def reportStuck():
+            player.stop()
+            raise RuntimeError("BitmapManager didn't reply in time.")
+
+        self.loadEmptyScene()
+        loaded = []
+        requests = []
+        # Pause loading while the requests are queued so the order doesn't depend on
+        # thread timing.
+        avg.BitmapManager.get().setNumThreads(0)
+        for i in range(8):
+            requests.append(avg.BitmapManager.get().loadBitmap(
+                    "media/rgb24alpha-64x64.png", lambda bmp, i=i: onLoaded(i, bmp)))
+        requests[6].cancel()
+        self.assert_(requests[6].isCancelled())
+        requests[7].priority = 10
+        self.assertEqual(requests[7].priority, 10)
+        avg.BitmapManager.get().setNumThreads(1)
+        player.setTimeout(2000, reportStuck)
+        player.play()
+        self.assertEqual(loaded, [7, 0, 1, 2, 3, 4, 5])
+
+    def testBitmapManagerStats(self):
+        def onLoaded(bmp):
+            self.assert_(not isinstance(bmp, Exception))
+            loaded.append(bmp)
+            if len(loaded) == 16:
+                player.stop()
+
+        def reportStuck():
+            player.stop()
+            raise RuntimeError("BitmapManager didn't reply in time.")
+
+        self.loadEmptyScene()
+        bitmapManager = avg.BitmapManager.get()
+        bitmapManager.resetStats()
+        self.assertEqual(bitmapManager.getNumLoaded(), 0)
+        self.assertEqual(bitmapManager.getLoadLatency(50), 0)
+        self.assertRaises(RuntimeError, lambda: bitmapManager.getLoadLatency(101))
+
+        loaded = []
+        bitmapManager.setAutoNumThreads(True)
+        self.assert_(bitmapManager.getAutoNumThreads())
+        for i in range(16):
+            bitmapManager.loadBitmap("media/rgb24alpha-64x64.png", onLoaded)
+        player.setTimeout(5000, reportStuck)
+        player.play()
+        self.assert_(bitmapManager.getNumThreads() >= 1)
+        self.assertEqual(bitmapManager.getNumLoaded(), 16)
+        self.assert_(bitmapManager.getLoadLatency(50) <= 
+                bitmapManager.getLoadLatency(99))
+        self.assert_(bitmapManager.getBytesPerSecond() > 0)
+
+        bitmapManager.setNumThreads(1)
+        self.assert_(not bitmapManager.getAutoNumThreads())
+        self.assertEqual(bitmapManager.getNumThreads(), 1)
+
     def testBitmapManagerException(self):
         def bitmapCb(bitmap):
             raise RuntimeError
@@ -378,6 +486,131 @@ class ImageTestCase(AVGTestCase):
         avg.BitmapManager.get().loadBitmap("rgb24alpha-64x64.png", bitmapCb),
         self.assertRaises(RuntimeError, player.play)
 
+    def testBitmapCache(self):
+        cache = avg.BitmapCache.get()
+        maxBytes = cache.getMaxBytes()
+        cache.clear()
+        cache.resetStats()
+        root = self.loadEmptyScene()
+        for i in range(3):
+            avg.ImageNode(href="rgb24-64x64.png", pos=(i*16,0), parent=root)
+        self.assertEqual(cache.getNumMisses(), 1)
+        self.assertEqual(cache.getNumHits(), 2)
+        self.assertEqual(cache.getNumEntries(), 1)
+        self.assertEqual(cache.getNumBytes(), 64*64*4)
+
+        avg.ImageNode(href="rgb24-64x64.png", compression="B5G6R5", parent=root)
+        self.assertEqual(cache.getNumMisses(), 2)
+        self.assertEqual(cache.getNumEntries(), 2)
+
+        cache.setMaxBytes(64*64*4)
+        self.assertEqual(cache.getNumEntries(), 1)
+        self.assert_(cache.getNumBytes() <= 64*64*4)
+        cache.setMaxBytes(0)
+        self.assertEqual(cache.getNumEntries(), 0)
+        self.assertEqual(cache.getNumBytes(), 0)
+        avg.ImageNode(href="rgb24-64x64.png", parent=root)
+        self.assertEqual(cache.getNumEntries(), 0)
+
+        cache.setMaxBytes(maxBytes)
+        bmp = avg.Bitmap("media/rgb24-64x64.png")
+        bmp.setPixels(bmp.getPixels())
+        self.assertEqual(bmp.getSize(), (64,64))
+        self.assertEqual(avg.Bitmap("media/rgb24-64x64.png").getPixels(), 
+                bmp.getPixels())
+
+    def testBitmapDiskCache(self):
+        diskCache = avg.BitmapDiskCache.get()
+        memCache = avg.BitmapCache.get()
+        cacheDir = tempfile.mkdtemp()
+        try:
+            diskCache.setDir(cacheDir)
+            self.assertEqual(diskCache.getDir(), cacheDir)
+            diskCache.resetStats()
+            memCache.clear()
+            origBmp = avg.Bitmap("media/rgb24alpha-64x64.png")
+            self.assertEqual(diskCache.getNumMisses(), 1)
+            self.assertEqual(len(os.listdir(cacheDir)), 1)
+
+            memCache.clear()
+            cachedBmp = avg.Bitmap("media/rgb24alpha-64x64.png")
+            self.assertEqual(diskCache.getNumHits(), 1)
+            self.assertEqual(cachedBmp.getSize(), origBmp.getSize())
+            self.assertEqual(cachedBmp.getFormat(), origBmp.getFormat())
+            self.assertEqual(cachedBmp.getPixels(), origBmp.getPixels())
+
+            self.assert_(not diskCache.prewarm("media/rgb24alpha-64x64.png"))
+            self.assert_(diskCache.prewarm("media/rgb24alpha-64x64.png", avg.I8))
+            self.assertEqual(len(os.listdir(cacheDir)), 2)
+        finally:
+            diskCache.setDir("")
+            memCache.clear()
+            shutil.rmtree(cacheDir)
+        self.assertRaises(RuntimeError, 
+                lambda: diskCache.prewarm("media/rgb24alpha-64x64.png"))
+
+    def testBitmapBuffer(self):
+        buf = bytearray(4*3*4)
+        bmp = avg.Bitmap(buf, (4,3), avg.R8G8B8A8)
+        self.assertEqual(bmp.getSize(), (4,3))
+        buf[0:4] = "\x01\x02\x03\x04"
+        self.assertEqual(bmp.getPixel((0,0)), (1,2,3,4))
+        bmp.setPixels("\xff"*(4*3*4))
+        self.assertEqual(buf[5], 255)
+
+        # Stride larger than the line length.
+        buf = bytearray(8*2)
+        bmp = avg.Bitmap(buf, (2,2), avg.I8, 8)
+        buf[8] = 42
+        self.assertEqual(bmp.getPixel((0,1)), (42,42,42,255))
+        self.assertRaises(RuntimeError, lambda: avg.Bitmap(bytearray(10), (4,4), avg.I8))
+        self.assertRaises(RuntimeError, 
+                lambda: avg.Bitmap(bytearray(16), (4,4), avg.I8, 2))
+
+        bmp = avg.Bitmap((4,3), avg.R8G8B8A8, "")
+        interface = bmp.__array_interface__
+        self.assertEqual(interface["shape"], (3,4,4))
+        self.assertEqual(interface["strides"], (16,4,1))
+        self.assertEqual(interface["typestr"], "|u1")
+        self.assertEqual(interface["version"], 3)
+        self.assertEqual(interface["data"], bmp.__array_interface__["data"])
+        interface = avg.Bitmap((4,3), avg.I16, "").__array_interface__
+        self.assertEqual(interface["shape"], (3,4))
+        self.assertEqual(interface["typestr"][1:], "u2")
+        try:
+            import numpy
+        except ImportError:
+            return
+        bmp = avg.Bitmap((4,3), avg.R8G8B8A8, "")
+        bmp.setPixels("\x00"*(4*3*4))
+        array = numpy.asarray(bmp)
+        array[1,2] = (10,20,30,40)
+        self.assertEqual(bmp.getPixel((2,1)), (10,20,30,40))
+
+    def testDecodeSize(self):
+        def onLoaded(bmp):
+            self.assert_(not isinstance(bmp, Exception))
+            self.assertEqual(bmp.getSize(), (40,30))
+            player.stop()
+
+        bmp = avg.Bitmap("media/freidrehen.jpg", (80,80))
+        self.assertEqual(bmp.getSize(), (80,60))
+        bmp = avg.Bitmap("media/freidrehen.jpg", maxsize=(0,30))
+        self.assertEqual(bmp.getSize(), (40,30))
+        # Images are never enlarged.
+        bmp = avg.Bitmap("media/freidrehen.jpg", (1000,1000))
+        self.assertEqual(bmp.getSize(), (160,120))
+
+        root = self.loadEmptyScene()
+        node = avg.ImageNode(href="freidrehen.jpg", maxdecodesize=(40,40), parent=root)
+        self.assertEqual(node.maxdecodesize, (40,40))
+        self.assertEqual(node.getMediaSize(), (40,30))
+        self.assertEqual(node.size, (40,30))
+
+        avg.BitmapManager.get().loadBitmap("media/freidrehen.jpg", onLoaded, 
+                maxsize=(40,40))
+        player.play()
+
     def testBlendMode(self):
         def isBlendMinMaxSupported():
             def tryInsertNode():
@@ -415,6 +648,141 @@ class ImageTestCase(AVGTestCase):
                  lambda: self.compareImage("testBlend2")
                 ))
 
+    def testRenderBatching(self):
+        def getScreenshot():
+            self.bmps.append(player.screenshot())
+
+        def enableBatching():
+            player.enableRenderBatching(True)
+
+        def checkBatches():
+            canvas = player.getMainCanvas()
+            # Two runs: nodes 0-2 and nodes 4-5. Node 3 has a different opacity and 
+            # node 6 a different blend mode.
+            self.assertEqual(canvas.getNumBatches(), 2)
+            self.assertEqual(canvas.getNumBatchedNodes(), 5)
+            self.assert_(self.areSimilarBmps(self.bmps[0], self.bmps[1], 0.1, 1))
+
+        def disableBatching():
+            player.enableRenderBatching(False)
+
+        def checkUnbatched():
+            self.assertEqual(player.getMainCanvas().getNumBatches(), 0)
+
+        root = self.loadEmptyScene()
+        self.bmps = []
+        for i in range(7):
+            avg.ImageNode(href="rgb24-32x32.png", pos=(i*20,i*10), angle=i*0.3,
+                    parent=root)
+        root.getChild(1).size = (48,20)
+        root.getChild(3).opacity = 0.5
+        root.getChild(6).blendmode = "add"
+        self.assert_(not(player.isRenderBatchingEnabled()))
+        self.start(False,
+                (getScreenshot,
+                 enableBatching,
+                 getScreenshot,
+                 checkBatches,
+                 disableBatching,
+                 checkUnbatched,
+                ))
+
+    def testTextureAtlas(self):
+        def createNodes():
+            for i in range(3):
+                avg.ImageNode(href="rgb24-32x32.png", pos=(i*40,0), parent=root)
+            self.alphaNode = avg.ImageNode(href="rgb24alpha-64x64.png", pos=(0,40),
+                    parent=root)
+            avg.ImageNode(href="rgb24-65x65.png", pos=(80,40), parent=root)
+
+        def enableAtlas():
+            self.bmp = player.screenshot()
+            while root.getNumChildren() > 0:
+                root.getChild(0).unlink(True)
+            atlas.setMaxImageSize(64)
+            createNodes()
+
+        def checkAtlas():
+            # One page per pixel format. The 65x65 image is too large.
+            self.assertEqual(atlas.getNumRegions(), 2)
+            self.assertEqual(atlas.getNumPages(), 2)
+            self.assert_(self.areSimilarBmps(self.bmp, player.screenshot(), 0.1, 1))
+
+        def setEffect():
+            self.alphaNode.setEffect(avg.NullFXNode())
+
+        def checkEffect():
+            self.assertEqual(atlas.getNumRegions(), 1)
+            self.assertEqual(atlas.getNumPages(), 1)
+
+        def removeNodes():
+            while root.getNumChildren() > 0:
+                root.getChild(0).unlink(True)
+
+        atlas = avg.TextureAtlas.get()
+        self.assertEqual(atlas.getMaxImageSize(), 0)
+        root = self.loadEmptyScene()
+        createNodes()
+        try:
+            self.start(False,
+                    (enableAtlas,
+                     checkAtlas,
+                     setEffect,
+                     checkEffect,
+                     removeNodes,
+                     lambda: self.assertEqual(atlas.getNumPages(), 0),
+                    ))
+        finally:
+            atlas.setMaxImageSize(0)
+
+    def testTextureAtlasRepack(self):
+        def createNode(i, pos):
+            bmp = avg.Bitmap(srcBmp, ((i%5)*30, (i/5)*30), ((i%5)*30+30, (i/5)*30+30))
+            node = avg.ImageNode(pos=pos, parent=root)
+            node.setBitmap(bmp)
+            return node
+
+        def addNodeOverBudget():
+            self.assertEqual(atlas.getNumRegions(), 16)
+            self.assertEqual(atlas.getNumPages(), 1)
+            # The page is full and there is no budget for a second one.
+            createNode(16, (200,0))
+            self.assertEqual(atlas.getNumRegions(), 16)
+            self.bmp = player.screenshot()
+
+        def addNodeWithRepack():
+            for node in hiddenNodes:
+                node.unlink(True)
+            self.assertEqual(atlas.getNumRegions(), 12)
+            createNode(17, (200,0))
+            self.assertEqual(atlas.getNumRegions(), 13)
+            self.assertEqual(atlas.getNumPages(), 1)
+            self.assertEqual(atlas.getNumRepacks(), 1)
+
+        def checkScreenshot():
+            # The visible images have moved inside the page.
+            self.assert_(self.areSimilarBmps(self.bmp, player.screenshot(), 0, 0))
+
+        atlas = avg.TextureAtlas.get()
+        atlas.setMaxImageSize(32)
+        atlas.setPageSize(128)
+        atlas.setMaxBytes(128*128*4)
+        try:
+            root = self.loadEmptyScene()
+            srcBmp = avg.Bitmap("media/freidrehen.jpg")
+            hiddenNodes = [createNode(i, (200,0)) for i in range(4)]
+            for i in range(4, 16):
+                createNode(i, (((i-4)%4)*32, ((i-4)/4)*32))
+            self.start(False,
+                    (addNodeOverBudget,
+                     addNodeWithRepack,
+                     checkScreenshot,
+                    ))
+        finally:
+            atlas.setMaxImageSize(0)
+            atlas.setPageSize(1024)
+            atlas.setMaxBytes(32*1024*1024)
+
     def testImageMask(self):
         def createNode(p):
             node = avg.ImageNode(href="rgb24-65x65.png", maskhref="mask.png", 
@@ -588,9 +956,19 @@ def imageTestSuite(tests):
             "testImageSize",
             "testImageWarp",
             "testBitmap",
+            "testBitmapSharing",
             "testBitmapManager",
             "testBitmapManagerException",
+            "testBitmapManagerPriority",
+            "testBitmapManagerStats",
+            "testBitmapCache",
+            "testBitmapDiskCache",
+            "testBitmapBuffer",
+            "testDecodeSize",
             "testBlendMode",
+            "testRenderBatching",
+            "testTextureAtlas",
+            "testTextureAtlasRepack",
             "testImageMask",
             "testImageMaskCanvas",
             "testImageMaskPos",
@@ -21,6 +21,7 @@
 
 import math
 import threading
+import os
 
 from libavg import avg, player
 from testcase import *
@@ -174,6 +175,52 @@ class PlayerTestCase(AVGTestCase):
                  lambda: checkSize(23,22),
                 ))
 
+    def testSpatialIndex(self):
+        def createDiv(bSpatialIndex):
+            div = avg.DivNode(size=(160,120), spatialindex=bSpatialIndex, parent=root)
+            for y in range(12):
+                for x in range(16):
+                    avg.DivNode(pos=(x*10,y*10), size=(8,8), parent=div)
+            # Unbounded and rotated children.
+            avg.RectNode(pos=(50,50), size=(20,20), parent=div)
+            avg.DivNode(pos=(30,30), parent=div)
+            avg.DivNode(pos=(60,20), size=(30,10), angle=0.5, parent=div)
+            return div
+
+        def getChildIndexes(div):
+            indexes = []
+            for y in range(0, 120, 3):
+                for x in range(0, 160, 3):
+                    node = div.getElementByPos((x,y))
+                    if node is div:
+                        indexes.append(-1)
+                    else:
+                        indexes.append(div.indexOf(node))
+            return indexes
+
+        def moveChildren(div):
+            div.getChild(5).pos = (73,47)
+            div.getChild(6).size = (30,30)
+            div.getChild(7).angle = 1
+            avg.DivNode(pos=(100,100), size=(30,30), parent=div)
+
+        def changeChildren(div):
+            div.insertChild(avg.DivNode(pos=(1,1), size=(50,50)), 20)
+            div.reorderChild(0, 100)
+            div.removeChild(30)
+
+        root = self.loadEmptyScene()
+        div = createDiv(False)
+        indexedDiv = createDiv(True)
+        self.assert_(indexedDiv.spatialindex)
+        self.assertEqual(getChildIndexes(div), getChildIndexes(indexedDiv))
+        for modifyDiv in (moveChildren, changeChildren):
+            modifyDiv(div)
+            modifyDiv(indexedDiv)
+            self.assertEqual(getChildIndexes(div), getChildIndexes(indexedDiv))
+        indexedDiv.spatialindex = False
+        self.assertEqual(getChildIndexes(div), getChildIndexes(indexedDiv))
+
     def testRotate(self):
         def onOuterDown(Event):
             self.onOuterDownCalled = True
@@ -373,6 +420,33 @@ class PlayerTestCase(AVGTestCase):
         player.clearInterval(self.timeout3ID)
 
 
+    def testManyTimeouts(self):
+        def onTimeout(time):
+            self.firedTimes.append(time)
+
+        def setupTimeouts():
+            self.ids = {}
+            for i in xrange(1000):
+                time = (i*37)%50
+                self.ids[i] = (time, player.setTimeout(time,
+                        lambda time=time: onTimeout(time)))
+            for i in xrange(0, 1000, 3):
+                self.assert_(player.clearInterval(self.ids[i][1]))
+            self.assert_(not(player.clearInterval(self.ids[0][1])))
+
+        def checkTimeouts():
+            self.assertEqual(self.firedTimes, sorted(self.firedTimes))
+            expectedTimes = [time for i, (time, id) in self.ids.iteritems() if i%3 != 0]
+            self.assertEqual(sorted(self.firedTimes), sorted(expectedTimes))
+
+        self.initDefaultImageScene()
+        self.firedTimes = []
+        self.start(False,
+                (setupTimeouts,
+                 lambda: self.delay(100),
+                 checkTimeouts,
+                ))
+
     def testTimeoutOnFrameHandling(self):
 
         def onTimeOut():
@@ -420,6 +494,62 @@ class PlayerTestCase(AVGTestCase):
                  lambda: self.assert_(self.asyncCalled),
                 ))
 
+    def testThreadChannel(self):
+
+        def onPayloads(payloads):
+            self.batches.append(payloads)
+
+        def threadFunc():
+            for i in xrange(10):
+                self.channel.post(i)
+            for i in xrange(5):
+                self.channel.post(("pos", i), "pos")
+            self.channel.post(10)
+
+        def runThread():
+            # Joining in the same frame makes sure all payloads arrive in one batch.
+            thread = threading.Thread(target=threadFunc)
+            thread.start()
+            thread.join()
+
+        def checkBatch():
+            self.assertEqual(len(self.batches), 1)
+            self.assertEqual(self.batches[0], range(10) + [("pos", 4), 10])
+            self.assertEqual(self.channel.numcoalesced, 4)
+            self.assertEqual(self.channel.numpending, 0)
+
+        def checkOverflow():
+            for i in xrange(3):
+                self.channel.post(i)
+            self.assert_(self.channel.post(3, "key"))
+            self.assert_(not(self.channel.post(4)))
+            self.assert_(self.channel.post(5, "key"))
+            self.assertEqual(self.channel.numdropped, 1)
+            self.assertEqual(self.channel.numpending, 4)
+
+        def closeChannel():
+            self.channel.post(7)
+            self.channel.close()
+            self.assert_(self.channel.isClosed())
+            self.assert_(not(self.channel.post(8)))
+
+        self.initDefaultImageScene()
+        self.batches = []
+        self.assertRaises(RuntimeError, lambda: player.createThreadChannel(onPayloads, 0))
+        self.channel = player.createThreadChannel(onPayloads, maxsize=16)
+        self.start(False,
+                (runThread,
+                 checkBatch,
+                 lambda: self.assertEqual(len(self.batches), 1),
+                 lambda: self.batches.pop(),
+                 lambda: setattr(self, "channel", 
+                        player.createThreadChannel(onPayloads, maxsize=4)),
+                 checkOverflow,
+                 lambda: self.assertEqual(self.batches, [[0, 1, 2, 5]]),
+                 closeChannel,
+                 lambda: self.assertEqual(len(self.batches), 1),
+                ))
+
     def testAVGFile(self):
         player.loadFile("image.avg")
         self.start(False, 
@@ -464,6 +594,198 @@ class PlayerTestCase(AVGTestCase):
                  checkRelPos
                 ))
 
+    def testFrameSkipping(self):
+        def recordSkippedFrames():
+            self.__numSkipped = player.getNumSkippedFrames()
+            self.assert_(self.__numSkipped > 0)
+            self.__bmp = player.screenshot()
+            # The back buffer is undefined after a skipped frame and must be restored
+            # before it is read.
+            os.environ["AVG_BROKEN_READBUFFER"] = "1"
+            try:
+                backBmp = player.screenshot()
+            finally:
+                del os.environ["AVG_BROKEN_READBUFFER"]
+            self.assert_(self.areSimilarBmps(self.__bmp, backBmp, 0.01, 0.01))
+
+        def checkSkippedFrames(numNew):
+            self.assertEqual(player.getNumSkippedFrames(), self.__numSkipped+numNew)
+
+        def moveNode():
+            node.pos = (40,40)
+
+        def checkMoved():
+            checkSkippedFrames(1)
+            self.assert_(not(self.areSimilarBmps(self.__bmp, player.screenshot(),
+                    0.01, 0.01)))
+
+        def clearHRef():
+            node.href = ""
+
+        def checkCleared():
+            checkSkippedFrames(3)
+            self.assertEqual(player.screenshot().getAvg(), 0)
+
+        root = self.loadEmptyScene()
+        node = avg.ImageNode(href="rgb24-65x65.png", parent=root)
+        player.enableFrameSkipping(True)
+        self.assert_(player.isFrameSkippingEnabled())
+        try:
+            self.start(False,
+                    (None,
+                     recordSkippedFrames,
+                     moveNode,
+                     checkMoved,
+                     lambda: checkSkippedFrames(2),
+                     clearHRef,
+                     checkCleared,
+                    ))
+        finally:
+            player.enableFrameSkipping(False)
+
+    def testVertexReuse(self):
+        def moveNode():
+            node.x += 10
+
+        def checkReused():
+            self.assertEqual(player.getMainCanvas().getNumReusedDivs(), 2)
+            self.__bmp = player.screenshot()
+            player.enableFrameSkipping(False)
+
+        def checkNotReused():
+            self.assertEqual(player.getMainCanvas().getNumReusedDivs(), 0)
+            self.assert_(self.areSimilarBmps(self.__bmp, player.screenshot(), 0.01, 0.01))
+
+        root = self.loadEmptyScene()
+        div = avg.DivNode(parent=root)
+        avg.ImageNode(href="rgb24-65x65.png", parent=div)
+        div = avg.DivNode(parent=root)
+        node = avg.ImageNode(pos=(20,20), href="rgb24alpha-64x64.png", parent=div)
+        div = avg.DivNode(pos=(80,40), parent=root)
+        avg.ImageNode(href="rgb24-65x65.png", parent=div)
+        player.enableFrameSkipping(True)
+        try:
+            self.start(False,
+                    (None,
+                     None,
+                     moveNode,
+                     checkReused,
+                     checkNotReused,
+                    ))
+        finally:
+            player.enableFrameSkipping(False)
+
+    def testCachedDiv(self):
+        def checkUpdates(numUpdates):
+            self.assertEqual(player.getMainCanvas().getNumCacheUpdates(), numUpdates)
+
+        def checkCached():
+            checkUpdates(0)
+            self.assertEqual(player.getDivCacheNumBytes(), 70*70*4)
+
+        def moveDiv():
+            div.pos = (20,20)
+
+        def changeChild():
+            checkUpdates(0)
+            div.getChild(1).fillcolor = "00FF00"
+
+        def invalidate():
+            checkUpdates(1)
+            div.invalidate()
+
+        def disableCache():
+            checkUpdates(1)
+            self.__bmp = player.screenshot()
+            div.cached = False
+
+        def limitMemory():
+            checkUpdates(0)
+            self.assertEqual(player.getDivCacheNumBytes(), 0)
+            self.assert_(self.areSimilarBmps(self.__bmp, player.screenshot(), 0.1, 0.1))
+            player.setDivCacheMaxBytes(1000)
+            div.cached = True
+
+        def checkOverBudget():
+            checkUpdates(0)
+            self.assertEqual(player.getDivCacheNumBytes(), 0)
+            self.assert_(self.areSimilarBmps(self.__bmp, player.screenshot(), 0.1, 0.1))
+            player.setDivCacheMaxBytes(64*1024*1024)
+            # Group opacity only equals per-node opacity if children don't overlap.
+            div.getChild(0).active = False
+            div.opacity = 0.5
+
+        def checkOpacityCached():
+            checkUpdates(1)
+            div.opacity = 0.3
+
+        def checkOpacityChanged():
+            # The cache doesn't depend on the opacity of the div.
+            checkUpdates(0)
+            self.__bmp = player.screenshot()
+            div.cached = False
+
+        def checkOpacityUncached():
+            checkUpdates(0)
+            self.assert_(self.areSimilarBmps(self.__bmp, player.screenshot(), 0.1, 0.1))
+
+        root = self.loadEmptyScene()
+        div = avg.DivNode(pos=(10,10), size=(70,70), cached=True, parent=root)
+        self.assert_(div.cached)
+        avg.ImageNode(href="rgb24-65x65.png", parent=div)
+        avg.RectNode(pos=(10,10), size=(30,20), fillcolor="FF0000", fillopacity=1,
+                parent=div)
+        try:
+            self.start(False,
+                    (None,
+                     None,
+                     checkCached,
+                     moveDiv,
+                     changeChild,
+                     invalidate,
+                     disableCache,
+                     limitMemory,
+                     checkOverBudget,
+                     checkOpacityCached,
+                     checkOpacityChanged,
+                     checkOpacityUncached,
+                    ))
+        finally:
+            player.setDivCacheMaxBytes(64*1024*1024)
+
+    def testCulling(self):
+        def checkCulled():
+            self.assertEqual(player.getMainCanvas().getNumCulledNodes(), 6)
+            self.__bmp = player.screenshot()
+            hiddenImage.pos = (20,20)
+
+        def checkVisible():
+            self.assertEqual(player.getMainCanvas().getNumCulledNodes(), 5)
+            self.assert_(not(self.areSimilarBmps(self.__bmp, player.screenshot(), 
+                    0.1, 0.1)))
+
+        root = self.loadEmptyScene()
+        cropDiv = avg.DivNode(pos=(10,10), size=(50,50), crop=True, parent=root)
+        avg.ImageNode(href="rgb24-65x65.png", parent=cropDiv)
+        hiddenImage = avg.ImageNode(pos=(60,0), href="rgb24-65x65.png", parent=cropDiv)
+        avg.ImageNode(pos=(0,-70), href="rgb24-65x65.png", parent=cropDiv)
+        avg.ImageNode(pos=(170,0), href="rgb24-65x65.png", parent=root)
+        avg.ImageNode(pos=(-70,-70), href="rgb24-65x65.png", parent=root)
+        # Cropped div outside the window: Its children aren't counted.
+        outsideDiv = avg.DivNode(pos=(200,200), size=(20,20), crop=True, parent=root)
+        avg.ImageNode(href="rgb24-65x65.png", parent=outsideDiv)
+        # Uncropped div: Only the child is culled.
+        div = avg.DivNode(parent=root)
+        avg.ImageNode(pos=(300,0), href="rgb24-65x65.png", parent=div)
+        # Vector nodes are never culled.
+        avg.RectNode(pos=(300,300), size=(10,10), parent=root)
+        self.start(False,
+                (None,
+                 None,
+                 checkCulled,
+                 checkVisible,
+                ))
+
     def testCropImage(self):
         def moveTLCrop():
             node = player.getElementByID("img")
@@ -849,6 +1171,7 @@ def playerTestSuite(tests):
             "testColorParse",
             "testFakeTime",
             "testDivResize",
+            "testSpatialIndex",
             "testRotate",
             "testRotate2",
             "testRotatePivot",
@@ -860,11 +1183,17 @@ def playerTestSuite(tests):
             "testInvalidImageFilename",
             "testInvalidVideoFilename",
             "testTimeouts",
+            "testManyTimeouts",
             "testTimeoutOnFrameHandling",
             "testCallFromThread",
+            "testThreadChannel",
             "testAVGFile",
             "testBroken",
             "testMove",
+            "testFrameSkipping",
+            "testVertexReuse",
+            "testCachedDiv",
+            "testCulling",
             "testCropImage",
             "testCropMovie",
             "testWarp",
@@ -23,7 +23,7 @@ import os
 import time
 import tempfile
 
-from libavg import geom, statemachine, persist
+from libavg import geom, statemachine, persist, tasks
 
 from testcase import *
 
@@ -170,6 +170,22 @@ class PythonTestCase(AVGTestCase):
         kaputtMachine.addState('A', {'B': None})
         self.assertRaises(RuntimeError, lambda: kaputtMachine.changeState('B'))
 
+        # Machines that share the states of a template.
+        template = statemachine.StateMachine("template", 'A')
+        template.addState('A', ('B',))
+        template.addState('B', ('A',))
+        machine1 = statemachine.StateMachine("machine1", 'A', template)
+        machine2 = statemachine.StateMachine("machine2", 'B', template)
+        machine1.changeState('B')
+        self.assertEqual(machine1.state, 'B')
+        self.assertEqual(machine2.state, 'B')
+        self.assertRaises(RuntimeError, lambda: machine2.changeState('C'))
+        self.assertRaises(RuntimeError, lambda: template.addState('C', ('A',)))
+        kaputtMachine = statemachine.StateMachine("kaputt", 'A')
+        kaputtMachine.addState('A', ('B',))
+        self.assertRaises(RuntimeError, 
+                lambda: statemachine.StateMachine("kaputt2", 'A', kaputtMachine))
+
     def testStateMachineDiagram(self):
         def aEntered():
             pass
@@ -189,6 +205,98 @@ class PythonTestCase(AVGTestCase):
         except RuntimeError:
             self.skip("graphviz not installed.")
 
+    def testTasks(self):
+        def frameTask():
+            startTime = yield tasks.nextFrame()
+            time = yield tasks.nextFrame()
+            self.assertEqual(time-startTime, 100)
+            yield tasks.sleep(200)
+            self.assert_(player.getFrameTime()-startTime >= 300)
+            raise tasks.Return(42)
+
+        def mainTask():
+            result = yield tasks.start(frameTask())
+            self.assertEqual(result, 42)
+            try:
+                yield tasks.loadBitmap("nonexistent.png")
+                self.assert_(False)
+            except RuntimeError:
+                pass
+            bmp = yield tasks.loadBitmap("media/rgb24alpha-64x64.png")
+            self.assertEqual(bmp.getSize(), (64,64))
+            readFD, writeFD = os.pipe()
+            os.write(writeFD, "x")
+            yield tasks.waitReadable(readFD)
+            self.assertEqual(os.read(readFD, 1), "x")
+            os.close(readFD)
+            os.close(writeFD)
+            raise tasks.Return("done")
+
+        def sleepingTask():
+            try:
+                yield tasks.sleep(10000)
+            finally:
+                self.sleepingTaskClosed = True
+
+        def startTasks():
+            self.mainTask = tasks.start(mainTask())
+            self.sleepingTask = tasks.start(sleepingTask())
+
+        def cancelSleepingTask():
+            self.assert_(self.sleepingTask.cancel())
+            self.assert_(self.sleepingTask.cancelled())
+            self.assert_(self.sleepingTaskClosed)
+            self.assertRaises(tasks.CancelledError, self.sleepingTask.result)
+
+        self.loadEmptyScene()
+        player.setFakeFPS(10)
+        self.sleepingTaskClosed = False
+        self.start(False,
+                (startTasks,
+                 lambda: self.assert_(not(self.mainTask.done())),
+                 cancelSleepingTask,
+                 lambda: self.delay(1000),
+                 lambda: self.assertEqual(self.mainTask.result(), "done"),
+                ))
+
+    def testTasksClosedFile(self):
+        def waitingTask(fd):
+            try:
+                yield tasks.waitReadable(fd)
+            except Exception as ex:
+                raise tasks.Return(ex)
+            raise tasks.Return(fd)
+
+        def startTasks():
+            self.cancelledTask = tasks.start(waitingTask(self.cancelledFDs[0]))
+            self.closedTask = tasks.start(waitingTask(self.closedFDs[0]))
+            self.readyTask = tasks.start(waitingTask(self.readyFDs[0]))
+
+        def closeFiles():
+            # Closing the file of a cancelled wait in the same frame is common.
+            self.cancelledTask.cancel()
+            for fd in self.cancelledFDs + self.closedFDs:
+                os.close(fd)
+            os.write(self.readyFDs[1], "x")
+
+        def checkTasks():
+            self.assert_(self.cancelledTask.cancelled())
+            self.assert_(isinstance(self.closedTask.result(), Exception))
+            self.assertEqual(self.readyTask.result(), self.readyFDs[0])
+            for fd in self.readyFDs:
+                os.close(fd)
+
+        self.loadEmptyScene()
+        self.cancelledFDs = os.pipe()
+        self.closedFDs = os.pipe()
+        self.readyFDs = os.pipe()
+        self.start(False,
+                (startTasks,
+                 closeFiles,
+                 None,
+                 checkTasks,
+                ))
+
     def testPersistStore(self):
         testFile = getTempFileName()
         p = persist.Persist(testFile, {})
@@ -230,6 +338,8 @@ def pythonTestSuite(tests):
         "testArc",
         "testStateMachine",
         "testStateMachineDiagram",
+        "testTasks",
+        "testTasksClosedFile",
         "testPersistStore",
         "testPersistCorrupted",
         "testPersistValidation",
@@ -96,7 +96,7 @@ class JitterFilter(app.MainDiv):
 
     def __moveContact(self):
         time = player.getFrameTime()
-        rawPos = self.__contact.events[-1].pos
+        rawPos = self.__contact.lastevent.pos
         self.__rawContactCircle.pos = rawPos
         filteredPos = avg.Point2D(self.__filters[0].apply(rawPos.x, time),
                 self.__filters[1].apply(rawPos.y, time))
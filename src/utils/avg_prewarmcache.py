@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# libavg - Media Playback Engine.
+# Copyright (C) 2003-2014 Ulrich von Zadow
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Current versions can be found at www.libavg.de
+#
+
+from optparse import OptionParser
+import os
+import sys
+
+from libavg import avg, player
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff")
+
+parser = OptionParser(usage="%prog [options] file(s) or folder(s)", 
+        description="Decodes image files and stores the results in the libavg bitmap "
+                "disk cache, so later loads are fast.")
+parser.add_option("-d", "--dir", dest="dir",
+        help="Cache directory. Defaults to bitmap:diskcachedir from avgrc.")
+parser.add_option("-r", "--recursion", dest="recursion", action="store_true",
+        help="Recurse into subdirectories")
+parser.add_option("-p", "--pixelformat", dest="pixelformat", default="NO_PIXELFORMAT",
+        help="Pixel format to decode to, e.g. I8. Defaults to the format used by "
+                "ImageNodes.")
+parser.add_option("-m", "--maxsize", dest="maxsize", default="0,0",
+        help="Maximum decode size as width,height (see ImageNode.maxdecodesize).")
+options, args = parser.parse_args()
+
+def getFileNames(args):
+    fileNames = []
+    for arg in args:
+        if os.path.isdir(arg):
+            for dirPath, dirNames, files in os.walk(arg):
+                if not(options.recursion):
+                    del dirNames[:]
+                for fileName in sorted(files):
+                    if os.path.splitext(fileName)[1].lower() in IMAGE_EXTENSIONS:
+                        fileNames.append(os.path.join(dirPath, fileName))
+        elif os.path.isfile(arg):
+            fileNames.append(arg)
+        else:
+            sys.stderr.write("Skipping " + arg + ": Not a file or folder.\n")
+    return fileNames
+
+if len(args) == 0:
+    parser.print_help()
+    sys.exit(1)
+
+diskCache = avg.BitmapDiskCache.get()
+if options.dir:
+    diskCache.setDir(options.dir)
+if diskCache.getDir() == "":
+    sys.stderr.write("No cache directory. Use --dir or set bitmap:diskcachedir in "
+            "avgrc.\n")
+    sys.exit(1)
+pixelFormat = getattr(avg, options.pixelformat)
+maxSize = [int(x) for x in options.maxsize.split(",")]
+
+numDecoded = 0
+numCached = 0
+numFailed = 0
+for fileName in getFileNames(args):
+    try:
+        if diskCache.prewarm(fileName, pixelFormat, maxSize):
+            numDecoded += 1
+            print "Decoded", fileName
+        else:
+            numCached += 1
+    except RuntimeError, err:
+        numFailed += 1
+        sys.stderr.write(fileName + ": " + str(err) + "\n")
+
+print "%i files decoded, %i already cached, %i failed." % (
+        numDecoded, numCached, numFailed)
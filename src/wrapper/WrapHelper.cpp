@@ -446,6 +446,7 @@ void export_base()
     from_python_sequence<vector<string>, variable_capacity_policy>();
   
     from_python_sequence<vector<float>, variable_capacity_policy>();
+    to_python_converter<vector<int>, to_list<vector<int> > >();    
     from_python_sequence<vector<int>, variable_capacity_policy>();
 
     to_python_converter<std::type_info, type_info_to_string>();
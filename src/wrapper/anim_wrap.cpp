@@ -28,6 +28,7 @@
 #include "../anim/WaitAnim.h"
 #include "../anim/ParallelAnim.h"
 #include "../anim/StateAnim.h"
+#include "../anim/InertiaAnim.h"
 
 #include "../player/BoostPython.h"
 
@@ -100,6 +101,18 @@ void export_anim()
         .def("start", &WaitAnim::start, start_overloads(bp::args("bKeepAttr")))
         ;
     
+    class_<InertiaAnim, boost::shared_ptr<InertiaAnim>, bases<Anim>, 
+            boost::noncopyable>("InertiaAnim", no_init)
+        .def(init<float, optional<const object&, const object&> >
+                ((bp::arg("friction"), bp::arg("moveCallback")=object(),
+                 bp::arg("stopCallback")=object())))
+        .def("onDrag", &InertiaAnim::onDrag)
+        .def("start", &InertiaAnim::start, start_overloads(bp::args("bKeepAttr")))
+        .add_property("friction", &InertiaAnim::getFriction)
+        .add_property("velocity", &InertiaAnim::getVelocity)
+        .add_property("angvelocity", &InertiaAnim::getAngVelocity)
+        ;
+    
     class_<ParallelAnim, boost::shared_ptr<ParallelAnim>, bases<Anim>, 
             boost::noncopyable>("ParallelAnim", no_init)
         .def(init<const std::vector<AnimPtr>&,
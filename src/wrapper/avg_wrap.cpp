@@ -40,6 +40,7 @@ void export_anim();
 #include "../player/TestHelper.h"
 #include "../player/Canvas.h"
 #include "../player/OffscreenCanvas.h"
+#include "../player/ThreadChannel.h"
 #include "../player/VideoWriter.h"
 #include "../player/SVG.h"
 #include "../player/VersionInfo.h"
@@ -116,6 +117,11 @@ BOOST_PYTHON_MODULE(avg)
         // end remove
 
         def("validateXml", validateXml);
+        def("calcKMeans", calcKMeans, 
+                (bp::arg("pts"), bp::arg("numclusters"), 
+                 bp::arg("initialclusters")=std::vector<int>(),
+                 bp::arg("maxiterations")=50));
+        def("calcClusterCentroids", calcClusterCentroids);
 
         class_<MessageID>("MessageID", no_init)
             .def("__repr__", &MessageID::getRepr)
@@ -229,6 +235,14 @@ BOOST_PYTHON_MODULE(avg)
             .def("setOGLOptions", &Player::setOGLOptions)
             .def("setMultiSampleSamples", &Player::setMultiSampleSamples)
             .def("enableGLErrorChecks", &Player::enableGLErrorChecks)
+            .def("enableRenderBatching", &Player::enableRenderBatching)
+            .def("isRenderBatchingEnabled", &Player::isRenderBatchingEnabled)
+            .def("enableFrameSkipping", &Player::enableFrameSkipping)
+            .def("isFrameSkippingEnabled", &Player::isFrameSkippingEnabled)
+            .def("getNumSkippedFrames", &Player::getNumSkippedFrames)
+            .def("setDivCacheMaxBytes", &Player::setDivCacheMaxBytes)
+            .def("getDivCacheMaxBytes", &Player::getDivCacheMaxBytes)
+            .def("getDivCacheNumBytes", &Player::getDivCacheNumBytes)
             .def("getScreenResolution", &Player::getScreenResolution)
             .def("getPixelsPerMM", &Player::getPixelsPerMM)
             .def("getPhysicalScreenDimensions", &Player::getPhysicalScreenDimensions)
@@ -258,12 +272,16 @@ BOOST_PYTHON_MODULE(avg)
             .def("createNode", &Player::createNode, Player_createNode_overloads())
             .def("enableMultitouch", &Player::enableMultitouch)
             .def("enableMouse", &Player::enableMouse)
+            .def("enableMotionCoalescing", &Player::enableMotionCoalescing)
+            .def("isMotionCoalescingEnabled", &Player::isMotionCoalescingEnabled)
             .def("isMultitouchAvailable", &Player::isMultitouchAvailable)
             .def("getTracker", &Player::getTracker,
                     return_value_policy<reference_existing_object>())
             .def("setInterval", &Player::setInterval)
             .def("setTimeout", &Player::setTimeout)
             .def("callFromThread", &Player::callFromThread)
+            .def("createThreadChannel", &Player::createThreadChannel,
+                    (bp::arg("callback"), bp::arg("maxsize")=1024))
             .def("setOnFrameHandler", &Player::setOnFrameHandler)
             .def("clearInterval", &Player::clearInterval)
             .def("addInputDevice", &Player::addInputDevice)
@@ -300,6 +318,23 @@ BOOST_PYTHON_MODULE(avg)
             .def("getRootNode", &Canvas::getRootNode)
             .def("getElementByID", &Canvas::getElementByID)
             .def("screenshot", &Canvas::screenshot)
+            .def("getNumBatches", &Canvas::getNumBatches)
+            .def("getNumBatchedNodes", &Canvas::getNumBatchedNodes)
+            .def("getNumCacheUpdates", &Canvas::getNumCacheUpdates)
+            .def("getNumCulledNodes", &Canvas::getNumCulledNodes)
+            .def("getNumReusedDivs", &Canvas::getNumReusedDivs)
+        ;
+
+        class_<ThreadChannel, boost::shared_ptr<ThreadChannel>, boost::noncopyable>(
+                "ThreadChannel", no_init)
+            .def("post", &ThreadChannel::post,
+                    (bp::arg("payload"), bp::arg("key")=""))
+            .def("close", &ThreadChannel::close)
+            .def("isClosed", &ThreadChannel::isClosed)
+            .add_property("maxsize", &ThreadChannel::getMaxSize)
+            .add_property("numpending", &ThreadChannel::getNumPending)
+            .add_property("numdropped", &ThreadChannel::getNumDropped)
+            .add_property("numcoalesced", &ThreadChannel::getNumCoalesced)
         ;
 
         class_<OffscreenCanvas, boost::shared_ptr<OffscreenCanvas>, bases<Canvas>,
@@ -23,12 +23,18 @@
 
 #include "../player/BoostPython.h"
 #include "../player/BitmapManager.h"
+#include "../player/BitmapCache.h"
+#include "../player/WrapPython.h"
 
 #include "../graphics/Bitmap.h"
 #include "../graphics/BitmapLoader.h"
+#include "../graphics/BitmapDiskCache.h"
+#include "../graphics/TextureAtlas.h"
 #include "../graphics/FilterResizeBilinear.h"
 
 #include "../base/CubicSpline.h"
+#include "../base/Mat3x3.h"
+#include "../base/OneEuroFilterBank.h"
 #include "../base/GeomHelper.h"
 
 #include "../glm/gtx/vector_angle.hpp"
@@ -89,14 +95,188 @@ BitmapPtr Bitmap_getResized(BitmapPtr This, const glm::vec2& size)
     return FilterResizeBilinear(IntPoint(size)).apply(This);
 }
 
+// Describes the pixel memory of the bitmap in numpy array interface format (version 3),
+// so numpy.asarray(bitmap) returns a view that shares memory with the bitmap.
+dict Bitmap_getArrayInterface(BitmapPtr This)
+{
+    PixelFormat pf = This->getPixelFormat();
+    if (pf == YCbCr411 || pixelFormatIsPlanar(pf)) {
+        throw Exception(AVG_ERR_UNSUPPORTED, "Bitmap.__array_interface__: pixel format "
+                + getPixelFormatString(pf) + " not supported.");
+    }
+    int one = 1;
+    string sByteOrder = (*(char*)&one == 1) ? "<" : ">";
+    string sTypeStr;
+    int compSize;
+    switch (pf) {
+        case B5G6R5:
+        case R5G6B5:
+        case I16:
+            sTypeStr = sByteOrder+"u2";
+            compSize = 2;
+            break;
+        case R32G32B32A32F:
+        case I32F:
+            sTypeStr = sByteOrder+"f4";
+            compSize = 4;
+            break;
+        default:
+            sTypeStr = "|u1";
+            compSize = 1;
+    }
+    int bpp = This->getBytesPerPixel();
+    IntPoint size = This->getSize();
+    dict arrayInterface;
+    if (bpp == compSize) {
+        arrayInterface["shape"] = make_tuple(size.y, size.x);
+        arrayInterface["strides"] = make_tuple(This->getStride(), bpp);
+    } else {
+        arrayInterface["shape"] = make_tuple(size.y, size.x, bpp/compSize);
+        arrayInterface["strides"] = make_tuple(This->getStride(), bpp, compSize);
+    }
+    arrayInterface["typestr"] = sTypeStr;
+    object address(handle<>(PyLong_FromVoidPtr(This->getPixels())));
+    arrayInterface["data"] = make_tuple(address, false);
+    arrayInterface["version"] = 3;
+    return arrayInterface;
+}
+
+// Keeps the python object that exports the pixel memory of a bitmap alive and locked
+// as long as the bitmap exists.
+class PyBufferReleaser
+{
+public:
+    PyBufferReleaser(Py_buffer* pView)
+        : m_pView(pView)
+    {
+    }
+
+    void operator()(Bitmap* pBmp)
+    {
+        delete pBmp;
+        aquirePyGIL lock;
+        PyBuffer_Release(m_pView);
+        delete m_pView;
+    }
+
+private:
+    Py_buffer* m_pView;
+};
+
+BitmapPtr createBitmapFromBufferWithStride(object buffer, const IntPoint& size,
+        PixelFormat pf, int stride)
+{
+    if (pixelFormatIsPlanar(pf) || pf == NO_PIXELFORMAT) {
+        throw Exception(AVG_ERR_UNSUPPORTED, "Bitmap: pixel format "
+                + getPixelFormatString(pf) + " can't be used with a buffer.");
+    }
+    if (size.x <= 0 || size.y <= 0) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, 
+                "Can't create a bitmap with zero or negative width/height.");
+    }
+    int lineLen = size.x*getBytesPerPixel(pf);
+    if (stride == 0) {
+        stride = lineLen;
+    }
+    if (stride < lineLen) {
+        throw Exception(AVG_ERR_OUT_OF_RANGE, "Bitmap: stride too small.");
+    }
+    Py_buffer* pView = new Py_buffer;
+    if (PyObject_GetBuffer(buffer.ptr(), pView, PyBUF_WRITABLE) == -1) {
+        delete pView;
+        throw_error_already_set();
+    }
+    if (pView->len < Py_ssize_t(stride)*(size.y-1)+lineLen) {
+        PyBuffer_Release(pView);
+        delete pView;
+        throw Exception(AVG_ERR_OUT_OF_RANGE, "Bitmap: buffer too small.");
+    }
+    Bitmap* pBmp = new Bitmap(size, pf, (unsigned char*)pView->buf, stride, false);
+    return BitmapPtr(pBmp, PyBufferReleaser(pView));
+}
+
+BitmapPtr createBitmapFromBuffer(object buffer, const IntPoint& size, PixelFormat pf)
+{
+    return createBitmapFromBufferWithStride(buffer, size, pf, 0);
+}
+
 glm::vec2* createPoint()
 {
     return new glm::vec2(0,0);
 }
 
+int Mat3x3_len(const Mat3x3&)
+{
+    return 3;
+}
+
+glm::vec3 Mat3x3_getItem(const Mat3x3& mat, int i)
+{
+    if (i < 0 || i > 2) {
+        // Raises IndexError, so python iteration works.
+        throw std::out_of_range("Index out of range for Mat3x3. Must be 0, 1 or 2.");
+    }
+    return mat.getRow(i);
+}
+
+string Mat3x3_str(const Mat3x3& mat)
+{
+    stringstream st;
+    st << "avg.Mat3x3" << mat;
+    return st.str();
+}
+
+Mat3x3 Mat3x3_applyMat(const Mat3x3& mat, const Mat3x3& other)
+{
+    return mat*other;
+}
+
+Mat3x3 Mat3x3_scalarMult(const Mat3x3& mat, float s)
+{
+    return mat*s;
+}
+
+// Works with all nodes that have pos, pivot, angle and size attributes.
+Mat3x3 Mat3x3_fromNode(const object& node)
+{
+    glm::vec2 pos = extract<glm::vec2>(node.attr("pos"));
+    glm::vec2 pivot = extract<glm::vec2>(node.attr("pivot"));
+    float angle = extract<float>(node.attr("angle"));
+    glm::vec2 size = extract<glm::vec2>(node.attr("size"));
+    return Mat3x3::translate(pos+pivot) * Mat3x3::rotate(angle) * 
+            Mat3x3::translate(-pivot) * Mat3x3::scale(size);
+}
+
+void Mat3x3_setNodeTransform(const Mat3x3& mat, object node)
+{
+    node.attr("angle") = mat.getRotation();
+    glm::vec2 scale = mat.getScale();
+    if (scale.x < 9999 && scale.y < 9999) {
+        node.attr("size") = scale;
+    } else {
+        node.attr("size") = glm::vec2(0,0);
+    }
+    glm::vec2 pivot = extract<glm::vec2>(node.attr("size"))()/2.f;
+    node.attr("pivot") = pivot;
+    float angle = extract<float>(node.attr("angle"));
+    node.attr("pos") = mat.getTranslation() + getRotated(pivot, angle) - pivot;
+}
+
+BitmapPtr createBitmapFromFileWithMaxSize(const UTF8String& sFName, 
+        const IntPoint& maxSize)
+{
+    // The cached bitmap is shared, so python gets its own copy to modify.
+    BitmapPtr pCachedBmp = BitmapCache::get()->load(sFName, NO_PIXELFORMAT,
+            Image::TEXTURECOMPRESSION_NONE, maxSize);
+    BitmapPtr pBmp(new Bitmap(pCachedBmp->getSize(), pCachedBmp->getPixelFormat(),
+            pCachedBmp->getName()));
+    pBmp->copyPixels(*pCachedBmp);
+    return pBmp;
+}
+
 BitmapPtr createBitmapFromFile(const UTF8String& sFName)
 {
-    return loadBitmap(sFName);
+    return createBitmapFromFileWithMaxSize(sFName, IntPoint(0,0));
 }
 
 BitmapPtr createBitmapWithRect(BitmapPtr pBmp,
@@ -116,7 +296,24 @@ BitmapPtr createBitmapWithRect(BitmapPtr pBmp,
 }
 
 BOOST_PYTHON_MEMBER_FUNCTION_OVERLOADS(loadBitmap_overloads, BitmapManager::loadBitmapPy, 
-        2, 3);
+        2, 5);
+
+BOOST_PYTHON_MEMBER_FUNCTION_OVERLOADS(prewarm_overloads, BitmapDiskCache::prewarm, 1, 3);
+
+void BitmapLoadRequest_cancel(BitmapManagerMsgPtr pMsg)
+{
+    BitmapManager::get()->cancelRequest(pMsg);
+}
+
+void BitmapLoadRequest_setPriority(BitmapManagerMsgPtr pMsg, float priority)
+{
+    BitmapManager::get()->setRequestPriority(pMsg, priority);
+}
+
+float BitmapLoadRequest_getPriority(BitmapManagerMsgPtr pMsg)
+{
+    return BitmapManager::get()->getRequestPriority(pMsg);
+}
 
 void export_bitmap()
 {
@@ -137,6 +334,37 @@ void export_bitmap()
     implicitly_convertible<ConstVec2, glm::vec2>();
     implicitly_convertible<glm::vec2, ConstVec2>();
 
+    class_<Mat3x3>("Mat3x3", init<>())
+        .def(init<const glm::vec3&, const glm::vec3&, optional<const glm::vec3&> >())
+        .def("translate", &Mat3x3::translate)
+        .staticmethod("translate")
+        .def("rotate", &Mat3x3::rotate)
+        .staticmethod("rotate")
+        .def("pivotRotate", &Mat3x3::pivotRotate)
+        .staticmethod("pivotRotate")
+        .def("scale", &Mat3x3::scale)
+        .staticmethod("scale")
+        .def("fromNode", &Mat3x3_fromNode)
+        .staticmethod("fromNode")
+        .def("__len__", &Mat3x3_len)
+        .def("__getitem__", &Mat3x3_getItem)
+        .def("__str__", &Mat3x3_str)
+        .def("__repr__", &Mat3x3_str)
+        .def(self * self)
+        .def(self == self)
+        .def("applyMat", &Mat3x3_applyMat)
+        .def("applyVec", &Mat3x3::applyVec)
+        .def("applyPoint", &Mat3x3::applyPoint)
+        .def("applyPoints", &Mat3x3::applyPoints)
+        .def("det", &Mat3x3::det)
+        .def("inverse", &Mat3x3::inverse)
+        .def("scalarMult", &Mat3x3_scalarMult)
+        .def("getTranslation", &Mat3x3::getTranslation)
+        .def("getRotation", &Mat3x3::getRotation)
+        .def("getScale", &Mat3x3::getScale)
+        .def("setNodeTransform", &Mat3x3_setNodeTransform)
+    ;
+
     enum_<PixelFormat>("pixelformat")
         .value("B5G6R5", B5G6R5)
         .value("B8G8R8", B8G8R8)
@@ -177,6 +405,12 @@ void export_bitmap()
         .def(init<Bitmap>())
         .def("__init__", make_constructor(createBitmapWithRect))
         .def("__init__", make_constructor(createBitmapFromFile))
+        .def("__init__", make_constructor(createBitmapFromFileWithMaxSize,
+                default_call_policies(), 
+                (boost::python::arg("filename"), boost::python::arg("maxsize"))))
+        .def("__init__", make_constructor(createBitmapFromBuffer))
+        .def("__init__", make_constructor(createBitmapFromBufferWithStride))
+        .add_property("__array_interface__", &Bitmap_getArrayInterface)
         .def("blt", &Bitmap::blt)
         .def("getResized", &Bitmap_getResized)
         .def("save", &Bitmap::save)
@@ -197,8 +431,71 @@ void export_bitmap()
         .def("get", &BitmapManager::get,
                 return_value_policy<reference_existing_object>())
         .staticmethod("get")
-        .def("loadBitmap", &BitmapManager::loadBitmapPy, loadBitmap_overloads())
+        .def("loadBitmap", &BitmapManager::loadBitmapPy, loadBitmap_overloads(
+                args("self", "fileName", "callback", "pixelformat", "priority",
+                        "maxsize")))
+        .def("getNumPendingRequests", &BitmapManager::getNumPendingRequests)
         .def("setNumThreads", &BitmapManager::setNumThreads)
+        .def("getNumThreads", &BitmapManager::getNumThreads)
+        .def("setAutoNumThreads", &BitmapManager::setAutoNumThreads)
+        .def("getAutoNumThreads", &BitmapManager::getAutoNumThreads)
+        .def("getLoadLatency", &BitmapManager::getLoadLatency)
+        .def("getBytesPerSecond", &BitmapManager::getBytesPerSecond)
+        .def("getNumLoaded", &BitmapManager::getNumLoaded)
+        .def("resetStats", &BitmapManager::resetStats)
+    ;
+
+    class_<BitmapManagerMsg, BitmapManagerMsgPtr, boost::noncopyable>(
+            "BitmapLoadRequest", no_init)
+        .def("cancel", &BitmapLoadRequest_cancel)
+        .def("isCancelled", &BitmapManagerMsg::isCancelled)
+        .def("getFilename", &BitmapManagerMsg::getFilename)
+        .add_property("priority", &BitmapLoadRequest_getPriority,
+                &BitmapLoadRequest_setPriority)
+    ;
+
+    class_<BitmapCache, boost::noncopyable>("BitmapCache", no_init)
+        .def("get", &BitmapCache::get,
+                return_value_policy<reference_existing_object>())
+        .staticmethod("get")
+        .def("getNumHits", &BitmapCache::getNumHits)
+        .def("getNumMisses", &BitmapCache::getNumMisses)
+        .def("getNumInternHits", &BitmapCache::getNumInternHits)
+        .def("getNumBytes", &BitmapCache::getNumBytes)
+        .def("getNumEntries", &BitmapCache::getNumEntries)
+        .def("getMaxBytes", &BitmapCache::getMaxBytes)
+        .def("setMaxBytes", &BitmapCache::setMaxBytes)
+        .def("resetStats", &BitmapCache::resetStats)
+        .def("clear", &BitmapCache::clear)
+    ;
+
+    class_<TextureAtlas, boost::noncopyable>("TextureAtlas", no_init)
+        .def("get", &TextureAtlas::get,
+                return_value_policy<reference_existing_object>())
+        .staticmethod("get")
+        .def("getMaxImageSize", &TextureAtlas::getMaxImageSize)
+        .def("setMaxImageSize", &TextureAtlas::setMaxImageSize)
+        .def("getPageSize", &TextureAtlas::getPageSize)
+        .def("setPageSize", &TextureAtlas::setPageSize)
+        .def("getMaxBytes", &TextureAtlas::getMaxBytes)
+        .def("setMaxBytes", &TextureAtlas::setMaxBytes)
+        .def("getNumBytes", &TextureAtlas::getNumBytes)
+        .def("getNumPages", &TextureAtlas::getNumPages)
+        .def("getNumRegions", &TextureAtlas::getNumRegions)
+        .def("getNumRepacks", &TextureAtlas::getNumRepacks)
+    ;
+
+    class_<BitmapDiskCache, boost::noncopyable>("BitmapDiskCache", no_init)
+        .def("get", &BitmapDiskCache::get,
+                return_value_policy<reference_existing_object>())
+        .staticmethod("get")
+        .def("setDir", &BitmapDiskCache::setDir)
+        .def("getDir", &BitmapDiskCache::getDir)
+        .def("prewarm", &BitmapDiskCache::prewarm, prewarm_overloads(
+                args("self", "fileName", "pixelformat", "maxsize")))
+        .def("getNumHits", &BitmapDiskCache::getNumHits)
+        .def("getNumMisses", &BitmapDiskCache::getNumMisses)
+        .def("resetStats", &BitmapDiskCache::resetStats)
     ;
 
     class_<CubicSpline, boost::noncopyable>("CubicSpline", no_init)
@@ -206,4 +503,16 @@ void export_bitmap()
         .def(init<const vector<glm::vec2>&, bool>())
         .def("interpolate", &CubicSpline::interpolate)
     ;
+
+    class_<OneEuroFilterBank, boost::noncopyable>("OneEuroFilterBank", 
+            init<float, float, float>((boost::python::arg("mincutoff")=1.0,
+                    boost::python::arg("beta")=0.0, boost::python::arg("dcutoff")=1.0)))
+        .def("addChannel", &OneEuroFilterBank::addChannel)
+        .def("removeChannel", &OneEuroFilterBank::removeChannel)
+        .def("getNumChannels", &OneEuroFilterBank::getNumChannels)
+        .def("apply", &OneEuroFilterBank::apply)
+        .add_property("mincutoff", &OneEuroFilterBank::getMinCutoff)
+        .add_property("beta", &OneEuroFilterBank::getBeta)
+        .add_property("dcutoff", &OneEuroFilterBank::getDCutoff)
+    ;
 }
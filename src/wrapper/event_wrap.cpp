@@ -203,6 +203,13 @@ void export_event()
         .add_property("motionvec", &Contact::getMotionVec)
         .add_property("distancetravelled", &Contact::getDistanceTravelled)
         .add_property("events", &Contact::getEvents)
+        .add_property("firstevent", &Contact::getFirstEvent)
+        .add_property("lastevent", &Contact::getLastEvent)
+        .add_property("numevents", &Contact::getNumEvents)
+        .def("setMaxHistoryLen", &Contact::setMaxHistoryLen)
+        .staticmethod("setMaxHistoryLen")
+        .def("getMaxHistoryLen", &Contact::getMaxHistoryLen)
+        .staticmethod("getMaxHistoryLen")
         .def("connectListener", &Contact::connectListener)
         .def("disconnectListener", &Contact::disconnectListener)
         ;
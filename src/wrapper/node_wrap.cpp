@@ -152,6 +152,10 @@ void export_node()
     class_<DivNode, bases<AreaNode>, boost::noncopyable>("DivNode", no_init)
         .def("__init__", raw_constructor(createNode<divNodeName>))
         .add_property("crop", &DivNode::getCrop, &DivNode::setCrop)
+        .add_property("spatialindex", &DivNode::getSpatialIndex, 
+                &DivNode::setSpatialIndex)
+        .add_property("cached", &DivNode::getCached, &DivNode::setCached)
+        .def("invalidate", &DivNode::invalidate)
         .def("getNumChildren", &DivNode::getNumChildren)
         .def("getChild", make_function(&DivNode::getChild,
                 return_value_policy<copy_const_reference>()))
@@ -38,6 +38,8 @@ char videoNodeName[] = "video";
 char fontStyleName[] = "fontstyle";
 char wordsNodeName[] = "words";
 
+BOOST_PYTHON_MEMBER_FUNCTION_OVERLOADS(setBitmap_overloads, ImageNode::setBitmap, 1, 2);
+
 void export_raster()
 {
 
@@ -73,13 +75,17 @@ void export_raster()
     class_<ImageNode, bases<RasterNode> >("ImageNode", no_init)
         .def("__init__", raw_constructor(createNode<imageNodeName>))
         .def("getBitmap", &ImageNode::getBitmap)
-        .def("setBitmap", &ImageNode::setBitmap)
+        .def("setBitmap", &ImageNode::setBitmap,
+                setBitmap_overloads(args("bitmap", "shared")))
         .add_property("href", 
                 make_function(&ImageNode::getHRef,
                         return_value_policy<copy_const_reference>()),
                 &ImageNode::setHRef)
         .add_property("compression",
                 &ImageNode::getCompression)
+        .add_property("maxdecodesize",
+                make_function(&ImageNode::getMaxDecodeSize,
+                        return_value_policy<copy_const_reference>()))
     ;
 
     class_<CameraNode, bases<RasterNode> >("CameraNode", no_init)